@@ -5,6 +5,10 @@ Split from monolithic analytics.py (~1235 lines) for maintainability:
 - timeseries: Time-series data and spot price APIs
 - analysis: Strike analysis, reversal levels, max pain, IV skew
 - aggregate: Aggregate OI/COI views (LOC Calculator style)
+- scenario: Spot x IV x time scenario grid repricing
+- surface: Fitted volatility surface (SVI per expiry)
+- optimizer: Best strike combinations for spreads, condors and butterflies
+- simulation: Monte Carlo probability cones, touch odds and position POP
 
 All routers are prefixed with /analytics in the main router.py
 """
@@ -12,6 +16,10 @@ from fastapi import APIRouter
 from app.api.v1.analytics.timeseries import router as timeseries_router
 from app.api.v1.analytics.analysis import router as analysis_router
 from app.api.v1.analytics.aggregate import router as aggregate_router
+from app.api.v1.analytics.scenario import router as scenario_router
+from app.api.v1.analytics.surface import router as surface_router
+from app.api.v1.analytics.optimizer import router as optimizer_router
+from app.api.v1.analytics.simulation import router as simulation_router
 
 router = APIRouter()
 
@@ -19,5 +27,9 @@ router = APIRouter()
 router.include_router(timeseries_router, tags=["Analytics - Timeseries"])
 router.include_router(analysis_router, tags=["Analytics - Analysis"])
 router.include_router(aggregate_router, tags=["Analytics - Aggregate"])
+router.include_router(scenario_router, tags=["Analytics - Scenario"])
+router.include_router(surface_router, tags=["Analytics - Surface"])
+router.include_router(optimizer_router, tags=["Analytics - Optimizer"])
+router.include_router(simulation_router, tags=["Analytics - Simulation"])
 
 __all__ = ["router"]
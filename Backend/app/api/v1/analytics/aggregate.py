@@ -11,11 +11,13 @@ import logging
 import random
 from typing import Optional, List
 
+import numpy as np
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 
 from app.core.dependencies import OptionalUser
 from app.services.dhan_client import get_dhan_client
+from app.services.chain_frame import ChainFrame
 from app.services.options import OptionsService
 from app.cache.redis import get_redis, RedisCache
 
@@ -133,57 +135,42 @@ async def get_aggregate_coi(
     symbol = symbol.upper()
     
     try:
-        live_data = await service.get_live_data(
-            symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
-        )
+        frame = await service.get_chain_frame(symbol, expiry)
         
-        oc_data = live_data.get("oc", {})
-        atm_strike = live_data.get("atm_strike", 0)
-        
-        if not oc_data:
+        if frame is None or not len(frame):
             return generate_mock_aggregate_data(symbol, "coi", top_n)
         
-        data = []
-        total_ce_coi = 0
-        total_pe_coi = 0
-        
-        for strike_key, strike_data in oc_data.items():
-            try:
-                strike = float(strike_key)
-            except:
-                continue
-            
-            ce = strike_data.get("ce", {})
-            pe = strike_data.get("pe", {})
-            
-            ce_coi = ce.get("oichng", ce.get("oi_change", 0)) or 0
-            pe_coi = pe.get("oichng", pe.get("oi_change", 0)) or 0
-            
-            total_ce_coi += ce_coi
-            total_pe_coi += pe_coi
-            
-            data.append({
-                "strike": strike,
-                "ce_coi": ce_coi,
-                "pe_coi": pe_coi,
-                "net_coi": pe_coi - ce_coi,
-                "ce_oi": ce.get("OI", ce.get("oi", 0)) or 0,
-                "pe_oi": pe.get("OI", pe.get("oi", 0)) or 0,
-                "is_atm": abs(strike - atm_strike) < 100,
-            })
+        atm_strike = frame.atm_strike()
+        ce_coi, pe_coi = frame.ce("oichng"), frame.pe("oichng")
+        total_ce_coi = ce_coi.sum().item()
+        total_pe_coi = pe_coi.sum().item()
         
-        data.sort(key=lambda x: abs(x["ce_coi"]) + abs(x["pe_coi"]), reverse=True)
-        data = data[:top_n]
-        data.sort(key=lambda x: x["strike"])
+        # Most active strikes, back in strike order
+        rows = np.sort(np.argsort(-(np.abs(ce_coi) + np.abs(pe_coi)), kind="stable")[:top_n])
+        strikes = frame.strikes[rows]
+        ce_coi, pe_coi = ce_coi[rows], pe_coi[rows]
+        cumulative_ce, cumulative_pe = np.cumsum(ce_coi), np.cumsum(pe_coi)
         
-        cumulative_ce = 0
-        cumulative_pe = 0
-        for item in data:
-            cumulative_ce += item["ce_coi"]
-            cumulative_pe += item["pe_coi"]
-            item["cumulative_ce_coi"] = cumulative_ce
-            item["cumulative_pe_coi"] = cumulative_pe
-            item["cumulative_net"] = cumulative_pe - cumulative_ce
+        data = [
+            {
+                "strike": strike,
+                "ce_coi": ce,
+                "pe_coi": pe,
+                "net_coi": pe - ce,
+                "ce_oi": ce_oi,
+                "pe_oi": pe_oi,
+                "is_atm": is_atm,
+                "cumulative_ce_coi": cum_ce,
+                "cumulative_pe_coi": cum_pe,
+                "cumulative_net": cum_pe - cum_ce,
+            }
+            for strike, ce, pe, ce_oi, pe_oi, is_atm, cum_ce, cum_pe in zip(
+                strikes.tolist(), ce_coi.tolist(), pe_coi.tolist(),
+                frame.ce("OI")[rows].tolist(), frame.pe("OI")[rows].tolist(),
+                (np.abs(strikes - atm_strike) < 100).tolist(),
+                cumulative_ce.tolist(), cumulative_pe.tolist(),
+            )
+        ]
         
         net_coi = total_pe_coi - total_ce_coi
         
@@ -220,47 +207,35 @@ async def get_aggregate_oi(
     symbol = symbol.upper()
     
     try:
-        live_data = await service.get_live_data(
-            symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
-        )
-        
-        oc_data = live_data.get("oc", {})
-        atm_strike = live_data.get("atm_strike", 0)
+        frame = await service.get_chain_frame(symbol, expiry)
         
-        if not oc_data:
+        if frame is None or not len(frame):
             return generate_mock_aggregate_data(symbol, "oi", top_n)
         
-        data = []
-        total_ce_oi = 0
-        total_pe_oi = 0
+        atm_strike = frame.atm_strike()
+        ce_oi, pe_oi = frame.ce("OI"), frame.pe("OI")
+        total_ce_oi = ce_oi.sum().item()
+        total_pe_oi = pe_oi.sum().item()
         
-        for strike_key, strike_data in oc_data.items():
-            try:
-                strike = float(strike_key)
-            except:
-                continue
-            
-            ce = strike_data.get("ce", {})
-            pe = strike_data.get("pe", {})
-            
-            ce_oi = ce.get("OI", ce.get("oi", 0)) or 0
-            pe_oi = pe.get("OI", pe.get("oi", 0)) or 0
-            
-            total_ce_oi += ce_oi
-            total_pe_oi += pe_oi
-            
-            data.append({
-                "strike": strike,
-                "ce_oi": ce_oi,
-                "pe_oi": pe_oi,
-                "total_oi": ce_oi + pe_oi,
-                "pcr": round(pe_oi / ce_oi, 2) if ce_oi > 0 else 0,
-                "is_atm": abs(strike - atm_strike) < 100,
-            })
+        # Largest OI strikes, back in strike order
+        rows = np.sort(np.argsort(-(ce_oi + pe_oi), kind="stable")[:top_n])
+        strikes = frame.strikes[rows]
         
-        data.sort(key=lambda x: x["total_oi"], reverse=True)
-        data = data[:top_n]
-        data.sort(key=lambda x: x["strike"])
+        data = [
+            {
+                "strike": strike,
+                "ce_oi": ce,
+                "pe_oi": pe,
+                "total_oi": ce + pe,
+                "pcr": pcr,
+                "is_atm": is_atm,
+            }
+            for strike, ce, pe, pcr, is_atm in zip(
+                strikes.tolist(), ce_oi[rows].tolist(), pe_oi[rows].tolist(),
+                frame.strike_pcr(2)[rows].tolist(),
+                (np.abs(strikes - atm_strike) < 100).tolist(),
+            )
+        ]
         
         pcr = round(total_pe_oi / total_ce_oi, 2) if total_ce_oi > 0 else 0
         
@@ -296,46 +271,26 @@ async def get_aggregate_pcr(
     symbol = symbol.upper()
     
     try:
-        live_data = await service.get_live_data(
-            symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
-        )
-        
-        oc_data = live_data.get("oc", {})
-        atm_strike = live_data.get("atm_strike", 0)
+        frame = await service.get_chain_frame(symbol, expiry) or ChainFrame.from_oc({})
+        atm_strike = frame.atm_strike()
         
-        data = []
-        total_ce_oi = 0
-        total_pe_oi = 0
-        total_ce_vol = 0
-        total_pe_vol = 0
+        total_ce_oi, total_pe_oi = frame.ce("OI").sum().item(), frame.pe("OI").sum().item()
+        total_ce_vol, total_pe_vol = frame.ce("vol").sum().item(), frame.pe("vol").sum().item()
         
-        for strike_key, strike_data in oc_data.items():
-            try:
-                strike = float(strike_key)
-            except:
-                continue
-            
-            ce = strike_data.get("ce", {})
-            pe = strike_data.get("pe", {})
-            
-            ce_oi = ce.get("OI", ce.get("oi", 0)) or 0
-            pe_oi = pe.get("OI", pe.get("oi", 0)) or 0
-            ce_vol = ce.get("volume", ce.get("vol", 0)) or 0
-            pe_vol = pe.get("volume", pe.get("vol", 0)) or 0
-            
-            total_ce_oi += ce_oi
-            total_pe_oi += pe_oi
-            total_ce_vol += ce_vol
-            total_pe_vol += pe_vol
-            
-            data.append({
+        data = [
+            {
                 "strike": strike,
-                "oi_pcr": round(pe_oi / ce_oi, 2) if ce_oi > 0 else 0,
-                "vol_pcr": round(pe_vol / ce_vol, 2) if ce_vol > 0 else 0,
-                "is_atm": abs(strike - atm_strike) < 100,
-            })
-        
-        data.sort(key=lambda x: x["strike"])
+                "oi_pcr": oi_pcr,
+                "vol_pcr": vol_pcr,
+                "is_atm": is_atm,
+            }
+            for strike, oi_pcr, vol_pcr, is_atm in zip(
+                frame.strikes.tolist(),
+                frame.strike_pcr(2).tolist(),
+                frame.strike_pcr(2, field="vol").tolist(),
+                (np.abs(frame.strikes - atm_strike) < 100).tolist(),
+            )
+        ]
         
         overall_oi_pcr = round(total_pe_oi / total_ce_oi, 2) if total_ce_oi > 0 else 0
         overall_vol_pcr = round(total_pe_vol / total_ce_vol, 2) if total_ce_vol > 0 else 0
@@ -371,40 +326,27 @@ async def get_aggregate_percentage(
     symbol = symbol.upper()
     
     try:
-        live_data = await service.get_live_data(
-            symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
-        )
-        
-        oc_data = live_data.get("oc", {})
-        atm_strike = live_data.get("atm_strike", 0)
+        frame = await service.get_chain_frame(symbol, expiry) or ChainFrame.from_oc({})
+        atm_strike = frame.atm_strike()
         
-        data = []
+        # COI as a percentage of OI per leg; 0 where there is no OI
+        oi = frame.legs["OI"].astype(np.float64)
+        coi_pct = np.round(
+            np.divide(frame.legs["oichng"], oi, out=np.zeros_like(oi), where=oi > 0) * 100, 2
+        ).tolist()
+        n = len(frame)
         
-        for strike_key, strike_data in oc_data.items():
-            try:
-                strike = float(strike_key)
-            except:
-                continue
-            
-            ce = strike_data.get("ce", {})
-            pe = strike_data.get("pe", {})
-            
-            ce_oi = ce.get("OI", ce.get("oi", 0)) or 0
-            pe_oi = pe.get("OI", pe.get("oi", 0)) or 0
-            ce_coi = ce.get("oichng", 0) or 0
-            pe_coi = pe.get("oichng", 0) or 0
-            
-            ce_pct = round((ce_coi / ce_oi) * 100, 2) if ce_oi > 0 else 0
-            pe_pct = round((pe_coi / pe_oi) * 100, 2) if pe_oi > 0 else 0
-            
-            data.append({
+        data = [
+            {
                 "strike": strike,
-                "ce_oi_pct": ce_pct,
-                "pe_oi_pct": pe_pct,
-                "is_atm": abs(strike - atm_strike) < 100,
-            })
-        
-        data.sort(key=lambda x: x["strike"])
+                "ce_oi_pct": coi_pct[i],
+                "pe_oi_pct": coi_pct[n + i],
+                "is_atm": is_atm,
+            }
+            for i, (strike, is_atm) in enumerate(zip(
+                frame.strikes.tolist(), (np.abs(frame.strikes - atm_strike) < 100).tolist()
+            ))
+        ]
         
         return {
             "success": True,
@@ -56,6 +56,7 @@ class ReversalLevelsResponse(BaseModel):
     straddle: float
     expected_range: float
     calculation_details: dict
+    reversal_debug: Optional[dict] = None
 
 
 class FuturesSummaryResponse(BaseModel):
@@ -146,6 +147,7 @@ async def get_precise_reversal(
     symbol: str,
     strike: float,
     expiry: str = Query(..., description="Expiry timestamp"),
+    debug: bool = Query(False, description="Include the reversal Greek breakdown for this strike"),
     current_user: OptionalUser = None,
     service: OptionsService = Depends(get_analytics_service),
 ) -> ReversalLevelsResponse:
@@ -154,7 +156,8 @@ async def get_precise_reversal(
     
     try:
         live_data = await service.get_live_data(
-            symbol=symbol, expiry=expiry, include_greeks=True, include_reversal=True
+            symbol=symbol, expiry=expiry, include_greeks=True, include_reversal=True,
+            debug_strike=strike if debug else None
         )
         
         oc_data = live_data.get("oc", {})
@@ -245,7 +248,8 @@ async def get_precise_reversal(
                 "pe_ltp": round(pe_ltp, 2),
                 "days_to_expiry": days_to_expiry,
                 "decay_factor": round(decay_factor, 2),
-            }
+            },
+            reversal_debug=strike_data.get("reversal_debug") if debug else None
         )
     except HTTPException:
         raise
@@ -427,7 +431,8 @@ async def get_iv_skew(
     
     try:
         live_data = await service.get_live_data(
-            symbol=symbol, expiry=expiry, include_greeks=True, include_reversal=False
+            symbol=symbol, expiry=expiry, include_greeks=True, include_reversal=False,
+            greeks_level="first"
         )
         
         oc_data = live_data.get("oc", {})
@@ -0,0 +1,89 @@
+"""
+Strategy Optimizer Endpoints
+
+Provides:
+- Best strike combinations for credit spreads, iron condors and butterflies
+"""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+
+from app.config.settings import settings
+from app.core.container import get_strategy_optimizer_dep
+from app.core.dependencies import OptionalUser
+from app.services.dhan_client import get_dhan_client
+from app.services.options import OptionsService
+from app.services.optimizer import (
+    ChainQuotes, StrategyOptimizer, OPTIMIZER_STRATEGIES, OPTIMIZER_RANKINGS
+)
+from app.cache.redis import get_redis, RedisCache
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# ============== Helper ==============
+
+async def get_analytics_service(cache: RedisCache = Depends(get_redis)) -> OptionsService:
+    dhan = await get_dhan_client(cache=cache)
+    return OptionsService(dhan_client=dhan, cache=cache)
+
+
+# ============== Optimizer ==============
+
+@router.get("/optimizer/{symbol}/{expiry}")
+async def optimize_strategy(
+    symbol: str,
+    expiry: str,
+    strategy: str = Query("iron_condor", description=f"One of: {', '.join(OPTIMIZER_STRATEGIES)}"),
+    top_k: int = Query(10, ge=1, le=settings.OPTIMIZER_MAX_TOP_K),
+    max_width: Optional[int] = Query(None, ge=1, le=100, description="Widest wing, in strikes"),
+    max_loss: Optional[float] = Query(None, gt=0, description="Largest acceptable max loss per unit"),
+    min_pop: float = Query(0.0, ge=0, le=100, description="Smallest acceptable probability of profit (%)"),
+    rank_by: str = Query("score", description=f"One of: {', '.join(OPTIMIZER_RANKINGS)}"),
+    time_budget: Optional[float] = Query(None, gt=0, le=30, description="Search time limit in seconds"),
+    current_user: OptionalUser = None,
+    service: OptionsService = Depends(get_analytics_service),
+    optimizer: StrategyOptimizer = Depends(get_strategy_optimizer_dep),
+):
+    """
+    Search the live chain for the best strike combinations of a structure.
+
+    Combinations are ranked by `score` (expected P&L per unit of risk,
+    treating the payoff as win max profit / lose max loss), probability of
+    profit or reward/risk. Premiums and risk are per unit; `complete` is
+    false when the time budget cut the search short.
+    """
+    symbol = symbol.upper()
+    if strategy not in OPTIMIZER_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"strategy must be one of {', '.join(OPTIMIZER_STRATEGIES)}")
+    if rank_by not in OPTIMIZER_RANKINGS:
+        raise HTTPException(status_code=400, detail=f"rank_by must be one of {', '.join(OPTIMIZER_RANKINGS)}")
+
+    live_data = await service.get_live_data(
+        symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
+    )
+    quotes = ChainQuotes.from_live_data(live_data, settings.DEFAULT_RISK_FREE_RATE)
+    if quotes is None:
+        raise HTTPException(status_code=404, detail="No live chain available")
+
+    result = await optimizer.optimize(
+        quotes,
+        strategy,
+        top_k=top_k,
+        max_width=max_width,
+        max_loss=max_loss,
+        min_pop=min_pop / 100,
+        rank_by=rank_by,
+        time_budget=time_budget,
+    )
+    return {
+        "success": True,
+        "symbol": symbol,
+        "expiry": expiry,
+        "spot": live_data["spot"]["ltp"],
+        "forward": round(quotes.forward, 2),
+        "days_to_expiry": live_data.get("days_to_expiry"),
+        **result,
+    }
@@ -0,0 +1,125 @@
+"""
+Scenario Analysis Endpoints
+
+Provides:
+- Scenario grid: reprice the whole chain over spot x IV x time shocks
+"""
+import json
+import logging
+import time
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+
+from app.core.container import get_scenario_service_dep
+from app.core.dependencies import OptionalUser
+from app.services.dhan_client import get_dhan_client
+from app.services.options import OptionsService
+from app.services.scenario import ScenarioService, SCENARIO_METRICS
+from app.cache.redis import get_redis, RedisCache
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Largest grid (spot x iv x time x strikes) served in one response
+MAX_SCENARIO_CELLS = 1_000_000
+
+
+# ============== Helper ==============
+
+async def get_analytics_service(cache: RedisCache = Depends(get_redis)) -> OptionsService:
+    dhan = await get_dhan_client(cache=cache)
+    return OptionsService(dhan_client=dhan, cache=cache)
+
+
+# ============== Scenario Grid ==============
+
+@router.get("/scenario/{symbol}/{expiry}")
+async def get_scenario_grid(
+    symbol: str,
+    expiry: str,
+    spot_range_pct: float = Query(2.0, ge=0, le=20, description="Spot shocks span ±this percent"),
+    spot_steps: int = Query(21, ge=1, le=101),
+    iv_range: float = Query(3.0, ge=0, le=50, description="IV shifts span ±this many vol points"),
+    iv_steps: int = Query(11, ge=1, le=51),
+    days_forward: float = Query(4.0, ge=0, le=365, description="Last time step, in days from now"),
+    time_steps: int = Query(5, ge=1, le=31),
+    metrics: str = Query("price,delta", description=f"Comma-separated: {', '.join(SCENARIO_METRICS)}"),
+    current_user: OptionalUser = None,
+    service: OptionsService = Depends(get_analytics_service),
+    scenario: ScenarioService = Depends(get_scenario_service_dep),
+):
+    """
+    Reprice every strike over a grid of spot shocks, IV shifts and days forward.
+
+    Each metric is returned per leg as a nested list indexed
+    [spot][iv][time][strike], matching the "axes" block.
+    """
+    symbol = symbol.upper()
+    metric_list = [m.strip() for m in metrics.split(",") if m.strip()]
+    unknown = [m for m in metric_list if m not in SCENARIO_METRICS]
+    if not metric_list or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"metrics must be a subset of {', '.join(SCENARIO_METRICS)}"
+        )
+
+    live_data = await service.get_live_data(
+        symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
+    )
+    oc_data = live_data.get("oc", {}) if live_data else {}
+    spot = (live_data or {}).get("spot", {}).get("ltp", 0)
+    if not oc_data or spot <= 0:
+        raise HTTPException(status_code=404, detail="No live chain available")
+
+    rows = sorted(
+        (float(key), data.get("ce", {}).get("iv", 0) or 0, data.get("pe", {}).get("iv", 0) or 0)
+        for key, data in oc_data.items()
+    )
+    strikes = np.array([row[0] for row in rows])
+    call_ivs = np.array([row[1] for row in rows])
+    put_ivs = np.array([row[2] for row in rows])
+    # Legs without an IV borrow the other side's, else the ATM IV
+    fallback_iv = live_data.get("atmiv") or 15.0
+    call_ivs = np.where(call_ivs > 0, call_ivs, np.where(put_ivs > 0, put_ivs, fallback_iv))
+    put_ivs = np.where(put_ivs > 0, put_ivs, call_ivs)
+
+    if spot_steps * iv_steps * time_steps * len(strikes) > MAX_SCENARIO_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Scenario grid too large (max {MAX_SCENARIO_CELLS:,} cells)"
+        )
+
+    spot_shocks = np.linspace(-spot_range_pct, spot_range_pct, spot_steps)
+    iv_shifts = np.linspace(-iv_range, iv_range, iv_steps)
+    days = np.linspace(0, days_forward, time_steps)
+    T_days = float(live_data.get("days_to_expiry") or 0)
+
+    start = time.perf_counter()
+    grid = scenario.reprice_grid(
+        spot, strikes, call_ivs, put_ivs, T_days,
+        spot_shocks, iv_shifts, days, metric_list
+    )
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    payload = {
+        "success": True,
+        "symbol": symbol,
+        "expiry": expiry,
+        "spot": spot,
+        "days_to_expiry": T_days,
+        "metrics": metric_list,
+        "shape": [spot_steps, iv_steps, time_steps, len(strikes)],
+        "axes": {
+            "spot_shock_pct": np.round(spot_shocks, 4).tolist(),
+            "spot": np.round(spot * (1 + spot_shocks / 100), 2).tolist(),
+            "iv_shift": np.round(iv_shifts, 4).tolist(),
+            "days_forward": np.round(days, 4).tolist(),
+            "strikes": strikes.tolist(),
+        },
+        "ce": {m: np.round(arr, 2 if m == "price" else 6).tolist() for m, arr in grid["ce"].items()},
+        "pe": {m: np.round(arr, 2 if m == "price" else 6).tolist() for m, arr in grid["pe"].items()},
+        "compute_ms": round(compute_ms, 2),
+    }
+    # Encoded directly: the nested tensors are too large for jsonable_encoder
+    return Response(content=json.dumps(payload, separators=(",", ":")), media_type="application/json")
@@ -0,0 +1,191 @@
+"""
+Monte Carlo Simulation Endpoints
+
+Provides:
+- Percentile price cones and probability of touch per strike
+- Probability of profit for a position at expiry
+"""
+import asyncio
+import logging
+import math
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query, HTTPException
+from pydantic import BaseModel, Field
+
+from app.api.v1.calculators import StrategyLegRequest
+from app.config.settings import settings
+from app.core.container import container, get_simulation_service_dep
+from app.core.dependencies import OptionalUser
+from app.services.dhan_client import get_dhan_client
+from app.services.options import OptionsService
+from app.services.simulation import SimulationService, PathSet, JumpParams, DEFAULT_PERCENTILES
+from app.services.strategy import StrategyLeg
+from app.cache.redis import get_redis, RedisCache
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# ============== Request Models ==============
+
+class JumpRequest(BaseModel):
+    """Merton jump parameters"""
+    intensity: float = Field(..., gt=0, le=100, description="Expected jumps per year")
+    mean: float = Field(0.0, ge=-1, le=1, description="Mean log jump size")
+    vol: float = Field(0.05, ge=0, le=1, description="Std dev of the log jump size")
+
+
+class SimulationPositionRequest(BaseModel):
+    """Position to evaluate against the simulated expiry distribution"""
+    legs: List[StrategyLegRequest] = Field(..., min_length=1, max_length=20, description="Position legs")
+    jumps: Optional[JumpRequest] = Field(None, description="Add Merton jumps to the GBM paths")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed; server default if omitted")
+
+
+# ============== Helper ==============
+
+async def get_analytics_service(cache: RedisCache = Depends(get_redis)) -> OptionsService:
+    dhan = await get_dhan_client(cache=cache)
+    return OptionsService(dhan_client=dhan, cache=cache)
+
+
+async def snapshot_paths(
+    service: OptionsService,
+    simulation: SimulationService,
+    symbol: str,
+    expiry: str,
+    jumps: Optional[JumpParams],
+    seed: Optional[int]
+) -> Tuple[Dict, PathSet]:
+    """Live chain for an expiry and the path set simulated from its spot and ATM IV"""
+    live_data = await service.get_live_data(
+        symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
+    )
+    spot = (live_data or {}).get("spot", {}).get("ltp", 0)
+    atm_iv = (live_data or {}).get("atmiv") or 0
+    T_days = float((live_data or {}).get("days_to_expiry") or 0)
+    if spot <= 0 or atm_iv <= 0 or T_days <= 0:
+        raise HTTPException(status_code=404, detail="No live chain with spot, ATM IV and expiry available")
+
+    rate = settings.DEFAULT_RISK_FREE_RATE
+    # Start from the parity forward, discounted, when the chain provides one
+    parity = live_data.get("implied_forward") or {}
+    if parity.get("forward"):
+        spot = parity["forward"] * math.exp(-rate * T_days / 365)
+
+    # Path generation is tens of milliseconds of NumPy work, so it runs on
+    # the chain compute executor, off the event loop (inline when none is set)
+    simulate = partial(simulation.simulate, spot, atm_iv / 100, T_days, rate, jumps=jumps, seed=seed)
+    executor = container.chain_thread_executor
+    try:
+        if executor is None:
+            paths = simulate()
+        else:
+            paths = await asyncio.get_running_loop().run_in_executor(executor, simulate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return live_data, paths
+
+
+def parse_jumps(intensity: float, mean: float, vol: float) -> Optional[JumpParams]:
+    return JumpParams(intensity=intensity, mean=mean, vol=vol) if intensity > 0 else None
+
+
+# ============== Cones and Touch ==============
+
+@router.get("/simulation/{symbol}/{expiry}")
+async def get_simulation(
+    symbol: str,
+    expiry: str,
+    percentiles: Optional[str] = Query(None, description="Comma-separated cone percentiles (default 5,16,25,50,75,84,95)"),
+    strikes: Optional[str] = Query(None, description="Comma-separated strikes for touch odds (default: whole chain)"),
+    jump_intensity: float = Query(0.0, ge=0, le=100, description="Expected jumps per year (0 = pure GBM)"),
+    jump_mean: float = Query(0.0, ge=-1, le=1, description="Mean log jump size"),
+    jump_vol: float = Query(0.05, ge=0, le=1, description="Std dev of the log jump size"),
+    seed: Optional[int] = Query(None, ge=0, description="Random seed; server default if omitted"),
+    current_user: OptionalUser = None,
+    service: OptionsService = Depends(get_analytics_service),
+    simulation: SimulationService = Depends(get_simulation_service_dep),
+):
+    """
+    Simulated expected-move distribution to expiry.
+
+    Returns price percentile cones for each day to expiry, and for each
+    strike the probability of touching it before expiry and of finishing
+    beyond it. Paths start at the current spot with the chain's ATM IV.
+    """
+    symbol = symbol.upper()
+    try:
+        levels = (
+            [float(q) for q in percentiles.split(",") if q.strip()] if percentiles
+            else list(DEFAULT_PERCENTILES)
+        )
+        strike_list = [float(s) for s in strikes.split(",") if s.strip()] if strikes else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="percentiles and strikes must be comma-separated numbers")
+    if not levels or not all(0 <= q <= 100 for q in levels):
+        raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+
+    live_data, paths = await snapshot_paths(
+        service, simulation, symbol, expiry, parse_jumps(jump_intensity, jump_mean, jump_vol), seed
+    )
+    if strike_list is None:
+        strike_list = sorted(float(k) for k in live_data.get("oc", {}))
+
+    cones = simulation.percentile_cones(paths, levels)
+    touch = simulation.touch_probabilities(paths, strike_list)
+    return {
+        "success": True,
+        "symbol": symbol,
+        "expiry": expiry,
+        "simulation": paths.to_dict(),
+        "cones": {
+            "days": np.round(paths.days, 4).tolist(),
+            **{name: np.round(band, 2).tolist() for name, band in cones.items()},
+        },
+        "strikes": strike_list,
+        "touch_probability": np.round(touch["touch"] * 100, 2).tolist(),
+        "expire_beyond_probability": np.round(touch["expire_beyond"] * 100, 2).tolist(),
+    }
+
+
+# ============== Position POP ==============
+
+@router.post("/simulation/{symbol}/{expiry}/probability-of-profit")
+async def get_simulated_pop(
+    symbol: str,
+    expiry: str,
+    request: SimulationPositionRequest,
+    current_user: OptionalUser = None,
+    service: OptionsService = Depends(get_analytics_service),
+    simulation: SimulationService = Depends(get_simulation_service_dep),
+):
+    """
+    Probability of profit of a position at this expiry, over the same
+    simulated paths as the cones. Legs of later expiries are marked at
+    their remaining time value.
+    """
+    symbol = symbol.upper()
+    jumps = parse_jumps(**request.jumps.model_dump()) if request.jumps else None
+    _, paths = await snapshot_paths(service, simulation, symbol, expiry, jumps, request.seed)
+
+    try:
+        result = simulation.probability_of_profit(
+            paths, [StrategyLeg(**leg.model_dump()) for leg in request.legs]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "success": True,
+        "symbol": symbol,
+        "expiry": expiry,
+        "simulation": paths.to_dict(),
+        "pop": round(result["pop"] * 100, 2),
+        "expected_pnl": round(result["expected_pnl"], 2),
+        "net_premium": round(result["net_premium"], 2),
+        "pnl_percentiles": {name: round(v, 2) for name, v in result["pnl_percentiles"].items()},
+    }
@@ -0,0 +1,90 @@
+"""
+Volatility Surface Endpoints
+
+Provides:
+- Fitted SVI smiles per expiry, with market vs fitted IVs
+- Surface IV at arbitrary strikes and days to expiry
+"""
+import logging
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query, HTTPException
+
+from app.core.container import get_vol_surface_service_dep
+from app.core.dependencies import OptionalUser
+from app.services.dhan_client import get_dhan_client
+from app.services.options import OptionsService
+from app.services.vol_surface import VolSurfaceService
+from app.cache.redis import get_redis, RedisCache
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# ============== Helper ==============
+
+async def get_analytics_service(cache: RedisCache = Depends(get_redis)) -> OptionsService:
+    dhan = await get_dhan_client(cache=cache)
+    return OptionsService(dhan_client=dhan, cache=cache)
+
+
+# ============== Vol Surface ==============
+
+@router.get("/vol-surface/{symbol}")
+async def get_vol_surface(
+    symbol: str,
+    expiry: Optional[str] = Query(None, description="Refresh this expiry's smile from the live chain first"),
+    strikes: Optional[str] = Query(None, description="Comma-separated strikes to evaluate the surface at"),
+    days: Optional[float] = Query(None, gt=0, le=730, description="Days to expiry to evaluate the surface at"),
+    current_user: OptionalUser = None,
+    service: OptionsService = Depends(get_analytics_service),
+    surface: VolSurfaceService = Depends(get_vol_surface_service_dep),
+):
+    """
+    Get the cached volatility surface for a symbol.
+
+    Each fitted expiry is returned with its SVI parameters and its smile
+    (market vs fitted IV per quoted strike). With `strikes` and `days`, the
+    surface is also interpolated across expiries at those points.
+    """
+    symbol = symbol.upper()
+    if expiry:
+        # Fitting happens as part of processing the chain
+        await service.get_live_data(
+            symbol=symbol, expiry=expiry, include_greeks=False, include_reversal=False
+        )
+
+    slices = surface.get_surface(symbol)
+    if not slices:
+        raise HTTPException(status_code=404, detail="No fitted surface for this symbol")
+
+    result = {
+        "success": True,
+        "symbol": symbol,
+        "expiries": [
+            {
+                **fitted.to_dict(),
+                "smile": {
+                    "strikes": fitted.strikes.tolist(),
+                    "market_iv": np.round(fitted.quote_ivs, 2).tolist(),
+                    "fitted_iv": np.round(fitted.implied_vol(fitted.strikes), 2).tolist(),
+                },
+            }
+            for fitted in slices
+        ],
+    }
+
+    if strikes and days:
+        try:
+            strike_list = [float(s) for s in strikes.split(",") if s.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="strikes must be comma-separated numbers")
+        ivs = surface.implied_vol(symbol, strike_list, days / 365)
+        result["points"] = {
+            "days": days,
+            "strikes": strike_list,
+            "iv": np.round(ivs, 2).tolist(),
+        }
+
+    return result
@@ -157,7 +157,8 @@ async def get_strike_timeseries(
             symbol=symbol,
             expiry="",
             include_greeks=True,
-            include_reversal=False
+            include_reversal=False,
+            greeks_level="first"
         )
         
         if live_data and "oc" in live_data:
@@ -2,13 +2,17 @@
 Financial Calculators API Endpoints
 Provides endpoints for Option Pricing, Greeks, and Investment calculators.
 """
+import asyncio
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, Depends, Query, HTTPException
 from pydantic import BaseModel, Field
 
+from app.config.settings import settings
 from app.core.dependencies import OptionalUser
+from app.core.streaming import JSONStreamEncoder, create_streaming_response
 from app.services.calculators import CalculatorService, get_calculator_service
+from app.services.strategy import StrategyLeg, get_strategy_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -27,6 +31,16 @@ class OptionPriceRequest(BaseModel):
     dividend_yield: float = Field(0.0, ge=0, description="Annual dividend yield")
 
 
+class OptionPriceBatchRequest(BaseModel):
+    """Request for batch option price calculation"""
+    rows: List[OptionPriceRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.CALCULATOR_BATCH_MAX_ROWS,
+        description="Contracts to price, one row each"
+    )
+
+
 class OptionPriceResponse(BaseModel):
     """Response for option price calculation"""
     success: bool = True
@@ -68,6 +82,46 @@ class SWPRequest(BaseModel):
     years: int = Field(..., gt=0, le=50, description="Duration in years")
 
 
+class StrategyLegRequest(BaseModel):
+    """One leg of a multi-leg strategy"""
+    strike: float = Field(..., gt=0, description="Strike price")
+    option_type: str = Field("CE", pattern="^(CE|PE)$", description="Option type")
+    side: str = Field("buy", pattern="^(buy|sell)$", description="buy or sell")
+    quantity: int = Field(1, gt=0, description="Quantity in units (lots x lot size)")
+    time_to_expiry: float = Field(..., gt=0, description="Time to expiry in years")
+    volatility: float = Field(..., gt=0, description="Annual volatility (e.g., 0.20 for 20%)")
+    premium: Optional[float] = Field(None, ge=0, description="Entry price; theoretical value if omitted")
+
+
+class StrategyRequest(BaseModel):
+    """Request for multi-leg strategy analysis"""
+    spot: float = Field(..., gt=0, description="Current spot price")
+    legs: List[StrategyLegRequest] = Field(..., min_length=1, max_length=20, description="Strategy legs")
+    risk_free_rate: float = Field(0.07, ge=0, description="Annual risk-free rate")
+    dividend_yield: float = Field(0.0, ge=0, description="Annual dividend yield")
+    range_pct: float = Field(10.0, gt=0, le=50, description="Price grid spans spot ± this percent")
+    points: int = Field(201, ge=11, le=2001, description="Number of price grid points")
+    days_forward: float = Field(0.0, ge=0, description="Days ahead for the theoretical P&L curve")
+
+
+class PortfolioMarginRequest(BaseModel):
+    """Request for SPAN-style portfolio margin"""
+    spot: float = Field(..., gt=0, description="Current spot price")
+    legs: List[StrategyLegRequest] = Field(..., min_length=1, max_length=200, description="Portfolio legs")
+    risk_free_rate: float = Field(0.07, ge=0, description="Annual risk-free rate")
+    dividend_yield: float = Field(0.0, ge=0, description="Annual dividend yield")
+    price_scan_pct: float = Field(6.0, gt=0, le=50, description="Price scan range, percent of spot")
+    vol_scan_pct: float = Field(4.0, ge=0, le=50, description="Volatility scan range, in vol points")
+    short_option_min_pct: float = Field(3.0, ge=0, le=50, description="Short option minimum, percent of spot per net short unit")
+    exposure_pct: float = Field(2.0, ge=0, le=50, description="Exposure margin, percent of spot per short unit")
+    scenarios: Optional[List[Tuple[float, float, float]]] = Field(
+        None,
+        min_length=1,
+        max_length=64,
+        description="Risk array rows (price moves in scan ranges, vol moves in scan ranges, cover fraction); 16 SPAN scenarios if omitted"
+    )
+
+
 class MarginRequest(BaseModel):
     """Request for margin calculation"""
     spot: float = Field(..., gt=0, description="Spot price")
@@ -120,6 +174,117 @@ async def calculate_option_price(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/option-price/batch")
+async def calculate_option_price_batch(
+    request: OptionPriceBatchRequest,
+    current_user: OptionalUser = None,
+):
+    """
+    Calculate option prices and Greeks for many contracts in one request.
+    
+    Rows are priced together with a vectorized Black-Scholes kernel and
+    streamed back as NDJSON: a start line, chunks of {"data": [...]} in
+    request order (each row shaped like /option-price), then an end line.
+    """
+    service = get_calculator_service()
+    rows = request.rows
+    
+    try:
+        result = service.calculate_option_price_batch(
+            spot=[row.spot for row in rows],
+            strike=[row.strike for row in rows],
+            time_to_expiry=[row.time_to_expiry for row in rows],
+            risk_free_rate=[row.risk_free_rate for row in rows],
+            volatility=[row.volatility for row in rows],
+            dividend_yield=[row.dividend_yield for row in rows]
+        )
+    except Exception as e:
+        logger.error(f"Error calculating batch option prices: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    chunk_rows = settings.CALCULATOR_BATCH_CHUNK_ROWS
+    greek_keys = [key for key in result if key not in ("call_price", "put_price")]
+    
+    async def generate():
+        yield JSONStreamEncoder.encode_start({"total_rows": len(rows), "chunk_size": chunk_rows})
+        for start in range(0, len(rows), chunk_rows):
+            chunk = {key: values[start:start + chunk_rows].tolist() for key, values in result.items()}
+            data = [
+                {
+                    "call_price": chunk["call_price"][i],
+                    "put_price": chunk["put_price"][i],
+                    "greeks": {key: chunk[key][i] for key in greek_keys},
+                }
+                for i in range(len(chunk["call_price"]))
+            ]
+            yield JSONStreamEncoder.encode_line({"data": data})
+            await asyncio.sleep(0)  # Yield control between chunks
+        yield JSONStreamEncoder.encode_end({"total_rows": len(rows)})
+    
+    return create_streaming_response(generate())
+
+
+@router.post("/strategy")
+async def analyze_strategy(
+    request: StrategyRequest,
+    current_user: OptionalUser = None,
+):
+    """
+    Payoff and P&L curves plus aggregate Greeks for a multi-leg strategy.
+    
+    Returns the payoff at the nearest expiry and the theoretical P&L
+    curve over a spot grid, position Greeks at spot, net premium,
+    breakevens and max profit/loss.
+    """
+    service = get_strategy_service()
+    
+    try:
+        result = service.analyze(
+            legs=[StrategyLeg(**leg.model_dump()) for leg in request.legs],
+            spot=request.spot,
+            risk_free_rate=request.risk_free_rate,
+            dividend_yield=request.dividend_yield,
+            range_pct=request.range_pct,
+            points=request.points,
+            days_forward=request.days_forward
+        )
+        return {"success": True, **result}
+    except Exception as e:
+        logger.error(f"Error analyzing strategy: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/portfolio-margin")
+async def calculate_portfolio_margin(
+    request: PortfolioMarginRequest,
+    current_user: OptionalUser = None,
+):
+    """
+    SPAN-style margin for a multi-leg option portfolio.
+    
+    Scans the whole portfolio over the price/volatility risk array and
+    charges the worst-case loss, crediting offsets between legs.
+    """
+    service = get_strategy_service()
+    
+    try:
+        result = service.portfolio_margin(
+            legs=[StrategyLeg(**leg.model_dump()) for leg in request.legs],
+            spot=request.spot,
+            risk_free_rate=request.risk_free_rate,
+            dividend_yield=request.dividend_yield,
+            price_scan_pct=request.price_scan_pct,
+            vol_scan_pct=request.vol_scan_pct,
+            short_option_min_pct=request.short_option_min_pct,
+            exposure_pct=request.exposure_pct,
+            scenarios=request.scenarios
+        )
+        return {"success": True, **result}
+    except Exception as e:
+        logger.error(f"Error calculating portfolio margin: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/implied-volatility")
 async def calculate_iv(
     request: IVRequest,
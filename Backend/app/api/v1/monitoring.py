@@ -22,6 +22,7 @@ from app.config.database import get_db, AsyncSessionLocal
 from app.core.dependencies import CurrentAdmin
 from app.schemas.common import ResponseModel
 from app.cache.redis import RedisCache, get_redis
+from app.core.container import container
 
 logger = logging.getLogger(__name__)
 
@@ -324,3 +325,61 @@ async def get_redis_stats(
             success=False,
             message=f"Redis error: {str(e)}"
         )
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Pricing Memo
+# ═══════════════════════════════════════════════════════════════════
+
+@router.get("/pricing-memo", response_model=ResponseModel)
+async def get_pricing_memo_stats(
+    current_user: CurrentAdmin,
+):
+    """
+    Get pricing memo statistics - size, limits, hits, misses and evictions.
+    """
+    memo = container.pricing_memo
+    if memo is None:
+        return ResponseModel(success=False, message="Pricing memo disabled")
+    
+    stats = memo.snapshot()
+    stats["timestamp"] = datetime.utcnow().isoformat()
+    return ResponseModel(success=True, data=stats)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Live Data Coalescing and Processed Chain Cache
+# ═══════════════════════════════════════════════════════════════════
+
+@router.get("/live-coalescing", response_model=ResponseModel)
+async def get_live_coalescing_stats(
+    current_user: CurrentAdmin,
+):
+    """
+    Get live data single-flight statistics - executed, coalesced and fresh
+    requests and the coalescing ratio.
+    """
+    flight = container.live_data_flight
+    if flight is None:
+        return ResponseModel(success=False, message="Live data coalescing disabled")
+    
+    stats = flight.snapshot()
+    stats["timestamp"] = datetime.utcnow().isoformat()
+    return ResponseModel(success=True, data=stats)
+
+
+@router.get("/processed-chain-cache", response_model=ResponseModel)
+async def get_processed_chain_cache_stats(
+    current_user: CurrentAdmin,
+):
+    """
+    Get processed chain cache statistics - size, limits, hits (unchanged
+    upstream versions served without reprocessing) and misses.
+    """
+    chain_cache = container.processed_chain_cache
+    if chain_cache is None:
+        return ResponseModel(success=False, message="Processed chain cache disabled")
+    
+    stats = chain_cache.snapshot()
+    stats["timestamp"] = datetime.utcnow().isoformat()
+    return ResponseModel(success=True, data=stats)
@@ -2,8 +2,9 @@
 Options API Endpoints
 """
 import logging
+from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, Body
+from fastapi import APIRouter, Depends, Query, Body, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.database import get_db
@@ -62,6 +63,7 @@ async def get_option_chain(
     current_user: CurrentUser,
     include_greeks: bool = Query(default=True),
     include_reversal: bool = Query(default=True),
+    greeks_level: str = Query(default="full", pattern="^(first|second|full)$"),
     service: OptionsService = Depends(get_options_service),
 ):
     """
@@ -73,7 +75,8 @@ async def get_option_chain(
         symbol=symbol,
         expiry=expiry,
         include_greeks=include_greeks,
-        include_reversal=include_reversal
+        include_reversal=include_reversal,
+        greeks_level=greeks_level
     )
     
     return data
@@ -83,6 +86,10 @@ async def get_option_chain(
 async def get_live_data(
     symbol: str = Query(..., alias="sid"),
     expiry: str = Query(default=None, alias="exp_sid"),  # Made optional - backend auto-fetches if missing
+    greeks_level: str = Query(default="full", pattern="^(first|second|full)$"),
+    strike_window: Optional[int] = Query(default=None, ge=0),
+    if_none_match: Optional[str] = Header(default=None),
+    response: Response = None,
     current_user: CurrentUser = None,
     service: OptionsService = Depends(get_options_service),
 ):
@@ -90,14 +97,28 @@ async def get_live_data(
     Get live option chain data (REST endpoint).
     Compatible with legacy API.
     If expiry is not provided, the backend will auto-fetch the nearest expiry.
+    greeks_level limits each leg's Greeks to first, second or full order.
+    strike_window limits computation and payload to the ATM strike and that
+    many strikes either side of it.
+    The upstream data version is sent as a weak ETag; a poll with a matching
+    If-None-Match gets 304 Not Modified.
     """
     data = await service.get_live_data(
         symbol=symbol.upper(),
         expiry=expiry,  # Can be None - service handles fallback
         include_greeks=True,
-        include_reversal=True
+        include_reversal=True,
+        greeks_level=greeks_level,
+        strike_window=strike_window
     )
     
+    version = data.get("version") if isinstance(data, dict) else None
+    if version:
+        etag = f'W/"{version}"'
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+    
     return data
 
 
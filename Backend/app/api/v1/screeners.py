@@ -93,19 +93,7 @@ async def get_scalp_signals(
             expiry=expiry,
             total_signals=len(results),
             signals=[
-                ScreenerSignal(
-                    symbol=r.symbol,
-                    strike=r.strike,
-                    option_type=r.option_type,
-                    signal=r.signal,
-                    strength=r.strength,
-                    reason=r.reason,
-                    entry_price=r.entry_price,
-                    target_price=r.target_price,
-                    stop_loss=r.stop_loss,
-                    timestamp=r.timestamp.isoformat(),
-                    metrics=r.metrics
-                )
+                ScreenerSignal(**r.to_dict())
                 for r in results
             ]
         )
@@ -148,19 +136,7 @@ async def get_positional_signals(
             expiry=expiry,
             total_signals=len(results),
             signals=[
-                ScreenerSignal(
-                    symbol=r.symbol,
-                    strike=r.strike,
-                    option_type=r.option_type,
-                    signal=r.signal,
-                    strength=r.strength,
-                    reason=r.reason,
-                    entry_price=r.entry_price,
-                    target_price=r.target_price,
-                    stop_loss=r.stop_loss,
-                    timestamp=r.timestamp.isoformat(),
-                    metrics=r.metrics
-                )
+                ScreenerSignal(**r.to_dict())
                 for r in results
             ]
         )
@@ -200,19 +176,7 @@ async def get_sr_signals(
             expiry=expiry,
             total_signals=len(results),
             signals=[
-                ScreenerSignal(
-                    symbol=r.symbol,
-                    strike=r.strike,
-                    option_type=r.option_type,
-                    signal=r.signal,
-                    strength=r.strength,
-                    reason=r.reason,
-                    entry_price=r.entry_price,
-                    target_price=r.target_price,
-                    stop_loss=r.stop_loss,
-                    timestamp=r.timestamp.isoformat(),
-                    metrics=r.metrics
-                )
+                ScreenerSignal(**r.to_dict())
                 for r in results
             ]
         )
@@ -241,22 +205,7 @@ async def get_all_signals(
         sr_results = await service.run_sr_screener(symbol, expiry)
         
         def format_signals(results):
-            return [
-                {
-                    "symbol": r.symbol,
-                    "strike": r.strike,
-                    "option_type": r.option_type,
-                    "signal": r.signal,
-                    "strength": r.strength,
-                    "reason": r.reason,
-                    "entry_price": r.entry_price,
-                    "target_price": r.target_price,
-                    "stop_loss": r.stop_loss,
-                    "timestamp": r.timestamp.isoformat(),
-                    "metrics": r.metrics
-                }
-                for r in results
-            ]
+            return [r.to_dict() for r in results]
         
         return {
             "success": True,
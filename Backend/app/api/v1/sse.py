@@ -7,7 +7,7 @@ Used when WebSocket connections fail after max retries.
 import asyncio
 import logging
 from typing import Optional, AsyncGenerator
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import StreamingResponse
 import json
 
@@ -22,11 +22,15 @@ router = APIRouter()
 async def generate_sse_events(
     symbol: str,
     expiry: str,
-    request: Request
+    request: Request,
+    strike_window: Optional[int] = None
 ) -> AsyncGenerator[str, None]:
     """
     Generate SSE events for live options data.
     
+    Args:
+        strike_window: Strikes either side of ATM to compute and send (None = all)
+    
     Yields:
         SSE-formatted data strings
     """
@@ -42,12 +46,17 @@ async def generate_sse_events(
             
             try:
                 # Fetch live data
-                data = await options_service.get_live_data(symbol, expiry)
+                data = await options_service.get_live_data(
+                    symbol, expiry, approximate=settings.APPROX_UPDATE_ENABLED,
+                    strike_window=strike_window
+                )
                 
                 if data:
-                    # Format as SSE event
+                    # Format as SSE event; the id is the upstream data version
                     event_data = json.dumps(data, default=str)
-                    yield f"event: data\ndata: {event_data}\n\n"
+                    version = data.get("version")
+                    event_id = f"id: {version}\n" if version else ""
+                    yield f"event: data\n{event_id}data: {event_data}\n\n"
                 else:
                     # Send heartbeat if no data
                     yield f"event: heartbeat\ndata: {{}}\n\n"
@@ -69,7 +78,8 @@ async def generate_sse_events(
 async def sse_stream(
     symbol: str,
     expiry: str,
-    request: Request
+    request: Request,
+    strike_window: Optional[int] = Query(default=None, ge=0)
 ):
     """
     SSE endpoint for live options data streaming.
@@ -79,6 +89,7 @@ async def sse_stream(
     Args:
         symbol: Trading symbol (e.g., NIFTY)
         expiry: Expiry timestamp
+        strike_window: Only stream the ATM strike and this many either side
     
     Returns:
         StreamingResponse with SSE events
@@ -86,7 +97,7 @@ async def sse_stream(
     logger.info(f"SSE connection started for {symbol}:{expiry}")
     
     return StreamingResponse(
-        generate_sse_events(symbol.upper(), expiry, request),
+        generate_sse_events(symbol.upper(), expiry, request, strike_window),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -99,7 +110,8 @@ async def sse_stream(
 @router.get("/poll/{symbol}/{expiry}")
 async def poll_data(
     symbol: str,
-    expiry: str
+    expiry: str,
+    strike_window: Optional[int] = Query(default=None, ge=0)
 ):
     """
     Long-polling endpoint as last-resort fallback.
@@ -111,7 +123,9 @@ async def poll_data(
     options_service = OptionsService(dhan_client)
     
     try:
-        data = await options_service.get_live_data(symbol.upper(), expiry)
+        data = await options_service.get_live_data(
+            symbol.upper(), expiry, strike_window=strike_window
+        )
         return {"success": True, "data": data}
     except Exception as e:
         logger.error(f"Polling error: {e}")
@@ -10,6 +10,7 @@ from fastapi import WebSocket, WebSocketDisconnect, Depends
 
 from app.api.websocket.manager import manager
 from app.services.dhan_client import DhanClient
+from app.services.greeks import GREEK_LEVELS
 from app.services.options import OptionsService
 from app.cache.redis import get_redis_connection, RedisCache
 from app.config.settings import settings
@@ -78,6 +79,8 @@ async def handle_subscribe(client_id: str, data: dict):
     """
     symbol = data.get("sid", data.get("symbol", "NIFTY")).upper()
     expiry = data.get("exp_sid", data.get("expiry", ""))
+    greeks_level = data.get("greeks_level", "full")
+    strike_window = data.get("strike_window")
     
     if not expiry:
         await manager.send_personal_message(
@@ -86,8 +89,24 @@ async def handle_subscribe(client_id: str, data: dict):
         )
         return
     
+    if greeks_level not in GREEK_LEVELS:
+        await manager.send_personal_message(
+            {"type": "error", "message": f"greeks_level must be one of {', '.join(GREEK_LEVELS)}"},
+            client_id
+        )
+        return
+    
+    if strike_window is not None and (
+        isinstance(strike_window, bool) or not isinstance(strike_window, int) or strike_window < 0
+    ):
+        await manager.send_personal_message(
+            {"type": "error", "message": "strike_window must be a non-negative integer"},
+            client_id
+        )
+        return
+    
     # Subscribe client
-    await manager.subscribe(client_id, symbol, expiry)
+    await manager.subscribe(client_id, symbol, expiry, greeks_level, strike_window)
     
     # Start streaming if not already running for this group
     group_key = f"{symbol}:{expiry}"
@@ -161,7 +180,10 @@ async def stream_live_data(symbol: str, expiry: str):
                     symbol=symbol,
                     expiry=expiry,
                     include_greeks=True,
-                    include_reversal=True
+                    include_reversal=True,
+                    approximate=settings.APPROX_UPDATE_ENABLED,
+                    greeks_level=manager.get_group_greeks_level(symbol, expiry),
+                    strike_window=manager.get_group_strike_window(symbol, expiry)
                 )
                 
                 # Success - reset error counter
@@ -22,6 +22,8 @@ class ClientSubscription:
     symbol: str
     expiry: str
     active: bool = True
+    greeks_level: str = "full"
+    strike_window: Optional[int] = None  # Strikes either side of ATM; None = whole chain
 
 
 class ConnectionManager:
@@ -129,7 +131,9 @@ class ConnectionManager:
         self,
         client_id: str,
         symbol: str,
-        expiry: str
+        expiry: str,
+        greeks_level: str = "full",
+        strike_window: Optional[int] = None
     ) -> bool:
         """
         Subscribe a client to symbol/expiry live data.
@@ -138,6 +142,8 @@ class ConnectionManager:
             client_id: Client identifier
             symbol: Trading symbol
             expiry: Expiry timestamp
+            greeks_level: Highest Greek order the client needs (first/second/full)
+            strike_window: Strikes either side of ATM the client shows (None = all)
             
         Returns:
             True if subscribed successfully
@@ -159,7 +165,9 @@ class ConnectionManager:
                 websocket=websocket,
                 symbol=symbol.upper(),
                 expiry=expiry,
-                active=True
+                active=True,
+                greeks_level=greeks_level,
+                strike_window=strike_window
             )
             
             # Add to new subscription group
@@ -186,7 +194,9 @@ class ConnectionManager:
             {
                 "type": "subscribed",
                 "symbol": symbol.upper(),
-                "expiry": expiry
+                "expiry": expiry,
+                "greeks_level": greeks_level,
+                "strike_window": strike_window
             },
             client_id
         )
@@ -348,6 +358,35 @@ class ConnectionManager:
         """Get client's current subscription"""
         return self.subscriptions.get(client_id)
     
+    def get_group_greeks_level(self, symbol: str, expiry: str) -> str:
+        """
+        Highest greeks_level requested in a subscription group.
+        The group shares one broadcast, so it carries what its most demanding client needs.
+        """
+        levels = {
+            self.subscriptions[client_id].greeks_level
+            for client_id in self.subscription_groups.get(f"{symbol}:{expiry}", ())
+            if client_id in self.subscriptions
+        }
+        for level in ("full", "second", "first"):
+            if level in levels:
+                return level
+        return "full"
+    
+    def get_group_strike_window(self, symbol: str, expiry: str) -> Optional[int]:
+        """
+        Widest strike_window requested in a subscription group (None = whole chain).
+        Like greeks_level, the shared broadcast covers every client's window.
+        """
+        windows = [
+            self.subscriptions[client_id].strike_window
+            for client_id in self.subscription_groups.get(f"{symbol}:{expiry}", ())
+            if client_id in self.subscriptions
+        ]
+        if not windows or None in windows:
+            return None
+        return max(windows)
+    
     def get_active_subscriptions(self) -> Dict[str, Set[str]]:
         """Get all active subscription groups"""
         return dict(self.subscription_groups)
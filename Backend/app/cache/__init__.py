@@ -1,4 +1,7 @@
-"""Cache module - Redis integration"""
+"""Cache module - Redis integration and in-process memo, single-flight and versioned caches"""
 from app.cache.redis import RedisCache, get_redis
+from app.cache.memo import PricingMemo
+from app.cache.single_flight import SingleFlight
+from app.cache.versioned import VersionedCache
 
-__all__ = ["RedisCache", "get_redis"]
+__all__ = ["RedisCache", "get_redis", "PricingMemo", "SingleFlight", "VersionedCache"]
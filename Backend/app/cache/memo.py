@@ -0,0 +1,155 @@
+"""
+In-process pricing memo
+
+Bounded LRU for scalar BSM prices and Greeks, keyed on inputs quantized
+to market precision so repeat requests within the same tick hit.
+"""
+import math
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from app.core.metrics import increment_counter, set_gauge
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+class PricingMemo:
+    """
+    Thread-safe LRU memo for pricing functions of (S, K, T, sigma).
+
+    Inputs are snapped to a grid - spot/strike to a relative step (a
+    log-spaced grid, so low-priced underlyings keep their precision), IV
+    to basis points, time to minutes - and the value is computed at the
+    grid point, so a key always maps to the same result whichever caller
+    filled it. Cached values are shared between callers and must not be
+    modified. Hits and misses are counted locally and flushed to the metrics
+    store in batches, keeping lookups cheap.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100_000,
+        price_step: float = 2e-6,
+        iv_step: float = 0.0001,
+        time_step_minutes: float = 1.0,
+        flush_every: int = 1000
+    ):
+        """
+        Args:
+            max_size: Entries kept (least recently used evicted)
+            price_step: Spot and strike quantum, relative to the price
+                (2e-6 is about a 0.05 tick at 25,000)
+            iv_step: Volatility quantum, as decimal (0.0001 = 1 bp)
+            time_step_minutes: Time-to-expiry quantum
+            flush_every: Lookups between metric flushes
+        """
+        self.max_size = max_size
+        self.price_step = price_step
+        self.iv_step = iv_step
+        self.time_step = time_step_minutes / MINUTES_PER_YEAR
+        self.flush_every = flush_every
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._unflushed = {"hit": 0, "miss": 0}
+
+    def lookup(
+        self,
+        tag: Tuple,
+        S: float,
+        K: float,
+        T: float,
+        sigma: float,
+        compute: Callable[[float, float, float, float], Any]
+    ) -> Any:
+        """
+        Cached compute(S, K, T, sigma), evaluated at the quantized inputs.
+
+        Args:
+            tag: What is computed and any other inputs it depends on
+                (function name, option type, rate, ...)
+            compute: Pricing function of the quantized (S, K, T, sigma)
+
+        Degenerate inputs (non-positive S, K, T or sigma) bypass the memo.
+        """
+        if S <= 0 or K <= 0 or T <= 0 or sigma <= 0:
+            return compute(S, K, T, sigma)
+
+        # Never quantize a live option down to expiry or zero vol
+        q_S = round(math.log(S) / self.price_step)
+        q_K = round(math.log(K) / self.price_step)
+        q_T = max(1, round(T / self.time_step))
+        q_sigma = max(1, round(sigma / self.iv_step))
+        key = (tag, q_S, q_K, q_T, q_sigma)
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._count("hit")
+                return value
+
+        value = compute(
+            math.exp(q_S * self.price_step),
+            math.exp(q_K * self.price_step),
+            q_T * self.time_step,
+            q_sigma * self.iv_step
+        )
+
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            self._count("miss")
+        return value
+
+    def _count(self, result: str) -> None:
+        """Record a lookup (caller holds the lock)"""
+        self.stats["hits" if result == "hit" else "misses"] += 1
+        self._unflushed[result] += 1
+        if self._unflushed["hit"] + self._unflushed["miss"] >= self.flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        for result, count in self._unflushed.items():
+            if count:
+                increment_counter("pricing_memo_lookups_total", {"result": result}, count)
+                self._unflushed[result] = 0
+        set_gauge("pricing_memo_size", len(self._entries))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current size, limits and hit rate (also flushes pending metrics)"""
+        with self._lock:
+            self._flush()
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def memoized_pricing(method: Callable) -> Callable:
+    """
+    Route a scalar pricing method (self, S, K, T, sigma, ...) through the
+    instance's `memo`, when it has one. The method name, the instance's
+    rate and the remaining arguments are part of the key.
+    """
+    @wraps(method)
+    def wrapper(self, S, K, T, sigma, *args, **kwargs):
+        if self.memo is None:
+            return method(self, S, K, T, sigma, *args, **kwargs)
+        tag = (method.__qualname__, getattr(self, "r", None), args, tuple(sorted(kwargs.items())))
+        return self.memo.lookup(
+            tag, S, K, T, sigma,
+            lambda q_S, q_K, q_T, q_sigma: method(self, q_S, q_K, q_T, q_sigma, *args, **kwargs)
+        )
+    return wrapper
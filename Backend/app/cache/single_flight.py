@@ -0,0 +1,124 @@
+"""
+In-process single-flight
+
+Coalesces concurrent identical async calls onto one in-flight task and
+reuses its result for a short freshness window, so a burst of requests
+for the same chain fetches and processes it once.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.core.metrics import increment_counter, set_gauge
+
+
+class SingleFlight:
+    """
+    Single-flight call coalescing with a short-lived result cache.
+
+    The first caller for a key starts the call as its own task; callers
+    arriving while it runs await that same task, and callers within
+    freshness_seconds of it finishing get its result directly. Results are
+    shared between callers and must be treated as read-only. Failed or
+    cancelled calls are never reused. Outcomes are counted locally and
+    flushed to the metrics store in batches.
+    """
+
+    OUTCOMES = ("executed", "coalesced", "fresh")
+
+    def __init__(
+        self,
+        name: str = "live_data",
+        freshness_seconds: float = 0.25,
+        max_entries: int = 256,
+        flush_every: int = 100
+    ):
+        """
+        Args:
+            name: Metric name prefix
+            freshness_seconds: How long a finished result is reused (0 = only coalesce in-flight calls)
+            max_entries: Finished results kept (least recently used evicted)
+            flush_every: Calls between metric flushes
+        """
+        self.name = name
+        self.freshness_seconds = freshness_seconds
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._recent: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.stats = {outcome: 0 for outcome in self.OUTCOMES}
+        self._unflushed = {outcome: 0 for outcome in self.OUTCOMES}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of fn() for this key, shared with concurrent and recent callers.
+
+        A caller that is cancelled stops waiting but does not cancel the
+        shared call; the others still get its result.
+        """
+        entry = self._recent.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] <= self.freshness_seconds:
+                self._recent.move_to_end(key)
+                self._count("fresh")
+                return entry[1]
+            del self._recent[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._settle, key))
+            self._count("executed")
+        else:
+            self._count("coalesced")
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Hashable, task: asyncio.Task) -> None:
+        """Retire a finished call and keep its result while fresh"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.freshness_seconds > 0:
+            self._recent[key] = (time.monotonic(), task.result())
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_entries:
+                self._recent.popitem(last=False)
+
+    def _count(self, outcome: str) -> None:
+        self.stats[outcome] += 1
+        self._unflushed[outcome] += 1
+        if sum(self._unflushed.values()) >= self.flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        for outcome, count in self._unflushed.items():
+            if count:
+                increment_counter(f"{self.name}_requests_total", {"result": outcome}, count)
+                self._unflushed[outcome] = 0
+        set_gauge(f"{self.name}_coalescing_ratio", self.coalescing_ratio())
+
+    def coalescing_ratio(self) -> float:
+        """Share of calls served without running fn"""
+        calls = sum(self.stats.values())
+        return round((calls - self.stats["executed"]) / calls, 4) if calls else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Call outcomes, coalescing ratio and current sizes (also flushes pending metrics)"""
+        self._flush()
+        return {
+            **self.stats,
+            "requests": sum(self.stats.values()),
+            "coalescing_ratio": self.coalescing_ratio(),
+            "in_flight": len(self._inflight),
+            "recent": len(self._recent),
+            "freshness_seconds": self.freshness_seconds,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self) -> None:
+        """Drop reusable results; calls already in flight still complete"""
+        self._recent.clear()
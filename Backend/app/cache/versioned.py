@@ -0,0 +1,93 @@
+"""
+In-process versioned result cache
+
+Keeps the last processed result per key together with the version of the
+input it was computed from, so an unchanged input is served without
+reprocessing.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.metrics import increment_counter, set_gauge
+
+
+class VersionedCache:
+    """
+    LRU of (version, value) per key.
+
+    A lookup hits only when the caller's input version matches the stored
+    one and the value is younger than max_age_seconds, which bounds how
+    long time-dependent outputs (time to expiry, theta) are reused.
+    Values are shared between callers and must be treated as read-only.
+    Hits and misses are counted locally and flushed to the metrics store
+    in batches.
+    """
+
+    def __init__(
+        self,
+        name: str = "processed_chain",
+        max_entries: int = 64,
+        max_age_seconds: float = 60.0,
+        flush_every: int = 100
+    ):
+        """
+        Args:
+            name: Metric name prefix
+            max_entries: Keys kept (least recently used evicted)
+            max_age_seconds: Oldest value served for a matching version
+            flush_every: Lookups between metric flushes
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.flush_every = flush_every
+        self._entries: "OrderedDict[Hashable, Tuple[str, float, Any]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._unflushed = {"hit": 0, "miss": 0}
+
+    def get(self, key: Hashable, version: str) -> Optional[Any]:
+        """Value stored for key at this version, or None"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version and time.monotonic() - entry[1] <= self.max_age_seconds:
+            self._entries.move_to_end(key)
+            self._count("hit")
+            return entry[2]
+        self._count("miss")
+        return None
+
+    def put(self, key: Hashable, version: str, value: Any) -> None:
+        """Store value as the result for key at this version, replacing older versions"""
+        self._entries[key] = (version, time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _count(self, result: str) -> None:
+        self.stats["hits" if result == "hit" else "misses"] += 1
+        self._unflushed[result] += 1
+        if self._unflushed["hit"] + self._unflushed["miss"] >= self.flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        for result, count in self._unflushed.items():
+            if count:
+                increment_counter(f"{self.name}_cache_lookups_total", {"result": result}, count)
+                self._unflushed[result] = 0
+        set_gauge(f"{self.name}_cache_size", len(self._entries))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current size, limits and hit rate (also flushes pending metrics)"""
+        self._flush()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_age_seconds": self.max_age_seconds,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -126,12 +126,92 @@ class Settings(BaseSettings):
     WS_BROADCAST_INTERVAL: float = Field(default=0.25, description="Live data broadcast interval (250ms for faster updates)")
     WS_CHARTS_BROADCAST_INTERVAL: float = Field(default=0.25, description="Charts data broadcast interval (250ms for real-time)")
     
+    # ═══════════════════════════════════════════════════════════════════
+    # Incremental Chain Recompute (between live ticks)
+    # ═══════════════════════════════════════════════════════════════════
+    INCREMENTAL_RECOMPUTE_ENABLED: bool = Field(default=True, description="Reuse last tick's Greeks/reversal for unchanged strikes")
+    INCREMENTAL_RECOMPUTE_TOLERANCE: float = Field(default=0.0, description="Relative LTP/IV/OI change below which a strike is reused (0 = any change)")
+    INCREMENTAL_TIME_TOLERANCE_SECONDS: float = Field(default=60.0, description="Time-to-expiry drift tolerated before a full chain recompute")
+    INCREMENTAL_MAX_CHAINS: int = Field(default=8, description="Chains (symbol, expiry, strike window) whose last tick each service keeps")
+    APPROX_UPDATE_ENABLED: bool = Field(default=False, description="Stream Taylor-expanded Greeks/prices for small spot moves instead of exact BSM")
+    APPROX_MAX_SPOT_MOVE_PCT: float = Field(default=0.1, description="Spot move (% of spot) from a strike's last exact tick beyond which it is recomputed exactly")
+    APPROX_FULL_RECOMPUTE_TICKS: int = Field(default=20, description="Force an exact full-chain recompute every N ticks in approximate mode")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Implied Forward (put-call parity)
+    # ═══════════════════════════════════════════════════════════════════
+    IMPLIED_FORWARD_ENABLED: bool = Field(default=True, description="Estimate each expiry's forward/discount factor from CE-PE parity and price off it")
+    IMPLIED_FORWARD_STRIKES: int = Field(default=20, description="Strikes nearest spot used in the parity regression")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Volatility Surface (SVI smile per expiry)
+    # ═══════════════════════════════════════════════════════════════════
+    VOL_SURFACE_ENABLED: bool = Field(default=True, description="Fit a smile per expiry on each chain fetch and use it for legs without an IV")
+    VOL_SURFACE_SMOOTH_IVS: bool = Field(default=False, description="Price Greeks/reversal off the fitted smile instead of raw strike IVs")
+    VOL_SURFACE_REFIT_TOLERANCE: float = Field(default=0.05, description="Per-strike IV move (vol points) below which the cached fit is reused")
+    VOL_SURFACE_REFIT_FORWARD_PCT: float = Field(default=0.05, description="Forward move (%) below which the cached fit is reused")
+    VOL_SURFACE_MAX_AGE_SECONDS: float = Field(default=60.0, description="Refit a smile at least this often while quotes arrive")
+    
     # ═══════════════════════════════════════════════════════════════════
     # Trading Defaults
     # ═══════════════════════════════════════════════════════════════════
     DEFAULT_RISK_FREE_RATE: float = Field(default=0.10, description="Risk-free rate for BSM")
     DEFAULT_SYMBOL: str = Field(default="NIFTY")
     
+    # ═══════════════════════════════════════════════════════════════════
+    # Pricing Memo (scalar BSM/Greeks results keyed on quantized inputs)
+    # ═══════════════════════════════════════════════════════════════════
+    PRICING_MEMO_ENABLED: bool = Field(default=True, description="Memoize scalar prices/Greeks in a process-wide LRU")
+    PRICING_MEMO_MAX_SIZE: int = Field(default=100000, description="Entries kept in the pricing memo")
+    PRICING_MEMO_PRICE_STEP: float = Field(default=2e-6, description="Spot/strike quantum for memo keys, relative to the price")
+    PRICING_MEMO_IV_STEP: float = Field(default=0.0001, description="IV quantum for memo keys, as decimal (0.0001 = 1 bp)")
+    PRICING_MEMO_TIME_STEP_MINUTES: float = Field(default=1.0, description="Time-to-expiry quantum for memo keys")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Live Data Coalescing (single-flight and upstream-versioned chain cache)
+    # ═══════════════════════════════════════════════════════════════════
+    LIVE_COALESCE_ENABLED: bool = Field(default=True, description="Share one fetch-and-process of a live chain between identical concurrent requests")
+    LIVE_COALESCE_FRESHNESS_SECONDS: float = Field(default=0.25, description="How long a processed chain is reused for identical requests (0 = only coalesce in-flight requests)")
+    LIVE_COALESCE_MAX_ENTRIES: int = Field(default=256, description="Processed chains kept for reuse")
+    PROCESSED_CHAIN_CACHE_ENABLED: bool = Field(default=True, description="Skip reprocessing a live chain whose upstream content is unchanged")
+    PROCESSED_CHAIN_CACHE_MAX_ENTRIES: int = Field(default=64, description="Processed chains kept per (symbol, expiry, options) with their upstream version")
+    PROCESSED_CHAIN_CACHE_MAX_AGE_SECONDS: float = Field(default=60.0, description="Reprocess an unchanged chain at least this often (time to expiry moves)")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Chain Compute (where live chain processing runs)
+    # ═══════════════════════════════════════════════════════════════════
+    CHAIN_COMPUTE_EXECUTOR: str = Field(default="thread", description="inline (on the event loop), thread (worker threads) or process (worker threads, with Greeks/reversal kernels in worker processes)")
+    CHAIN_COMPUTE_WORKERS: int = Field(default=2, description="Worker threads, and worker processes in process mode, for chain processing")
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: float = Field(default=1.0, description="Event loop lag sampling interval for the event_loop_lag_ms gauge (0 = off)")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Calculators
+    # ═══════════════════════════════════════════════════════════════════
+    CALCULATOR_BATCH_MAX_ROWS: int = Field(default=10000, description="Max rows accepted by /calculators/option-price/batch")
+    CALCULATOR_BATCH_CHUNK_ROWS: int = Field(default=500, description="Rows per NDJSON chunk in batch pricing responses")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Strategy Optimizer
+    # ═══════════════════════════════════════════════════════════════════
+    OPTIMIZER_WORKERS: int = Field(default=2, description="Worker processes for strike-combination searches (0 = score inline)")
+    OPTIMIZER_CHUNK_SIZE: int = Field(default=250000, description="Candidate combinations scored per worker task")
+    OPTIMIZER_TIME_BUDGET_SECONDS: float = Field(default=2.0, description="Default search time limit; the best combinations found so far are returned")
+    OPTIMIZER_MAX_TOP_K: int = Field(default=50, description="Max combinations returned by /analytics/optimizer")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Monte Carlo Simulation
+    # ═══════════════════════════════════════════════════════════════════
+    SIMULATION_PATHS: int = Field(default=10000, description="Paths per simulated snapshot")
+    SIMULATION_STEPS_PER_DAY: int = Field(default=8, description="Monitoring steps per day for probability of touch")
+    SIMULATION_MAX_STEPS: int = Field(default=256, description="Cap on steps per path for long expiries")
+    SIMULATION_CACHE_MAX_BYTES: int = Field(default=128 * 1024 * 1024, description="Memory budget for path sets kept for reuse across requests")
+    SIMULATION_SEED: int = Field(default=42, description="Default random seed, so a snapshot's paths are reproducible")
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # Reversal Weights
+    # ═══════════════════════════════════════════════════════════════════
+    REVERSAL_PARAMS_PATH: Optional[str] = Field(default=None, description="Calibrated reversal parameter set (JSON written by scripts.calibrate_reversal); built-in weights if unset")
+    
     # ═══════════════════════════════════════════════════════════════════
     # Logging
     # ═══════════════════════════════════════════════════════════════════
@@ -184,6 +264,14 @@ class Settings(BaseSettings):
             raise ValueError(f"APP_ENV must be one of {allowed}")
         return v
     
+    @field_validator("CHAIN_COMPUTE_EXECUTOR")
+    @classmethod
+    def validate_chain_executor(cls, v: str) -> str:
+        allowed = ["inline", "thread", "process"]
+        if v not in allowed:
+            raise ValueError(f"CHAIN_COMPUTE_EXECUTOR must be one of {allowed}")
+        return v
+    
     @property
     def is_production(self) -> bool:
         return self.APP_ENV == "production"
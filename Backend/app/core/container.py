@@ -5,6 +5,7 @@ Provides singleton instances and proper dependency injection for all services.
 Eliminates ad-hoc service creation throughout the codebase.
 """
 import logging
+import multiprocessing
 from typing import Optional
 from functools import cached_property
 
@@ -13,6 +14,13 @@ from app.config.settings import settings
 logger = logging.getLogger(__name__)
 
 
+def process_pool_context():
+    """Start method for worker pools: not fork, since a forked worker could
+    inherit a lock held by another thread; forkserver where available, else spawn"""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
 class ServiceContainer:
     """
     Centralized dependency injection container.
@@ -51,6 +59,9 @@ class ServiceContainer:
         self._screener_service = None
         self._calculator_service = None
         self._ticks_service = None
+        self._optimizer_executor = None
+        self._chain_thread_executor = None
+        self._chain_process_executor = None
         
         self._initialized = True
         logger.info("ServiceContainer initialized")
@@ -59,23 +70,152 @@ class ServiceContainer:
     # Core Services (Stateless Singletons)
     # ═══════════════════════════════════════════════════════════════════
     
+    @cached_property
+    def pricing_memo(self):
+        """Process-wide memo of scalar prices/Greeks (None when disabled)"""
+        if not settings.PRICING_MEMO_ENABLED:
+            return None
+        from app.cache.memo import PricingMemo
+        return PricingMemo(
+            max_size=settings.PRICING_MEMO_MAX_SIZE,
+            price_step=settings.PRICING_MEMO_PRICE_STEP,
+            iv_step=settings.PRICING_MEMO_IV_STEP,
+            time_step_minutes=settings.PRICING_MEMO_TIME_STEP_MINUTES
+        )
+    
+    @cached_property
+    def live_data_flight(self):
+        """Process-wide single-flight for live chain requests (None when disabled)"""
+        if not settings.LIVE_COALESCE_ENABLED:
+            return None
+        from app.cache.single_flight import SingleFlight
+        return SingleFlight(
+            name="live_data",
+            freshness_seconds=settings.LIVE_COALESCE_FRESHNESS_SECONDS,
+            max_entries=settings.LIVE_COALESCE_MAX_ENTRIES
+        )
+    
+    @cached_property
+    def processed_chain_cache(self):
+        """Processed live chains by upstream content version (None when disabled)"""
+        if not settings.PROCESSED_CHAIN_CACHE_ENABLED:
+            return None
+        from app.cache.versioned import VersionedCache
+        return VersionedCache(
+            name="processed_chain",
+            max_entries=settings.PROCESSED_CHAIN_CACHE_MAX_ENTRIES,
+            max_age_seconds=settings.PROCESSED_CHAIN_CACHE_MAX_AGE_SECONDS
+        )
+    
     @cached_property
     def bsm_service(self):
         """Black-Scholes Model service"""
         from app.services.bsm import BSMService
-        return BSMService(settings.RISK_FREE_RATE)
+        return BSMService(
+            settings.DEFAULT_RISK_FREE_RATE,
+            memo=self.pricing_memo,
+            vol_surface=self.vol_surface_service if settings.VOL_SURFACE_ENABLED else None
+        )
     
     @cached_property
     def greeks_service(self):
         """Greeks calculation service"""
         from app.services.greeks import GreeksService
-        return GreeksService(settings.RISK_FREE_RATE)
+        return GreeksService(settings.DEFAULT_RISK_FREE_RATE, memo=self.pricing_memo)
+    
+    @cached_property
+    def reversal_params(self):
+        """Reversal weights: the calibrated set at REVERSAL_PARAMS_PATH, else the built-in defaults"""
+        from app.services.reversal import ReversalParams, DEFAULT_REVERSAL_PARAMS
+        path = settings.REVERSAL_PARAMS_PATH
+        if not path:
+            return DEFAULT_REVERSAL_PARAMS
+        try:
+            params = ReversalParams.load(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Failed to load reversal parameters from {path}, using defaults: {e}")
+            return DEFAULT_REVERSAL_PARAMS
+        logger.info(f"Loaded reversal parameter set {params.version} from {path}")
+        return params
     
     @cached_property
     def reversal_service(self):
         """Reversal detection service"""
         from app.services.reversal import ReversalService
-        return ReversalService(settings.RISK_FREE_RATE)
+        return ReversalService(
+            settings.DEFAULT_RISK_FREE_RATE,
+            params=self.reversal_params,
+            vol_surface=self.vol_surface_service if settings.VOL_SURFACE_ENABLED else None
+        )
+    
+    @cached_property
+    def scenario_service(self):
+        """Scenario grid (spot x IV x time) repricing service"""
+        from app.services.scenario import ScenarioService
+        return ScenarioService(settings.DEFAULT_RISK_FREE_RATE)
+    
+    @cached_property
+    def vol_surface_service(self):
+        """Implied volatility surfaces, shared so fits persist across requests"""
+        from app.services.vol_surface import VolSurfaceService
+        return VolSurfaceService(
+            refit_tolerance=settings.VOL_SURFACE_REFIT_TOLERANCE,
+            refit_forward_pct=settings.VOL_SURFACE_REFIT_FORWARD_PCT,
+            max_age_seconds=settings.VOL_SURFACE_MAX_AGE_SECONDS
+        )
+    
+    @cached_property
+    def simulation_service(self):
+        """Monte Carlo paths, shared so path sets are reused across requests"""
+        from app.services.simulation import SimulationService
+        return SimulationService(
+            n_paths=settings.SIMULATION_PATHS,
+            steps_per_day=settings.SIMULATION_STEPS_PER_DAY,
+            max_steps=settings.SIMULATION_MAX_STEPS,
+            cache_max_bytes=settings.SIMULATION_CACHE_MAX_BYTES,
+            seed=settings.SIMULATION_SEED
+        )
+    
+    @cached_property
+    def strategy_optimizer(self):
+        """Strike-combination search, scoring on the shared process pool"""
+        from app.services.optimizer import StrategyOptimizer
+        return StrategyOptimizer(
+            executor=self.optimizer_executor,
+            workers=settings.OPTIMIZER_WORKERS,
+            chunk_size=settings.OPTIMIZER_CHUNK_SIZE,
+            time_budget=settings.OPTIMIZER_TIME_BUDGET_SECONDS
+        )
+    
+    @property
+    def optimizer_executor(self):
+        """Process pool for optimizer searches (None = score inline); workers start on first use"""
+        if self._optimizer_executor is None and settings.OPTIMIZER_WORKERS > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self._optimizer_executor = ProcessPoolExecutor(
+                max_workers=settings.OPTIMIZER_WORKERS, mp_context=process_pool_context()
+            )
+        return self._optimizer_executor
+    
+    @property
+    def chain_thread_executor(self):
+        """Threads that run live chain processing off the event loop (None in inline mode)"""
+        if self._chain_thread_executor is None and settings.CHAIN_COMPUTE_EXECUTOR != "inline":
+            from concurrent.futures import ThreadPoolExecutor
+            self._chain_thread_executor = ThreadPoolExecutor(
+                max_workers=settings.CHAIN_COMPUTE_WORKERS, thread_name_prefix="chain-compute"
+            )
+        return self._chain_thread_executor
+    
+    @property
+    def chain_process_executor(self):
+        """Process pool for chain Greeks/reversal kernels (None unless in process mode)"""
+        if self._chain_process_executor is None and settings.CHAIN_COMPUTE_EXECUTOR == "process":
+            from concurrent.futures import ProcessPoolExecutor
+            self._chain_process_executor = ProcessPoolExecutor(
+                max_workers=settings.CHAIN_COMPUTE_WORKERS, mp_context=process_pool_context()
+            )
+        return self._chain_process_executor
     
     # ═══════════════════════════════════════════════════════════════════
     # Infrastructure Services (Require Redis)
@@ -149,7 +289,7 @@ class ServiceContainer:
         """Get Calculator service"""
         if self._calculator_service is None:
             from app.services.calculators import CalculatorService
-            self._calculator_service = CalculatorService()
+            self._calculator_service = CalculatorService(memo=self.pricing_memo)
         return self._calculator_service
     
     @property
@@ -170,6 +310,12 @@ class ServiceContainer:
             await self._dhan_client.close()
             self._dhan_client = None
         
+        if self._optimizer_executor:
+            self._optimizer_executor.shutdown(wait=False, cancel_futures=True)
+            self._optimizer_executor = None
+            self.__dict__.pop('strategy_optimizer', None)
+        self._shutdown_chain_executors()
+        
         self._options_service = None
         self._config_service = None
         self._historical_service = None
@@ -177,6 +323,13 @@ class ServiceContainer:
         
         logger.info("ServiceContainer cleaned up")
     
+    def _shutdown_chain_executors(self):
+        for executor in (self._chain_thread_executor, self._chain_process_executor):
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._chain_thread_executor = None
+        self._chain_process_executor = None
+    
     def reset(self):
         """Reset container (for testing)"""
         self._redis_cache = None
@@ -187,14 +340,34 @@ class ServiceContainer:
         self._screener_service = None
         self._calculator_service = None
         self._ticks_service = None
+        if self._optimizer_executor:
+            self._optimizer_executor.shutdown(wait=False, cancel_futures=True)
+            self._optimizer_executor = None
+        self._shutdown_chain_executors()
         
         # Clear cached properties
+        if 'pricing_memo' in self.__dict__:
+            del self.__dict__['pricing_memo']
+        if 'live_data_flight' in self.__dict__:
+            del self.__dict__['live_data_flight']
+        if 'processed_chain_cache' in self.__dict__:
+            del self.__dict__['processed_chain_cache']
         if 'bsm_service' in self.__dict__:
             del self.__dict__['bsm_service']
         if 'greeks_service' in self.__dict__:
             del self.__dict__['greeks_service']
+        if 'reversal_params' in self.__dict__:
+            del self.__dict__['reversal_params']
         if 'reversal_service' in self.__dict__:
             del self.__dict__['reversal_service']
+        if 'scenario_service' in self.__dict__:
+            del self.__dict__['scenario_service']
+        if 'vol_surface_service' in self.__dict__:
+            del self.__dict__['vol_surface_service']
+        if 'simulation_service' in self.__dict__:
+            del self.__dict__['simulation_service']
+        if 'strategy_optimizer' in self.__dict__:
+            del self.__dict__['strategy_optimizer']
 
 
 # Global singleton instance
@@ -243,3 +416,23 @@ async def get_calculator_service_dep():
 async def get_ticks_service_dep():
     """FastAPI dependency for DhanTicksService"""
     return container.ticks_service
+
+
+async def get_scenario_service_dep():
+    """FastAPI dependency for ScenarioService"""
+    return container.scenario_service
+
+
+async def get_vol_surface_service_dep():
+    """FastAPI dependency for VolSurfaceService"""
+    return container.vol_surface_service
+
+
+async def get_simulation_service_dep():
+    """FastAPI dependency for SimulationService"""
+    return container.simulation_service
+
+
+async def get_strategy_optimizer_dep():
+    """FastAPI dependency for StrategyOptimizer"""
+    return container.strategy_optimizer
@@ -13,6 +13,7 @@ Falls back to in-memory storage if Redis is unavailable.
 import time
 import logging
 import asyncio
+import threading
 from typing import Callable, Optional
 from functools import wraps
 
@@ -24,6 +25,10 @@ logger = logging.getLogger(__name__)
 # Redis connection for distributed metrics
 _metrics_redis: Optional[object] = None
 _use_redis_metrics = True  # Set to False to force in-memory mode
+# Loop that owns the Redis connection; worker threads hand their updates to it
+_metrics_loop: Optional[asyncio.AbstractEventLoop] = None
+# Local counters are also updated from chain compute threads
+_local_lock = threading.Lock()
 
 # Local fallback metrics storage (used when Redis unavailable)
 _local_metrics = {
@@ -44,7 +49,7 @@ METRICS_PREFIX = "stockify:metrics:"
 
 async def init_metrics_redis() -> bool:
     """Initialize Redis connection for metrics storage."""
-    global _metrics_redis, _use_redis_metrics
+    global _metrics_redis, _use_redis_metrics, _metrics_loop
     
     if not _use_redis_metrics:
         logger.info("Redis metrics disabled, using in-memory storage")
@@ -53,6 +58,7 @@ async def init_metrics_redis() -> bool:
     try:
         from app.cache.redis import get_redis_connection
         _metrics_redis = await get_redis_connection()
+        _metrics_loop = asyncio.get_running_loop()
         logger.info("Distributed metrics initialized with Redis backend")
         return True
     except Exception as e:
@@ -61,6 +67,16 @@ async def init_metrics_redis() -> bool:
         return False
 
 
+def _schedule_redis(update: Callable, *args) -> None:
+    """Fire-and-forget a Redis update, from the event loop or a worker thread"""
+    try:
+        asyncio.get_running_loop().create_task(update(*args))
+    except RuntimeError:
+        # Off the loop (e.g. chain compute threads): run it on the metrics loop
+        if _metrics_loop is not None and not _metrics_loop.is_closed():
+            _metrics_loop.call_soon_threadsafe(lambda: _metrics_loop.create_task(update(*args)))
+
+
 async def _redis_incr(key: str, value: int = 1) -> int:
     """Increment a Redis counter atomically."""
     if _metrics_redis:
@@ -109,21 +125,18 @@ def _sync_increment_counter(name: str, labels: dict = None, value: int = 1):
         key += ":" + ":".join(f"{k}={v}" for k, v in sorted(labels.items()))
     
     # Update local storage immediately
-    if name not in _local_metrics:
-        _local_metrics[name] = {}
-    
-    if isinstance(_local_metrics[name], dict):
-        _local_metrics[name][key] = _local_metrics[name].get(key, 0) + value
-    else:
-        _local_metrics[name] += value
+    with _local_lock:
+        if name not in _local_metrics:
+            _local_metrics[name] = {}
+        
+        if isinstance(_local_metrics[name], dict):
+            _local_metrics[name][key] = _local_metrics[name].get(key, 0) + value
+        else:
+            _local_metrics[name] += value
     
     # Schedule async Redis update (fire and forget)
     if _metrics_redis:
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(_redis_incr(key, value))
-        except RuntimeError:
-            pass  # No event loop running
+        _schedule_redis(_redis_incr, key, value)
 
 
 def increment_counter(name: str, labels: dict = None, value: int = 1):
@@ -174,11 +187,7 @@ def set_gauge(name: str, value: float):
     
     # Schedule async Redis update
     if _metrics_redis:
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(_redis_set(name, str(value)))
-        except RuntimeError:
-            pass
+        _schedule_redis(_redis_set, name, str(value))
 
 
 def get_all_metrics() -> dict:
@@ -365,6 +374,22 @@ def cache_miss(cache_type: str = "default"):
     increment_counter("cache_misses_total", {"type": cache_type})
 
 
+# Event loop metrics
+async def monitor_event_loop_lag(interval: float = 1.0):
+    """
+    Sample event loop lag into the event_loop_lag_ms gauge until cancelled.
+    
+    Lag is how late a sleep(interval) wakes up: the time ready callbacks
+    (WebSocket sends, pings, requests) wait behind work blocking the loop.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - start - interval, 0.0)
+        set_gauge("event_loop_lag_ms", round(lag * 1000, 3))
+
+
 # External API metrics
 def track_external_api(endpoint: str):
     """Decorator to track external API call metrics."""
@@ -2,6 +2,7 @@
 Stockify Trading Platform - FastAPI Application
 Main entry point for the application
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
@@ -99,6 +100,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         from app.core.container import container
         container.set_redis_cache(redis_cache)
         logger.info("DI container initialized with Redis")
+        # Load the reversal weights now so a bad parameter file shows at startup
+        logger.info(f"Reversal parameter set: {container.reversal_params.version}")
     except Exception as e:
         logger.warning(f"Container initialization failed: {e}")
     
@@ -134,6 +137,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         except Exception as e:
             logger.warning(f"Task queue initialization failed: {e}")
     
+    # Sample event loop lag (blocking work shows up here first)
+    lag_monitor = None
+    if settings.EVENT_LOOP_LAG_INTERVAL_SECONDS > 0:
+        from app.core.metrics import monitor_event_loop_lag
+        lag_monitor = asyncio.create_task(monitor_event_loop_lag(settings.EVENT_LOOP_LAG_INTERVAL_SECONDS))
+    
     logger.info(f"{settings.APP_NAME} started successfully")
     
     yield
@@ -141,6 +150,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # Shutdown
     logger.info("Shutting down...")
     
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+    
     # Stop background task workers
     if settings.TASK_QUEUE_ENABLED:
         try:
@@ -4,6 +4,11 @@ from app.services.greeks import GreeksService
 from app.services.reversal import ReversalService
 from app.services.dhan_client import DhanClient
 from app.services.options import OptionsService
+from app.services.optimizer import StrategyOptimizer
+from app.services.scenario import ScenarioService
+from app.services.simulation import SimulationService
+from app.services.strategy import StrategyService
+from app.services.vol_surface import VolSurfaceService
 from app.services.config_service import ConfigService
 
 __all__ = [
@@ -12,5 +17,10 @@ __all__ = [
     "ReversalService",
     "DhanClient",
     "OptionsService",
+    "ScenarioService",
+    "SimulationService",
+    "StrategyOptimizer",
+    "StrategyService",
+    "VolSurfaceService",
     "ConfigService",
 ]
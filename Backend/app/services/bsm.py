@@ -3,16 +3,26 @@ Black-Scholes Model Service
 Implements option pricing and related calculations
 """
 import math
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 
-import scipy.stats as stats
 import numpy as np
+from scipy.special import ndtr
 
+from app.cache.memo import PricingMemo, memoized_pricing
 from app.config.settings import settings
+from app.services.kernels import norm_cdf, norm_pdf, norm_ppf
+from app.services.vol_surface import VolSurfaceService
 
 
-@dataclass
+@lru_cache(maxsize=32)
+def confidence_z_score(confidence: float) -> float:
+    """Two-sided z-score for a confidence level (cached, the level rarely changes)"""
+    return norm_ppf((1 + confidence) / 2)
+
+
+@dataclass(slots=True)
 class BSMResult:
     """Result container for BSM calculations"""
     price: float
@@ -21,16 +31,67 @@ class BSMResult:
     theta: float
     vega: float
     rho: float
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "price": self.price,
+            "delta": self.delta,
+            "gamma": self.gamma,
+            "theta": self.theta,
+            "vega": self.vega,
+            "rho": self.rho,
+        }
+
+
+@dataclass
+class ParityFit:
+    """Forward and discount factor implied by put-call parity for one expiry"""
+    forward: float
+    discount_factor: float
+    rate: float  # Implied continuously compounded annual rate
+    n_strikes: int
+    rmse: float  # Parity residual of (C - P), in price units
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "forward": round(self.forward, 2),
+            "discount_factor": round(self.discount_factor, 6),
+            "rate": round(self.rate, 4),
+            "n_strikes": self.n_strikes,
+            "rmse": round(self.rmse, 4),
+        }
 
 
 class BSMService:
     """
     Black-Scholes Model calculations for European options.
     Provides theoretical pricing and Greeks calculations.
+    Scalar methods go through `memo` when one is given, and `vol_surface`
+    (the shared fitted smiles) can be queried for strikes without a quote.
     """
     
-    def __init__(self, risk_free_rate: Optional[float] = None):
+    def __init__(
+        self,
+        risk_free_rate: Optional[float] = None,
+        memo: Optional[PricingMemo] = None,
+        vol_surface: Optional[VolSurfaceService] = None
+    ):
         self.r = risk_free_rate or settings.DEFAULT_RISK_FREE_RATE
+        self.memo = memo
+        self.vol_surface = vol_surface
+    
+    def surface_iv(
+        self,
+        symbol: str,
+        strikes: Union[float, np.ndarray],
+        T: float,
+        forward: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        """Surface IV (as decimal) at strikes and T in years; None without a fitted surface"""
+        if self.vol_surface is None:
+            return None
+        ivs = self.vol_surface.implied_vol(symbol, np.atleast_1d(strikes), T, forward)
+        return None if ivs is None else ivs / 100
     
     @staticmethod
     def _d1(S: float, K: float, T: float, r: float, sigma: float) -> float:
@@ -46,6 +107,7 @@ class BSMService:
             return 0.0
         return BSMService._d1(S, K, T, r, sigma) - sigma * math.sqrt(T)
     
+    @memoized_pricing
     def price(
         self,
         S: float,
@@ -80,12 +142,13 @@ class BSMService:
         d2 = self._d2(S, K, T, self.r, sigma)
         
         if option_type.lower() == "call":
-            price = S * stats.norm.cdf(d1) - K * math.exp(-self.r * T) * stats.norm.cdf(d2)
+            price = S * norm_cdf(d1) - K * math.exp(-self.r * T) * norm_cdf(d2)
         else:
-            price = K * math.exp(-self.r * T) * stats.norm.cdf(-d2) - S * stats.norm.cdf(-d1)
+            price = K * math.exp(-self.r * T) * norm_cdf(-d2) - S * norm_cdf(-d1)
         
         return max(0, price)
     
+    @memoized_pricing
     def delta(
         self,
         S: float,
@@ -103,9 +166,10 @@ class BSMService:
         d1 = self._d1(S, K, T, self.r, sigma)
         
         if option_type.lower() == "call":
-            return stats.norm.cdf(d1)
-        return stats.norm.cdf(d1) - 1
+            return norm_cdf(d1)
+        return norm_cdf(d1) - 1
     
+    @memoized_pricing
     def gamma(
         self,
         S: float,
@@ -118,8 +182,9 @@ class BSMService:
             return 0.0
         
         d1 = self._d1(S, K, T, self.r, sigma)
-        return stats.norm.pdf(d1) / (S * sigma * math.sqrt(T))
+        return norm_pdf(d1) / (S * sigma * math.sqrt(T))
     
+    @memoized_pricing
     def theta(
         self,
         S: float,
@@ -135,16 +200,17 @@ class BSMService:
         d1 = self._d1(S, K, T, self.r, sigma)
         d2 = self._d2(S, K, T, self.r, sigma)
         
-        term1 = -(S * stats.norm.pdf(d1) * sigma) / (2 * math.sqrt(T))
+        term1 = -(S * norm_pdf(d1) * sigma) / (2 * math.sqrt(T))
         
         if option_type.lower() == "call":
-            term2 = -self.r * K * math.exp(-self.r * T) * stats.norm.cdf(d2)
+            term2 = -self.r * K * math.exp(-self.r * T) * norm_cdf(d2)
         else:
-            term2 = self.r * K * math.exp(-self.r * T) * stats.norm.cdf(-d2)
+            term2 = self.r * K * math.exp(-self.r * T) * norm_cdf(-d2)
         
         # Return daily theta
         return (term1 + term2) / 365
     
+    @memoized_pricing
     def vega(
         self,
         S: float,
@@ -157,8 +223,9 @@ class BSMService:
             return 0.0
         
         d1 = self._d1(S, K, T, self.r, sigma)
-        return S * stats.norm.pdf(d1) * math.sqrt(T) / 100  # Per 1% change in IV
+        return S * norm_pdf(d1) * math.sqrt(T) / 100  # Per 1% change in IV
     
+    @memoized_pricing
     def rho(
         self,
         S: float,
@@ -174,8 +241,8 @@ class BSMService:
         d2 = self._d2(S, K, T, self.r, sigma)
         
         if option_type.lower() == "call":
-            return K * T * math.exp(-self.r * T) * stats.norm.cdf(d2) / 100
-        return -K * T * math.exp(-self.r * T) * stats.norm.cdf(-d2) / 100
+            return K * T * math.exp(-self.r * T) * norm_cdf(d2) / 100
+        return -K * T * math.exp(-self.r * T) * norm_cdf(-d2) / 100
     
     def calculate_all(
         self,
@@ -206,7 +273,8 @@ class BSMService:
         max_iterations: int = 100
     ) -> Optional[float]:
         """
-        Calculate implied volatility using Newton-Raphson method.
+        Calculate implied volatility for a single option.
+        Delegates to implied_volatility_batch.
         
         Args:
             market_price: Current market price of the option
@@ -215,7 +283,7 @@ class BSMService:
             T: Time to expiration in years
             option_type: 'call' or 'put'
             precision: Convergence threshold
-            max_iterations: Maximum iterations
+            max_iterations: Maximum bisection fallback iterations
             
         Returns:
             Implied volatility or None if not found
@@ -223,26 +291,294 @@ class BSMService:
         if T <= 0 or market_price <= 0:
             return None
         
-        sigma = 0.3  # Initial guess
+        sigma = self.implied_volatility_batch(
+            np.array([market_price]), S, np.array([K]), T,
+            np.array([option_type.lower() == "call"]),
+            precision=precision,
+            max_bisection_iterations=max_iterations
+        )[0]
         
-        for _ in range(max_iterations):
-            price = self.price(S, K, T, sigma, option_type)
-            vega = self.vega(S, K, T, sigma) * 100  # Undo the /100 scaling
+        return None if np.isnan(sigma) else float(sigma)
+    
+    def price_array(
+        self,
+        S: Union[float, np.ndarray],
+        K: np.ndarray,
+        T: Union[float, np.ndarray],
+        sigma: np.ndarray,
+        is_call: np.ndarray,
+        r: Optional[Union[float, np.ndarray]] = None,
+        q: Union[float, np.ndarray] = 0.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized Black-Scholes price and raw vega (per 1.00 change in IV).
+        
+        Args:
+            S: Spot price (scalar or array)
+            K: Strike prices
+            T: Time to expiration in years (scalar or array)
+            sigma: Implied volatilities (as decimal), must be > 0
+            is_call: Boolean array, True for calls
+            r: Risk-free rate override, scalar or per row (defaults to self.r)
+            q: Continuous dividend yield, scalar or per row
             
-            if vega < 1e-10:
-                return None
+        Returns:
+            Tuple of (price, vega) arrays. Inputs must have T > 0.
+        """
+        r = self.r if r is None else r
+        sqrt_T = np.sqrt(T)
+        vol_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        
+        disc_S = S * np.exp(-q * T)
+        disc_K = K * np.exp(-r * T)
+        price = np.where(
+            is_call,
+            disc_S * ndtr(d1) - disc_K * ndtr(d2),
+            disc_K * ndtr(-d2) - disc_S * ndtr(-d1)
+        )
+        vega = disc_S * np.exp(-0.5 * d1 * d1) / math.sqrt(2 * math.pi) * sqrt_T
+        return price, vega
+    
+    def greeks_array(
+        self,
+        S: Union[float, np.ndarray],
+        K: np.ndarray,
+        T: Union[float, np.ndarray],
+        sigma: np.ndarray,
+        is_call: np.ndarray,
+        r: Optional[Union[float, np.ndarray]] = None,
+        q: Union[float, np.ndarray] = 0.0
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized first-order Greeks with a continuous dividend yield.
+        
+        Same inputs as price_array.
+        
+        Returns:
+            Dict of delta, gamma, theta (per day), vega and rho (per 1%)
+            arrays. Inputs must have T > 0.
+        """
+        r = self.r if r is None else r
+        sqrt_T = np.sqrt(T)
+        vol_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        
+        carry = np.exp(-q * T)
+        disc_S = S * carry
+        disc_K = K * np.exp(-r * T)
+        pdf_d1 = np.exp(-0.5 * d1 * d1) / math.sqrt(2 * math.pi)
+        cdf_d1 = np.where(is_call, ndtr(d1), -ndtr(-d1))
+        cdf_d2 = np.where(is_call, ndtr(d2), -ndtr(-d2))
+        
+        return {
+            "delta": carry * cdf_d1,
+            "gamma": carry * pdf_d1 / (S * vol_sqrt_T),
+            "theta": (-disc_S * pdf_d1 * sigma / (2 * sqrt_T) - r * disc_K * cdf_d2 + q * disc_S * cdf_d1) / 365,
+            "vega": disc_S * pdf_d1 * sqrt_T / 100,
+            "rho": K * T * np.exp(-r * T) * cdf_d2 / 100,
+        }
+    
+    def implied_forward(
+        self,
+        strikes: np.ndarray,
+        call_prices: np.ndarray,
+        put_prices: np.ndarray,
+        spot: float,
+        T: float,
+        max_strikes: int = 20,
+        rate_bounds: Tuple[float, float] = (-0.05, 1.0),
+        max_basis_pct: float = 5.0
+    ) -> Optional[ParityFit]:
+        """
+        Implied forward and discount factor from put-call parity.
+        
+        C - P = D * (F - K), so C - P regressed on K has slope -D and the
+        forward follows from the intercept. The regression is Theil-Sen
+        (median of pairwise slopes, then median implied forward) over the
+        strikes nearest spot, so one stale or illiquid quote does not move
+        the estimate.
+        
+        Args:
+            strikes: Strike prices
+            call_prices: Call mid (or last) prices, 0 = no quote
+            put_prices: Put mid (or last) prices, 0 = no quote
+            spot: Spot price, used to pick the strikes and sanity-check F
+            T: Time to expiry in years
+            max_strikes: Strikes nearest spot used in the fit
+            rate_bounds: Implied rates outside this range fall back to
+                self.r for the discount factor
+            max_basis_pct: Forwards further than this from spot are rejected
+            
+        Returns:
+            ParityFit, or None with fewer than 3 quoted strikes or an
+            implausible forward
+        """
+        strikes = np.asarray(strikes, dtype=np.float64)
+        call_prices = np.asarray(call_prices, dtype=np.float64)
+        put_prices = np.asarray(put_prices, dtype=np.float64)
+        
+        quoted = np.flatnonzero((call_prices > 0) & (put_prices > 0))
+        if quoted.size < 3 or spot <= 0 or T <= 0:
+            return None
+        nearest = quoted[np.argsort(np.abs(strikes[quoted] - spot), kind="stable")[:max_strikes]]
+        K = strikes[nearest]
+        y = call_prices[nearest] - put_prices[nearest]
+        
+        i, j = np.triu_indices(K.size, k=1)
+        dK = K[j] - K[i]
+        valid = dK != 0
+        if not valid.any():
+            return None
+        discount = -float(np.median((y[j] - y[i])[valid] / dK[valid]))
+        
+        low, high = rate_bounds
+        if not math.exp(-high * T) <= discount <= math.exp(-low * T):
+            discount = math.exp(-self.r * T)
+        
+        forward = float(np.median(K + y / discount))
+        if abs(forward / spot - 1) * 100 > max_basis_pct:
+            return None
+        
+        residual = y - discount * (forward - K)
+        return ParityFit(
+            forward=forward,
+            discount_factor=discount,
+            rate=-math.log(discount) / T,
+            n_strikes=int(K.size),
+            rmse=float(np.sqrt(np.mean(residual ** 2)))
+        )
+    
+    def implied_volatility_batch(
+        self,
+        market_price: np.ndarray,
+        S: Union[float, np.ndarray],
+        K: np.ndarray,
+        T: Union[float, np.ndarray],
+        is_call: np.ndarray,
+        r: Optional[float] = None,
+        q: float = 0.0,
+        precision: float = 0.0001,
+        max_newton_iterations: int = 8,
+        max_bisection_iterations: int = 60,
+        sigma_bounds: Tuple[float, float] = (0.001, 5.0)
+    ) -> np.ndarray:
+        """
+        Solve implied volatility for a whole array of options at once.
+        
+        Starts from the Corrado-Miller rational approximation, takes
+        safeguarded Newton steps on every unsolved element together, and
+        finishes any element that has not converged with bisection on its
+        own bracket.
+        
+        Args:
+            market_price: Option prices
+            S: Spot price (scalar or array)
+            K: Strike prices
+            T: Time to expiration in years (scalar or array)
+            is_call: Boolean array, True for calls
+            r: Risk-free rate override (defaults to self.r)
+            q: Continuous dividend yield
+            precision: Convergence threshold on price
+            max_newton_iterations: Newton steps before falling back to bisection
+            max_bisection_iterations: Bisection steps for the fallback
+            sigma_bounds: (low, high) search bracket for sigma
             
-            diff = market_price - price
+        Returns:
+            Array of implied volatilities, NaN where no solution exists
+            (non-positive price or T, or price outside no-arbitrage bounds)
+        """
+        r = self.r if r is None else r
+        market_price, S, K, T, is_call = np.broadcast_arrays(
+            np.asarray(market_price, dtype=np.float64),
+            np.asarray(S, dtype=np.float64),
+            np.asarray(K, dtype=np.float64),
+            np.asarray(T, dtype=np.float64),
+            np.asarray(is_call, dtype=bool),
+        )
+        result = np.full(market_price.shape, np.nan)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            disc_S = S * np.exp(-q * T)
+            disc_K = K * np.exp(-r * T)
+            lower = np.maximum(np.where(is_call, disc_S - disc_K, disc_K - disc_S), 0.0)
+            upper = np.where(is_call, disc_S, disc_K)
+        
+        idx = np.flatnonzero(
+            (T > 0) & (S > 0) & (K > 0) & (market_price > lower) & (market_price < upper)
+        )
+        if idx.size == 0:
+            return result
+        
+        price = market_price.flat[idx]
+        S_ = S.flat[idx]
+        K_ = K.flat[idx]
+        T_ = T.flat[idx]
+        call_ = is_call.flat[idx]
+        dS = disc_S.flat[idx]
+        dK = disc_K.flat[idx]
+        
+        # Corrado-Miller initial guess, computed on the equivalent call price
+        call_price = np.where(call_, price, price + dS - dK)
+        half_gap = call_price - (dS - dK) / 2
+        radicand = np.maximum(half_gap ** 2 - (dS - dK) ** 2 / math.pi, 0.0)
+        sigma = (
+            math.sqrt(2 * math.pi) / (dS + dK) * (half_gap + np.sqrt(radicand))
+            / np.sqrt(T_)
+        )
+        lo = np.full(idx.size, sigma_bounds[0])
+        hi = np.full(idx.size, sigma_bounds[1])
+        sigma = np.clip(np.nan_to_num(sigma, nan=0.3), lo, hi)
+        
+        active = np.arange(idx.size)
+        for _ in range(max_newton_iterations):
+            model, vega = self.price_array(
+                S_[active], K_[active], T_[active], sigma[active], call_[active], r, q
+            )
+            diff = model - price[active]
+            done = np.abs(diff) < precision
             
-            if abs(diff) < precision:
-                return sigma
+            # Price is increasing in sigma, so the sign of diff tightens the bracket
+            too_high = diff > 0
+            hi[active] = np.where(too_high, sigma[active], hi[active])
+            lo[active] = np.where(too_high, lo[active], sigma[active])
             
-            sigma += diff / vega
+            with np.errstate(divide="ignore", invalid="ignore"):
+                step = sigma[active] - diff / vega
+            in_bracket = (step > lo[active]) & (step < hi[active])
+            next_sigma = np.where(in_bracket, step, 0.5 * (lo[active] + hi[active]))
+            sigma[active] = np.where(done, sigma[active], next_sigma)
             
-            # Keep sigma in reasonable bounds
-            sigma = max(0.001, min(5.0, sigma))
+            active = active[~done]
+            if active.size == 0:
+                break
+        
+        # Bisection fallback for elements Newton could not finish
+        for _ in range(max_bisection_iterations):
+            if active.size == 0:
+                break
+            mid = 0.5 * (lo[active] + hi[active])
+            model, _ = self.price_array(
+                S_[active], K_[active], T_[active], mid, call_[active], r, q
+            )
+            diff = model - price[active]
+            sigma[active] = mid
+            too_high = diff > 0
+            hi[active] = np.where(too_high, mid, hi[active])
+            lo[active] = np.where(too_high, lo[active], mid)
+            active = active[np.abs(diff) >= precision]
+        
+        # Anything still unconverged is within its bracket; reject only if far off
+        if active.size:
+            model, _ = self.price_array(
+                S_[active], K_[active], T_[active], sigma[active], call_[active], r, q
+            )
+            sigma[active[np.abs(model - price[active]) >= 1]] = np.nan
         
-        return sigma if abs(market_price - self.price(S, K, T, sigma, option_type)) < 1 else None
+        result.flat[idx] = sigma
+        return result
     
     def expected_price_range(
         self,
@@ -267,7 +603,7 @@ class BSMService:
             return (S, S)
         
         T = T_days / 365
-        z = stats.norm.ppf((1 + confidence) / 2)
+        z = confidence_z_score(confidence)
         move = S * iv * math.sqrt(T) * z
         
         return (S - move, S + move)
@@ -4,16 +4,22 @@ Provides Option Pricing, Greeks, and Investment calculators.
 """
 import math
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 from dataclasses import dataclass
-from scipy.stats import norm
+
+import numpy as np
+
+from app.cache.memo import PricingMemo
+from app.core.container import container
+from app.services.bsm import BSMService
+from app.services.kernels import norm_cdf, norm_pdf
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True)
 class OptionPriceResult:
-    """Result of option price calculation"""
+    """Result of option price calculation (frozen: memoized results are shared)"""
     call_price: float
     put_price: float
     call_delta: float
@@ -65,8 +71,9 @@ class CalculatorService:
     - SWP Calculator
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, memo: Optional[PricingMemo] = None):
+        self.bsm = BSMService()
+        self.memo = memo
     
     # ============== Black-Scholes Option Pricing ==============
     
@@ -93,6 +100,24 @@ class CalculatorService:
         Returns:
             OptionPriceResult with call/put prices and all Greeks
         """
+        if self.memo is not None:
+            return self.memo.lookup(
+                ("calculate_option_price", risk_free_rate, dividend_yield),
+                spot, strike, time_to_expiry, volatility,
+                lambda S, K, T, sigma: self._option_price(S, K, T, risk_free_rate, sigma, dividend_yield)
+            )
+        return self._option_price(spot, strike, time_to_expiry, risk_free_rate, volatility, dividend_yield)
+    
+    def _option_price(
+        self,
+        spot: float,
+        strike: float,
+        time_to_expiry: float,
+        risk_free_rate: float,
+        volatility: float,
+        dividend_yield: float
+    ) -> OptionPriceResult:
+        """Uncached calculate_option_price"""
         try:
             # Safety checks
             if time_to_expiry <= 0:
@@ -105,32 +130,32 @@ class CalculatorService:
             d2 = d1 - volatility * math.sqrt(time_to_expiry)
             
             # Call and Put prices
-            call_price = spot * math.exp(-dividend_yield * time_to_expiry) * norm.cdf(d1) - strike * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(d2)
-            put_price = strike * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(-d2) - spot * math.exp(-dividend_yield * time_to_expiry) * norm.cdf(-d1)
+            call_price = spot * math.exp(-dividend_yield * time_to_expiry) * norm_cdf(d1) - strike * math.exp(-risk_free_rate * time_to_expiry) * norm_cdf(d2)
+            put_price = strike * math.exp(-risk_free_rate * time_to_expiry) * norm_cdf(-d2) - spot * math.exp(-dividend_yield * time_to_expiry) * norm_cdf(-d1)
             
             # Greeks
             # Delta
-            call_delta = math.exp(-dividend_yield * time_to_expiry) * norm.cdf(d1)
-            put_delta = -math.exp(-dividend_yield * time_to_expiry) * norm.cdf(-d1)
+            call_delta = math.exp(-dividend_yield * time_to_expiry) * norm_cdf(d1)
+            put_delta = -math.exp(-dividend_yield * time_to_expiry) * norm_cdf(-d1)
             
             # Gamma (same for call and put)
-            gamma = math.exp(-dividend_yield * time_to_expiry) * norm.pdf(d1) / (spot * volatility * math.sqrt(time_to_expiry))
+            gamma = math.exp(-dividend_yield * time_to_expiry) * norm_pdf(d1) / (spot * volatility * math.sqrt(time_to_expiry))
             
             # Vega (same for call and put, per 1% change)
-            vega = spot * math.exp(-dividend_yield * time_to_expiry) * norm.pdf(d1) * math.sqrt(time_to_expiry) / 100
+            vega = spot * math.exp(-dividend_yield * time_to_expiry) * norm_pdf(d1) * math.sqrt(time_to_expiry) / 100
             
             # Theta (per day)
-            call_theta = (-spot * math.exp(-dividend_yield * time_to_expiry) * norm.pdf(d1) * volatility / (2 * math.sqrt(time_to_expiry))
-                         - risk_free_rate * strike * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(d2)
-                         + dividend_yield * spot * math.exp(-dividend_yield * time_to_expiry) * norm.cdf(d1)) / 365
+            call_theta = (-spot * math.exp(-dividend_yield * time_to_expiry) * norm_pdf(d1) * volatility / (2 * math.sqrt(time_to_expiry))
+                         - risk_free_rate * strike * math.exp(-risk_free_rate * time_to_expiry) * norm_cdf(d2)
+                         + dividend_yield * spot * math.exp(-dividend_yield * time_to_expiry) * norm_cdf(d1)) / 365
             
-            put_theta = (-spot * math.exp(-dividend_yield * time_to_expiry) * norm.pdf(d1) * volatility / (2 * math.sqrt(time_to_expiry))
-                        + risk_free_rate * strike * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(-d2)
-                        - dividend_yield * spot * math.exp(-dividend_yield * time_to_expiry) * norm.cdf(-d1)) / 365
+            put_theta = (-spot * math.exp(-dividend_yield * time_to_expiry) * norm_pdf(d1) * volatility / (2 * math.sqrt(time_to_expiry))
+                        + risk_free_rate * strike * math.exp(-risk_free_rate * time_to_expiry) * norm_cdf(-d2)
+                        - dividend_yield * spot * math.exp(-dividend_yield * time_to_expiry) * norm_cdf(-d1)) / 365
             
             # Rho (per 1% change)
-            call_rho = strike * time_to_expiry * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(d2) / 100
-            put_rho = -strike * time_to_expiry * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(-d2) / 100
+            call_rho = strike * time_to_expiry * math.exp(-risk_free_rate * time_to_expiry) * norm_cdf(d2) / 100
+            put_rho = -strike * time_to_expiry * math.exp(-risk_free_rate * time_to_expiry) * norm_cdf(-d2) / 100
             
             return OptionPriceResult(
                 call_price=round(call_price, 2),
@@ -149,6 +174,54 @@ class CalculatorService:
             logger.error(f"Error calculating option price: {e}")
             raise ValueError(f"Calculation error: {e}")
     
+    def calculate_option_price_batch(
+        self,
+        spot: Sequence[float],
+        strike: Sequence[float],
+        time_to_expiry: Sequence[float],
+        risk_free_rate: Sequence[float],
+        volatility: Sequence[float],
+        dividend_yield: Sequence[float]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_option_price over many contracts.
+        
+        Each argument is a sequence (or scalar, broadcast) with one entry per
+        row, in the same units as calculate_option_price.
+        
+        Returns:
+            Dict keyed like OptionPriceResult fields, each an array with one
+            value per row, rounded as in calculate_option_price
+        """
+        S, K, T, r, sigma, q = np.broadcast_arrays(*(
+            np.asarray(a, dtype=np.float64)
+            for a in (spot, strike, time_to_expiry, risk_free_rate, volatility, dividend_yield)
+        ))
+        if np.any(S <= 0) or np.any(K <= 0):
+            raise ValueError("Spot and strike must be positive")
+        
+        # Same safety floors as the scalar path
+        T = np.where(T <= 0, 1/365, T)
+        sigma = np.where(sigma <= 0, 0.001, sigma)
+        
+        call_price, _ = self.bsm.price_array(S, K, T, sigma, True, r=r, q=q)
+        put_price, _ = self.bsm.price_array(S, K, T, sigma, False, r=r, q=q)
+        call = self.bsm.greeks_array(S, K, T, sigma, True, r=r, q=q)
+        put = self.bsm.greeks_array(S, K, T, sigma, False, r=r, q=q)
+        
+        return {
+            "call_price": np.round(call_price, 2),
+            "put_price": np.round(put_price, 2),
+            "call_delta": np.round(call["delta"], 4),
+            "put_delta": np.round(put["delta"], 4),
+            "gamma": np.round(call["gamma"], 6),
+            "vega": np.round(call["vega"], 4),
+            "call_theta": np.round(call["theta"], 4),
+            "put_theta": np.round(put["theta"], 4),
+            "call_rho": np.round(call["rho"], 4),
+            "put_rho": np.round(put["rho"], 4),
+        }
+    
     def calculate_iv(
         self,
         option_price: float,
@@ -160,7 +233,9 @@ class CalculatorService:
         dividend_yield: float = 0.0
     ) -> float:
         """
-        Calculate implied volatility using Newton-Raphson method.
+        Calculate implied volatility from an option price.
+        Uses the batch solver in BSMService (rational initial guess,
+        Newton steps, bisection fallback).
         
         Args:
             option_price: Market price of the option
@@ -174,35 +249,21 @@ class CalculatorService:
         Returns:
             Implied volatility as decimal (e.g., 0.20 for 20%)
         """
-        MAX_ITERATIONS = 100
-        PRECISION = 1e-5
-        
-        # Initial guess
-        sigma = 0.3
+        sigma = self.bsm.implied_volatility_batch(
+            np.array([option_price]),
+            spot,
+            np.array([strike]),
+            time_to_expiry,
+            np.array([option_type == "CE"]),
+            r=risk_free_rate,
+            q=dividend_yield,
+            precision=1e-5
+        )[0]
         
-        for _ in range(MAX_ITERATIONS):
-            result = self.calculate_option_price(
-                spot, strike, time_to_expiry, 
-                risk_free_rate, sigma, dividend_yield
-            )
-            
-            price = result.call_price if option_type == "CE" else result.put_price
-            vega = result.vega * 100  # Convert back from per 1%
-            
-            diff = price - option_price
-            
-            if abs(diff) < PRECISION:
-                return round(sigma, 4)
-            
-            if vega < 1e-10:
-                break
-                
-            sigma = sigma - diff / vega
-            
-            # Keep sigma in reasonable bounds
-            sigma = max(0.01, min(5.0, sigma))
+        if np.isnan(sigma):
+            raise ValueError("Option price is outside no-arbitrage bounds, implied volatility not found")
         
-        return round(sigma, 4)
+        return round(float(sigma), 4)
     
     # ============== SIP Calculator ==============
     
@@ -369,5 +430,5 @@ class CalculatorService:
 
 
 def get_calculator_service() -> CalculatorService:
-    """Get calculator service instance"""
-    return CalculatorService()
+    """Get calculator service instance (sharing the container's pricing memo)"""
+    return CalculatorService(memo=container.pricing_memo)
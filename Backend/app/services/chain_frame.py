@@ -0,0 +1,225 @@
+"""
+Columnar Option Chain
+One upstream option chain response held as NumPy columns, strike-sorted.
+
+Dhan sends the chain as {strike: {"ce": {...}, "pe": {...}}}. Parsing it
+once into per-field arrays lets Greeks, reversal, PCR, the aggregate views
+and the screeners work on whole columns; nested leg dicts are only built
+again at the serialization edge. Leg columns follow the chain Greeks
+layout: calls occupy rows [0, n), puts rows [n, 2n).
+"""
+import logging
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.bsm import ParityFit
+
+logger = logging.getLogger(__name__)
+
+# Numeric leg fields (missing or null = 0); "OI" also accepts lowercase "oi"
+LEG_NUMERIC_FIELDS = (
+    "ltp", "atp", "pc", "vol", "pVol", "OI", "oichng", "oiperchnge", "p_oi",
+    "p_chng", "p_pchng", "iv", "bid", "ask", "bid_qty", "ask_qty",
+)
+
+# Leg fields passed through as objects, with their defaults
+LEG_OBJECT_FIELDS = {
+    "btyp": "NT",  # LB, SB, SC, LC, NT
+    "BuiltupName": "NEUTRAL",
+    "mness": "",  # I = ITM, O = OTM
+    "sym": "",
+    "sid": 0,
+    "disp_sym": "",
+    "otype": "",  # CE or PE
+}
+
+# Serialized leg payload as (key, source column); aliases kept for the frontend
+LEG_PAYLOAD_FIELDS = (
+    ("ltp", "ltp"), ("atp", "atp"), ("pc", "pc"),
+    ("volume", "vol"), ("vol", "vol"), ("pVol", "pVol"),
+    ("oi", "OI"), ("OI", "OI"), ("oichng", "oichng"), ("oi_change", "oichng"),
+    ("oiperchnge", "oiperchnge"), ("p_oi", "p_oi"),
+    ("p_chng", "p_chng"), ("p_pchng", "p_pchng"), ("change", "p_chng"),
+    ("iv", "iv"), ("optgeeks", "optgeeks"),
+    ("bid", "bid"), ("ask", "ask"), ("bid_qty", "bid_qty"), ("ask_qty", "ask_qty"),
+    ("btyp", "btyp"), ("BuiltupName", "BuiltupName"), ("mness", "mness"),
+    ("sym", "sym"), ("sid", "sid"), ("disp_sym", "disp_sym"), ("otype", "otype"),
+)
+
+
+def _numeric_column(values: List[Any]) -> np.ndarray:
+    """Integer column when every value is an integer, else float; bad values become 0"""
+    column = np.array([0 if v is None else v for v in values])
+    if column.dtype.kind in "iuf":
+        return column
+    if column.dtype.kind == "b":
+        return column.astype(np.int64)
+    
+    parsed = np.zeros(len(values), dtype=np.float64)
+    for i, v in enumerate(values):
+        try:
+            parsed[i] = float(v)
+        except (TypeError, ValueError):
+            continue
+    return parsed
+
+
+def _object_column(values: List[Any]) -> np.ndarray:
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+@dataclass(slots=True)
+class ChainFrame:
+    """
+    Struct-of-arrays option chain.
+    
+    The upstream fields are filled by from_oc; OptionsService adds the
+    per-tick results (pricing IVs, Greeks, reversal) as it processes the chain.
+    """
+    keys: List[str]  # Upstream strike keys, strike-sorted
+    strikes: np.ndarray  # (n,)
+    legs: Dict[str, np.ndarray]  # (2n,) per leg field
+    present: np.ndarray  # (2n,) True where the leg was in the payload
+    
+    spot: float = 0.0
+    T_days: float = 0.0
+    parity: Optional[ParityFit] = None
+    # IVs used for pricing (percent): upstream IVs with solved/smile-filled gaps
+    iv: Optional[np.ndarray] = None
+    iv_filled: Optional[np.ndarray] = None
+    iv_smile: Optional[np.ndarray] = None  # Fitted smile IVs when pricing off the smile
+    greeks: Optional[Dict[str, np.ndarray]] = None  # (2n,) per Greek
+    reversal: Optional[Dict[str, np.ndarray]] = None  # (n,) per reversal column
+    debug_index: Optional[int] = None
+    debug_data: Optional[Dict[str, Any]] = None
+    # Full chain this frame was windowed from, for chain-wide totals
+    parent: Optional["ChainFrame"] = None
+    
+    @classmethod
+    def from_oc(cls, oc: Dict[str, Any]) -> "ChainFrame":
+        """Parse Dhan's per-strike "oc" mapping; unparsable strike keys are skipped"""
+        rows = []
+        for key, strike_data in oc.items():
+            try:
+                rows.append((float(key), key, strike_data))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Error processing strike {key}: {e}")
+        rows.sort(key=lambda row: row[0])
+        
+        legs = [row[2].get("ce", {}) for row in rows] + [row[2].get("pe", {}) for row in rows]
+        columns = {
+            name: _numeric_column([leg.get(name, 0) for leg in legs])
+            for name in LEG_NUMERIC_FIELDS if name != "OI"
+        }
+        columns["OI"] = _numeric_column([leg.get("OI", leg.get("oi", 0)) for leg in legs])
+        for name, default in LEG_OBJECT_FIELDS.items():
+            columns[name] = _object_column([leg.get(name, default) for leg in legs])
+        columns["optgeeks"] = _object_column([leg.get("optgeeks", {}) for leg in legs])
+        
+        return cls(
+            keys=[row[1] for row in rows],
+            strikes=np.array([row[0] for row in rows], dtype=np.float64),
+            legs=columns,
+            present=np.array([bool(leg) for leg in legs], dtype=bool),
+        )
+    
+    def __len__(self) -> int:
+        return self.strikes.size
+    
+    def ce(self, name: str) -> np.ndarray:
+        """Call rows of a leg column"""
+        return self.legs[name][:self.strikes.size]
+    
+    def pe(self, name: str) -> np.ndarray:
+        """Put rows of a leg column"""
+        return self.legs[name][self.strikes.size:]
+    
+    def leg_strikes(self) -> np.ndarray:
+        """Strike of every leg row"""
+        return np.concatenate([self.strikes, self.strikes])
+    
+    def mid_prices(self) -> np.ndarray:
+        """Bid/ask mid per leg when both sides are quoted, else LTP"""
+        bid = self.legs["bid"].astype(np.float64)
+        ask = self.legs["ask"].astype(np.float64)
+        quoted = (bid > 0) & (ask >= bid)
+        return np.where(quoted, (bid + ask) / 2, self.legs["ltp"])
+    
+    def atm_index(self) -> Optional[int]:
+        """Row of the strike nearest spot (lowest on ties); None for an empty chain"""
+        n = self.strikes.size
+        if not n:
+            return None
+        # Binary search on the sorted strikes, then the nearer neighbour
+        i = int(np.searchsorted(self.strikes, self.spot))
+        if i == n or (i > 0 and self.spot - self.strikes[i - 1] <= self.strikes[i] - self.spot):
+            return i - 1
+        return i
+    
+    def window(self, half_width: int) -> "ChainFrame":
+        """
+        The ATM strike and half_width strikes either side of it.
+        
+        The window is centred on the strike nearest the current spot, so it
+        re-centres as spot moves. Returns self when it covers the whole chain.
+        """
+        n = self.strikes.size
+        atm = self.atm_index()
+        if atm is None:
+            return self
+        lo, hi = max(atm - half_width, 0), min(atm + half_width + 1, n)
+        if lo == 0 and hi == n:
+            return self
+        
+        def leg_rows(arr: np.ndarray) -> np.ndarray:
+            return np.concatenate([arr[lo:hi], arr[n + lo:n + hi]])
+        
+        return replace(
+            self,
+            keys=self.keys[lo:hi],
+            strikes=self.strikes[lo:hi],
+            legs={name: leg_rows(arr) for name, arr in self.legs.items()},
+            present=leg_rows(self.present),
+            iv=None if self.iv is None else leg_rows(self.iv),
+            iv_filled=None if self.iv_filled is None else leg_rows(self.iv_filled),
+            iv_smile=None if self.iv_smile is None else leg_rows(self.iv_smile),
+            greeks=None if self.greeks is None else {
+                name: leg_rows(arr) for name, arr in self.greeks.items()
+            },
+            reversal=None if self.reversal is None else {
+                name: arr[lo:hi] for name, arr in self.reversal.items()
+            },
+            debug_index=None,
+            debug_data=None,
+            parent=self if self.parent is None else self.parent,
+        )
+    
+    def atm_strike(self) -> float:
+        """Strike nearest spot, or spot itself for an empty chain"""
+        index = self.atm_index()
+        return self.spot if index is None else float(self.strikes[index])
+    
+    def strike_pcr(self, decimals: int = 4, field: str = "OI") -> np.ndarray:
+        """Put/call ratio of a leg column per strike; 0 where the call side is 0"""
+        ce = self.ce(field).astype(np.float64)
+        pe = self.pe(field).astype(np.float64)
+        ratio = np.divide(pe, ce, out=np.zeros_like(ce), where=ce > 0)
+        return np.round(ratio, decimals)
+    
+    def leg_payloads(self, **columns: List[Any]) -> List[Dict[str, Any]]:
+        """
+        One payload dict per leg row (calls then puts) in the upstream leg
+        shape, aliases included. Keyword arguments replace a source column
+        with per-leg values (e.g. iv=..., optgeeks=...).
+        """
+        values = {
+            source: columns[source] if source in columns else self.legs[source].tolist()
+            for source in {source for _, source in LEG_PAYLOAD_FIELDS}
+        }
+        keys = [key for key, _ in LEG_PAYLOAD_FIELDS]
+        rows = zip(*(values[source] for _, source in LEG_PAYLOAD_FIELDS))
+        return [dict(zip(keys, row)) for row in rows]
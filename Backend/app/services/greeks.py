@@ -3,18 +3,48 @@ Greeks Service
 Calculates all option Greeks including advanced Greeks
 """
 import math
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Union
 from dataclasses import dataclass
 
-import scipy.stats as stats
 import numpy as np
+from scipy.special import ndtr
 
+from app.cache.memo import PricingMemo, memoized_pricing
 from app.services.bsm import BSMService
+from app.services.kernels import norm_cdf, norm_pdf
 
 
-@dataclass
+# Field order of AdvancedGreeks, used for the array-based chain API
+GREEK_FIELDS = (
+    "delta", "vega", "theta", "rho",
+    "gamma", "vanna", "charm",
+    "speed", "zomma", "color",
+    "vomma", "veta", "ultima",
+)
+
+# Greeks computed at each greeks_level; the rest are skipped (reported as 0)
+GREEK_LEVELS = {
+    "first": ("delta", "vega", "theta", "rho", "gamma"),
+    "second": ("delta", "vega", "theta", "rho", "gamma", "vanna", "charm", "vomma"),
+    "full": GREEK_FIELDS,
+}
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2 * math.pi)
+
+
+def greek_level_fields(level: str) -> tuple:
+    """Greek names computed for a greeks_level ('first', 'second' or 'full')"""
+    try:
+        return GREEK_LEVELS[level]
+    except KeyError:
+        raise ValueError(
+            f"Unknown greeks_level '{level}', expected one of {', '.join(GREEK_LEVELS)}"
+        ) from None
+
+
+@dataclass(slots=True, frozen=True)
 class AdvancedGreeks:
-    """All Greeks including advanced ones"""
+    """All Greeks including advanced ones (slotted, one is built per leg; frozen, memoized ones are shared)"""
     # First order
     delta: float
     vega: float
@@ -37,6 +67,10 @@ class AdvancedGreeks:
     
     # Higher order
     ultima: float  # dVomma/dIV
+    
+    def to_dict(self, fields: Sequence[str] = GREEK_FIELDS) -> Dict[str, float]:
+        """The named Greeks as a dict, read straight from the slots"""
+        return {name: getattr(self, name) for name in fields}
 
 
 class GreeksService:
@@ -46,19 +80,22 @@ class GreeksService:
     Delegates core BSM calculations to BSMService to avoid code duplication.
     """
     
-    def __init__(self, risk_free_rate: float = 0.10):
+    def __init__(self, risk_free_rate: float = 0.10, memo: Optional[PricingMemo] = None):
         self.r = risk_free_rate
-        self.bsm = BSMService(risk_free_rate)
+        self.memo = memo
+        self.bsm = BSMService(risk_free_rate, memo=memo)
     
     # NOTE: _d1 and _d2 removed - using BSMService._d1 and BSMService._d2 instead
     
+    @memoized_pricing
     def calculate_all_greeks(
         self,
         S: float,
         K: float,
         T: float,
         sigma: float,
-        option_type: str = "call"
+        option_type: str = "call",
+        level: str = "full"
     ) -> AdvancedGreeks:
         """
         Calculate all Greeks for an option.
@@ -69,10 +106,13 @@ class GreeksService:
             T: Time to expiration in years
             sigma: Implied volatility (as decimal)
             option_type: 'call' or 'put'
+            level: greeks_level - 'first' (delta, gamma, theta, vega, rho),
+                'second' (adds vanna, charm, vomma) or 'full'
             
         Returns:
-            AdvancedGreeks dataclass with all calculated values
+            AdvancedGreeks dataclass; Greeks above the level are 0
         """
+        fields = greek_level_fields(level)
         if T <= 0 or sigma <= 0 or S <= 0:
             return self._get_zero_greeks()
         
@@ -81,9 +121,9 @@ class GreeksService:
         d2 = BSMService._d2(S, K, T, self.r, sigma)
         
         sqrt_T = math.sqrt(T)
-        pdf_d1 = stats.norm.pdf(d1)
-        cdf_d1 = stats.norm.cdf(d1)
-        cdf_d2 = stats.norm.cdf(d2)
+        pdf_d1 = norm_pdf(d1)
+        cdf_d1 = norm_cdf(d1)
+        cdf_d2 = norm_cdf(d2)
         
         is_call = option_type.lower() == "call"
         
@@ -99,17 +139,20 @@ class GreeksService:
         if is_call:
             theta_term2 = -self.r * K * math.exp(-self.r * T) * cdf_d2
         else:
-            theta_term2 = self.r * K * math.exp(-self.r * T) * stats.norm.cdf(-d2)
+            theta_term2 = self.r * K * math.exp(-self.r * T) * norm_cdf(-d2)
         theta = (theta_term1 + theta_term2) / 365
         
         if is_call:
             rho = K * T * math.exp(-self.r * T) * cdf_d2 / 100
         else:
-            rho = -K * T * math.exp(-self.r * T) * stats.norm.cdf(-d2) / 100
+            rho = -K * T * math.exp(-self.r * T) * norm_cdf(-d2) / 100
         
         # Second order Greeks
         gamma = pdf_d1 / (S * sigma * sqrt_T)
         
+        if level == "first":
+            return self._level_greeks(fields, delta=delta, vega=vega, theta=theta, rho=rho, gamma=gamma)
+        
         vanna = -pdf_d1 * d2 / sigma
         
         charm = -pdf_d1 * (
@@ -118,6 +161,13 @@ class GreeksService:
         if not is_call:
             charm = charm
         
+        if level == "second":
+            vomma = vega * d1 * d2 / sigma
+            return self._level_greeks(
+                fields, delta=delta, vega=vega, theta=theta, rho=rho,
+                gamma=gamma, vanna=vanna, charm=charm, vomma=vomma
+            )
+        
         # Third order Greeks
         speed = -gamma / S * (d1 / (sigma * sqrt_T) + 1)
         
@@ -155,6 +205,12 @@ class GreeksService:
             ultima=round(ultima, 6),
         )
     
+    def _level_greeks(self, fields: tuple, **values: float) -> AdvancedGreeks:
+        """AdvancedGreeks with the computed level's values rounded, others 0"""
+        return AdvancedGreeks(
+            **{name: round(values[name], 6) if name in fields else 0 for name in GREEK_FIELDS}
+        )
+    
     def _get_zero_greeks(self) -> AdvancedGreeks:
         """Return zero values for all Greeks"""
         return AdvancedGreeks(
@@ -164,6 +220,179 @@ class GreeksService:
             vomma=0, veta=0, ultima=0
         )
     
+    def calculate_chain_greeks(
+        self,
+        S: Union[float, np.ndarray],
+        K: np.ndarray,
+        T: Union[float, np.ndarray],
+        sigma: np.ndarray,
+        is_call: np.ndarray,
+        with_price: bool = False,
+        decimals: Optional[int] = 6,
+        level: str = "full"
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate all Greeks for a whole chain in one vectorized pass.
+        
+        Same formulas as calculate_all_greeks, evaluated on NumPy arrays so a
+        chain costs a handful of array operations instead of one scipy call
+        per Greek per strike.
+        
+        Args:
+            S: Spot price (scalar or array, e.g. a grid of spot shocks)
+            K: Array of strike prices
+            T: Time to expiration in years (scalar or array)
+            sigma: Array of implied volatilities (as decimal)
+            is_call: Boolean array, True for calls and False for puts
+            with_price: Also return the BSM theoretical price under "price",
+                reusing the same d1/d2 (matches BSMService.price)
+            decimals: Rounding applied to the Greeks, None for full precision
+            level: greeks_level ('first', 'second' or 'full'); only that
+                level's Greeks are computed and returned
+            
+        Returns:
+            Dictionary of Greek name -> array for the level's Greeks (all of
+            GREEK_FIELDS when full). Rows with T, sigma, S or K <= 0 are
+            zero, like _get_zero_greeks.
+        """
+        fields = greek_level_fields(level)
+        S, K, T, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=np.float64),
+            np.asarray(K, dtype=np.float64),
+            np.asarray(T, dtype=np.float64),
+            np.asarray(sigma, dtype=np.float64),
+            np.asarray(is_call, dtype=bool),
+        )
+        r = self.r
+        
+        valid = (T > 0) & (sigma > 0) & (K > 0) & (S > 0)
+        if not valid.any():
+            result = {name: np.zeros(K.shape) for name in fields}
+            if with_price:
+                result["price"] = self._fallback_price(S, K, T, is_call)
+            return result
+        
+        # Substitute harmless values for invalid rows, zeroed at the end
+        S_input, K_input, T_input = S, K, T
+        all_valid = bool(valid.all())
+        if not all_valid:
+            S = np.where(valid, S, 1.0)
+            K = np.where(valid, K, S)
+            T = np.where(valid, T, 1.0)
+            sigma = np.where(valid, sigma, 1.0)
+        
+        sqrt_T = np.sqrt(T)
+        vol_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        
+        pdf_d1 = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+        cdf_d1 = ndtr(d1)
+        cdf_d2 = ndtr(d2)
+        cdf_neg_d2 = ndtr(-d2)
+        disc_K = K * np.exp(-r * T)
+        
+        # First order Greeks
+        delta = np.where(is_call, cdf_d1, cdf_d1 - 1)
+        vega = S * pdf_d1 * sqrt_T / 100
+        theta = (
+            -(S * pdf_d1 * sigma) / (2 * sqrt_T)
+            + np.where(is_call, -r * disc_K * cdf_d2, r * disc_K * cdf_neg_d2)
+        ) / 365
+        rho = np.where(is_call, T * disc_K * cdf_d2, -T * disc_K * cdf_neg_d2) / 100
+        
+        # Second order Greeks
+        gamma = pdf_d1 / (S * vol_sqrt_T)
+        values = {"delta": delta, "vega": vega, "theta": theta, "rho": rho, "gamma": gamma}
+        
+        if level != "first":
+            d1d2 = d1 * d2
+            values["vanna"] = -pdf_d1 * d2 / sigma
+            values["charm"] = -pdf_d1 * (2 * r * T - d2 * vol_sqrt_T) / (2 * T * vol_sqrt_T)
+            values["vomma"] = vega * d1d2 / sigma
+        
+        if level == "full":
+            # Third order Greeks
+            values["speed"] = -gamma / S * (d1 / vol_sqrt_T + 1)
+            values["zomma"] = gamma * (d1d2 - 1) / sigma
+            values["color"] = -pdf_d1 / (2 * S * T * vol_sqrt_T) * (
+                2 * r * T + 1 + (2 * r * T - d2 * vol_sqrt_T) * d1 / vol_sqrt_T
+            )
+            
+            # Volatility Greeks
+            values["veta"] = -S * pdf_d1 * sqrt_T * (r * d1 / vol_sqrt_T - (1 + d1d2) / (2 * T))
+            values["ultima"] = -vega / (sigma ** 2) * (d1d2 * (1 - d1d2) + d1 ** 2 + d2 ** 2)
+        
+        result = {
+            name: arr if decimals is None else np.round(arr, decimals)
+            for name, arr in values.items()
+        }
+        if not all_valid:
+            result = {name: np.where(valid, arr, 0.0) for name, arr in result.items()}
+        
+        if with_price:
+            price = np.where(
+                is_call,
+                S * cdf_d1 - disc_K * cdf_d2,
+                disc_K * cdf_neg_d2 - S * ndtr(-d1)
+            )
+            result["price"] = np.maximum(price, 0.0) if all_valid else np.where(
+                valid, np.maximum(price, 0.0), self._fallback_price(S_input, K_input, T_input, is_call)
+            )
+        
+        return result
+    
+    @staticmethod
+    def approximate_spot_move(
+        chain_greeks: Dict[str, np.ndarray],
+        dS: Union[float, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Taylor-expand calculate_chain_greeks output to a spot moved by dS.
+        
+        Price uses delta, gamma and speed; delta uses gamma and speed; gamma
+        uses speed; vega uses vanna and zomma; vanna uses zomma. Other Greeks are
+        carried over unchanged. Accurate for small moves only and best fed
+        unrounded Greeks (decimals=None).
+        """
+        delta = chain_greeks["delta"]
+        gamma = chain_greeks["gamma"]
+        speed = chain_greeks["speed"]
+        vanna = chain_greeks["vanna"]
+        dS2 = dS * dS
+        
+        result = dict(chain_greeks)
+        result["delta"] = delta + gamma * dS + 0.5 * speed * dS2
+        result["gamma"] = gamma + speed * dS
+        zomma = chain_greeks["zomma"]
+        result["vega"] = chain_greeks["vega"] + (vanna * dS + 0.5 * zomma * dS2) / 100
+        result["vanna"] = vanna + zomma * dS
+        if "price" in chain_greeks:
+            result["price"] = np.maximum(
+                chain_greeks["price"] + delta * dS + 0.5 * gamma * dS2 + speed * dS2 * dS / 6,
+                0.0
+            )
+        return result
+    
+    @staticmethod
+    def _fallback_price(
+        S: Union[float, np.ndarray],
+        K: np.ndarray,
+        T: np.ndarray,
+        is_call: np.ndarray
+    ) -> np.ndarray:
+        """BSMService.price for rows outside the model: intrinsic at expiry, else 0"""
+        intrinsic = np.maximum(np.where(is_call, S - K, K - S), 0.0)
+        return np.where(T <= 0, intrinsic, 0.0)
+    
+    @staticmethod
+    def greeks_at(chain_greeks: Dict[str, np.ndarray], index: int) -> AdvancedGreeks:
+        """Build an AdvancedGreeks for one row of calculate_chain_greeks output (missing Greeks are 0)"""
+        return AdvancedGreeks(**{
+            name: float(chain_greeks[name][index]) if name in chain_greeks else 0.0
+            for name in GREEK_FIELDS
+        })
+    
     def calculate_for_chain(
         self,
         spot: float,
@@ -185,21 +414,28 @@ class GreeksService:
         Returns:
             Dictionary of strike -> {ce_greeks, pe_greeks}
         """
-        result = {}
+        n = len(strikes)
+        if n == 0:
+            return {}
         
-        for strike in strikes:
-            call_iv = call_ivs.get(strike, 0)
-            put_iv = put_ivs.get(strike, 0)
-            
-            ce_greeks = self.calculate_all_greeks(spot, strike, T, call_iv, "call")
-            pe_greeks = self.calculate_all_greeks(spot, strike, T, put_iv, "put")
-            
-            result[strike] = {
-                "ce": ce_greeks,
-                "pe": pe_greeks
-            }
+        # Calls occupy rows [0, n), puts rows [n, 2n)
+        K = np.array(list(strikes) * 2, dtype=np.float64)
+        sigma = np.array(
+            [call_ivs.get(strike, 0) for strike in strikes]
+            + [put_ivs.get(strike, 0) for strike in strikes],
+            dtype=np.float64
+        )
+        is_call = np.arange(2 * n) < n
         
-        return result
+        chain_greeks = self.calculate_chain_greeks(spot, K, T, sigma, is_call)
+        
+        return {
+            strike: {
+                "ce": self.greeks_at(chain_greeks, i),
+                "pe": self.greeks_at(chain_greeks, n + i),
+            }
+            for i, strike in enumerate(strikes)
+        }
 
 
 # Singleton instance
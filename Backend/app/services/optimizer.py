@@ -0,0 +1,449 @@
+"""
+Strategy Optimizer
+Searches a chain's strike combinations for the best credit spreads, iron
+condors and butterflies, scoring candidates in vectorized chunks spread
+over a process pool.
+"""
+import asyncio
+import time
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.special import ndtr
+
+from app.core.metrics import increment_counter
+
+logger = logging.getLogger(__name__)
+
+
+# Leg layout of each structure: (option type, side, quantity) per column of
+# the candidate's strike-index row
+STRATEGY_LEGS = {
+    "bull_put_spread": (("PE", "buy", 1), ("PE", "sell", 1)),
+    "bear_call_spread": (("CE", "sell", 1), ("CE", "buy", 1)),
+    "iron_condor": (("PE", "buy", 1), ("PE", "sell", 1), ("CE", "sell", 1), ("CE", "buy", 1)),
+    "call_butterfly": (("CE", "buy", 1), ("CE", "sell", 2), ("CE", "buy", 1)),
+    "put_butterfly": (("PE", "buy", 1), ("PE", "sell", 2), ("PE", "buy", 1)),
+}
+OPTIMIZER_STRATEGIES = tuple(STRATEGY_LEGS)
+OPTIMIZER_RANKINGS = ("score", "pop", "reward_risk")
+
+
+@dataclass
+class ChainQuotes:
+    """One expiry's per-strike prices, sorted by strike"""
+    strikes: np.ndarray
+    call_prices: np.ndarray  # 0 = no quote
+    put_prices: np.ndarray
+    ivs: np.ndarray  # Smile IV per strike (percent): OTM leg, else the other
+    forward: float
+    T: float  # Years to expiry
+
+    @classmethod
+    def from_live_data(cls, live_data: Dict, risk_free_rate: float) -> Optional["ChainQuotes"]:
+        """
+        Build quotes from an OptionsService.get_live_data response.
+
+        Prices are bid/ask mids where both sides are quoted, else LTP. The
+        forward is the put-call parity estimate when available.
+
+        Returns:
+            None if the response has no chain, spot or time to expiry
+        """
+        oc_data = live_data.get("oc", {}) if live_data else {}
+        spot = (live_data or {}).get("spot", {}).get("ltp", 0) or 0
+        T = float(live_data.get("days_to_expiry") or 0) / 365 if live_data else 0.0
+        if not oc_data or spot <= 0 or T <= 0:
+            return None
+
+        rows = sorted((float(key), data.get("ce", {}), data.get("pe", {})) for key, data in oc_data.items())
+        strikes = np.array([row[0] for row in rows])
+
+        def leg_arrays(legs):
+            bid = np.array([leg.get("bid", 0) or 0 for leg in legs], dtype=np.float64)
+            ask = np.array([leg.get("ask", 0) or 0 for leg in legs], dtype=np.float64)
+            ltp = np.array([leg.get("ltp", 0) or 0 for leg in legs], dtype=np.float64)
+            iv = np.array([leg.get("iv", 0) or 0 for leg in legs], dtype=np.float64)
+            return np.where((bid > 0) & (ask >= bid), (bid + ask) / 2, ltp), iv
+
+        call_prices, call_ivs = leg_arrays([row[1] for row in rows])
+        put_prices, put_ivs = leg_arrays([row[2] for row in rows])
+
+        parity = live_data.get("implied_forward") or {}
+        forward = parity.get("forward") or spot * float(np.exp(risk_free_rate * T))
+
+        otm = np.where(strikes < forward, put_ivs, call_ivs)
+        itm = np.where(strikes < forward, call_ivs, put_ivs)
+        ivs = np.where(otm > 0, otm, itm)
+        fallback_iv = live_data.get("atmiv") or (float(np.median(ivs[ivs > 0])) if np.any(ivs > 0) else 15.0)
+        ivs = np.where(ivs > 0, ivs, fallback_iv)
+
+        return cls(
+            strikes=strikes,
+            call_prices=call_prices,
+            put_prices=put_prices,
+            ivs=ivs,
+            forward=float(forward),
+            T=T,
+        )
+
+
+# ============== Scoring (runs in worker processes) ==============
+
+def _prob_above(x: np.ndarray, quotes: ChainQuotes) -> np.ndarray:
+    """Risk-neutral P(S_T > x) under a lognormal at the smile IV of x"""
+    finite = np.isfinite(x) & (x > 0)
+    safe_x = np.where(finite, x, quotes.forward)
+    sd = np.interp(safe_x, quotes.strikes, quotes.ivs) / 100 * np.sqrt(quotes.T)
+    d2 = (np.log(quotes.forward / safe_x) - 0.5 * sd * sd) / sd
+    return np.where(finite, ndtr(d2), np.where(x <= 0, 1.0, 0.0))
+
+
+def _score_chunk(
+    strategy: str,
+    quotes: ChainQuotes,
+    outer: np.ndarray,
+    inner: Optional[np.ndarray],
+    max_loss: Optional[float],
+    min_pop: float,
+    rank_by: str,
+    top_k: int,
+    floor: float
+) -> Dict[str, np.ndarray]:
+    """
+    Score one chunk of candidates and keep its top K.
+
+    Candidates are rows of `outer` (strike indices in STRATEGY_LEGS order);
+    iron condors pair every put spread in `outer` with every call spread in
+    `inner`. Anything ranking at or below `floor` - the K-th best seen so
+    far - is dropped here rather than shipped back.
+    """
+    K = quotes.strikes
+    calls, puts = quotes.call_prices, quotes.put_prices
+
+    if strategy == "iron_condor":
+        put_long, put_short = outer.T
+        call_short, call_long = inner.T
+        net = ((puts[put_short] - puts[put_long])[:, None]
+               + (calls[call_short] - calls[call_long])[None, :])
+        width = np.maximum((K[put_short] - K[put_long])[:, None], (K[call_long] - K[call_short])[None, :])
+        lower = K[put_short][:, None] - net
+        upper = K[call_short][None, :] + net
+        valid = (K[put_short][:, None] < K[call_short][None, :]).ravel()
+        net, width, lower, upper = net.ravel(), width.ravel(), lower.ravel(), upper.ravel()
+        max_profit, loss = net, width - net
+    elif strategy == "bull_put_spread":
+        long, short = outer.T
+        net = puts[short] - puts[long]
+        max_profit, loss = net, (K[short] - K[long]) - net
+        lower, upper = K[short] - net, np.full(len(net), np.inf)
+        valid = np.ones(len(net), dtype=bool)
+    elif strategy == "bear_call_spread":
+        short, long = outer.T
+        net = calls[short] - calls[long]
+        max_profit, loss = net, (K[long] - K[short]) - net
+        lower, upper = np.zeros(len(net)), K[short] + net
+        valid = np.ones(len(net), dtype=bool)
+    else:
+        prices = calls if strategy == "call_butterfly" else puts
+        low, mid, high = outer.T
+        debit = prices[low] - 2 * prices[mid] + prices[high]
+        net = -debit
+        max_profit, loss = (K[mid] - K[low]) - debit, debit
+        lower, upper = K[low] + debit, K[high] - debit
+        valid = np.ones(len(net), dtype=bool)
+
+    valid &= (loss > 0) & (max_profit > 0)
+    if max_loss is not None:
+        valid &= loss <= max_loss
+    safe_loss = np.where(valid, loss, 1.0)
+
+    pop = np.clip(_prob_above(lower, quotes) - _prob_above(upper, quotes), 0.0, 1.0)
+    reward_risk = max_profit / safe_loss
+    # Expected P&L per unit of risk, treating the payoff as all-or-nothing
+    score = pop * reward_risk - (1 - pop)
+
+    rank = {"score": score, "pop": pop, "reward_risk": reward_risk}[rank_by]
+    selected = np.flatnonzero(valid & (pop >= min_pop) & (rank > floor))
+    if len(selected) > top_k:
+        selected = selected[np.argpartition(-rank[selected], top_k - 1)[:top_k]]
+
+    if inner is not None:
+        legs = np.hstack([outer[selected // len(inner)], inner[selected % len(inner)]])
+    else:
+        legs = outer[selected]
+
+    return {
+        "legs": legs,
+        "net_premium": net[selected],
+        "max_profit": max_profit[selected],
+        "max_loss": loss[selected],
+        "pop": pop[selected],
+        "reward_risk": reward_risk[selected],
+        "score": score[selected],
+        "lower": lower[selected],
+        "upper": upper[selected],
+        "rank": rank[selected],
+    }
+
+
+def _merge_top(results: List[Dict[str, np.ndarray]], top_k: int) -> Dict[str, np.ndarray]:
+    """Best K across chunk results, best first (ties broken by strikes)"""
+    merged = {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+    order = np.lexsort((*merged["legs"].T[::-1], -merged["rank"]))[:top_k]
+    return {key: values[order] for key, values in merged.items()}
+
+
+# ============== Optimizer ==============
+
+class StrategyOptimizer:
+    """
+    Top-K strike combinations for a multi-leg structure.
+
+    Candidates are pruned before scoring: legs must be quoted, spreads must
+    collect a credit (butterflies must cost a debit) and wings are limited
+    to `max_width` strikes. The rest are scored in vectorized chunks on a
+    process pool; each finished chunk raises the floor sent with the next
+    ones, and whatever has finished when the time budget runs out is
+    returned.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        workers: int = 1,
+        chunk_size: int = 250_000,
+        time_budget: float = 2.0
+    ):
+        """
+        Args:
+            executor: Pool to score chunks on; None scores them inline
+            workers: Size of that pool, to keep it busy without queueing
+                chunks that would only see a stale floor
+            chunk_size: Candidates per scoring task
+            time_budget: Default search time limit in seconds
+        """
+        self.executor = executor
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.time_budget = time_budget
+
+    # ============== Enumeration ==============
+
+    @staticmethod
+    def _credit_spreads(quotes: ChainQuotes, option_type: str, max_width: Optional[int]) -> np.ndarray:
+        """OTM credit spreads as (long, short) put or (short, long) call index rows"""
+        lo, hi = np.triu_indices(len(quotes.strikes), k=1)
+        if max_width:
+            keep = hi - lo <= max_width
+            lo, hi = lo[keep], hi[keep]
+
+        K = quotes.strikes
+        if option_type == "PE":
+            prices = quotes.put_prices
+            credit = prices[hi] - prices[lo]
+            keep = (K[hi] <= quotes.forward) & (prices[lo] > 0)
+        else:
+            prices = quotes.call_prices
+            credit = prices[lo] - prices[hi]
+            keep = (K[lo] >= quotes.forward) & (prices[hi] > 0)
+        keep &= (credit > 0) & (credit < K[hi] - K[lo])
+        return np.column_stack([lo[keep], hi[keep]])
+
+    @staticmethod
+    def _butterflies(quotes: ChainQuotes, option_type: str, max_width: Optional[int]) -> np.ndarray:
+        """Equal-wing butterflies as (low, mid, high) index rows"""
+        n = len(quotes.strikes)
+        widths = np.arange(1, min(max_width or n, (n - 1) // 2) + 1)
+        if not len(widths):
+            return np.empty((0, 3), dtype=np.int64)
+        mid = np.arange(n)[:, None]
+        low, high = mid - widths[None, :], mid + widths[None, :]
+        inside = (low >= 0) & (high < n)
+        low, mid, high = low[inside], np.broadcast_to(mid, inside.shape)[inside], high[inside]
+
+        K = quotes.strikes
+        prices = quotes.call_prices if option_type == "CE" else quotes.put_prices
+        keep = (
+            np.isclose(K[mid] - K[low], K[high] - K[mid])
+            & (prices[low] > 0) & (prices[mid] > 0) & (prices[high] > 0)
+        )
+        return np.column_stack([low[keep], mid[keep], high[keep]])
+
+    def _enumerate(
+        self,
+        strategy: str,
+        quotes: ChainQuotes,
+        max_width: Optional[int]
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Pruned candidate rows, plus the call spreads iron condors pair them with"""
+        if strategy == "iron_condor":
+            return (
+                self._credit_spreads(quotes, "PE", max_width),
+                self._credit_spreads(quotes, "CE", max_width),
+            )
+        if strategy == "bull_put_spread":
+            return self._credit_spreads(quotes, "PE", max_width), None
+        if strategy == "bear_call_spread":
+            return self._credit_spreads(quotes, "CE", max_width), None
+        return self._butterflies(quotes, "CE" if strategy == "call_butterfly" else "PE", max_width), None
+
+    # ============== Search ==============
+
+    async def optimize(
+        self,
+        quotes: ChainQuotes,
+        strategy: str,
+        top_k: int = 10,
+        max_width: Optional[int] = None,
+        max_loss: Optional[float] = None,
+        min_pop: float = 0.0,
+        rank_by: str = "score",
+        time_budget: Optional[float] = None
+    ) -> Dict:
+        """
+        Search one expiry for the best combinations of a structure.
+
+        Args:
+            quotes: Chain prices and smile for the expiry
+            strategy: One of OPTIMIZER_STRATEGIES
+            top_k: Number of combinations to return
+            max_width: Widest wing, in strikes (None = any)
+            max_loss: Largest acceptable max loss per unit (None = any)
+            min_pop: Smallest acceptable probability of profit (0-1)
+            rank_by: One of OPTIMIZER_RANKINGS
+            time_budget: Search time limit in seconds (None = default)
+
+        Returns:
+            Ranked combinations with their legs and risk metrics, and how
+            much of the search completed within the budget
+        """
+        if strategy not in STRATEGY_LEGS:
+            raise ValueError(f"strategy must be one of {', '.join(OPTIMIZER_STRATEGIES)}")
+        if rank_by not in OPTIMIZER_RANKINGS:
+            raise ValueError(f"rank_by must be one of {', '.join(OPTIMIZER_RANKINGS)}")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+
+        start = time.perf_counter()
+        deadline = start + (self.time_budget if time_budget is None else time_budget)
+
+        outer, inner = self._enumerate(strategy, quotes, max_width)
+        per_row = len(inner) if inner is not None else 1
+        rows_per_chunk = max(1, self.chunk_size // max(per_row, 1))
+        chunks = [outer[i:i + rows_per_chunk] for i in range(0, len(outer) if per_row else 0, rows_per_chunk)]
+        args = (strategy, quotes, inner, max_loss, min_pop, rank_by, top_k)
+
+        if self.executor is None or len(chunks) <= 1:
+            best, done = self._search_inline(chunks, args, deadline)
+        else:
+            best, done = await self._search_pool(chunks, args, deadline)
+
+        complete = done == len(chunks)
+        increment_counter(
+            "strategy_optimizer_runs_total",
+            {"strategy": strategy, "complete": str(complete).lower()}
+        )
+        if not complete:
+            logger.info(f"Optimizer hit its time budget: {done}/{len(chunks)} chunks of {strategy}")
+
+        return {
+            "strategy": strategy,
+            "rank_by": rank_by,
+            "candidates": len(outer) * per_row,
+            "chunks": len(chunks),
+            "chunks_done": done,
+            "complete": complete,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            "results": self._format(strategy, quotes, best) if best is not None else [],
+        }
+
+    def _search_inline(self, chunks: List[np.ndarray], args: Tuple, deadline: float):
+        strategy, quotes, inner, max_loss, min_pop, rank_by, top_k = args
+        best, done = None, 0
+        for chunk in chunks:
+            if done and time.perf_counter() >= deadline:
+                break
+            floor = self._floor(best, top_k)
+            result = _score_chunk(strategy, quotes, chunk, inner, max_loss, min_pop, rank_by, top_k, floor)
+            best = _merge_top([best, result] if best is not None else [result], top_k)
+            done += 1
+        return best, done
+
+    async def _search_pool(self, chunks: List[np.ndarray], args: Tuple, deadline: float):
+        loop = asyncio.get_running_loop()
+        top_k = args[-1]
+        queue = iter(chunks)
+        pending = set()
+        best, done = None, 0
+
+        def submit():
+            for chunk in queue:
+                pending.add(loop.run_in_executor(
+                    self.executor, _score_chunk,
+                    *args[:2], chunk, *args[2:], self._floor(best, top_k)
+                ))
+                return
+
+        # Two tasks per worker keeps the pool busy while results come back
+        for _ in range(self.workers * 2):
+            submit()
+
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            finished, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in finished:
+                result = future.result()
+                best = _merge_top([best, result] if best is not None else [result], top_k)
+                done += 1
+                submit()
+
+        # Queued chunks are dropped; ones already running finish in the background
+        for future in pending:
+            future.cancel()
+        return best, done
+
+    @staticmethod
+    def _floor(best: Optional[Dict[str, np.ndarray]], top_k: int) -> float:
+        """Rank a candidate must beat to enter a full top K"""
+        if best is None or len(best["rank"]) < top_k:
+            return -np.inf
+        return float(best["rank"][-1])
+
+    @staticmethod
+    def _format(strategy: str, quotes: ChainQuotes, best: Dict[str, np.ndarray]) -> List[Dict]:
+        layout = STRATEGY_LEGS[strategy]
+        results = []
+        for i, row in enumerate(best["legs"]):
+            legs = []
+            for index, (option_type, side, quantity) in zip(row, layout):
+                prices = quotes.call_prices if option_type == "CE" else quotes.put_prices
+                legs.append({
+                    "strike": float(quotes.strikes[index]),
+                    "option_type": option_type,
+                    "side": side,
+                    "quantity": quantity,
+                    "price": round(float(prices[index]), 2),
+                })
+            breakevens = [
+                round(float(x), 2) for x in (best["lower"][i], best["upper"][i])
+                if 0 < x < np.inf
+            ]
+            results.append({
+                "legs": legs,
+                "net_premium": round(float(best["net_premium"][i]), 2),
+                "max_profit": round(float(best["max_profit"][i]), 2),
+                "max_loss": round(float(best["max_loss"][i]), 2),
+                "reward_risk": round(float(best["reward_risk"][i]), 4),
+                "pop": round(float(best["pop"][i]) * 100, 2),
+                "score": round(float(best["score"][i]), 4),
+                "breakevens": breakevens,
+            })
+        return results
@@ -1,20 +1,84 @@
+import asyncio
+import hashlib
+import math
 import logging
-from typing import Dict, Any, List, Optional
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, Optional, Tuple, TypeVar
 from datetime import datetime, timezone, timedelta
 import numpy as np
 
 from app.services.dhan_client import DhanClient
-from app.services.bsm import BSMService
-from app.services.greeks import GreeksService
-from app.services.reversal import ReversalService
+from app.services.bsm import BSMService, ParityFit
+from app.services.chain_frame import ChainFrame
+from app.services.greeks import GreeksService, greek_level_fields
+from app.services.reversal import ReversalService, ReversalParams
+from app.services.vol_surface import VolSurfaceService
 from app.cache.redis import RedisCache, CacheKeys
+from app.cache.single_flight import SingleFlight
+from app.cache.versioned import VersionedCache
 from app.config.settings import settings
 from app.config.symbols import get_instrument_type
+from app.core.container import container
+from app.core.metrics import increment_counter
 from app.utils.data_processing import fetch_percentage
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _ChainState:
+    """Inputs and computed columns of one chain from the previous tick"""
+    global_inputs: tuple
+    spot_inputs: tuple
+    T_days: float
+    strikes: np.ndarray
+    strike_inputs: np.ndarray
+    chain_greeks: Dict[str, np.ndarray] = field(default_factory=dict)
+    reversal_cols: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Unrounded Greeks of each strike's last exact computation, and its spot
+    anchor_greeks: Dict[str, np.ndarray] = field(default_factory=dict)
+    anchor_spot: Optional[np.ndarray] = None
+    approx_ticks: int = 0
+    # Strikes whose current Greeks are Taylor approximations, not exact
+    approx_mask: Optional[np.ndarray] = None
+
+
+# Set per fetch by DhanClient or derived from "oc"; not part of the upstream content
+_UNVERSIONED_FIELDS = frozenset(("timestamp", "data", "strikes"))
+
+
+def chain_version(chain_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Version of an upstream chain: a hash of every field the processed chain
+    is built from (oc, spot, future, u_id, totals, ...). Equal content gives
+    an equal version; None when the payload cannot be hashed.
+    """
+    fields = [(k, v) for k, v in chain_data.items() if k not in _UNVERSIONED_FIELDS]
+    try:
+        # Pickling is several times faster than canonical JSON for a full chain
+        blob = pickle.dumps(fields, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+
+def _chain_greeks_kernel(r: float, kwargs: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """GreeksService.calculate_chain_greeks for a worker process"""
+    return GreeksService(r).calculate_chain_greeks(**kwargs)
+
+
+def _reversal_chain_kernel(r: float, params: ReversalParams, kwargs: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """ReversalService.calculate_reversal_chain for a worker process"""
+    return ReversalService(r, params=params).calculate_reversal_chain(**kwargs)
+
+
+ResultT = TypeVar("ResultT")
+
+
 class OptionsService:
     """
     High-level options data service.
@@ -22,16 +86,48 @@ class OptionsService:
     Designed for high concurrency and low latency.
     """
     
+    # Greeks included in each leg's "optgeeks" payload
+    GREEKS_OUTPUT_FIELDS = (
+        "delta", "gamma", "theta", "vega", "rho",
+        "vanna", "vomma", "charm", "speed", "zomma", "color", "ultima",
+    )
+    
     def __init__(
         self,
         dhan_client: DhanClient,
-        cache: Optional[RedisCache] = None
+        cache: Optional[RedisCache] = None,
+        vol_surface: Optional[VolSurfaceService] = None,
+        single_flight: Optional[SingleFlight] = None,
+        processed_cache: Optional[VersionedCache] = None,
+        executor: Optional[Executor] = None,
+        kernel_executor: Optional[Executor] = None
     ):
         self.dhan = dhan_client
         self.cache = cache
-        self.bsm = BSMService()
-        self.greeks = GreeksService()
-        self.reversal = ReversalService()
+        # Identical live requests share one fetch-and-process, and unchanged
+        # upstream chains are not reprocessed (both process-wide)
+        self.single_flight = single_flight if single_flight is not None else container.live_data_flight
+        self.processed_cache = processed_cache if processed_cache is not None else container.processed_chain_cache
+        # Chain processing runs on executor, off the event loop (None = inline);
+        # its Greeks/reversal kernels go to kernel_executor (a process pool) if set
+        self.executor = executor if executor is not None else container.chain_thread_executor
+        self.kernel_executor = kernel_executor if kernel_executor is not None else container.chain_process_executor
+        # _chain_state is updated in place, so one analysis at a time per service;
+        # the shared services it calls (vol surface, pricing memo) lock internally
+        self._chain_state_lock = threading.Lock()
+        # Shared surface so smiles are warm-started across requests
+        if vol_surface is None and settings.VOL_SURFACE_ENABLED:
+            vol_surface = container.vol_surface_service
+        self.vol_surface = vol_surface
+        # Scalar strike lookups share the process-wide pricing memo and surface
+        self.bsm = BSMService(memo=container.pricing_memo, vol_surface=vol_surface)
+        self.greeks = GreeksService(memo=container.pricing_memo)
+        self.reversal = ReversalService(params=container.reversal_params, vol_surface=vol_surface)
+        
+        # Per-(symbol, expiry, strike_window) results of the last tick, for
+        # incremental recompute; least recently used chains are dropped
+        self._chain_state: "OrderedDict[Tuple[str, str, Optional[int]], _ChainState]" = OrderedDict()
+        self.recompute_stats = {"reused": 0, "recomputed": 0, "approximated": 0}
     
     def _find_strike_key(self, oc: Dict, strike: float) -> str:
         """
@@ -71,7 +167,11 @@ class OptionsService:
         symbol: str,
         expiry: str,
         include_greeks: bool = True,
-        include_reversal: bool = True
+        include_reversal: bool = True,
+        debug_strike: Optional[float] = None,
+        approximate: bool = False,
+        greeks_level: str = "full",
+        strike_window: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Get complete live options data with Greeks and reversal.
@@ -81,39 +181,175 @@ class OptionsService:
             expiry: Expiry timestamp
             include_greeks: Calculate and include Greeks
             include_reversal: Calculate and include reversal points
+            debug_strike: Attach the reversal Greek breakdown ("reversal_debug")
+                to this strike only; never computed for the rest of the chain
+            approximate: Streaming fast-update mode; strikes unchanged since the
+                last tick get Taylor-expanded Greeks for small spot moves
+                (see APPROX_* settings) instead of a full BSM recompute
+            greeks_level: Greeks returned per leg - 'first' (delta, gamma,
+                theta, vega, rho), 'second' (adds vanna, charm, vomma) or
+                'full'. Higher orders are only computed when reversal needs them
+            strike_window: Only compute and return the ATM strike and this many
+                strikes either side of it (None = whole chain). Chain totals
+                and the smile fit still use every strike
+        
+        Returns:
+            Complete option chain data with Greeks, reversal, trading signals.
+            "version" identifies the upstream content it was built from, so
+            clients can skip updates whose version they already have. With
+            single-flight or the processed-chain cache enabled the payload
+            may be shared with other callers and must not be modified
+        """
+        key = (
+            "live", symbol.upper(), str(expiry), include_greeks, include_reversal,
+            debug_strike, approximate, greeks_level, strike_window
+        )
+        
+        async def fetch_and_process() -> Dict[str, Any]:
+            # Fetch raw option chain (dhan_client auto-fetches expiry if None)
+            chain_data = await self.dhan.get_option_chain(symbol, expiry)
+            
+            if not chain_data or "oc" not in chain_data:
+                return chain_data
             
+            # Upstream unchanged since the last processing: skip it entirely
+            version = chain_version(chain_data)
+            cached = self._processed(key, version)
+            if cached is not None:
+                return {**cached, "timestamp": datetime.utcnow().isoformat()}
+            
+            def process() -> Dict[str, Any]:
+                with self._chain_state_lock:
+                    frame = self._analyze_chain(
+                        symbol, expiry, chain_data, include_greeks, include_reversal,
+                        debug_strike, approximate, greeks_level, strike_window
+                    )
+                return self._serialize_chain(symbol, expiry, chain_data, frame, strike_window, version)
+            
+            data = await self._run_compute(process)
+            self._store_processed(key, version, data)
+            return data
+        
+        if self.single_flight is None:
+            return await fetch_and_process()
+        return await self.single_flight.run(key, fetch_and_process)
+    
+    async def get_chain_frame(
+        self,
+        symbol: str,
+        expiry: str,
+        include_greeks: bool = False,
+        include_reversal: bool = False,
+        greeks_level: str = "first",
+        strike_window: Optional[int] = None
+    ) -> Optional[ChainFrame]:
+        """
+        Live option chain as a ChainFrame, for analytics that work on columns.
+        
+        Runs the same pipeline as get_live_data (pricing IVs, Greeks and
+        reversal when requested, limited to strike_window strikes either
+        side of ATM) without building the response payload.
+        
         Returns:
-            Complete option chain data with Greeks, reversal, trading signals
+            The processed frame, or None when no chain is available. Frames
+            may be shared through single-flight or the processed-chain cache
+            and must not be modified
         """
-        # Fetch raw option chain (dhan_client auto-fetches expiry if None)
-        chain_data = await self.dhan.get_option_chain(symbol, expiry)
+        key = ("frame", symbol.upper(), str(expiry), include_greeks, include_reversal, greeks_level, strike_window)
         
-        if not chain_data or "oc" not in chain_data:
-            return chain_data
+        async def fetch_and_process() -> Optional[ChainFrame]:
+            chain_data = await self.dhan.get_option_chain(symbol, expiry)
+            
+            if not chain_data or "oc" not in chain_data:
+                return None
+            
+            version = chain_version(chain_data)
+            frame = self._processed(key, version)
+            if frame is None:
+                def analyze() -> ChainFrame:
+                    with self._chain_state_lock:
+                        return self._analyze_chain(
+                            symbol, expiry, chain_data, include_greeks, include_reversal,
+                            greeks_level=greeks_level, strike_window=strike_window
+                        )
+                
+                frame = await self._run_compute(analyze)
+                self._store_processed(key, version, frame)
+            return frame
+        
+        if self.single_flight is None:
+            return await fetch_and_process()
+        return await self.single_flight.run(key, fetch_and_process)
+    
+    async def _run_compute(self, fn: Callable[[], ResultT]) -> ResultT:
+        """Run a CPU-bound chain processing step on the compute executor"""
+        if self.executor is None:
+            return fn()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn)
+    
+    def _run_kernel(self, local: Callable[..., ResultT], kernel: Callable[..., ResultT], *kernel_args, **kwargs) -> ResultT:
+        """local(**kwargs) in this process, or kernel(*kernel_args, kwargs) on the kernel pool"""
+        if self.kernel_executor is None:
+            return local(**kwargs)
+        # Columns are pickled NumPy arrays; this blocks a compute thread, not the loop
+        return self.kernel_executor.submit(kernel, *kernel_args, kwargs).result()
+    
+    def _processed(self, key: tuple, version: Optional[str]) -> Any:
+        """Result processed earlier from the same upstream version, or None"""
+        if self.processed_cache is None or version is None:
+            return None
+        return self.processed_cache.get(key, version)
+    
+    def _store_processed(self, key: tuple, version: Optional[str], result: Any) -> None:
+        if self.processed_cache is not None and version is not None:
+            self.processed_cache.put(key, version, result)
+    
+    def _analyze_chain(
+        self,
+        symbol: str,
+        expiry: Optional[str],
+        chain_data: Dict[str, Any],
+        include_greeks: bool,
+        include_reversal: bool,
+        debug_strike: Optional[float] = None,
+        approximate: bool = False,
+        greeks_level: str = "full",
+        strike_window: Optional[int] = None
+    ) -> ChainFrame:
+        """
+        Parse one upstream chain into a ChainFrame and compute IVs, Greeks and reversal on it.
+        
+        With a strike_window the forward, OI averages, missing IVs and smile
+        still come from the whole chain, so a strike's values do not depend
+        on the window; Greeks and reversal only run on the windowed strikes.
+        """
+        frame = ChainFrame.from_oc(chain_data.get("oc", {}))
+        n_rows = len(frame)
         
         spot = chain_data.get("spot", {}).get("ltp", 0)
         spot_change = chain_data.get("spot", {}).get("change", 0)
+        frame.spot = spot
         
         # Get expiry from chain_data if it was auto-fetched (expiry might be None)
         actual_expiry = expiry or chain_data.get("expiry") or chain_data.get("exp_sid")
         
         # Calculate time to expiry using IST market hours
         T_days = self._calculate_days_to_expiry_ist(int(actual_expiry)) if actual_expiry else 0
-        T_years = max(T_days, 0.001) / 365
-        
-        # Get instrument type (IDX, EQ, COM)
-        instrument_type = get_instrument_type(symbol)
         
-        # Process each strike
-        oc = chain_data.get("oc", {})
-        processed_strikes = {}
-        confidence_scores = []  # For global statistics
+        # Last tick's results for this chain; small time drift keeps them valid.
+        # Windowed requests keep their own state so they never evict the full chain's
+        state_key = (symbol.upper(), str(actual_expiry), strike_window)
+        chain_state = self._chain_state.get(state_key)
+        if chain_state is not None and (
+            abs(T_days - chain_state.T_days) * 86400 < settings.INCREMENTAL_TIME_TOLERANCE_SECONDS
+        ):
+            T_days = chain_state.T_days
+        T_years = max(T_days, 0.001) / 365
+        frame.T_days = T_days
         
-        # Calculate OI averages for liquidity assessment
-        all_ce_oi = [s.get("ce", {}).get("oi", s.get("ce", {}).get("OI", 0)) for s in oc.values()]
-        all_pe_oi = [s.get("pe", {}).get("oi", s.get("pe", {}).get("OI", 0)) for s in oc.values()]
-        avg_ce_oi = sum(all_ce_oi) / len(all_ce_oi) if all_ce_oi else 1
-        avg_pe_oi = sum(all_pe_oi) / len(all_pe_oi) if all_pe_oi else 1
+        # OI averages for liquidity assessment
+        avg_ce_oi = float(frame.ce("OI").mean()) if n_rows else 1
+        avg_pe_oi = float(frame.pe("OI").mean()) if n_rows else 1
         
         # Get ATM IV for reversal calc - now at top level after transform
         atmiv = chain_data.get("atmiv", 0)
@@ -127,108 +363,209 @@ class OptionsService:
             if first_key:
                 fut_price = fl.get(first_key, {}).get("ltp", 0)
         
-        for strike_str, strike_data in oc.items():
-            try:
-                strike = float(strike_str)
-                ce = strike_data.get("ce", {})
-                pe = strike_data.get("pe", {})
-                
-                # Extract IVs
-                ce_iv_raw = ce.get("iv", 0)
-                pe_iv_raw = pe.get("iv", 0)
-                ce_iv = ce_iv_raw / 100 if ce_iv_raw > 0 else 0.2
-                pe_iv = pe_iv_raw / 100 if pe_iv_raw > 0 else 0.2
-                
-                processed = {
-                    "strike": strike,
-                    "ce": self._transform_leg(ce),
-                    "pe": self._transform_leg(pe),
+        # Parity forward for this expiry replaces the first listed future, and
+        # BSM and the reversal price off it (the forward discounted at the model
+        # rate), so reversal levels sit on the same spot as the theoretical prices
+        pricing_spot = spot
+        if settings.IMPLIED_FORWARD_ENABLED and spot > 0 and n_rows:
+            frame.parity = self._implied_forward(frame, spot, T_years)
+            if frame.parity is not None:
+                fut_price = frame.parity.forward
+                pricing_spot = frame.parity.forward * math.exp(-self.greeks.r * T_years)
+        
+        # Recover IVs Dhan sent as 0 from LTP, solving every missing leg at once
+        ivs = frame.legs["iv"].astype(np.float64)
+        iv_filled = np.zeros(2 * n_rows, dtype=bool)
+        if spot > 0 and n_rows:
+            iv_filled |= self._solve_missing_ivs(frame, ivs, pricing_spot, T_years)
+        
+        # Legs still without an IV take this expiry's fitted smile
+        if self.vol_surface is not None and spot > 0 and n_rows:
+            surface_legs, frame.iv_smile = self._apply_vol_surface(
+                symbol, actual_expiry, frame, ivs, pricing_spot, T_years
+            )
+            iv_filled |= surface_legs
+        frame.iv = ivs
+        frame.iv_filled = iv_filled
+        
+        # Re-centred on the ATM strike every tick, so the window follows spot
+        if strike_window is not None:
+            frame = frame.window(strike_window)
+            n_rows = len(frame)
+        
+        greek_fields = [
+            name for name in self.GREEKS_OUTPUT_FIELDS if name in greek_level_fields(greeks_level)
+        ]
+        # Reversal uses every Greek order, whatever the client asked for
+        compute_level = "full" if include_reversal else greeks_level
+        
+        if include_greeks and spot > 0 and n_rows:
+            # Calls occupy rows [0, n), puts rows [n, 2n)
+            calc_ivs = frame.iv if frame.iv_smile is None else frame.iv_smile
+            iv_raw_arr = np.where(calc_ivs > 0, calc_ivs, 20.0)
+            
+            # Per-strike inputs: call/put IV, LTP and OI
+            strike_inputs = np.column_stack([
+                iv_raw_arr[:n_rows],
+                iv_raw_arr[n_rows:],
+                frame.ce("ltp"),
+                frame.pe("ltp"),
+                frame.ce("OI"),
+                frame.pe("OI"),
+            ]).astype(np.float64)
+            global_inputs = (
+                T_days, iv_change, atmiv, avg_ce_oi, avg_pe_oi, include_reversal, compute_level
+            )
+            spot_inputs = (pricing_spot, spot, spot_change, fut_price)
+            
+            # Only strikes whose inputs moved since the last tick are recomputed;
+            # in approximate mode small spot moves are Taylor-expanded instead
+            plan = self._recompute_plan(
+                chain_state, global_inputs, spot_inputs, frame.strikes, strike_inputs,
+                approximate and compute_level == "full"
+            )
+            if plan is None:
+                chain_state = _ChainState(
+                    global_inputs=global_inputs,
+                    spot_inputs=spot_inputs,
+                    T_days=T_days,
+                    strikes=frame.strikes,
+                    strike_inputs=strike_inputs,
+                    approx_mask=np.zeros(n_rows, dtype=bool)
+                )
+                exact_rows = np.arange(n_rows)
+                approx_rows = exact_rows[:0]
+            else:
+                exact_rows, approx_rows = plan
+                chain_state.strike_inputs[exact_rows] = strike_inputs[exact_rows]
+                chain_state.spot_inputs = spot_inputs
+                chain_state.approx_ticks += 1 if approximate else 0
+            chain_state.approx_mask[exact_rows] = False
+            chain_state.approx_mask[approx_rows] = True
+            self._record_recompute(symbol, n_rows, exact_rows.size, approx_rows.size)
+            
+            if exact_rows.size:
+                self._compute_greeks(
+                    chain_state, exact_rows, pricing_spot, T_years, include_reversal, compute_level
+                )
+            if approx_rows.size:
+                self._approximate_greeks(chain_state, approx_rows, pricing_spot)
+            
+            # Spot feeds every strike's reversal, so a Taylor tick redoes all of them
+            reversal_rows = np.arange(n_rows) if approx_rows.size else exact_rows
+            if include_reversal and reversal_rows.size:
+                self._compute_reversal(
+                    chain_state, reversal_rows, pricing_spot, spot_change, iv_change, T_days,
+                    fut_price, atmiv, avg_ce_oi, avg_pe_oi
+                )
+            if settings.INCREMENTAL_RECOMPUTE_ENABLED:
+                self._store_chain_state(state_key, chain_state)
+            
+            # Copies: the state's columns are updated in place on later ticks
+            chain_greeks = chain_state.chain_greeks
+            frame.greeks = {name: chain_greeks[name].copy() for name in greek_fields}
+            if include_reversal:
+                frame.reversal = {
+                    name: arr.copy() for name, arr in chain_state.reversal_cols.items()
                 }
                 
-                # Calculate Greeks if requested
-                if include_greeks and spot > 0:
-                    ce_greeks = self.greeks.calculate_all_greeks(
-                        spot, strike, T_years, ce_iv, "call"
-                    )
-                    pe_greeks = self.greeks.calculate_all_greeks(
-                        spot, strike, T_years, pe_iv, "put"
-                    )
-                    
-                    processed["ce"]["optgeeks"] = self._greeks_to_dict(ce_greeks)
-                    processed["pe"]["optgeeks"] = self._greeks_to_dict(pe_greeks)
-                    
-                    # Calculate full reversal if requested
-                    if include_reversal:
-                        reversal_result = self.reversal.calculate_reversal(
-                            spot=spot,
+                if debug_strike is not None:
+                    matches = np.flatnonzero(np.isclose(frame.strikes, debug_strike))
+                    if matches.size:
+                        i = int(matches[0])
+                        frame.debug_index = i
+                        frame.debug_data = self.reversal.calculate_reversal(
+                            spot=pricing_spot,
                             spot_change=spot_change,
                             iv_change=iv_change,
-                            strike=strike,
+                            strike=frame.strikes[i],
                             T_days=T_days,
-                            sigma_call=ce_iv_raw if ce_iv_raw > 0 else ce_iv * 100,
-                            sigma_put=pe_iv_raw if pe_iv_raw > 0 else pe_iv * 100,
-                            curr_call_price=ce.get("ltp", 0),
-                            curr_put_price=pe.get("ltp", 0),
+                            sigma_call=iv_raw_arr[i],
+                            sigma_put=iv_raw_arr[n_rows + i],
+                            curr_call_price=frame.legs["ltp"][i].item(),
+                            curr_put_price=frame.legs["ltp"][n_rows + i].item(),
                             fut_price=fut_price,
                             atmiv=atmiv,
-                            instrument_type=instrument_type,
-                            ce_oi=ce.get("oi", ce.get("OI", 0)),
-                            pe_oi=pe.get("oi", pe.get("OI", 0)),
+                            instrument_type=get_instrument_type(symbol),
+                            ce_oi=frame.legs["OI"][i].item(),
+                            pe_oi=frame.legs["OI"][n_rows + i].item(),
                             avg_ce_oi=avg_ce_oi,
-                            avg_pe_oi=avg_pe_oi
-                        )
-                        
-                        # Add full reversal data
-                        processed["strike_price"] = reversal_result.strike_price
-                        processed["reversal"] = reversal_result.reversal
-                        processed["wkly_reversal"] = reversal_result.wkly_reversal
-                        processed["rs"] = reversal_result.rs
-                        processed["rr"] = reversal_result.rr
-                        processed["ss"] = reversal_result.ss
-                        processed["sr_diff"] = reversal_result.sr_diff
-                        processed["fut_reversal"] = reversal_result.fut_reversal
-                        processed["ce_tv"] = reversal_result.ce_tv
-                        processed["pe_tv"] = reversal_result.pe_tv
-                        processed["difference"] = reversal_result.sr_diff
-                        
-                        processed["price_range"] = reversal_result.price_range
-                        processed["trading_signals"] = {
-                            "entry": reversal_result.trading_signals.entry,
-                            "stop_loss": reversal_result.trading_signals.stop_loss,
-                            "take_profit": reversal_result.trading_signals.take_profit,
-                            "risk_reward": reversal_result.trading_signals.risk_reward,
-                        }
-                        processed["market_regimes"] = reversal_result.market_regimes
-                        processed["recommended_strategy"] = reversal_result.recommended_strategy
-                        processed["alert"] = reversal_result.alert
-                        processed["time_decay"] = self.reversal.weekly_theta_decay(T_days)
-                        
-                        # Collect confidence score for global stats
-                        confidence_scores.append(reversal_result.confidence)
-                
-                # Calculate PCR for this strike
-                ce_oi = ce.get("oi", ce.get("OI", 0))
-                pe_oi = pe.get("oi", pe.get("OI", 0))
-                processed["pcr"] = round(pe_oi / ce_oi, 4) if ce_oi > 0 else 0
-                
-                processed_strikes[strike_str] = processed
-                
-            except Exception as e:
-                logger.warning(f"Error processing strike {strike_str}: {e}")
-                continue
+                            avg_pe_oi=avg_pe_oi,
+                            ce_greeks=GreeksService.greeks_at(chain_greeks, i),
+                            pe_greeks=GreeksService.greeks_at(chain_greeks, n_rows + i),
+                            call_theoretical=float(chain_greeks["price"][i]),
+                            put_theoretical=float(chain_greeks["price"][n_rows + i]),
+                            include_debug=True
+                        ).debug_data
+        
+        return frame
+    
+    def _serialize_chain(
+        self,
+        symbol: str,
+        expiry: str,
+        chain_data: Dict[str, Any],
+        frame: ChainFrame,
+        strike_window: Optional[int] = None,
+        version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the live data response (nested per-strike dicts) from a processed frame"""
+        n_rows = len(frame)
+        T_days = frame.T_days
+        atmiv = chain_data.get("atmiv", 0)
+        
+        # Upstream IVs, with solved and smile-filled legs rounded in
+        iv_out = frame.legs["iv"].tolist()
+        pricing_ivs = frame.iv.tolist()
+        for row in np.flatnonzero(frame.iv_filled).tolist():
+            iv_out[row] = round(pricing_ivs[row], 2)
+        
+        leg_columns = {"iv": iv_out}
+        if frame.greeks is not None:
+            # One tuple per leg in output field order, zipped into each
+            # leg's payload without intermediate per-field lookups
+            greek_fields = list(frame.greeks)
+            leg_columns["optgeeks"] = [
+                dict(zip(greek_fields, row))
+                for row in zip(*(frame.greeks[name].tolist() for name in greek_fields))
+            ]
+        leg_payloads = frame.leg_payloads(**leg_columns)
         
-        # Calculate summary metrics
-        total_ce_oi = sum(all_ce_oi)
-        total_pe_oi = sum(all_pe_oi)
+        reversal_cols = None
+        confidence_scores = []  # For global statistics
+        if frame.reversal is not None:
+            reversal_cols = {name: arr.tolist() for name, arr in frame.reversal.items()}
+            confidence_scores = reversal_cols["confidence"]
+        time_decay = self.reversal.weekly_theta_decay(T_days) if reversal_cols else None
+        
+        strikes = frame.strikes.tolist()
+        strike_pcr = frame.strike_pcr().tolist()
+        processed_strikes = {}
+        for i, strike_str in enumerate(frame.keys):
+            processed = {
+                "strike": strikes[i],
+                "ce": leg_payloads[i],
+                "pe": leg_payloads[n_rows + i],
+            }
+            
+            # Attach full reversal data if requested
+            if reversal_cols is not None:
+                self._attach_reversal(processed, reversal_cols, i, time_decay)
+                if i == frame.debug_index:
+                    processed["reversal_debug"] = frame.debug_data
+            
+            processed["pcr"] = strike_pcr[i]
+            processed_strikes[strike_str] = processed
         
-        # Find ATM strike
-        strikes = sorted([float(s) for s in oc.keys()])
-        atm_strike = min(strikes, key=lambda x: abs(x - spot)) if strikes else spot
+        # Summary metrics cover the whole chain, windowed or not
+        chain = frame if frame.parent is None else frame.parent
+        total_ce_oi = chain.ce("OI").sum().item()
+        total_pe_oi = chain.pe("OI").sum().item()
         
         # ===== SMART AUTO-DETECTION METADATA =====
         meta = {
             "noise_floor": 60,
-            "volatility_regime": "medium", 
+            "volatility_regime": "medium",
             "recommended_threshold": 70,
             "std_dev": 0
         }
@@ -254,7 +591,7 @@ class OptionsService:
             else:
                 # Normal: Just above average
                 rec_threshold = base_threshold
-                
+            
             meta = {
                 "noise_floor": round(mean_conf, 1),
                 "volatility_regime": vol_regime,
@@ -267,27 +604,30 @@ class OptionsService:
             "expiry": expiry,
             "spot": chain_data.get("spot", {}),
             "future": chain_data.get("future"),
-            "atm_strike": atm_strike,
+            "implied_forward": frame.parity.to_dict() if frame.parity is not None else None,
+            "atm_strike": frame.atm_strike(),
             "atmiv": atmiv,
             "atmiv_change": chain_data.get("atmiv_change", 0),
             "oc": processed_strikes,
             "strikes": [str(s) for s in strikes],
+            "strike_window": strike_window,
             "total_ce_oi": chain_data.get("total_call_oi", total_ce_oi),  # Use Dhan's OIC if available
             "total_pe_oi": chain_data.get("total_put_oi", total_pe_oi),  # Use Dhan's OIP if available
             "pcr": chain_data.get("pcr_ratio") or (round(total_pe_oi / total_ce_oi, 4) if total_ce_oi > 0 else 0),
             "timestamp": datetime.utcnow().isoformat(),
             "days_to_expiry": chain_data.get("dte") or T_days,  # Use Dhan's dte if available
             "dte": chain_data.get("dte", T_days),
-            "instrument_type": instrument_type,
+            "instrument_type": get_instrument_type(symbol),
             # Schema Fields
             "max_pain_strike": chain_data.get("max_pain_strike", 0),
             "u_id": chain_data.get("u_id", 0),
+            "version": version,  # Upstream content version (see chain_version)
             "lot_size": chain_data.get("lot_size", 75),
             "expiry_list": chain_data.get("expiry_list", []),
             # New Meta Field
             "meta": meta
         }
-    
+
     async def get_percentage_data(
         self,
         symbol: str,
@@ -422,12 +762,39 @@ class OptionsService:
         symbol: str,
         expiry: str
     ) -> Dict[str, Any]:
-        """Get future price analysis"""
+        """
+        Get future price analysis.
+        
+        The forward implied by put-call parity on the option chain is used
+        when it can be estimated; the futures feed is only fetched otherwise.
+        """
         try:
             chain_data = await self.dhan.get_option_chain(symbol, expiry)
             spot = chain_data.get("spot", {}).get("ltp", 0) if chain_data else 0
             T_days = self._calculate_days_to_expiry(int(expiry)) if expiry else 0
             
+            parity = None
+            if settings.IMPLIED_FORWARD_ENABLED and spot > 0 and chain_data and expiry:
+                frame = ChainFrame.from_oc(chain_data.get("oc", {}))
+                T_years = max(self._calculate_days_to_expiry_ist(int(expiry)), 0.001) / 365
+                parity = self._implied_forward(frame, spot, T_years) if len(frame) else None
+            
+            if parity is not None:
+                listed = (chain_data.get("future") or {}).get(str(expiry), {})
+                basis = parity.forward - spot
+                return {
+                    "symbol": symbol,
+                    "spot": spot,
+                    "future_price": round(parity.forward, 2),
+                    "basis": round(basis, 2),
+                    "basis_percent": round(basis / spot * 100, 4),
+                    "days_to_expiry": T_days,
+                    "future_oi": listed.get("oi", 0),
+                    "source": "put_call_parity",
+                    "discount_factor": round(parity.discount_factor, 6),
+                    "implied_rate": round(parity.rate, 4),
+                }
+            
             # Try to get futures data, but handle failures gracefully
             futures_data = []
             try:
@@ -468,6 +835,7 @@ class OptionsService:
                 "basis_percent": round(basis / spot * 100, 4) if spot > 0 else 0,
                 "days_to_expiry": T_days,
                 "future_oi": current_future.get("oi", 0) if current_future else 0,
+                "source": "futures",
             }
         except Exception as e:
             logger.error(f"Error in get_future_price_data for {symbol}: {e}")
@@ -534,72 +902,309 @@ class OptionsService:
         
         return max(day_diff - 1, 0.000001)
     
-    def _transform_leg(self, leg: Dict) -> Dict:
-        """Transform option leg to standardized format with all Dhan fields"""
+    def _solve_missing_ivs(
+        self,
+        frame: ChainFrame,
+        ivs: np.ndarray,
+        spot: float,
+        T_years: float
+    ) -> np.ndarray:
+        """
+        Fill zero IVs (percent, per leg row, in place) by solving from each leg's LTP.
+        
+        Returns:
+            Boolean mask of the solved leg rows (calls [0, n), puts [n, 2n))
+        """
+        ltp = frame.legs["ltp"].astype(np.float64)
+        solved_legs = np.zeros(ivs.size, dtype=bool)
+        missing = np.flatnonzero(~(ivs > 0) & (ltp > 0))
+        if missing.size == 0:
+            return solved_legs
+        
+        solved = self.bsm.implied_volatility_batch(
+            ltp[missing], spot, frame.leg_strikes()[missing], T_years, missing < len(frame)
+        )
+        # No solution keeps the default IV
+        found = ~np.isnan(solved)
+        ivs[missing[found]] = solved[found] * 100
+        solved_legs[missing[found]] = True
+        return solved_legs
+    
+    def _implied_forward(
+        self,
+        frame: ChainFrame,
+        spot: float,
+        T_years: float
+    ) -> Optional[ParityFit]:
+        """Put-call parity forward/discount factor from each strike's mid prices"""
+        mids = frame.mid_prices()
+        n = len(frame)
+        return self.bsm.implied_forward(
+            frame.strikes, mids[:n], mids[n:], spot, T_years,
+            max_strikes=settings.IMPLIED_FORWARD_STRIKES
+        )
+    
+    def _apply_vol_surface(
+        self,
+        symbol: str,
+        expiry: Any,
+        frame: ChainFrame,
+        ivs: np.ndarray,
+        spot: float,
+        T_years: float
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Refresh this expiry's smile and fill zero IVs (percent, per leg row, in place) from it.
+        
+        Returns:
+            (mask of the filled leg rows, smoothed per-leg IVs when
+            VOL_SURFACE_SMOOTH_IVS is on, else None)
+        """
+        n = len(frame)
+        forward = spot * np.exp(self.bsm.r * T_years)
+        fitted = self.vol_surface.update(
+            symbol, str(expiry), frame.strikes, ivs[:n], ivs[n:], forward, T_years
+        )
+        if fitted is None:
+            return np.zeros(ivs.size, dtype=bool), None
+        
+        surface_ivs = np.tile(fitted.implied_vol(frame.strikes), 2)
+        filled_legs = ~(ivs > 0)
+        ivs[filled_legs] = surface_ivs[filled_legs]
+        
+        if settings.VOL_SURFACE_SMOOTH_IVS:
+            return filled_legs, surface_ivs
+        return filled_legs, None
+    
+    def _recompute_plan(
+        self,
+        state: Optional[_ChainState],
+        global_inputs: tuple,
+        spot_inputs: tuple,
+        strikes: np.ndarray,
+        strike_inputs: np.ndarray,
+        approximate: bool
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Decide which strikes to recompute exactly and which to approximate.
+        
+        A strike is recomputed when its LTP, IV or OI moved beyond
+        INCREMENTAL_RECOMPUTE_TOLERANCE (relative) since the last tick. In
+        approximate mode a spot-only move is Taylor-expanded for the other
+        strikes, unless the spot is more than APPROX_MAX_SPOT_MOVE_PCT away
+        from the strike's last exact computation. Outside approximate mode,
+        strikes a previous tick only approximated are recomputed too.
+        
+        Returns:
+            (exact_rows, approx_rows) index arrays, or None when the whole
+            chain must be recomputed: no previous tick, a time/ATM IV/OI
+            average change, a different strike set, a spot or futures move
+            outside approximate mode, or APPROX_FULL_RECOMPUTE_TICKS reached.
+        """
+        if (
+            not settings.INCREMENTAL_RECOMPUTE_ENABLED
+            or state is None
+            or state.global_inputs != global_inputs
+            or not np.array_equal(state.strikes, strikes)
+            or (approximate and state.approx_ticks + 1 >= settings.APPROX_FULL_RECOMPUTE_TICKS)
+        ):
+            return None
+        
+        previous = state.strike_inputs
+        threshold = settings.INCREMENTAL_RECOMPUTE_TOLERANCE * np.maximum(np.abs(previous), 1.0)
+        changed = (np.abs(strike_inputs - previous) > threshold).any(axis=1)
+        
+        if state.spot_inputs == spot_inputs:
+            if not approximate:
+                changed |= state.approx_mask
+            return np.flatnonzero(changed), np.flatnonzero(changed)[:0]
+        if not approximate:
+            return None
+        
+        spot = spot_inputs[0]
+        max_move = settings.APPROX_MAX_SPOT_MOVE_PCT / 100 * spot
+        exact = changed | (np.abs(spot - state.anchor_spot) > max_move)
+        return np.flatnonzero(exact), np.flatnonzero(~exact)
+    
+    def _compute_greeks(
+        self,
+        state: _ChainState,
+        rows: np.ndarray,
+        spot: float,
+        T_years: float,
+        with_price: bool,
+        level: str = "full"
+    ) -> None:
+        """Exact Greeks (and theoretical prices) for the given strike rows into state"""
+        n_rows = len(state.strikes)
+        strikes = state.strikes[rows]
+        inputs = state.strike_inputs[rows]
+        
+        # One fused pass: Greeks plus theoretical prices for reversal
+        anchor = self._run_kernel(
+            self.greeks.calculate_chain_greeks, _chain_greeks_kernel, self.greeks.r,
+            S=spot,
+            K=np.concatenate([strikes, strikes]),
+            T=T_years,
+            sigma=np.concatenate([inputs[:, 0], inputs[:, 1]]) / 100,
+            is_call=np.arange(2 * len(rows)) < len(rows),
+            with_price=with_price,
+            decimals=None,
+            level=level
+        )
+        
+        if len(rows) == n_rows:
+            state.anchor_greeks = anchor
+            state.anchor_spot = np.full(n_rows, float(spot))
+            state.chain_greeks = self._round_greeks(anchor)
+            return
+        
+        leg_rows = np.concatenate([rows, rows + n_rows])
+        for name, arr in anchor.items():
+            state.anchor_greeks[name][leg_rows] = arr
+        for name, arr in self._round_greeks(anchor).items():
+            state.chain_greeks[name][leg_rows] = arr
+        state.anchor_spot[rows] = spot
+    
+    def _approximate_greeks(self, state: _ChainState, rows: np.ndarray, spot: float) -> None:
+        """Taylor-expand the given strike rows from their last exact Greeks to spot"""
+        n_rows = len(state.strikes)
+        leg_rows = np.concatenate([rows, rows + n_rows])
+        dS = spot - np.concatenate([state.anchor_spot[rows], state.anchor_spot[rows]])
+        
+        approx = GreeksService.approximate_spot_move(
+            {name: arr[leg_rows] for name, arr in state.anchor_greeks.items()}, dS
+        )
+        for name, arr in self._round_greeks(approx).items():
+            state.chain_greeks[name][leg_rows] = arr
+    
+    def _compute_reversal(
+        self,
+        state: _ChainState,
+        rows: np.ndarray,
+        spot: float,
+        spot_change: float,
+        iv_change: float,
+        T_days: float,
+        fut_price: float,
+        atmiv: float,
+        avg_ce_oi: float,
+        avg_pe_oi: float
+    ) -> None:
+        """Reversal columns for the given strike rows from the Greeks in state"""
+        n_rows = len(state.strikes)
+        inputs = state.strike_inputs[rows]
+        leg_rows = np.concatenate([rows, rows + n_rows])
+        
+        reversal_cols = self._run_kernel(
+            self.reversal.calculate_reversal_chain, _reversal_chain_kernel,
+            self.reversal.r, self.reversal.params,
+            spot=spot,
+            spot_change=spot_change,
+            iv_change=iv_change,
+            strikes=state.strikes[rows],
+            T_days=T_days,
+            sigma_call=inputs[:, 0],
+            sigma_put=inputs[:, 1],
+            curr_call_price=inputs[:, 2],
+            curr_put_price=inputs[:, 3],
+            fut_price=fut_price,
+            atmiv=atmiv,
+            ce_oi=inputs[:, 4],
+            pe_oi=inputs[:, 5],
+            avg_ce_oi=avg_ce_oi,
+            avg_pe_oi=avg_pe_oi,
+            chain_greeks={name: arr[leg_rows] for name, arr in state.chain_greeks.items()}
+        )
+        
+        if len(rows) == n_rows:
+            # Object dtype so later partial updates never truncate strings
+            state.reversal_cols = {
+                name: arr.astype(object) if arr.dtype.kind == "U" else arr
+                for name, arr in reversal_cols.items()
+            }
+            return
+        
+        for name, arr in reversal_cols.items():
+            state.reversal_cols[name][rows] = arr
+    
+    def _store_chain_state(self, key: Tuple[str, str, Optional[int]], state: _ChainState) -> None:
+        """Keep state as the chain's last tick, evicting the least recently used chains"""
+        self._chain_state[key] = state
+        self._chain_state.move_to_end(key)
+        while len(self._chain_state) > settings.INCREMENTAL_MAX_CHAINS:
+            self._chain_state.popitem(last=False)
+    
+    @staticmethod
+    def _round_greeks(chain_greeks: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Round Greeks as calculate_chain_greeks does by default; prices stay exact"""
         return {
-            # Core prices
-            "ltp": leg.get("ltp", 0),
-            "atp": leg.get("atp", 0),  # Average traded price
-            "pc": leg.get("pc", 0),    # Previous close
-            
-            # Volume
-            "volume": leg.get("vol", 0),
-            "vol": leg.get("vol", 0),  # Keep both for compatibility
-            "pVol": leg.get("pVol", 0),  # Previous volume
-            
-            # Open Interest - Dhan uses uppercase OI!
-            "oi": leg.get("OI", leg.get("oi", 0)),  # Handle both cases
-            "OI": leg.get("OI", leg.get("oi", 0)),  # Keep uppercase for frontend
-            "oichng": leg.get("oichng", 0),
-            "oi_change": leg.get("oichng", 0),  # Alias for compatibility
-            "oiperchnge": leg.get("oiperchnge", 0),
-            "p_oi": leg.get("p_oi", 0),  # Previous day OI
-            
-            # Price change
-            "p_chng": leg.get("p_chng", 0),  # Price change
-            "p_pchng": leg.get("p_pchng", 0),  # Price change percent
-            "change": leg.get("p_chng", 0),  # Alias for frontend
-            
-            # IV & Greeks
-            "iv": leg.get("iv", 0),
-            "optgeeks": leg.get("optgeeks", {}),
-            
-            # Bid/Ask
-            "bid": leg.get("bid", 0),
-            "ask": leg.get("ask", 0),
-            "bid_qty": leg.get("bid_qty", 0),
-            "ask_qty": leg.get("ask_qty", 0),
-            
-            # Build-up signals - CRITICAL for trading
-            "btyp": leg.get("btyp", "NT"),  # LB, SB, SC, LC, NT
-            "BuiltupName": leg.get("BuiltupName", "NEUTRAL"),  # Full buildup name
-            
-            # Moneyness
-            "mness": leg.get("mness", ""),  # I = ITM, O = OTM
-            
-            # Symbol info
-            "sym": leg.get("sym", ""),
-            "sid": leg.get("sid", 0),
-            "disp_sym": leg.get("disp_sym", ""),
-            "otype": leg.get("otype", ""),  # CE or PE
+            name: arr.copy() if name == "price" else np.round(arr, 6)
+            for name, arr in chain_greeks.items()
         }
     
-    def _greeks_to_dict(self, greeks) -> Dict:
-        """Convert Greeks dataclass to dictionary"""
-        return {
-            "delta": greeks.delta,
-            "gamma": greeks.gamma,
-            "theta": greeks.theta,
-            "vega": greeks.vega,
-            "rho": greeks.rho,
-            "vanna": greeks.vanna,
-            "vomma": greeks.vomma,
-            "charm": greeks.charm,
-            "speed": greeks.speed,
-            "zomma": greeks.zomma,
-            "color": greeks.color,
-            "ultima": greeks.ultima,
+    def _record_recompute(
+        self,
+        symbol: str,
+        total: int,
+        recomputed: int,
+        approximated: int = 0
+    ) -> None:
+        """Count strikes reused from the last tick, recomputed and approximated"""
+        reused = total - recomputed - approximated
+        for result, count in (
+            ("reused", reused), ("recomputed", recomputed), ("approximated", approximated)
+        ):
+            self.recompute_stats[result] += count
+            if count:
+                increment_counter("chain_strikes_total", {"symbol": symbol, "result": result}, count)
+    
+    def _attach_reversal(
+        self,
+        processed: Dict,
+        reversal_cols: Dict[str, list],
+        index: int,
+        time_decay: float
+    ) -> None:
+        """Copy one row of ReversalService.calculate_reversal_chain columns into a strike dict"""
+        rev = reversal_cols["reversal"][index]
+        sr_diff = reversal_cols["sr_diff"][index]
+        alert_level = reversal_cols["alert_level"][index]
+        
+        processed["strike_price"] = reversal_cols["strike_price"][index]
+        processed["reversal"] = rev
+        processed["wkly_reversal"] = reversal_cols["wkly_reversal"][index]
+        processed["rs"] = reversal_cols["rs"][index]
+        processed["rr"] = reversal_cols["rr"][index]
+        processed["ss"] = reversal_cols["ss"][index]
+        processed["sr_diff"] = sr_diff
+        processed["fut_reversal"] = reversal_cols["fut_reversal"][index]
+        processed["ce_tv"] = reversal_cols["ce_tv"][index]
+        processed["pe_tv"] = reversal_cols["pe_tv"][index]
+        processed["difference"] = sr_diff
+        
+        processed["price_range"] = {
+            "low": reversal_cols["price_low"][index],
+            "high": reversal_cols["price_high"][index],
+            "confidence": 0.68
+        }
+        processed["trading_signals"] = {
+            "entry": reversal_cols["entry"][index],
+            "stop_loss": reversal_cols["stop_loss"][index],
+            "take_profit": reversal_cols["take_profit"][index],
+            "risk_reward": reversal_cols["risk_reward"][index],
+        }
+        processed["market_regimes"] = {
+            "volatility": reversal_cols["volatility_regime"][index],
+            "trend": reversal_cols["trend_regime"][index],
+            "liquidity": reversal_cols["liquidity_regime"][index]
+        }
+        processed["recommended_strategy"] = reversal_cols["recommended_strategy"][index]
+        processed["alert"] = {
+            "level": alert_level,
+            "message": self.reversal.alert_message(alert_level, rev)
         }
+        processed["time_decay"] = time_decay
 
 
 # Factory function for dependency injection
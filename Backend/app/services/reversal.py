@@ -3,27 +3,137 @@ Reversal Detection Service
 Advanced reversal point prediction with trading signals
 Ported from BSM.py and reversal.py
 """
+import json
 import math
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 
 import numpy as np
-from scipy.stats import norm
 
-from app.services.bsm import BSMService
+from app.services.bsm import BSMService, confidence_z_score
 from app.services.greeks import GreeksService, AdvancedGreeks
+from app.services.vol_surface import VolSurfaceService
 
 
-@dataclass
+# Greeks reported in ReversalResult.call_greeks / put_greeks
+SUMMARY_GREEK_FIELDS = ("delta", "gamma", "theta", "vega", "rho")
+
+# Upper bounds (days to expiry) of the weekly, bi-weekly and monthly time
+# regimes; anything longer falls in the fourth
+TIME_REGIME_DAYS = (5, 15, 30)
+
+# ATM IV (percent) above which vol is high / below which it is low
+HIGH_IV_THRESHOLD = 30
+LOW_IV_THRESHOLD = 12
+
+
+@dataclass(frozen=True)
+class ReversalParams:
+    """
+    Tunable weights of advanced_reversal_point.
+    
+    The defaults are the original hand-set values; calibrated sets are
+    written by app.services.reversal_calibration and loaded with load().
+    """
+    version: str = "default"
+    # (w1, w2, w3) order weights per time regime
+    order_weights: Tuple[Tuple[float, float, float], ...] = (
+        (0.4, 0.4, 0.2), (0.5, 0.35, 0.15), (0.6, 0.3, 0.1), (0.7, 0.25, 0.05),
+    )
+    # Second-order multiplier per time regime (third order uses its ^1.5)
+    volatility_multipliers: Tuple[float, ...] = (1.5, 1.3, 1.1, 1.0)
+    # (vega, vomma, ultima) boosts in high and low IV regimes
+    high_iv_boosts: Tuple[float, float, float] = (1.4, 1.6, 1.3)
+    low_iv_boosts: Tuple[float, float, float] = (0.8, 0.7, 0.6)
+    # Liquidity gravity = min(cap, max(0, (oi_ratio - 1) * slope))
+    gravity_slope: float = 0.1
+    gravity_cap: float = 0.4
+    # How the set was produced (calibration window, losses); not compared
+    metadata: Dict[str, Any] = field(default_factory=dict, compare=False, hash=False)
+    
+    @staticmethod
+    def time_regime(T_days: float) -> int:
+        """Index into order_weights / volatility_multipliers for T_days"""
+        for regime, bound in enumerate(TIME_REGIME_DAYS):
+            if T_days <= bound:
+                return regime
+        return len(TIME_REGIME_DAYS)
+    
+    def iv_boosts(self, current_iv: float) -> Tuple[float, float, float]:
+        """(vega, vomma, ultima) boosts for an ATM IV in percent"""
+        if current_iv > HIGH_IV_THRESHOLD:
+            return self.high_iv_boosts
+        if current_iv < LOW_IV_THRESHOLD:
+            return self.low_iv_boosts
+        return (1.0, 1.0, 1.0)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "order_weights": [list(w) for w in self.order_weights],
+            "volatility_multipliers": list(self.volatility_multipliers),
+            "high_iv_boosts": list(self.high_iv_boosts),
+            "low_iv_boosts": list(self.low_iv_boosts),
+            "gravity_slope": self.gravity_slope,
+            "gravity_cap": self.gravity_cap,
+            "metadata": self.metadata,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReversalParams":
+        params = cls(
+            version=str(data["version"]),
+            order_weights=tuple(tuple(float(w) for w in row) for row in data["order_weights"]),
+            volatility_multipliers=tuple(float(m) for m in data["volatility_multipliers"]),
+            high_iv_boosts=tuple(float(b) for b in data["high_iv_boosts"]),
+            low_iv_boosts=tuple(float(b) for b in data["low_iv_boosts"]),
+            gravity_slope=float(data["gravity_slope"]),
+            gravity_cap=float(data["gravity_cap"]),
+            metadata=data.get("metadata", {}),
+        )
+        regimes = len(TIME_REGIME_DAYS) + 1
+        if (
+            len(params.order_weights) != regimes
+            or any(len(row) != 3 for row in params.order_weights)
+            or len(params.volatility_multipliers) != regimes
+            or len(params.high_iv_boosts) != 3
+            or len(params.low_iv_boosts) != 3
+        ):
+            raise ValueError(f"Reversal parameter set {params.version} has the wrong shape")
+        return params
+    
+    @classmethod
+    def load(cls, path: str) -> "ReversalParams":
+        """Read a parameter set written by save()"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+    
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+DEFAULT_REVERSAL_PARAMS = ReversalParams()
+
+
+@dataclass(slots=True)
 class TradingSignals:
     """Trading signal results"""
     entry: float
     stop_loss: float
     take_profit: float
     risk_reward: float
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "entry": self.entry,
+            "stop_loss": self.stop_loss,
+            "take_profit": self.take_profit,
+            "risk_reward": self.risk_reward,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ReversalResult:
     """Complete reversal calculation result"""
     strike_price: float
@@ -46,6 +156,37 @@ class ReversalResult:
     call_greeks: Dict[str, float]
     put_greeks: Dict[str, float]
     debug_data: Dict = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-ready dict built directly from the fields (dataclasses.asdict
+        would deep-copy every nested dict). Nested dicts are shared, not
+        copied; debug_data is included only when populated.
+        """
+        result = {
+            "strike_price": self.strike_price,
+            "reversal": self.reversal,
+            "wkly_reversal": self.wkly_reversal,
+            "rs": self.rs,
+            "rr": self.rr,
+            "ss": self.ss,
+            "sr_diff": self.sr_diff,
+            "fut_reversal": self.fut_reversal,
+            "ce_tv": self.ce_tv,
+            "pe_tv": self.pe_tv,
+            "confidence": self.confidence,
+            "direction": self.direction,
+            "price_range": self.price_range,
+            "trading_signals": self.trading_signals.to_dict(),
+            "market_regimes": self.market_regimes,
+            "recommended_strategy": self.recommended_strategy,
+            "alert": self.alert,
+            "call_greeks": self.call_greeks,
+            "put_greeks": self.put_greeks,
+        }
+        if self.debug_data:
+            result["debug_data"] = self.debug_data
+        return result
 
 
 class ReversalService:
@@ -54,9 +195,15 @@ class ReversalService:
     Uses BSM, Greeks, and advanced analysis to predict reversal points.
     """
     
-    def __init__(self, risk_free_rate: float = 0.10):
+    def __init__(
+        self,
+        risk_free_rate: float = 0.10,
+        params: Optional[ReversalParams] = None,
+        vol_surface: Optional[VolSurfaceService] = None
+    ):
         self.r = risk_free_rate
-        self.bsm = BSMService(risk_free_rate)
+        self.params = params or DEFAULT_REVERSAL_PARAMS
+        self.bsm = BSMService(risk_free_rate, vol_surface=vol_surface)
         self.greeks_service = GreeksService(risk_free_rate)
     
     def detect_volatility_regime(
@@ -119,8 +266,8 @@ class ReversalService:
         
         # Gravity logic: If OI is huge (>2x average), it anchors the price closer to Strike
         # If OI is low, price is free to drift with Greeks
-        # Gravity range: 0.0 to 0.4 (max 40% dampening)
-        gravity = min(0.4, max(0, (ratio - 1) * 0.1))
+        # Gravity range: 0.0 to gravity_cap (0.4 = max 40% dampening by default)
+        gravity = min(self.params.gravity_cap, max(0, (ratio - 1) * self.params.gravity_slope))
         return ratio, gravity
 
     def expected_price_range(
@@ -280,11 +427,15 @@ class ReversalService:
         vol_chng: float = 0.01,
         time_chng: float = 1/365,
         gravity: float = 0.0,
-        liquidity_ratio: float = 1.0
+        liquidity_ratio: float = 1.0,
+        include_debug: bool = False
     ) -> tuple:
         """
         Calculate advanced reversal point using 11 Greek orders AND Liquidity Gravity.
         Full implementation ported from avp.py advanced_reversal_point()
+        
+        The Greek breakdown and reversal features are only built when
+        include_debug is set; otherwise the third element is an empty dict.
         """
         if T_days <= 0:
             return (K, 0, {})
@@ -329,30 +480,13 @@ class ReversalService:
         
         # ===== INTELLIGENT WEIGHTING SYSTEM =====
         # Time-based weighting (near expiry emphasizes higher-order Greeks)
-        if T_days <= 5:  # Weekly expiry - higher-order Greeks dominate
-            w1, w2, w3 = 0.4, 0.4, 0.2
-            volatility_multiplier = 1.5
-        elif T_days <= 15:  # Bi-weekly
-            w1, w2, w3 = 0.5, 0.35, 0.15
-            volatility_multiplier = 1.3
-        elif T_days <= 30:  # Monthly
-            w1, w2, w3 = 0.6, 0.3, 0.1
-            volatility_multiplier = 1.1
-        else:  # Longer dated
-            w1, w2, w3 = 0.7, 0.25, 0.05
-            volatility_multiplier = 1.0
-        
-        # Volatility regime adjustment
-        if current_iv > 30:  # High vol - emphasize vega-related Greeks
-            vega_boost = 1.4
-            vomma_boost = 1.6
-            ultima_boost = 1.3
-        elif current_iv < 12:  # Low vol - emphasize delta/gamma
-            vega_boost = 0.8
-            vomma_boost = 0.7
-            ultima_boost = 0.6
-        else:  # Normal vol
-            vega_boost = vomma_boost = ultima_boost = 1.0
+        regime = self.params.time_regime(T_days)
+        w1, w2, w3 = self.params.order_weights[regime]
+        volatility_multiplier = self.params.volatility_multipliers[regime]
+        
+        # Volatility regime adjustment (high vol emphasizes vega-related
+        # Greeks, low vol delta/gamma)
+        vega_boost, vomma_boost, ultima_boost = self.params.iv_boosts(current_iv)
         
         # ===== WEIGHTED CONTRIBUTIONS =====
         first_order_total = (
@@ -414,6 +548,9 @@ class ReversalService:
         base_confidence = 60 + min(30, higher_order_significance * 20)
         final_confidence = round(min(95, base_confidence + time_vol_confidence * 0.1))
         
+        if not include_debug:
+            return (reversal_point, final_confidence, {})
+        
         # ===== COMPREHENSIVE DEBUG OUTPUT =====
         debug_data = {
             "reversal_point": reversal_point,
@@ -447,11 +584,14 @@ class ReversalService:
             },
             "market_factors": {
                 "price_discrepancy": price_discrepancy,
-                "volatility_regime": "high" if current_iv > 30 else ("low" if current_iv < 12 else "normal"),
+                "volatility_regime": (
+                    "high" if current_iv > HIGH_IV_THRESHOLD
+                    else ("low" if current_iv < LOW_IV_THRESHOLD else "normal")
+                ),
                 "time_regime": "near_expiry" if T_days <= 5 else "normal",
                 "max_adjustment_bound": max_adjustment,
             },
-            "weights_applied": {"w1": w1, "w2": w2, "w3": w3},
+            "weights_applied": {"w1": w1, "w2": w2, "w3": w3, "params_version": self.params.version},
             "higher_order_significance": higher_order_significance,
             "reversal_features": self.compute_reversal_features(K, ce_greeks, pe_greeks),
         }
@@ -475,10 +615,23 @@ class ReversalService:
         ce_oi: float = 0,
         pe_oi: float = 0,
         avg_ce_oi: float = 1,
-        avg_pe_oi: float = 1
+        avg_pe_oi: float = 1,
+        ce_greeks: Optional[AdvancedGreeks] = None,
+        pe_greeks: Optional[AdvancedGreeks] = None,
+        call_theoretical: Optional[float] = None,
+        put_theoretical: Optional[float] = None,
+        include_debug: bool = False
     ) -> ReversalResult:
         """
         Complete reversal calculation matching original get_reversal function.
+        
+        Greeks and theoretical prices already computed for this strike (e.g.
+        by GreeksService.calculate_chain_greeks with with_price=True) can be
+        passed in to skip recomputing them; they must use the same S, T and
+        normalized sigmas.
+        
+        debug_data (Greek breakdown and reversal features) is only populated
+        when include_debug is set.
         """
         try:
             # Normalize inputs
@@ -494,33 +647,25 @@ class ReversalService:
             if sigma_put <= 0:
                 sigma_put = sigma_call if sigma_call > 0 else 0.15
             
-            # Calculate theoretical prices
-            call_theoretical = self.bsm.price(S, K, T, sigma_call, "call")
-            put_theoretical = self.bsm.price(S, K, T, sigma_put, "put")
+            # Calculate theoretical prices (unless supplied by the caller)
+            if call_theoretical is None:
+                call_theoretical = self.bsm.price(S, K, T, sigma_call, "call")
+            if put_theoretical is None:
+                put_theoretical = self.bsm.price(S, K, T, sigma_put, "put")
             
-            # Calculate Greeks
-            ce_greeks = self.greeks_service.calculate_all_greeks(
-                S, K, T, sigma_call, "call"
-            )
-            pe_greeks = self.greeks_service.calculate_all_greeks(
-                S, K, T, sigma_put, "put"
-            )
+            # Calculate Greeks (unless supplied by the caller)
+            if ce_greeks is None:
+                ce_greeks = self.greeks_service.calculate_all_greeks(
+                    S, K, T, sigma_call, "call"
+                )
+            if pe_greeks is None:
+                pe_greeks = self.greeks_service.calculate_all_greeks(
+                    S, K, T, sigma_put, "put"
+                )
             
             # Standard Greeks dictionaries
-            call_greeks_dict = {
-                "delta": ce_greeks.delta,
-                "gamma": ce_greeks.gamma,
-                "theta": ce_greeks.theta,
-                "vega": ce_greeks.vega,
-                "rho": ce_greeks.rho,
-            }
-            put_greeks_dict = {
-                "delta": pe_greeks.delta,
-                "gamma": pe_greeks.gamma,
-                "theta": pe_greeks.theta,
-                "vega": pe_greeks.vega,
-                "rho": pe_greeks.rho,
-            }
+            call_greeks_dict = ce_greeks.to_dict(SUMMARY_GREEK_FIELDS)
+            put_greeks_dict = pe_greeks.to_dict(SUMMARY_GREEK_FIELDS)
             
             # Alpha for reversal calculations
             alpha = put_theoretical - call_theoretical
@@ -560,7 +705,8 @@ class ReversalService:
                 S_chng=spot_change,
                 instrument_type=instrument_type,
                 gravity=gravity,
-                liquidity_ratio=liq_ratio
+                liquidity_ratio=liq_ratio,
+                include_debug=include_debug
             )
             
             # IV skew analysis
@@ -617,13 +763,11 @@ class ReversalService:
             
             if current_distance < 0.3 * strike_distance:
                 alert_level = "high"
-                alert_message = f"Price near reversal point ({rev})"
             elif current_distance < 0.7 * strike_distance:
                 alert_level = "medium"
-                alert_message = f"Price approaching reversal ({rev})"
             else:
                 alert_level = "low"
-                alert_message = "Monitoring"
+            alert_message = self.alert_message(alert_level, rev)
             
             # Future reversal
             fut_rev = self.round_to_tick(rev + (fut_price - S)) if fut_price > 0 else rev
@@ -685,6 +829,325 @@ class ReversalService:
                 debug_data={"error": str(e)}
             )
 
+    def calculate_reversal_chain(
+        self,
+        spot: float,
+        spot_change: float,
+        iv_change: float,
+        strikes: np.ndarray,
+        T_days: float,
+        sigma_call: np.ndarray,
+        sigma_put: np.ndarray,
+        curr_call_price: np.ndarray,
+        curr_put_price: np.ndarray,
+        fut_price: float = 0,
+        atmiv: float = 0,
+        ce_oi: Union[float, np.ndarray] = 0,
+        pe_oi: Union[float, np.ndarray] = 0,
+        avg_ce_oi: float = 1,
+        avg_pe_oi: float = 1,
+        chain_greeks: Optional[Dict[str, np.ndarray]] = None,
+        symbol: Optional[str] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_reversal over a whole chain.
+        
+        Takes the chain as columns (one row per strike) and evaluates the same
+        reversal, adjusted reversal, confidence, trading signal and regime
+        logic with NumPy, turning the T_days / IV regime branches into masked
+        selects. Results match calculate_reversal row by row.
+        
+        Args:
+            spot, spot_change, iv_change, T_days, fut_price, atmiv,
+            avg_ce_oi, avg_pe_oi: As in calculate_reversal (scalars)
+            strikes: Strike prices
+            sigma_call, sigma_put: Call/put IVs in percent
+            curr_call_price, curr_put_price: Current LTPs
+            ce_oi, pe_oi: Open interest per strike
+            chain_greeks: Optional GreeksService.calculate_chain_greeks output
+                with with_price=True over calls [0, n) then puts [n, 2n),
+                computed with the normalized sigmas; recomputed if omitted
+            symbol: With a vol surface on the service, legs without an IV
+                take the symbol's fitted smile before the usual fallbacks
+            
+        Returns:
+            Dictionary of column name -> array with strike_price, reversal,
+            wkly_reversal, rs, rr, ss, sr_diff, fut_reversal, ce_tv, pe_tv,
+            confidence, direction, price_low, price_high, entry, stop_loss,
+            take_profit, risk_reward, volatility_regime, trend_regime,
+            liquidity_regime, recommended_strategy and alert_level
+        """
+        K = np.asarray(strikes, dtype=np.float64)
+        n = K.size
+        S = round(float(spot), 4)
+        T = T_days / 365
+        
+        # Normalize IVs exactly like the scalar path
+        sc = np.asarray(sigma_call, dtype=np.float64) / 100
+        sp = np.asarray(sigma_put, dtype=np.float64) / 100
+        smile = self.bsm.surface_iv(symbol, K, T) if symbol is not None else None
+        if smile is not None:
+            sc = np.where(sc <= 0, smile, sc)
+            sp = np.where(sp <= 0, smile, sp)
+        sc = np.where(sc <= 0, np.where(sp > 0, sp, 0.15), sc)
+        sp = np.where(sp <= 0, sc, sp)
+        
+        call_price = np.asarray(curr_call_price, dtype=np.float64)
+        put_price = np.asarray(curr_put_price, dtype=np.float64)
+        
+        if chain_greeks is None:
+            chain_greeks = self.greeks_service.calculate_chain_greeks(
+                S, np.concatenate([K, K]), T, np.concatenate([sc, sp]),
+                np.arange(2 * n) < n, with_price=True
+            )
+        ce = {name: arr[:n] for name, arr in chain_greeks.items()}
+        pe = {name: arr[n:] for name, arr in chain_greeks.items()}
+        call_tv = ce["price"]
+        put_tv = pe["price"]
+        alpha = put_tv - call_tv
+        
+        # Liquidity gravity
+        avg_oi_safe = max(avg_ce_oi + avg_pe_oi, 1) / 2
+        liq_ratio = (np.asarray(ce_oi, dtype=np.float64) + np.asarray(pe_oi, dtype=np.float64)) / avg_oi_safe
+        gravity = self.liquidity_gravity(liq_ratio, self.params.gravity_slope, self.params.gravity_cap)
+        dampener = 1.0 - gravity
+        
+        # ===== ADJUSTED REVERSAL PRICES =====
+        put_diff = put_price - put_tv
+        call_diff = call_price - call_tv
+        abs_ce_gamma = np.abs(ce["gamma"])
+        abs_pe_gamma = np.abs(pe["gamma"])
+        total_gamma = abs_ce_gamma + abs_pe_gamma
+        weighted_diff = np.where(
+            total_gamma > 0.0001,
+            (put_diff * abs_pe_gamma + call_diff * abs_ce_gamma) / np.maximum(total_gamma, 0.0001),
+            put_diff + call_diff
+        )
+        wkly_rev = self._round_to_tick_array(K + weighted_diff * dampener)
+        rr = self._round_to_tick_array(
+            K + ((np.abs(put_diff) - np.abs(call_diff)) - alpha * (sp - sc)) * dampener
+        )
+        rs = self._round_to_tick_array(
+            K + ((put_diff * pe["delta"]) - (call_diff * ce["delta"]) + alpha * (sp - sc)) * dampener
+        )
+        ss = self._round_to_tick_array(
+            K - ((call_diff - put_diff) - alpha * (sc - sp)) * dampener
+        )
+        
+        # ===== ADVANCED REVERSAL POINT =====
+        current_iv = np.full(n, float(atmiv)) if atmiv > 0 else (sc + sp) / 2 * 100
+        net = {name: ce[name] + pe[name] for name in (
+            "delta", "gamma", "vega", "theta", "rho",
+            "vomma", "vanna", "charm", "speed", "zomma", "color", "ultima",
+        )}
+        effects = self.reversal_effects(net, spot_change, iv_change)
+        
+        # Time regime weights, and IV regime boosts per strike
+        T_arr = np.asarray(T_days, dtype=np.float64)
+        regime = self.params.time_regime(T_days)
+        iv_regimes = [current_iv > HIGH_IV_THRESHOLD, current_iv < LOW_IV_THRESHOLD]
+        boosts = [
+            np.select(iv_regimes, [high, low], 1.0)
+            for high, low in zip(self.params.high_iv_boosts, self.params.low_iv_boosts)
+        ]
+        
+        total_greek_adjustment = self.greek_adjustment(
+            effects,
+            self.params.order_weights[regime],
+            self.params.volatility_multipliers[regime],
+            boosts,
+            gravity
+        )
+        max_adjustment = self.max_adjustment(S, K, current_iv)
+        
+        lower_order = (
+            np.abs(net["delta"]) + np.abs(net["gamma"]) + np.abs(net["vega"]) + np.abs(net["theta"])
+        )
+        higher_order = (
+            np.abs(net["vomma"]) + np.abs(net["vanna"]) + np.abs(net["charm"])
+            + np.abs(net["speed"]) + np.abs(net["zomma"]) + np.abs(net["color"])
+            + np.abs(net["ultima"])
+        )
+        higher_order_significance = higher_order / np.maximum(lower_order, 0.001)
+        time_vol_confidence = np.minimum(100, (T_days * current_iv) / 10)
+        base_confidence = 60 + np.minimum(30, higher_order_significance * 20)
+        
+        expired = T_arr <= 0
+        rev = np.where(expired, K, self.bounded_reversal(K, total_greek_adjustment, max_adjustment))
+        confidence = np.where(
+            expired, 0, np.rint(np.minimum(95, base_confidence + time_vol_confidence * 0.1))
+        ).astype(np.int64)
+        
+        # ===== EXPECTED RANGE AND TRADING SIGNALS =====
+        iv_skew = sc - sp
+        skew_weight = np.clip(0.5 + (iv_skew / np.maximum(sc, sp)) * 0.5, 0, 1)
+        volatility_weight = np.where(np.abs(iv_skew) > 0.01, skew_weight, 0.5)
+        effective_iv = volatility_weight * sc + (1 - volatility_weight) * sp
+        
+        range_days = int(T_days)
+        if range_days > 0:
+            move = S * effective_iv * math.sqrt(range_days / 365) * confidence_z_score(0.68)
+        else:
+            move = np.zeros(n)
+        price_low = S - move
+        price_high = S + move
+        range_pct = (price_high - price_low) / S if S > 0 else np.zeros(n)
+        rr_base = np.select([range_pct < 0.01, range_pct < 0.02], [2.5, 1.5], 1.0)
+        
+        entry_price = self._round_cents(rev)
+        stop_loss = self._round_cents(rev - (rev * 0.005 * rr_base))
+        take_profit = self._round_cents(entry_price + (entry_price - stop_loss) * rr_base)
+        risk = entry_price - stop_loss
+        reward = take_profit - entry_price
+        risk_reward = np.where(risk > 0, self._round_cents(reward / np.where(risk > 0, risk, 1)), 0)
+        
+        direction = np.select([rev > S + 10, rev < S - 10], ["bullish", "bearish"], "neutral")
+        
+        # ===== REGIMES =====
+        avg_iv = (sc + sp) / 2
+        vol_regime = np.select([avg_iv < 0.15, avg_iv < 0.30], ["low", "medium"], "high")
+        trend_regime = self.detect_trend_regime([S])
+        liquidity_regime = np.select(
+            [liq_ratio > 1.1, liq_ratio > 0.9], ["high", "medium"], "low"
+        )
+        
+        trending = trend_regime in ("uptrend", "downtrend")
+        strategy = np.select(
+            [
+                (vol_regime == "high") & (trend_regime == "sideways"),
+                (vol_regime == "high") & trending,
+                (vol_regime == "low") & (trend_regime != "sideways"),
+            ],
+            ["Iron Condor", "Calendar Spread", "Vertical Spread"],
+            "Reversal"
+        )
+        
+        strike_distance = 100
+        current_distance = np.abs(S - rev)
+        alert_level = np.select(
+            [current_distance < 0.3 * strike_distance, current_distance < 0.7 * strike_distance],
+            ["high", "medium"],
+            "low"
+        )
+        
+        fut_rev = self._round_to_tick_array(rev + (fut_price - S)) if fut_price > 0 else rev
+        sr_diff = self._round_to_tick_array(wkly_rev - rr)
+        
+        return {
+            "strike_price": K,
+            "reversal": rev,
+            "wkly_reversal": wkly_rev,
+            "rs": rs,
+            "rr": rr,
+            "ss": ss,
+            "sr_diff": sr_diff,
+            "fut_reversal": fut_rev,
+            "ce_tv": call_tv,
+            "pe_tv": put_tv,
+            "confidence": confidence,
+            "direction": direction,
+            "price_low": price_low,
+            "price_high": price_high,
+            "entry": entry_price,
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "risk_reward": risk_reward,
+            "volatility_regime": vol_regime,
+            "trend_regime": np.full(n, trend_regime),
+            "liquidity_regime": liquidity_regime,
+            "recommended_strategy": strategy,
+            "alert_level": alert_level,
+        }
+    
+    # ============== Chain reversal building blocks ==============
+    # Shared with app.services.reversal_calibration, which broadcasts the
+    # weights over a leading axis of candidate parameter sets
+    
+    @staticmethod
+    def liquidity_gravity(liq_ratio, slope, cap):
+        """Gravity dampener for strike OI / average OI ratios"""
+        return np.minimum(cap, np.maximum(0, (liq_ratio - 1) * slope))
+    
+    @staticmethod
+    def reversal_effects(
+        net: Dict[str, np.ndarray],
+        S_chng: float,
+        iv_chng: float,
+        time_chng: float = 1 / 365
+    ) -> Dict[str, np.ndarray]:
+        """Taylor contribution of each net (call + put) Greek to the move"""
+        return {
+            "delta": net["delta"] * S_chng,
+            "gamma": 0.5 * net["gamma"] * (S_chng ** 2),
+            "vega": net["vega"] * iv_chng,
+            "theta": net["theta"] * time_chng,
+            "rho": net["rho"] * 0.001,  # 1bp rate change
+            "vomma": 0.5 * net["vomma"] * (iv_chng ** 2),
+            "vanna": net["vanna"] * S_chng * iv_chng,
+            "charm": net["charm"] * time_chng,
+            "speed": (1 / 6) * net["speed"] * (S_chng ** 3),
+            "zomma": net["zomma"] * S_chng * iv_chng,
+            "color": net["color"] * time_chng,
+            "ultima": (1 / 6) * net["ultima"] * (iv_chng ** 3),
+        }
+    
+    @staticmethod
+    def greek_adjustment(effects, weights, volatility_multiplier, boosts, gravity):
+        """
+        Weighted, gravity-dampened sum of the effects, as in
+        advanced_reversal_point. weights are (w1, w2, w3) and boosts the
+        (vega, vomma, ultima) multipliers.
+        """
+        w1, w2, w3 = weights
+        vega_boost, vomma_boost, ultima_boost = boosts
+        first_order_total = (
+            effects["delta"] + effects["gamma"] + (effects["vega"] * vega_boost)
+            + effects["theta"] + effects["rho"]
+        )
+        second_order_total = (
+            (effects["vomma"] * vomma_boost) + effects["vanna"] + effects["charm"]
+        ) * volatility_multiplier
+        third_order_total = (
+            effects["speed"] + effects["zomma"] + effects["color"] + (effects["ultima"] * ultima_boost)
+        ) * (volatility_multiplier ** 1.5)
+        return (
+            first_order_total * w1 + second_order_total * w2 + third_order_total * w3
+        ) * (1 - gravity)
+    
+    @staticmethod
+    def max_adjustment(S: float, K: np.ndarray, current_iv: np.ndarray) -> np.ndarray:
+        """Bound on the reversal shift: 3 implied daily moves, at most 2% of strike"""
+        implied_move_today = S * (current_iv / 100) * math.sqrt(1 / 365)
+        return np.minimum(np.maximum(10.0, implied_move_today * 3.0), K * 0.02)
+    
+    @classmethod
+    def bounded_reversal(cls, K, adjustment, max_adjustment):
+        """Strike shifted by the tanh-bounded adjustment, on the tick grid"""
+        bounded = np.tanh(adjustment / np.maximum(max_adjustment, 1)) * max_adjustment
+        return cls._round_to_tick_array(K + bounded)
+    
+    @staticmethod
+    def _round_to_tick_array(price: np.ndarray, tick_size: float = 0.05) -> np.ndarray:
+        """Vectorized round_to_tick"""
+        return np.round(np.round(price / tick_size) * tick_size, 2)
+    
+    @staticmethod
+    def _round_cents(values: np.ndarray) -> np.ndarray:
+        """
+        round(x, 2) per element. np.round scales by 100 first, which can land
+        a cent away from Python's round on signal levels; this keeps parity.
+        """
+        return np.array([round(v, 2) for v in values.tolist()], dtype=np.float64)
+    
+    @staticmethod
+    def alert_message(level: str, reversal: float) -> str:
+        """Alert message for an alert level, as built by calculate_reversal"""
+        if level == "high":
+            return f"Price near reversal point ({reversal})"
+        if level == "medium":
+            return f"Price approaching reversal ({reversal})"
+        return "Monitoring"
+
 
 # Singleton instance
 reversal_service = ReversalService()
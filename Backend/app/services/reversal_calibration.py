@@ -0,0 +1,414 @@
+"""
+Reversal Weight Calibration
+Walk-forward random search over ReversalParams against recorded chain
+snapshots and the spot path that followed each of them.
+
+Run offline through scripts.calibrate_reversal; the parameter set it
+writes is loaded at startup via REVERSAL_PARAMS_PATH.
+"""
+import hashlib
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.reversal import (
+    DEFAULT_REVERSAL_PARAMS,
+    HIGH_IV_THRESHOLD,
+    LOW_IV_THRESHOLD,
+    ReversalParams,
+    ReversalService,
+)
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# IV regime rows of the boost table built per candidate
+_IV_HIGH, _IV_LOW, _IV_NORMAL = 0, 1, 2
+
+
+@dataclass(slots=True)
+class CalibrationSample:
+    """One chain snapshot reduced to what the reversal weights act on"""
+    timestamp: datetime
+    spot: float
+    time_regime: int
+    strikes: np.ndarray
+    effects: Dict[str, np.ndarray]  # Per-strike Taylor effects
+    liquidity_ratio: np.ndarray
+    iv_regime: np.ndarray  # _IV_HIGH / _IV_LOW / _IV_NORMAL per strike
+    max_adjustment: np.ndarray
+    # Extremes of the realized spot path over the horizon
+    realized_high: float
+    realized_low: float
+
+
+# ============== Samples ==============
+
+def load_snapshots(path: str) -> List[Dict[str, Any]]:
+    """
+    Recorded snapshots from a JSON-lines file, one HistoricalService
+    snapshot dict (symbol, expiry, timestamp, spot, option_chain, ...)
+    per line.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _timestamp(value: str) -> datetime:
+    """Snapshot timestamps are IST unless they carry an offset"""
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=IST)
+
+
+def _days_to_expiry(expiry: str, timestamp: datetime) -> float:
+    """Days from the snapshot to 15:30 IST on the expiry date"""
+    expiry_day = datetime.fromtimestamp(int(expiry), IST)
+    close = expiry_day.replace(hour=15, minute=30, second=0, microsecond=0)
+    return (close - timestamp).total_seconds() / 86400
+
+
+def build_samples(
+    snapshots: Sequence[Dict[str, Any]],
+    horizon_minutes: float = 60,
+    service: Optional[ReversalService] = None
+) -> List[CalibrationSample]:
+    """
+    Turn recorded snapshots into calibration samples.
+
+    Snapshots are grouped by (symbol, expiry) and ordered in time; each one
+    is paired with the spots of the later snapshots of its series within
+    horizon_minutes. Spot change is taken from the snapshot when recorded,
+    else from the previous snapshot of the series. Snapshots without a
+    later spot in the horizon, or at/after expiry, are skipped.
+
+    Returns:
+        Samples sorted by timestamp
+    """
+    service = service or ReversalService()
+    series: Dict[tuple, List[tuple]] = {}
+    for snap in snapshots:
+        key = (snap.get("symbol"), str(snap.get("expiry")))
+        series.setdefault(key, []).append((_timestamp(snap["timestamp"]), snap))
+
+    horizon = timedelta(minutes=horizon_minutes)
+    samples = []
+    for (_, expiry), rows in series.items():
+        rows.sort(key=lambda row: row[0])
+        times = [ts for ts, _ in rows]
+        spots = np.array([float(snap.get("spot") or 0) for _, snap in rows])
+        for i, (ts, snap) in enumerate(rows):
+            j = i + 1
+            while j < len(rows) and times[j] - ts <= horizon:
+                j += 1
+            T_days = _days_to_expiry(expiry, ts)
+            if j == i + 1 or spots[i] <= 0 or T_days <= 0:
+                continue
+            spot_change = snap.get("spot_change")
+            if spot_change is None:
+                spot_change = spots[i] - spots[i - 1] if i else 0.0
+            sample = _sample_from_snapshot(
+                service, snap, ts, float(spots[i]), float(spot_change), T_days,
+                realized=spots[i + 1:j]
+            )
+            if sample is not None:
+                samples.append(sample)
+
+    samples.sort(key=lambda sample: sample.timestamp)
+    return samples
+
+
+def _sample_from_snapshot(
+    service: ReversalService,
+    snap: Dict[str, Any],
+    timestamp: datetime,
+    spot: float,
+    spot_change: float,
+    T_days: float,
+    realized: np.ndarray
+) -> Optional[CalibrationSample]:
+    """Greeks and reversal inputs of one snapshot, as calculate_reversal_chain builds them"""
+    rows = []
+    for strike_str, strike_data in (snap.get("option_chain") or {}).items():
+        try:
+            strike = float(strike_str)
+        except (TypeError, ValueError):
+            continue
+        ce, pe = strike_data.get("ce", {}), strike_data.get("pe", {})
+        rows.append((
+            strike, ce.get("iv", 0) or 0, pe.get("iv", 0) or 0,
+            ce.get("oi", ce.get("OI", 0)) or 0, pe.get("oi", pe.get("OI", 0)) or 0,
+        ))
+    if not rows:
+        return None
+
+    K, iv_call, iv_put, ce_oi, pe_oi = (np.array(col, dtype=np.float64) for col in zip(*rows))
+    n = K.size
+    S = round(spot, 4)
+
+    # Same IV normalization and Greeks as calculate_reversal_chain
+    sc = iv_call / 100
+    sp = iv_put / 100
+    sc = np.where(sc <= 0, np.where(sp > 0, sp, 0.15), sc)
+    sp = np.where(sp <= 0, sc, sp)
+    greeks = service.greeks_service.calculate_chain_greeks(
+        S, np.concatenate([K, K]), T_days / 365, np.concatenate([sc, sp]), np.arange(2 * n) < n
+    )
+    net = {name: arr[:n] + arr[n:] for name, arr in greeks.items()}
+
+    avg_oi_safe = max(ce_oi.mean() + pe_oi.mean(), 1) / 2
+    atmiv = snap.get("atmiv") or 0
+    current_iv = np.full(n, float(atmiv)) if atmiv > 0 else (sc + sp) / 2 * 100
+    iv_change = snap.get("atmiv_change", 0) / 100 if snap.get("atmiv_change") else 0
+
+    return CalibrationSample(
+        timestamp=timestamp,
+        spot=S,
+        time_regime=ReversalParams.time_regime(T_days),
+        strikes=K,
+        effects=service.reversal_effects(net, spot_change, iv_change),
+        liquidity_ratio=(ce_oi + pe_oi) / avg_oi_safe,
+        iv_regime=np.select(
+            [current_iv > HIGH_IV_THRESHOLD, current_iv < LOW_IV_THRESHOLD], [_IV_HIGH, _IV_LOW], _IV_NORMAL
+        ),
+        max_adjustment=service.max_adjustment(S, K, current_iv),
+        realized_high=float(realized.max()),
+        realized_low=float(realized.min()),
+    )
+
+
+# ============== Candidates ==============
+
+def params_to_arrays(params: Sequence[ReversalParams]) -> Dict[str, np.ndarray]:
+    """Stack parameter sets into arrays with a leading candidate axis"""
+    return {
+        "order_weights": np.array([p.order_weights for p in params], dtype=np.float64),
+        "volatility_multipliers": np.array([p.volatility_multipliers for p in params], dtype=np.float64),
+        "high_iv_boosts": np.array([p.high_iv_boosts for p in params], dtype=np.float64),
+        "low_iv_boosts": np.array([p.low_iv_boosts for p in params], dtype=np.float64),
+        "gravity_slope": np.array([p.gravity_slope for p in params], dtype=np.float64),
+        "gravity_cap": np.array([p.gravity_cap for p in params], dtype=np.float64),
+    }
+
+
+def arrays_to_params(
+    candidates: Dict[str, np.ndarray],
+    index: int,
+    version: str = "candidate",
+    metadata: Optional[Dict[str, Any]] = None
+) -> ReversalParams:
+    """One row of the candidate arrays as a ReversalParams"""
+    return ReversalParams(
+        version=version,
+        order_weights=tuple(tuple(row) for row in candidates["order_weights"][index].tolist()),
+        volatility_multipliers=tuple(candidates["volatility_multipliers"][index].tolist()),
+        high_iv_boosts=tuple(candidates["high_iv_boosts"][index].tolist()),
+        low_iv_boosts=tuple(candidates["low_iv_boosts"][index].tolist()),
+        gravity_slope=float(candidates["gravity_slope"][index]),
+        gravity_cap=float(candidates["gravity_cap"][index]),
+        metadata=metadata or {},
+    )
+
+
+def sample_candidates(
+    n_candidates: int,
+    base: ReversalParams = DEFAULT_REVERSAL_PARAMS,
+    spread: float = 0.25,
+    seed: int = 0
+) -> Dict[str, np.ndarray]:
+    """
+    Random search candidates around base: every parameter scaled by an
+    independent lognormal factor, order weights renormalized to sum to 1
+    and the gravity cap kept below 0.9. Row 0 is base itself.
+    """
+    rng = np.random.default_rng(seed)
+    candidates = params_to_arrays([base] * n_candidates)
+    for arr in candidates.values():
+        arr[1:] *= np.exp(spread * rng.standard_normal(arr[1:].shape))
+    weights = candidates["order_weights"]
+    weights /= weights.sum(axis=2, keepdims=True)
+    np.clip(candidates["gravity_cap"], 0.0, 0.9, out=candidates["gravity_cap"])
+    return candidates
+
+
+# ============== Evaluation ==============
+
+def candidate_reversals(candidates: Dict[str, np.ndarray], sample: CalibrationSample) -> np.ndarray:
+    """Reversal point of every strike under every candidate, (candidates, strikes)"""
+    regime = sample.time_regime
+    weights = candidates["order_weights"][:, regime, :]
+    multiplier = candidates["volatility_multipliers"][:, regime, None]
+    table = np.stack([
+        candidates["high_iv_boosts"],
+        candidates["low_iv_boosts"],
+        np.ones_like(candidates["high_iv_boosts"]),
+    ], axis=1)
+    boosts = table[:, sample.iv_regime, :]
+    gravity = ReversalService.liquidity_gravity(
+        sample.liquidity_ratio, candidates["gravity_slope"][:, None], candidates["gravity_cap"][:, None]
+    )
+    adjustment = ReversalService.greek_adjustment(
+        sample.effects,
+        (weights[:, 0, None], weights[:, 1, None], weights[:, 2, None]),
+        multiplier,
+        (boosts[..., 0], boosts[..., 1], boosts[..., 2]),
+        gravity
+    )
+    return ReversalService.bounded_reversal(sample.strikes, adjustment, sample.max_adjustment)
+
+
+def sample_loss(reversals: np.ndarray, sample: CalibrationSample) -> np.ndarray:
+    """
+    Support/resistance error per candidate, in basis points of spot.
+
+    The nearest reversal level above spot is scored against the realized
+    high and the nearest one below against the realized low; a side
+    without a level falls back to the extreme level on the other side.
+    """
+    above = reversals > sample.spot
+    resistance = np.where(above, reversals, np.inf).min(axis=1)
+    support = np.where(above, -np.inf, reversals).max(axis=1)
+    resistance = np.where(np.isinf(resistance), reversals.max(axis=1), resistance)
+    support = np.where(np.isinf(support), reversals.min(axis=1), support)
+    error = np.abs(resistance - sample.realized_high) + np.abs(support - sample.realized_low)
+    return error / 2 / sample.spot * 1e4
+
+
+def evaluate_candidates(
+    candidates: Dict[str, np.ndarray],
+    samples: Sequence[CalibrationSample]
+) -> np.ndarray:
+    """Loss of every candidate on every sample, (candidates, samples)"""
+    n_candidates = len(candidates["gravity_cap"])
+    losses = np.empty((n_candidates, len(samples)))
+    for j, sample in enumerate(samples):
+        losses[:, j] = sample_loss(candidate_reversals(candidates, sample), sample)
+    return losses
+
+
+# Samples of a pool worker, sent once through the pool initializer
+_worker_samples: Sequence[CalibrationSample] = ()
+
+
+def _init_worker(samples: Sequence[CalibrationSample]) -> None:
+    global _worker_samples
+    _worker_samples = samples
+
+
+def _evaluate_chunk(candidates: Dict[str, np.ndarray]) -> np.ndarray:
+    return evaluate_candidates(candidates, _worker_samples)
+
+
+def evaluate_parallel(
+    candidates: Dict[str, np.ndarray],
+    samples: Sequence[CalibrationSample],
+    workers: int = 1,
+    chunk_size: int = 256
+) -> np.ndarray:
+    """evaluate_candidates with candidate chunks spread over worker processes"""
+    n_candidates = len(candidates["gravity_cap"])
+    if workers <= 1 or n_candidates <= chunk_size:
+        return evaluate_candidates(candidates, samples)
+
+    chunks = [
+        {name: arr[start:start + chunk_size] for name, arr in candidates.items()}
+        for start in range(0, n_candidates, chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(samples,)) as pool:
+        return np.concatenate(list(pool.map(_evaluate_chunk, chunks)))
+
+
+# ============== Walk-forward ==============
+
+def walk_forward(losses: np.ndarray, n_folds: int = 4) -> List[Dict[str, Any]]:
+    """
+    Expanding-window walk-forward over time-ordered samples.
+
+    The samples are cut into n_folds + 1 consecutive blocks; fold k picks
+    the candidate with the lowest mean loss on blocks [0, k] and scores it
+    on block k + 1, next to the default weights (candidate 0).
+    """
+    blocks = np.array_split(np.arange(losses.shape[1]), n_folds + 1)
+    folds = []
+    for k in range(1, len(blocks)):
+        train = np.concatenate(blocks[:k])
+        test = blocks[k]
+        if not train.size or not test.size:
+            continue
+        best = int(np.argmin(losses[:, train].mean(axis=1)))
+        folds.append({
+            "train_samples": int(train.size),
+            "test_samples": int(test.size),
+            "candidate": best,
+            "train_loss_bps": round(float(losses[best, train].mean()), 4),
+            "test_loss_bps": round(float(losses[best, test].mean()), 4),
+            "default_test_loss_bps": round(float(losses[0, test].mean()), 4),
+        })
+    return folds
+
+
+def _version(params: ReversalParams, created: datetime) -> str:
+    """Timestamp plus a digest of the weights, e.g. 20260105T101500Z-3f2a9c1d"""
+    weights = {k: v for k, v in params.to_dict().items() if k not in ("version", "metadata")}
+    digest = hashlib.sha1(json.dumps(weights, sort_keys=True).encode()).hexdigest()[:8]
+    return f"{created:%Y%m%dT%H%M%SZ}-{digest}"
+
+
+def calibrate(
+    samples: Sequence[CalibrationSample],
+    n_candidates: int = 2000,
+    spread: float = 0.25,
+    seed: int = 0,
+    n_folds: int = 4,
+    workers: int = 1,
+    chunk_size: int = 256,
+    base: ReversalParams = DEFAULT_REVERSAL_PARAMS
+) -> ReversalParams:
+    """
+    Search reversal weights on the samples.
+
+    Every candidate is scored on every sample once; the walk-forward folds
+    and the final pick (lowest mean loss over all samples) reuse that loss
+    matrix. The returned set carries a fresh version and the calibration
+    report in its metadata.
+    """
+    if not samples:
+        raise ValueError("No calibration samples")
+
+    candidates = sample_candidates(n_candidates, base=base, spread=spread, seed=seed)
+    losses = evaluate_parallel(candidates, samples, workers=workers, chunk_size=chunk_size)
+    mean_loss = losses.mean(axis=1)
+    best = int(np.argmin(mean_loss))
+    folds = walk_forward(losses, n_folds)
+
+    created = datetime.now(timezone.utc)
+    params = arrays_to_params(candidates, best)
+    metadata = {
+        "created_at": created.isoformat(),
+        "base_version": base.version,
+        "samples": len(samples),
+        "window": [samples[0].timestamp.isoformat(), samples[-1].timestamp.isoformat()],
+        "candidates": n_candidates,
+        "spread": spread,
+        "seed": seed,
+        "loss_bps": round(float(mean_loss[best]), 4),
+        "default_loss_bps": round(float(mean_loss[0]), 4),
+        "walk_forward": folds,
+    }
+    if folds:
+        metadata["walk_forward_test_loss_bps"] = round(
+            float(np.mean([fold["test_loss_bps"] for fold in folds])), 4
+        )
+        metadata["walk_forward_default_loss_bps"] = round(
+            float(np.mean([fold["default_test_loss_bps"] for fold in folds])), 4
+        )
+    logger.info(
+        f"Reversal calibration: {len(samples)} samples, {n_candidates} candidates, "
+        f"loss {mean_loss[best]:.2f} bps (default {mean_loss[0]:.2f} bps)"
+    )
+    return arrays_to_params(candidates, best, version=_version(params, created), metadata=metadata)
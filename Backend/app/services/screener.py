@@ -8,6 +8,8 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 from app.services.dhan_client import DhanClient
 from app.services.options import OptionsService
 from app.cache.redis import RedisCache
@@ -21,7 +23,7 @@ class ScreenerType(str, Enum):
     SUPPORT_RESISTANCE = "sr"
 
 
-@dataclass
+@dataclass(slots=True)
 class ScreenerResult:
     """Single screener result/signal"""
     symbol: str
@@ -35,6 +37,22 @@ class ScreenerResult:
     stop_loss: float
     timestamp: datetime
     metrics: Dict[str, Any]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Response payload, timestamp as ISO string"""
+        return {
+            "symbol": self.symbol,
+            "strike": self.strike,
+            "option_type": self.option_type,
+            "signal": self.signal,
+            "strength": self.strength,
+            "reason": self.reason,
+            "entry_price": self.entry_price,
+            "target_price": self.target_price,
+            "stop_loss": self.stop_loss,
+            "timestamp": self.timestamp.isoformat(),
+            "metrics": self.metrics,
+        }
 
 
 class ScreenerService:
@@ -77,76 +95,65 @@ class ScreenerService:
             return self._generate_mock_scalp_results(symbol)
         
         try:
-            live_data = await self.options_service.get_live_data(
-                symbol=symbol,
-                expiry=expiry,
-                include_greeks=True,
-                include_reversal=False
-            )
+            frame = await self.options_service.get_chain_frame(symbol=symbol, expiry=expiry)
             
-            if not live_data:
+            if frame is None:
                 return results
             
-            oc_data = live_data.get("oc", {})
-            atm = live_data.get("atm_strike", 0)
-            spot = live_data.get("spot", {}).get("ltp", 0)
+            n = len(frame)
+            atm = frame.atm_strike()
+            oi, oi_change = frame.legs["OI"], frame.legs["oichng"]
+            volume, ltp = frame.legs["vol"], frame.legs["ltp"]
             
-            for strike_key, strike_data in oc_data.items():
-                try:
-                    strike = float(strike_key)
-                except:
-                    continue
+            # OI change against the previous day's OI
+            prev_oi = (oi - oi_change).astype(np.float64)
+            oi_change_pct = np.divide(
+                oi_change, prev_oi, out=np.zeros_like(prev_oi), where=prev_oi > 0
+            ) * 100
+            
+            # Quoted legs near ATM with a large OI move on volume
+            candidates = (
+                frame.present
+                & (np.abs(frame.leg_strikes() - atm) <= atm * 0.05)
+                & (oi != 0) & (ltp != 0)
+                & (np.abs(oi_change_pct) >= min_oi_change_pct)
+                & (volume >= min_volume)
+            )
+            rows = np.flatnonzero(candidates)
+            
+            for row, strike, leg_oi, chng, pct, vol, price, iv in zip(
+                rows.tolist(), frame.leg_strikes()[rows].tolist(), oi[rows].tolist(),
+                oi_change[rows].tolist(), oi_change_pct[rows].tolist(), volume[rows].tolist(),
+                ltp[rows].tolist(), frame.legs["iv"][rows].tolist()
+            ):
+                side = "CE" if row < n else "PE"
+                # Determine signal direction
+                if side == "CE":
+                    signal = "BUY" if chng > 0 else "SELL"
+                else:
+                    signal = "BUY" if chng < 0 else "SELL"
                 
-                # Skip far OTM strikes
-                if abs(strike - atm) > atm * 0.05:
-                    continue
+                strength = min(100, abs(pct) * 2 + (vol / 10000))
                 
-                for side, opt in [("CE", strike_data.get("ce", {})), ("PE", strike_data.get("pe", {}))]:
-                    if not opt:
-                        continue
-                    
-                    oi = opt.get("OI", opt.get("oi", 0)) or 0
-                    oi_change = opt.get("oichng", 0) or 0
-                    volume = opt.get("volume", opt.get("vol", 0)) or 0
-                    ltp = opt.get("ltp", 0) or 0
-                    iv = opt.get("iv", 0) or 0
-                    
-                    if oi == 0 or ltp == 0:
-                        continue
-                    
-                    # Calculate OI change percentage
-                    prev_oi = oi - oi_change
-                    oi_change_pct = (oi_change / prev_oi * 100) if prev_oi > 0 else 0
-                    
-                    # Scalp signal logic
-                    if abs(oi_change_pct) >= min_oi_change_pct and volume >= min_volume:
-                        # Determine signal direction
-                        if side == "CE":
-                            signal = "BUY" if oi_change > 0 else "SELL"
-                        else:
-                            signal = "BUY" if oi_change < 0 else "SELL"
-                        
-                        strength = min(100, abs(oi_change_pct) * 2 + (volume / 10000))
-                        
-                        results.append(ScreenerResult(
-                            symbol=symbol,
-                            strike=strike,
-                            option_type=side,
-                            signal=signal,
-                            strength=round(strength, 1),
-                            reason=f"OI Change: {oi_change_pct:+.1f}%, Vol: {volume}",
-                            entry_price=ltp,
-                            target_price=ltp * 1.05 if signal == "BUY" else ltp * 0.95,
-                            stop_loss=ltp * 0.97 if signal == "BUY" else ltp * 1.03,
-                            timestamp=datetime.now(),
-                            metrics={
-                                "oi": oi,
-                                "oi_change": oi_change,
-                                "oi_change_pct": round(oi_change_pct, 2),
-                                "volume": volume,
-                                "iv": iv,
-                            }
-                        ))
+                results.append(ScreenerResult(
+                    symbol=symbol,
+                    strike=strike,
+                    option_type=side,
+                    signal=signal,
+                    strength=round(strength, 1),
+                    reason=f"OI Change: {pct:+.1f}%, Vol: {vol}",
+                    entry_price=price,
+                    target_price=price * 1.05 if signal == "BUY" else price * 0.95,
+                    stop_loss=price * 0.97 if signal == "BUY" else price * 1.03,
+                    timestamp=datetime.now(),
+                    metrics={
+                        "oi": leg_oi,
+                        "oi_change": chng,
+                        "oi_change_pct": round(pct, 2),
+                        "volume": vol,
+                        "iv": iv,
+                    }
+                ))
             
             # Sort by strength
             results.sort(key=lambda x: x.strength, reverse=True)
@@ -176,61 +183,56 @@ class ScreenerService:
             return self._generate_mock_positional_results(symbol)
         
         try:
-            live_data = await self.options_service.get_live_data(
+            frame = await self.options_service.get_chain_frame(
                 symbol=symbol,
                 expiry=expiry,
                 include_greeks=True,
-                include_reversal=False
+                greeks_level="first"
             )
             
-            if not live_data:
+            if frame is None:
                 return results
             
-            oc_data = live_data.get("oc", {})
-            atm = live_data.get("atm_strike", 0)
+            n = len(frame)
+            oi, oi_change, ltp = frame.legs["OI"], frame.legs["oichng"], frame.legs["ltp"]
+            if frame.greeks is not None:
+                delta, theta = np.abs(frame.greeks["delta"]), frame.greeks["theta"]
+            else:
+                delta = theta = np.zeros(2 * n)
             
-            for strike_key, strike_data in oc_data.items():
-                try:
-                    strike = float(strike_key)
-                except:
-                    continue
+            # Fresh OI buildup on legs with meaningful delta
+            candidates = (
+                frame.present
+                & (oi >= min_oi_buildup) & (ltp != 0)
+                & (oi_change > 0) & (delta > 0.25)
+            )
+            rows = np.flatnonzero(candidates)
+            
+            for row, strike, leg_oi, chng, price, d, th in zip(
+                rows.tolist(), frame.leg_strikes()[rows].tolist(), oi[rows].tolist(),
+                oi_change[rows].tolist(), ltp[rows].tolist(),
+                delta[rows].tolist(), theta[rows].tolist()
+            ):
+                strength = min(100, (leg_oi / 100000) * 10 + d * 50)
                 
-                for side, opt in [("CE", strike_data.get("ce", {})), ("PE", strike_data.get("pe", {}))]:
-                    if not opt:
-                        continue
-                    
-                    oi = opt.get("OI", opt.get("oi", 0)) or 0
-                    oi_change = opt.get("oichng", 0) or 0
-                    ltp = opt.get("ltp", 0) or 0
-                    delta = abs(opt.get("delta", 0) or 0)
-                    theta = opt.get("theta", 0) or 0
-                    
-                    if oi < min_oi_buildup or ltp == 0:
-                        continue
-                    
-                    # Check for fresh OI buildup
-                    if oi_change > 0 and delta > 0.25:
-                        signal = "BUY"
-                        strength = min(100, (oi / 100000) * 10 + delta * 50)
-                        
-                        results.append(ScreenerResult(
-                            symbol=symbol,
-                            strike=strike,
-                            option_type=side,
-                            signal=signal,
-                            strength=round(strength, 1),
-                            reason=f"OI Buildup: {oi:,}, Delta: {delta:.2f}",
-                            entry_price=ltp,
-                            target_price=ltp * 1.15,
-                            stop_loss=ltp * 0.90,
-                            timestamp=datetime.now(),
-                            metrics={
-                                "oi": oi,
-                                "oi_change": oi_change,
-                                "delta": delta,
-                                "theta": theta,
-                            }
-                        ))
+                results.append(ScreenerResult(
+                    symbol=symbol,
+                    strike=strike,
+                    option_type="CE" if row < n else "PE",
+                    signal="BUY",
+                    strength=round(strength, 1),
+                    reason=f"OI Buildup: {leg_oi:,}, Delta: {d:.2f}",
+                    entry_price=price,
+                    target_price=price * 1.15,
+                    stop_loss=price * 0.90,
+                    timestamp=datetime.now(),
+                    metrics={
+                        "oi": leg_oi,
+                        "oi_change": chng,
+                        "delta": d,
+                        "theta": th,
+                    }
+                ))
             
             results.sort(key=lambda x: x.strength, reverse=True)
             return results[:10]
@@ -255,61 +257,34 @@ class ScreenerService:
             return self._generate_mock_sr_results(symbol)
         
         try:
-            live_data = await self.options_service.get_live_data(
-                symbol=symbol,
-                expiry=expiry,
-                include_greeks=True,
-                include_reversal=False
-            )
+            frame = await self.options_service.get_chain_frame(symbol=symbol, expiry=expiry)
             
-            if not live_data:
+            if frame is None:
                 return results
             
-            oc_data = live_data.get("oc", {})
-            atm = live_data.get("atm_strike", 0)
-            spot = live_data.get("spot", {}).get("ltp", 0)
-            max_pain = live_data.get("max_pain_strike", atm)
+            n = len(frame)
+            spot = frame.spot
+            ce_oi, pe_oi = frame.ce("OI"), frame.pe("OI")
             
-            # Find high OI levels (potential S/R)
-            oi_levels = []
-            for strike_key, strike_data in oc_data.items():
-                try:
-                    strike = float(strike_key)
-                except:
-                    continue
-                
-                ce_oi = strike_data.get("ce", {}).get("OI", 0) or 0
-                pe_oi = strike_data.get("pe", {}).get("OI", 0) or 0
-                total_oi = ce_oi + pe_oi
-                
-                oi_levels.append({
-                    "strike": strike,
-                    "ce_oi": ce_oi,
-                    "pe_oi": pe_oi,
-                    "total_oi": total_oi,
-                    "type": "RESISTANCE" if strike > spot else "SUPPORT"
-                })
+            # Top OI levels (potential S/R)
+            top_levels = np.argsort(-(ce_oi + pe_oi), kind="stable")[:5].tolist()
             
-            # Get top OI levels
-            oi_levels.sort(key=lambda x: x["total_oi"], reverse=True)
-            top_levels = oi_levels[:5]
-            
-            for level in top_levels:
-                strike = level["strike"]
-                sr_type = level["type"]
-                
-                # Find option at this strike
-                strike_data = oc_data.get(str(int(strike)), {})
+            for i in top_levels:
+                strike = float(frame.strikes[i])
+                level = {
+                    "ce_oi": ce_oi[i].item(),
+                    "pe_oi": pe_oi[i].item(),
+                    "total_oi": (ce_oi[i] + pe_oi[i]).item(),
+                }
+                sr_type = "RESISTANCE" if strike > spot else "SUPPORT"
                 
                 # For support, buy PE; for resistance, buy CE
                 if sr_type == "SUPPORT":
-                    opt = strike_data.get("pe", {})
-                    opt_type = "PE"
+                    row, opt_type = n + i, "PE"
                 else:
-                    opt = strike_data.get("ce", {})
-                    opt_type = "CE"
+                    row, opt_type = i, "CE"
                 
-                ltp = opt.get("ltp", 0) or 0
+                ltp = frame.legs["ltp"][row].item()
                 if ltp == 0:
                     continue
                 
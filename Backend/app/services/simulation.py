@@ -0,0 +1,338 @@
+"""
+Simulation Service
+Monte Carlo price paths (GBM, optionally with Merton jumps) for
+probability-of-touch, percentile cones and position probability of profit.
+"""
+import math
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.metrics import increment_counter
+from app.services.bsm import BSMService
+from app.services.strategy import StrategyLeg
+
+logger = logging.getLogger(__name__)
+
+
+# Percentiles reported in cones unless others are requested
+DEFAULT_PERCENTILES = (5, 16, 25, 50, 75, 84, 95)
+
+
+@dataclass(frozen=True)
+class JumpParams:
+    """Merton jump-diffusion parameters"""
+    intensity: float  # Expected jumps per year
+    mean: float  # Mean log jump size
+    vol: float  # Std dev of the log jump size
+
+    @property
+    def compensator(self) -> float:
+        """Expected relative jump, E[e^J] - 1, removed from the drift"""
+        return math.exp(self.mean + 0.5 * self.vol ** 2) - 1
+
+
+@dataclass
+class PathSet:
+    """Simulated prices for one chain snapshot"""
+    spot: float
+    sigma: float  # Annual, as decimal
+    T_days: float
+    rate: float
+    dividend_yield: float
+    jumps: Optional[JumpParams]
+    seed: int
+    n_steps: int
+    generate_ms: float
+    # Day offsets of the cone columns: 0, 1, ..., then T_days itself
+    days: np.ndarray = field(repr=False)
+    # Prices at each day offset, (days, paths)
+    day_prices: np.ndarray = field(repr=False)
+    # Highest and lowest price each path reached, monitored every step
+    path_max: np.ndarray = field(repr=False)
+    path_min: np.ndarray = field(repr=False)
+
+    @property
+    def terminal(self) -> np.ndarray:
+        return self.day_prices[-1]
+
+    @property
+    def n_paths(self) -> int:
+        return self.day_prices.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the price arrays"""
+        return self.day_prices.nbytes + self.path_max.nbytes + self.path_min.nbytes
+
+    def to_dict(self) -> Dict:
+        return {
+            "spot": self.spot,
+            "sigma": round(self.sigma, 6),
+            "days_to_expiry": round(self.T_days, 4),
+            "rate": self.rate,
+            "dividend_yield": self.dividend_yield,
+            "jumps": vars(self.jumps) if self.jumps else None,
+            "seed": self.seed,
+            "paths": self.n_paths,
+            "steps": self.n_steps,
+            "generate_ms": round(self.generate_ms, 3),
+        }
+
+
+class SimulationService:
+    """
+    Risk-neutral Monte Carlo over a chain snapshot.
+
+    Paths are generated in one vectorized pass (antithetic normals, log
+    increments cumulated along the time axis) and only their daily prices
+    and running extremes are kept. Path sets are cached by snapshot inputs
+    and seed, so repeat queries against the same spot/IV/expiry only redo
+    the statistics. The cache is bounded by the bytes its path sets hold
+    (a long-dated set is far larger than a weekly one) and is safe to use
+    from worker threads.
+    """
+
+    def __init__(
+        self,
+        n_paths: int = 10000,
+        steps_per_day: int = 8,
+        max_steps: int = 256,
+        cache_max_bytes: int = 128 * 1024 * 1024,
+        seed: int = 42
+    ):
+        """
+        Args:
+            n_paths: Paths per set (rounded up to even for antithetics)
+            steps_per_day: Monitoring steps per day, for touch detection
+            max_steps: Cap on steps per path for long expiries
+            cache_max_bytes: Memory budget for cached path sets (least recently
+                used evicted; the newest set is always kept)
+            seed: Default random seed
+        """
+        self.n_paths = n_paths + n_paths % 2
+        self.steps_per_day = steps_per_day
+        self.max_steps = max_steps
+        self.cache_max_bytes = cache_max_bytes
+        self.seed = seed
+        self.bsm = BSMService()
+        self._cache: "OrderedDict[Tuple, PathSet]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"generated": 0, "reused": 0}
+
+    # ============== Paths ==============
+
+    def simulate(
+        self,
+        spot: float,
+        sigma: float,
+        T_days: float,
+        risk_free_rate: float,
+        dividend_yield: float = 0.0,
+        jumps: Optional[JumpParams] = None,
+        seed: Optional[int] = None
+    ) -> PathSet:
+        """
+        Cached or freshly generated paths for a snapshot.
+
+        Args:
+            spot: Current spot (or pricing spot) price
+            sigma: Annual volatility (decimal), typically the ATM IV
+            T_days: Days to expiry (fractional)
+            risk_free_rate: Annual risk-free rate (decimal)
+            dividend_yield: Continuous dividend yield (decimal)
+            jumps: Merton jump parameters; pure GBM if None
+            seed: Random seed (None = service default)
+        """
+        if spot <= 0 or sigma <= 0 or T_days <= 0:
+            raise ValueError("Spot, volatility and days to expiry must be positive")
+
+        seed = self.seed if seed is None else seed
+        key = (
+            round(spot, 4), round(sigma, 6), round(T_days, 6),
+            round(risk_free_rate, 6), round(dividend_yield, 6), jumps, seed, self.n_paths
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._record("reused")
+                return cached
+
+        # Generated outside the lock so other snapshots are not held up
+        paths = self._generate(spot, sigma, T_days, risk_free_rate, dividend_yield, jumps, seed)
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cache_bytes -= previous.nbytes
+            self._cache[key] = paths
+            self._cache_bytes += paths.nbytes
+            while self._cache_bytes > self.cache_max_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.nbytes
+            self._record("generated")
+        return paths
+
+    def _generate(
+        self,
+        spot: float,
+        sigma: float,
+        T_days: float,
+        rate: float,
+        dividend_yield: float,
+        jumps: Optional[JumpParams],
+        seed: int
+    ) -> PathSet:
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        n_steps = int(min(self.max_steps, max(1, math.ceil(T_days * self.steps_per_day))))
+        dt = T_days / 365 / n_steps
+
+        half = rng.standard_normal((self.n_paths // 2, n_steps))
+        shocks = np.concatenate([half, -half])
+
+        drift = rate - dividend_yield - 0.5 * sigma ** 2
+        if jumps is not None:
+            drift -= jumps.intensity * jumps.compensator
+        log_paths = drift * dt + sigma * math.sqrt(dt) * shocks
+        if jumps is not None:
+            counts = rng.poisson(jumps.intensity * dt, size=log_paths.shape)
+            log_paths += counts * jumps.mean + np.sqrt(counts) * jumps.vol * rng.standard_normal(log_paths.shape)
+        np.cumsum(log_paths, axis=1, out=log_paths)
+
+        days = np.append(np.arange(math.ceil(T_days)), T_days)
+        columns = np.rint(days / T_days * n_steps).astype(np.int64)
+        # Column 0 is the start of the path, before the first step
+        day_log = np.where(columns[:, None] > 0, log_paths[:, np.maximum(columns - 1, 0)].T, 0.0)
+
+        return PathSet(
+            spot=spot,
+            sigma=sigma,
+            T_days=T_days,
+            rate=rate,
+            dividend_yield=dividend_yield,
+            jumps=jumps,
+            seed=seed,
+            n_steps=n_steps,
+            generate_ms=(time.perf_counter() - start) * 1000,
+            days=days,
+            day_prices=spot * np.exp(day_log),
+            path_max=spot * np.exp(np.maximum(log_paths.max(axis=1), 0.0)),
+            path_min=spot * np.exp(np.minimum(log_paths.min(axis=1), 0.0)),
+        )
+
+    def _record(self, result: str) -> None:
+        self.stats[result] += 1
+        increment_counter("simulation_path_sets_total", {"result": result})
+
+    def clear(self) -> None:
+        """Drop all cached path sets"""
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    # ============== Statistics ==============
+
+    @staticmethod
+    def touch_probabilities(paths: PathSet, strikes: Sequence[float]) -> Dict[str, np.ndarray]:
+        """
+        Chance of trading through each strike before expiry.
+
+        Strikes above spot are touched when a path's high reaches them,
+        strikes below when its low does. Touches are detected at the
+        simulation steps, so intrastep touches are missed and the
+        probabilities lean slightly low.
+
+        Returns:
+            'touch' and 'expire_beyond' (finishing past the strike on the
+            same side), both as probabilities per strike
+        """
+        strikes = np.asarray(strikes, dtype=np.float64)
+        above = strikes >= paths.spot
+        highs = np.sort(paths.path_max)
+        lows = np.sort(paths.path_min)
+        terminal = np.sort(paths.terminal)
+        n = paths.n_paths
+
+        # Sorted extremes turn each strike's count into one binary search
+        touch_up = 1 - np.searchsorted(highs, strikes, side="left") / n
+        touch_down = np.searchsorted(lows, strikes, side="right") / n
+        finish_up = 1 - np.searchsorted(terminal, strikes, side="left") / n
+        finish_down = np.searchsorted(terminal, strikes, side="right") / n
+        return {
+            "touch": np.where(above, touch_up, touch_down),
+            "expire_beyond": np.where(above, finish_up, finish_down),
+        }
+
+    @staticmethod
+    def percentile_cones(
+        paths: PathSet,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, np.ndarray]:
+        """Price percentiles at each day offset, keyed 'p<percentile>'"""
+        bands = np.percentile(paths.day_prices, percentiles, axis=1)
+        return {f"p{q:g}": band for q, band in zip(percentiles, bands)}
+
+    def probability_of_profit(
+        self,
+        paths: PathSet,
+        legs: Sequence[StrategyLeg]
+    ) -> Dict:
+        """
+        P&L distribution of a position at the path set's expiry.
+
+        Legs expiring then settle at intrinsic value; later legs are marked
+        with Black-Scholes at their remaining time. Legs without a premium
+        are entered at their theoretical value now.
+
+        Returns:
+            Probability of profit, expected P&L and P&L percentiles
+        """
+        if not legs:
+            raise ValueError("Position needs at least one leg")
+
+        horizon = paths.T_days / 365
+        K = np.array([leg.strike for leg in legs], dtype=np.float64)[:, None]
+        T = np.array([leg.time_to_expiry for leg in legs], dtype=np.float64)[:, None]
+        sigma = np.array([leg.volatility for leg in legs], dtype=np.float64)[:, None]
+        is_call = np.array([leg.option_type == "CE" for leg in legs])[:, None]
+        position = np.array(
+            [leg.quantity * (1 if leg.side == "buy" else -1) for leg in legs], dtype=np.float64
+        )[:, None]
+        # A day's slack for clients rounding the expiry to whole days
+        if np.any(T < horizon - 1 / 365):
+            raise ValueError("Legs must not expire before the simulated horizon")
+
+        theoretical, _ = self.bsm.price_array(
+            paths.spot, K, T, sigma, is_call, r=paths.rate, q=paths.dividend_yield
+        )
+        entry = np.array(
+            [leg.premium if leg.premium is not None else theoretical[i, 0] for i, leg in enumerate(legs)],
+            dtype=np.float64
+        )[:, None]
+
+        S = paths.terminal[None, :]
+        remaining = T - horizon
+        live = remaining > 1e-9
+        marked, _ = self.bsm.price_array(
+            S, K, np.where(live, remaining, 1.0), sigma, is_call,
+            r=paths.rate, q=paths.dividend_yield
+        )
+        intrinsic = np.maximum(np.where(is_call, S - K, K - S), 0.0)
+        pnl = ((np.where(live, marked, intrinsic) - entry) * position).sum(axis=0)
+
+        return {
+            "pop": float(np.mean(pnl > 0)),
+            "expected_pnl": float(pnl.mean()),
+            "pnl_percentiles": dict(zip(
+                (f"p{q:g}" for q in DEFAULT_PERCENTILES),
+                np.percentile(pnl, DEFAULT_PERCENTILES).tolist()
+            )),
+            "net_premium": float(-np.sum(entry * position)),
+        }
@@ -0,0 +1,312 @@
+"""
+Strategy Service
+Payoff, theoretical P&L and aggregate Greeks for multi-leg option
+strategies (spreads, straddles, condors, calendars, ...).
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.services.bsm import BSMService
+from app.services.calculators import CalculatorService
+
+logger = logging.getLogger(__name__)
+
+
+# Aggregate Greeks reported for a strategy
+STRATEGY_GREEKS = ("delta", "gamma", "theta", "vega", "rho")
+
+# SPAN-style risk array: (price move in price scan ranges, vol move in vol
+# scan ranges, fraction of the loss covered). The last two are the extreme
+# moves, of which only 35% of the loss counts.
+SPAN_SCENARIOS: Tuple[Tuple[float, float, float], ...] = (
+    (0, 1, 1.0), (0, -1, 1.0),
+    (1 / 3, 1, 1.0), (1 / 3, -1, 1.0), (-1 / 3, 1, 1.0), (-1 / 3, -1, 1.0),
+    (2 / 3, 1, 1.0), (2 / 3, -1, 1.0), (-2 / 3, 1, 1.0), (-2 / 3, -1, 1.0),
+    (1, 1, 1.0), (1, -1, 1.0), (-1, 1, 1.0), (-1, -1, 1.0),
+    (2, 0, 0.35), (-2, 0, 0.35),
+)
+
+
+@dataclass
+class StrategyLeg:
+    """One option leg of a strategy"""
+    strike: float
+    option_type: str  # "CE" or "PE"
+    side: str  # "buy" or "sell"
+    quantity: int
+    time_to_expiry: float  # In years
+    volatility: float  # Annual, as decimal
+    premium: Optional[float] = None  # Entry price; theoretical value if None
+
+
+class StrategyService:
+    """
+    Multi-leg strategy analysis.
+
+    Every leg is valued at every point of a spot grid in one broadcast
+    (legs x prices) Black-Scholes pass, for both the payoff at the nearest
+    expiry and the theoretical P&L now.
+    """
+
+    def __init__(self):
+        self.bsm = BSMService()
+        self.calculator = CalculatorService()
+
+    def analyze(
+        self,
+        legs: Sequence[StrategyLeg],
+        spot: float,
+        risk_free_rate: float,
+        dividend_yield: float = 0.0,
+        range_pct: float = 10.0,
+        points: int = 201,
+        days_forward: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Payoff and P&L curves plus aggregate Greeks for a strategy.
+
+        Args:
+            legs: Strategy legs
+            spot: Current spot price
+            risk_free_rate: Annual risk-free rate (decimal)
+            dividend_yield: Continuous dividend yield (decimal)
+            range_pct: Price grid spans spot ± this percent
+            points: Number of grid points
+            days_forward: Evaluate the theoretical P&L curve this many days
+                from now (0 = today)
+
+        Returns:
+            Dict with the price grid, 'payoff_at_expiry' (nearest expiry;
+            later legs are marked at their remaining time value),
+            'pnl_theoretical', position Greeks at spot, net premium,
+            breakevens and max profit/loss
+        """
+        if not legs:
+            raise ValueError("Strategy needs at least one leg")
+        if spot <= 0:
+            raise ValueError("Spot must be positive")
+
+        # Legs on axis 0, price grid on axis 1
+        K = np.array([leg.strike for leg in legs], dtype=np.float64)[:, None]
+        T = np.array([leg.time_to_expiry for leg in legs], dtype=np.float64)[:, None]
+        sigma = np.array([leg.volatility for leg in legs], dtype=np.float64)[:, None]
+        is_call = np.array([leg.option_type == "CE" for leg in legs])[:, None]
+        position = np.array(
+            [leg.quantity * (1 if leg.side == "buy" else -1) for leg in legs], dtype=np.float64
+        )[:, None]
+        prices = np.linspace(spot * (1 - range_pct / 100), spot * (1 + range_pct / 100), points)
+        S = np.maximum(prices, 1e-9)[None, :]
+
+        # Greeks (and theoretical entry prices) at the current spot
+        at_spot = self.calculator.calculate_option_price_batch(
+            spot, K[:, 0], T[:, 0], risk_free_rate, sigma[:, 0], dividend_yield
+        )
+        calls = is_call[:, 0]
+        theoretical = np.where(calls, at_spot["call_price"], at_spot["put_price"])
+        entry = np.array(
+            [leg.premium if leg.premium is not None else theoretical[i] for i, leg in enumerate(legs)],
+            dtype=np.float64
+        )[:, None]
+
+        leg_greeks = {
+            "delta": np.where(calls, at_spot["call_delta"], at_spot["put_delta"]),
+            "gamma": at_spot["gamma"],
+            "theta": np.where(calls, at_spot["call_theta"], at_spot["put_theta"]),
+            "vega": at_spot["vega"],
+            "rho": np.where(calls, at_spot["call_rho"], at_spot["put_rho"]),
+        }
+        greeks = {
+            name: round(float(np.sum(leg_greeks[name] * position[:, 0])), 4)
+            for name in STRATEGY_GREEKS
+        }
+
+        first_expiry = float(T.min())
+        at_expiry = self._leg_values(
+            S, K, T - first_expiry, sigma, is_call, risk_free_rate, dividend_yield
+        )
+        now = self._leg_values(
+            S, K, T - days_forward / 365, sigma, is_call, risk_free_rate, dividend_yield
+        )
+        payoff = ((at_expiry - entry) * position).sum(axis=0)
+        pnl = ((now - entry) * position).sum(axis=0)
+
+        # The expiry payoff is piecewise linear with kinks at the strikes, so
+        # its extremes below the top strike lie at S=0, a strike or the grid
+        kinks = np.maximum(np.append(0.0, K[:, 0]), 1e-9)[None, :]
+        kink_payoff = ((
+            self._leg_values(kinks, K, T - first_expiry, sigma, is_call, risk_free_rate, dividend_yield)
+            - entry
+        ) * position).sum(axis=0)
+        extremes = np.concatenate([payoff, kink_payoff])
+
+        # Far above the grid every call's value grows one-for-one with spot
+        upside_slope = float(np.sum(position[calls]))
+        max_profit: Union[float, str] = round(float(extremes.max()), 2)
+        max_loss: Union[float, str] = round(float(extremes.min()), 2)
+        if upside_slope > 0:
+            max_profit = "Unlimited"
+        elif upside_slope < 0:
+            max_loss = "Unlimited"
+
+        return {
+            "spot": spot,
+            "prices": np.round(prices, 2).tolist(),
+            "payoff_at_expiry": np.round(payoff, 2).tolist(),
+            "pnl_theoretical": np.round(pnl, 2).tolist(),
+            "greeks": greeks,
+            "net_premium": round(float(-np.sum(entry * position)), 2),
+            "breakevens": self._breakevens(prices, payoff),
+            "max_profit": max_profit,
+            "max_loss": max_loss,
+            "days_to_first_expiry": round(first_expiry * 365, 4),
+        }
+
+    def portfolio_margin(
+        self,
+        legs: Sequence[StrategyLeg],
+        spot: float,
+        risk_free_rate: float,
+        dividend_yield: float = 0.0,
+        price_scan_pct: float = 6.0,
+        vol_scan_pct: float = 4.0,
+        short_option_min_pct: float = 3.0,
+        exposure_pct: float = 2.0,
+        scenarios: Optional[Sequence[Tuple[float, float, float]]] = None
+    ) -> Dict[str, Any]:
+        """
+        SPAN-style margin for a portfolio of option legs on one underlying.
+        
+        Every leg is repriced under every scenario of the risk array in one
+        (legs x scenarios) pass. The scan risk is the worst covered
+        portfolio loss; scanning the legs together credits their offsets
+        against each other, reported as the difference from the sum of each
+        leg's standalone scan risk.
+        
+        Args:
+            legs: Portfolio legs (premium, if given, is the traded price)
+            spot: Current spot price
+            risk_free_rate: Annual risk-free rate (decimal)
+            dividend_yield: Continuous dividend yield (decimal)
+            price_scan_pct: Price scan range, percent of spot
+            vol_scan_pct: Volatility scan range, in vol points
+            short_option_min_pct: Short option minimum charge per net short
+                unit (shorts less longs of the same type), percent of spot
+            exposure_pct: Exposure margin per short unit, percent of spot
+            scenarios: Risk array rows (price moves, vol moves, cover);
+                defaults to the 16 SPAN_SCENARIOS
+            
+        Returns:
+            Dict with total/SPAN/exposure margin, scan risk, offset credit,
+            premiums, the worst scenario and the P&L of every scenario
+        """
+        if not legs:
+            raise ValueError("Portfolio needs at least one leg")
+        if spot <= 0:
+            raise ValueError("Spot must be positive")
+        risk_array = np.asarray(scenarios if scenarios is not None else SPAN_SCENARIOS, dtype=np.float64)
+        if risk_array.ndim != 2 or risk_array.shape[1] != 3:
+            raise ValueError("Scenarios must be (price move, vol move, cover) rows")
+        
+        K = np.array([leg.strike for leg in legs], dtype=np.float64)[:, None]
+        T = np.array([leg.time_to_expiry for leg in legs], dtype=np.float64)[:, None]
+        sigma = np.array([leg.volatility for leg in legs], dtype=np.float64)[:, None]
+        is_call = np.array([leg.option_type == "CE" for leg in legs])[:, None]
+        position = np.array(
+            [leg.quantity * (1 if leg.side == "buy" else -1) for leg in legs], dtype=np.float64
+        )[:, None]
+        
+        # Column 0 is the current market; the rest are the scenarios
+        price_moves = np.concatenate([[0.0], risk_array[:, 0] * price_scan_pct / 100])
+        vol_moves = np.concatenate([[0.0], risk_array[:, 1] * vol_scan_pct / 100])
+        S = (spot * (1 + price_moves))[None, :]
+        scenario_sigma = np.maximum(sigma + vol_moves[None, :], 0.001)
+        values = self._leg_values(S, K, T, scenario_sigma, is_call, risk_free_rate, dividend_yield)
+        
+        leg_pnl = (values[:, 1:] - values[:, :1]) * position
+        covered_loss = -leg_pnl * risk_array[:, 2][None, :]
+        portfolio_loss = covered_loss.sum(axis=0)
+        worst = int(np.argmax(portfolio_loss))
+        scan_risk = max(float(portfolio_loss[worst]), 0.0)
+        standalone = float(np.maximum(covered_loss.max(axis=1), 0.0).sum())
+        
+        # Minimum charge on short options not covered by longs of the same type;
+        # exposure margin is charged on every short unit
+        calls = is_call[:, 0]
+        net_short_units = sum(
+            max(-float(position[mask, 0].sum()), 0.0) for mask in (calls, ~calls)
+        )
+        short_units = float(-position[position < 0].sum())
+        short_option_minimum = net_short_units * spot * short_option_min_pct / 100
+        span_margin = max(scan_risk, short_option_minimum)
+        exposure_margin = short_units * spot * exposure_pct / 100
+        
+        entry = np.array(
+            [leg.premium if leg.premium is not None else values[i, 0] for i, leg in enumerate(legs)],
+            dtype=np.float64
+        )
+        long_units = position[:, 0] > 0
+        premium_payable = float(np.sum(entry[long_units] * position[long_units, 0]))
+        premium_receivable = float(-np.sum(entry[~long_units] * position[~long_units, 0]))
+        
+        return {
+            "total_margin": round(span_margin + exposure_margin, 2),
+            "span_margin": round(span_margin, 2),
+            "scan_risk": round(scan_risk, 2),
+            "short_option_minimum": round(short_option_minimum, 2),
+            "exposure_margin": round(exposure_margin, 2),
+            "standalone_scan_risk": round(standalone, 2),
+            "offset_credit": round(standalone - scan_risk, 2),
+            "premium_payable": round(premium_payable, 2),
+            "premium_receivable": round(premium_receivable, 2),
+            "net_option_value": round(float(np.sum(values[:, 0] * position[:, 0])), 2),
+            "worst_scenario": {
+                "index": worst + 1,
+                "price_move_pct": round(float(price_moves[worst + 1] * 100), 4),
+                "vol_move": round(float(vol_moves[worst + 1] * 100), 4),
+                "loss": round(float(portfolio_loss[worst]), 2),
+            },
+            "scenarios": [
+                {
+                    "price_move_pct": round(float(price_moves[i + 1] * 100), 4),
+                    "vol_move": round(float(vol_moves[i + 1] * 100), 4),
+                    "cover": float(risk_array[i, 2]),
+                    "pnl": round(float(-portfolio_loss[i]), 2),
+                }
+                for i in range(risk_array.shape[0])
+            ],
+        }
+    
+    def _leg_values(
+        self,
+        S: np.ndarray,
+        K: np.ndarray,
+        T: np.ndarray,
+        sigma: np.ndarray,
+        is_call: np.ndarray,
+        r: float,
+        q: float
+    ) -> np.ndarray:
+        """Black-Scholes value of each leg (rows) at each price (columns); intrinsic once expired"""
+        live = T > 0
+        price, _ = self.bsm.price_array(
+            S, K, np.where(live, T, 1.0), sigma, is_call, r=r, q=q
+        )
+        intrinsic = np.maximum(np.where(is_call, S - K, K - S), 0.0)
+        return np.where(live, price, intrinsic)
+
+    @staticmethod
+    def _breakevens(prices: np.ndarray, pnl: np.ndarray) -> List[float]:
+        """Prices where the P&L curve crosses zero, linearly interpolated"""
+        sign = np.where(pnl >= 0, 1, -1)
+        crossings = np.flatnonzero(sign[:-1] != sign[1:])
+        x0, x1 = prices[crossings], prices[crossings + 1]
+        y0, y1 = pnl[crossings], pnl[crossings + 1]
+        return np.round(x0 - y0 * (x1 - x0) / (y1 - y0), 2).tolist()
+
+
+def get_strategy_service() -> StrategyService:
+    """Get strategy service instance"""
+    return StrategyService()
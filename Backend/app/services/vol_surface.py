@@ -0,0 +1,348 @@
+"""
+Volatility Surface Service
+Fits a raw-SVI smile per expiry from chain IVs and interpolates across
+expiries, refitting only when the quotes move.
+"""
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.optimize import minimize
+
+from app.core.metrics import increment_counter
+
+logger = logging.getLogger(__name__)
+
+
+# Raw SVI parameters, in order: w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2))
+SVI_PARAMS = ("a", "b", "rho", "m", "sigma")
+
+# Quotes outside this IV band (percent) are treated as bad prints
+_MIN_QUOTE_IV = 1.0
+_MAX_QUOTE_IV = 300.0
+
+
+@dataclass
+class SVISlice:
+    """Fitted smile for one expiry, in total variance over log-moneyness"""
+    expiry: str
+    T: float  # Years to expiry
+    forward: float
+    params: np.ndarray
+    rmse: float  # Fit error in vol points
+    n_quotes: int
+    fitted_at: float
+    fit_ms: float
+    # Quotes the fit was made from, for the refit check
+    strikes: np.ndarray = field(repr=False)
+    quote_ivs: np.ndarray = field(repr=False)
+
+    def total_variance(self, k: np.ndarray) -> np.ndarray:
+        """SVI total variance at log-moneyness k = ln(K / F)"""
+        a, b, rho, m, sigma = self.params
+        km = np.asarray(k, dtype=np.float64) - m
+        return np.maximum(a + b * (rho * km + np.sqrt(km * km + sigma * sigma)), 1e-12)
+
+    def implied_vol(self, strikes: Sequence[float]) -> np.ndarray:
+        """Fitted IV (percent) at each strike"""
+        k = np.log(np.asarray(strikes, dtype=np.float64) / self.forward)
+        return np.sqrt(self.total_variance(k) / self.T) * 100
+
+    def to_dict(self) -> Dict:
+        return {
+            "expiry": self.expiry,
+            "T": round(self.T, 8),
+            "forward": round(self.forward, 4),
+            "params": dict(zip(SVI_PARAMS, (round(float(p), 8) for p in self.params))),
+            "atm_iv": round(float(self.implied_vol([self.forward])[0]), 4),
+            "rmse": round(self.rmse, 4),
+            "n_quotes": self.n_quotes,
+            "fitted_at": self.fitted_at,
+            "fit_ms": round(self.fit_ms, 3),
+        }
+
+
+class VolSurfaceService:
+    """
+    Per-symbol implied volatility surfaces.
+
+    Each expiry's smile is a raw-SVI fit to the out-of-the-money legs of the
+    chain (puts below the forward, calls above). Fits are warm-started from
+    the previous parameters and skipped entirely while the quotes stay
+    within tolerance. Between expiries total variance is interpolated
+    linearly in time at fixed log-moneyness; outside them IV is held flat.
+    Chain compute threads share one instance, so fits, reads of the cached
+    slices and the stats counters go through an internal lock.
+    """
+
+    def __init__(
+        self,
+        refit_tolerance: float = 0.05,
+        refit_forward_pct: float = 0.05,
+        max_age_seconds: float = 60.0,
+        min_quotes: int = 5
+    ):
+        """
+        Args:
+            refit_tolerance: Largest per-strike IV move (vol points) that
+                keeps the cached fit
+            refit_forward_pct: Largest forward move (percent) that keeps it
+            max_age_seconds: Refit at least this often while quotes arrive
+            min_quotes: Fewer usable quotes than this leaves the expiry unfitted
+        """
+        self.refit_tolerance = refit_tolerance
+        self.refit_forward_pct = refit_forward_pct
+        self.max_age_seconds = max_age_seconds
+        self.min_quotes = min_quotes
+        self._surfaces: Dict[str, Dict[str, SVISlice]] = {}
+        self.stats = {"fitted": 0, "reused": 0, "failed": 0}
+        # Reentrant: implied_vol reads the slices through get_surface
+        self._lock = threading.RLock()
+
+    # ============== Fitting ==============
+
+    def update(
+        self,
+        symbol: str,
+        expiry: str,
+        strikes: Sequence[float],
+        call_ivs: Sequence[float],
+        put_ivs: Sequence[float],
+        forward: float,
+        T: float
+    ) -> Optional[SVISlice]:
+        """
+        Refresh one expiry's smile from the latest chain.
+
+        Args:
+            symbol: Trading symbol
+            expiry: Expiry identifier
+            strikes: Strike prices
+            call_ivs: Call IV per strike (percent, 0 = missing)
+            put_ivs: Put IV per strike (percent, 0 = missing)
+            forward: Forward (or futures) price for the expiry
+            T: Time to expiry in years
+
+        Returns:
+            The cached or newly fitted slice; None if the expiry has never
+            had enough quotes to fit
+        """
+        with self._lock:
+            return self._update(symbol, expiry, strikes, call_ivs, put_ivs, forward, T)
+
+    def _update(
+        self,
+        symbol: str,
+        expiry: str,
+        strikes: Sequence[float],
+        call_ivs: Sequence[float],
+        put_ivs: Sequence[float],
+        forward: float,
+        T: float
+    ) -> Optional[SVISlice]:
+        """update() body (caller holds the lock)"""
+        symbol = symbol.upper()
+        expiry = str(expiry)
+        slices = self._surfaces.setdefault(symbol, {})
+        previous = slices.get(expiry)
+
+        strikes = np.asarray(strikes, dtype=np.float64)
+        ivs = self._otm_quotes(
+            strikes,
+            np.asarray(call_ivs, dtype=np.float64),
+            np.asarray(put_ivs, dtype=np.float64),
+            forward
+        )
+        if previous is not None and self._quotes_unchanged(previous, strikes, ivs, forward):
+            self._record(symbol, "reused")
+            return previous
+
+        usable = (ivs > _MIN_QUOTE_IV) & (ivs < _MAX_QUOTE_IV)
+        if forward <= 0 or T <= 0 or np.count_nonzero(usable) < self.min_quotes:
+            self._record(symbol, "failed")
+            return previous
+
+        start = time.perf_counter()
+        try:
+            params, rmse = self._fit_svi(
+                np.log(strikes[usable] / forward),
+                ivs[usable],
+                T,
+                previous.params if previous is not None else None
+            )
+        except (ValueError, FloatingPointError) as e:
+            logger.warning(f"SVI fit failed for {symbol} {expiry}: {e}")
+            self._record(symbol, "failed")
+            return previous
+
+        fitted = SVISlice(
+            expiry=expiry,
+            T=T,
+            forward=forward,
+            params=params,
+            rmse=rmse,
+            n_quotes=int(np.count_nonzero(usable)),
+            fitted_at=time.time(),
+            fit_ms=(time.perf_counter() - start) * 1000,
+            strikes=strikes,
+            quote_ivs=ivs,
+        )
+        slices[expiry] = fitted
+        self._record(symbol, "fitted")
+        return fitted
+
+    @staticmethod
+    def _otm_quotes(
+        strikes: np.ndarray,
+        call_ivs: np.ndarray,
+        put_ivs: np.ndarray,
+        forward: float
+    ) -> np.ndarray:
+        """One IV per strike: the OTM leg, or the other leg when it is missing"""
+        otm = np.where(strikes < forward, put_ivs, call_ivs)
+        itm = np.where(strikes < forward, call_ivs, put_ivs)
+        return np.where(otm > 0, otm, np.maximum(itm, 0.0))
+
+    def _quotes_unchanged(
+        self,
+        previous: SVISlice,
+        strikes: np.ndarray,
+        ivs: np.ndarray,
+        forward: float
+    ) -> bool:
+        """True while the cached fit still describes the market"""
+        return (
+            time.time() - previous.fitted_at <= self.max_age_seconds
+            and np.array_equal(strikes, previous.strikes)
+            and abs(forward / previous.forward - 1) * 100 <= self.refit_forward_pct
+            and float(np.max(np.abs(ivs - previous.quote_ivs), initial=0.0)) <= self.refit_tolerance
+        )
+
+    @staticmethod
+    def _fit_svi(
+        k: np.ndarray,
+        ivs: np.ndarray,
+        T: float,
+        warm_start: Optional[np.ndarray] = None
+    ):
+        """
+        Quasi-explicit raw-SVI fit.
+
+        For fixed (m, sigma) the smile is linear in (a, b*rho*sigma, b*sigma),
+        so only those two parameters are searched (Nelder-Mead) and the rest
+        come from a weighted linear least-squares solve. Weights of
+        1/sqrt(w) make variance residuals approximate IV residuals.
+
+        Returns:
+            (params, rmse in vol points)
+        """
+        w_market = (ivs / 100) ** 2 * T
+        weights = 1 / np.sqrt(w_market)
+        w_weighted = w_market * weights
+
+        def linear_fit(m, sigma):
+            y = (k - m) / sigma
+            z = np.sqrt(y * y + 1)
+            design = np.stack([weights, y * weights, z * weights])
+            a, d, c = np.linalg.lstsq(design.T, w_weighted, rcond=None)[0]
+            # Keep b >= 0 and |rho| < 1, refitting the level afterwards
+            if c <= 0 or abs(d) >= c:
+                c = max(c, 1e-8)
+                d = float(np.clip(d, -0.999 * c, 0.999 * c))
+                a = float(np.average(w_market - d * y - c * z, weights=weights ** 2))
+            return a, d, c, y, z
+
+        def objective(x):
+            m, sigma = x
+            a, d, c, y, z = linear_fit(m, sigma)
+            return float(np.sum(((a + d * y + c * z - w_market) * weights) ** 2))
+
+        bounds = ((-1.0, 1.0), (1e-4, 2.0))
+        if warm_start is not None:
+            x0 = np.clip(warm_start[3:], [-1.0, 1e-4], [1.0, 2.0])
+        else:
+            # Coarse grid for a cold start
+            candidates = [(m, sigma) for m in (-0.05, 0.0, 0.05) for sigma in (0.02, 0.1, 0.3)]
+            x0 = np.array(min(candidates, key=objective))
+
+        fit = minimize(
+            objective, x0, method="Nelder-Mead", bounds=bounds,
+            options={"xatol": 1e-6, "fatol": 1e-12, "maxiter": 200 if warm_start is None else 80}
+        )
+        m, sigma = fit.x
+        a, d, c, _, _ = linear_fit(m, sigma)
+        params = np.array([a, c / sigma, d / c, m, sigma])
+
+        km = k - m
+        w_fit = np.maximum(a + params[1] * (params[2] * km + np.sqrt(km * km + sigma * sigma)), 1e-12)
+        rmse = float(np.sqrt(np.mean((np.sqrt(w_fit / T) * 100 - ivs) ** 2)))
+        return params, rmse
+
+    def _record(self, symbol: str, result: str) -> None:
+        """Count a fit outcome (caller holds the lock)"""
+        self.stats[result] += 1
+        increment_counter("vol_surface_fits_total", {"symbol": symbol, "result": result})
+
+    # ============== Queries ==============
+
+    def get_slice(self, symbol: str, expiry: str) -> Optional[SVISlice]:
+        """Cached fit for one expiry"""
+        with self._lock:
+            return self._surfaces.get(symbol.upper(), {}).get(str(expiry))
+
+    def get_surface(self, symbol: str) -> List[SVISlice]:
+        """All cached slices for a symbol, nearest expiry first"""
+        with self._lock:
+            return sorted(self._surfaces.get(symbol.upper(), {}).values(), key=lambda s: s.T)
+
+    def implied_vol(
+        self,
+        symbol: str,
+        strikes: Sequence[float],
+        T: float,
+        forward: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Surface IV (percent) at any strikes and time to expiry.
+
+        Args:
+            symbol: Trading symbol
+            strikes: Strike prices
+            T: Time to expiry in years
+            forward: Forward for T; interpolated from the slices if omitted
+
+        Returns:
+            IV per strike, or None if the symbol has no fitted slices
+        """
+        slices = self.get_surface(symbol)
+        if not slices:
+            return None
+
+        strikes = np.asarray(strikes, dtype=np.float64)
+        times = np.array([s.T for s in slices])
+        if forward is None:
+            forward = float(np.exp(np.interp(T, times, np.log([s.forward for s in slices]))))
+        k = np.log(strikes / forward)
+
+        # Flat IV beyond the first and last expiries
+        if T <= times[0] or len(slices) == 1:
+            return np.sqrt(slices[0].total_variance(k) / slices[0].T) * 100
+        if T >= times[-1]:
+            return np.sqrt(slices[-1].total_variance(k) / slices[-1].T) * 100
+
+        upper = int(np.searchsorted(times, T))
+        near, far = slices[upper - 1], slices[upper]
+        weight = (T - near.T) / (far.T - near.T)
+        w = (1 - weight) * near.total_variance(k) + weight * far.total_variance(k)
+        return np.sqrt(w / T) * 100
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        """Drop cached fits for one symbol, or all of them"""
+        with self._lock:
+            if symbol is None:
+                self._surfaces.clear()
+            else:
+                self._surfaces.pop(symbol.upper(), None)
@@ -0,0 +1,103 @@
+"""
+Benchmark: columnar ChainFrame vs walking the nested chain dicts.
+
+Times parsing a synthetic Dhan chain into a ChainFrame and serializing its
+leg payloads, then an aggregate COI view and a scalp-style leg filter
+computed on the frame's columns against the same work done by re-walking
+the serialized get_live_data payload with .get() chains.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_chain_frame [--strikes 200] [--repeat 200]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.services.chain_frame import ChainFrame
+from app.services.options import OptionsService
+from scripts.benchmark_chain_greeks import time_it
+from scripts.benchmark_tick_memory import SnapshotClient, build_raw_chain
+
+
+def coi_from_dicts(live_data: dict, top_n: int) -> list:
+    """COI view over the nested payload, as the endpoint used to build it"""
+    data = []
+    for strike_key, strike_data in live_data["oc"].items():
+        ce = strike_data.get("ce", {})
+        pe = strike_data.get("pe", {})
+        ce_coi = ce.get("oichng", ce.get("oi_change", 0)) or 0
+        pe_coi = pe.get("oichng", pe.get("oi_change", 0)) or 0
+        data.append({"strike": float(strike_key), "ce_coi": ce_coi, "pe_coi": pe_coi})
+    data.sort(key=lambda x: abs(x["ce_coi"]) + abs(x["pe_coi"]), reverse=True)
+    return sorted(data[:top_n], key=lambda x: x["strike"])
+
+
+def coi_from_frame(frame: ChainFrame, top_n: int) -> list:
+    ce_coi, pe_coi = frame.ce("oichng"), frame.pe("oichng")
+    rows = np.sort(np.argsort(-(np.abs(ce_coi) + np.abs(pe_coi)), kind="stable")[:top_n])
+    return [
+        {"strike": strike, "ce_coi": ce, "pe_coi": pe}
+        for strike, ce, pe in zip(
+            frame.strikes[rows].tolist(), ce_coi[rows].tolist(), pe_coi[rows].tolist()
+        )
+    ]
+
+
+def active_legs_from_dicts(live_data: dict, min_volume: int) -> int:
+    count = 0
+    for strike_data in live_data["oc"].values():
+        for opt in (strike_data.get("ce", {}), strike_data.get("pe", {})):
+            oi = opt.get("OI", opt.get("oi", 0)) or 0
+            oi_change = opt.get("oichng", 0) or 0
+            prev_oi = oi - oi_change
+            pct = (oi_change / prev_oi * 100) if prev_oi > 0 else 0
+            if abs(pct) >= 5 and (opt.get("vol", 0) or 0) >= min_volume:
+                count += 1
+    return count
+
+
+def active_legs_from_frame(frame: ChainFrame, min_volume: int) -> int:
+    oi, oi_change = frame.legs["OI"], frame.legs["oichng"]
+    prev_oi = (oi - oi_change).astype(np.float64)
+    pct = np.divide(oi_change, prev_oi, out=np.zeros_like(prev_oi), where=prev_oi > 0) * 100
+    return int(np.count_nonzero((np.abs(pct) >= 5) & (frame.legs["vol"] >= min_volume)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    raw = build_raw_chain(args.strikes)
+    service = OptionsService(dhan_client=SnapshotClient(raw))
+    expiry = str(int(time.time()) + 4 * 86400)
+    loop = asyncio.new_event_loop()
+    live_data = loop.run_until_complete(
+        service.get_live_data("NIFTY", expiry, include_greeks=False, include_reversal=False)
+    )
+    frame = loop.run_until_complete(service.get_chain_frame("NIFTY", expiry))
+    loop.close()
+
+    assert coi_from_dicts(live_data, 30) == coi_from_frame(frame, 30)
+    assert active_legs_from_dicts(live_data, 1000) == active_legs_from_frame(frame, 1000)
+
+    print(f"{args.strikes} strikes ({2 * args.strikes} legs)        ms")
+    print(f"  ChainFrame.from_oc              {time_it(lambda: ChainFrame.from_oc(raw['oc']), args.repeat):8.3f}")
+    print(f"  leg payloads (serialization)    {time_it(frame.leg_payloads, args.repeat):8.3f}")
+    print("Analytics on one chain           dicts    frame")
+    for label, on_dicts, on_frame in (
+        ("aggregate COI (top 30)", lambda: coi_from_dicts(live_data, 30), lambda: coi_from_frame(frame, 30)),
+        ("scalp leg filter", lambda: active_legs_from_dicts(live_data, 1000),
+         lambda: active_legs_from_frame(frame, 1000)),
+    ):
+        print(f"  {label:<28}{time_it(on_dicts, args.repeat):8.3f} {time_it(on_frame, args.repeat):8.3f}")
+
+
+if __name__ == "__main__":
+    main()
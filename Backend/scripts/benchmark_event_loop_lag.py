@@ -0,0 +1,90 @@
+"""
+Benchmark: event loop lag while live chains are processed.
+
+Runs --streams concurrent get_live_data loops (Greeks and reversal on;
+incremental recompute, coalescing and the processed-chain cache off so
+every tick is a full recompute) over a synthetic raw chain for each
+CHAIN_COMPUTE_EXECUTOR mode, while a probe
+task sleeps 1 ms at a time and records how late it wakes up. That delay is
+what every WebSocket send, ping and HTTP request on the worker waits on.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_event_loop_lag [--strikes 400] [--streams 4]
+        [--seconds 3] [--modes inline thread process]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.config.settings import settings
+from app.core.container import container
+from app.services.options import OptionsService
+from scripts.benchmark_tick_memory import SnapshotClient, build_raw_chain
+
+PROBE_INTERVAL = 0.001
+
+
+async def probe(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+async def stream(service: OptionsService, expiry: str, deadline: float) -> int:
+    ticks = 0
+    while time.perf_counter() < deadline:
+        await service.get_live_data("NIFTY", expiry)
+        ticks += 1
+        await asyncio.sleep(0)
+    return ticks
+
+
+async def run(raw: dict, streams: int, seconds: float) -> tuple:
+    """(lag samples in ms, ticks per second) with the current executor settings"""
+    expiry = str(int(time.time()) + 4 * 86400)
+    services = [OptionsService(dhan_client=SnapshotClient(raw)) for _ in range(streams)]
+    for service in services:
+        await service.get_live_data("NIFTY", expiry)  # Warm workers and per-expiry state
+
+    lags, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    deadline = time.perf_counter() + seconds
+    ticks = await asyncio.gather(*(stream(service, expiry, deadline) for service in services))
+    stop.set()
+    await probe_task
+    return np.array(lags) * 1000, sum(ticks) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strikes", type=int, default=400)
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread", "process"])
+    args = parser.parse_args()
+
+    raw = build_raw_chain(args.strikes)
+    settings.INCREMENTAL_RECOMPUTE_ENABLED = False
+    settings.LIVE_COALESCE_ENABLED = False  # Streams share one chain; keep them from reusing each other's ticks
+    settings.PROCESSED_CHAIN_CACHE_ENABLED = False
+
+    print(f"{args.streams} streams x {args.strikes} strikes, {os.cpu_count()} CPUs")
+    print("  executor    lag p50    p99    max (ms)   ticks/s")
+    for mode in args.modes:
+        settings.CHAIN_COMPUTE_EXECUTOR = mode
+        container.reset()
+        lags, rate = asyncio.run(run(raw, args.streams, args.seconds))
+        p50, p99 = np.percentile(lags, [50, 99])
+        print(f"  {mode:<10}{p50:8.2f} {p99:6.2f} {lags.max():6.2f}        {rate:8.1f}")
+    container.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: scipy.stats.norm vs the math-module kernels on scalars.
+
+Times norm.cdf/pdf/ppf against app.services.kernels on Python floats,
+checks the largest difference over a dense grid, and times the
+single-contract pricing paths that now use the kernels.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_normal_kernels [--repeat 20000]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+from scipy.stats import norm
+
+from app.services.bsm import BSMService
+from app.services.calculators import CalculatorService
+from app.services.greeks import GreeksService
+from app.services.kernels import norm_cdf, norm_pdf, norm_ppf
+
+
+def per_call_us(fn, args, repeat: int) -> float:
+    """Mean microseconds per call, cycling through args"""
+    n = len(args)
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(args[i % n])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    xs = np.linspace(-8, 8, 1001).tolist()
+    ps = np.linspace(0.001, 0.999, 999).tolist()
+
+    print("Per call (us)        scipy    kernel   speed-up")
+    for name, ref, fast, inputs in (
+        ("cdf", norm.cdf, norm_cdf, xs),
+        ("pdf", norm.pdf, norm_pdf, xs),
+        ("ppf", norm.ppf, norm_ppf, ps),
+    ):
+        slow_us = per_call_us(ref, inputs, args.repeat)
+        fast_us = per_call_us(fast, inputs, args.repeat)
+        print(f"  norm.{name}          {slow_us:7.2f}  {fast_us:7.3f}   {slow_us / fast_us:6.0f}x")
+
+    grid = np.linspace(-38, 38, 200001)
+    probs = np.concatenate([np.logspace(-300, -1, 3000), np.linspace(1e-4, 1 - 1e-4, 20001)])
+    print("Max |kernel - scipy|")
+    print(f"  cdf {max(abs(norm_cdf(x) - r) for x, r in zip(grid.tolist(), norm.cdf(grid))):.2e}")
+    print(f"  pdf {max(abs(norm_pdf(x) - r) for x, r in zip(grid.tolist(), norm.pdf(grid))):.2e}")
+    print(f"  ppf {max(abs(norm_ppf(p) - r) for p, r in zip(probs.tolist(), norm.ppf(probs))):.2e}")
+
+    bsm = BSMService(risk_free_rate=0.10)
+    greeks = GreeksService(risk_free_rate=0.10)
+    calculator = CalculatorService()
+    strikes = np.arange(23500, 25500, 50.0).tolist()
+    repeat = args.repeat // 10
+    print("Single-contract paths (us per call)")
+    print(f"  BSMService.price                          "
+          f"{per_call_us(lambda K: bsm.price(24500, K, 7 / 365, 0.15), strikes, repeat):8.2f}")
+    print(f"  GreeksService.calculate_all_greeks        "
+          f"{per_call_us(lambda K: greeks.calculate_all_greeks(24500, K, 7 / 365, 0.15), strikes, repeat):8.2f}")
+    print(f"  CalculatorService.calculate_option_price  "
+          f"{per_call_us(lambda K: calculator.calculate_option_price(24500, K, 7 / 365, 0.07, 0.15), strikes, repeat):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: per-row vs batch calculator option pricing.
+
+Compares a loop of CalculatorService.calculate_option_price (what a client
+sending one /calculators/option-price request per contract costs on the
+server) with one CalculatorService.calculate_option_price_batch call.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_option_price_batch [--rows 10000] [--repeat 10]
+"""
+import argparse
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.services.calculators import CalculatorService
+from scripts.benchmark_chain_greeks import time_it
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    n = args.rows
+    columns = (
+        np.full(n, 24500.0),
+        rng.uniform(20000, 29000, n),
+        rng.uniform(1 / 365, 1.0, n),
+        np.full(n, 0.07),
+        rng.uniform(0.08, 0.6, n),
+        rng.choice([0.0, 0.01], n),
+    )
+    rows = list(zip(*(c.tolist() for c in columns)))
+    calculator = CalculatorService()
+
+    def scalar():
+        for row in rows:
+            calculator.calculate_option_price(*row)
+
+    def batch():
+        calculator.calculate_option_price_batch(*columns)
+
+    scalar_ms = time_it(scalar, 1)
+    batch_ms = time_it(batch, args.repeat)
+
+    print(f"Rows: {n:,}")
+    print(f"  calculate_option_price loop  : {scalar_ms:10.3f} ms")
+    print(f"  calculate_option_price_batch : {batch_ms:10.3f} ms")
+    print(f"  speed-up                     : {scalar_ms / batch_ms:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
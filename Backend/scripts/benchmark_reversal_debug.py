@@ -0,0 +1,82 @@
+"""
+Benchmark: cost of the advanced_reversal_point debug payload.
+
+Runs ReversalService.advanced_reversal_point over a 200-strike NIFTY chain
+(Greeks precomputed once, as get_live_data does) with include_debug off (the
+live/streaming default) and on (what
+/analytics/reversal/{symbol}/{strike}?debug=true asks for), reporting wall
+time and the memory held by one chain's results.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_reversal_debug [--strikes 200] [--repeat 50]
+"""
+import argparse
+import os
+import tracemalloc
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.services.greeks import GreeksService
+from app.services.reversal import ReversalService
+from scripts.benchmark_chain_greeks import build_chain, time_it
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    reversal = ReversalService(risk_free_rate=0.10)
+    spot, strikes, ce_iv, pe_iv = build_chain(args.strikes)
+    n = len(strikes)
+    chain = reversal.greeks_service.calculate_chain_greeks(
+        spot, np.concatenate([strikes, strikes]), 4 / 365,
+        np.concatenate([ce_iv, pe_iv]), np.arange(2 * n) < n, with_price=True
+    )
+    rows = [
+        (
+            float(strikes[i]),
+            GreeksService.greeks_at(chain, i),
+            GreeksService.greeks_at(chain, n + i),
+            float(chain["price"][i]),
+            float(chain["price"][n + i]),
+        )
+        for i in range(n)
+    ]
+
+    def run_chain(include_debug: bool) -> list:
+        return [
+            reversal.advanced_reversal_point(
+                K=K, spot_price=spot, T_days=4, current_iv=14, iv_chng=0.01,
+                ce_greeks=ce_greeks, pe_greeks=pe_greeks,
+                curr_call_price=call_tv + 1, curr_put_price=put_tv - 1,
+                call_theoretical=call_tv, put_theoretical=put_tv,
+                S_chng=25, include_debug=include_debug
+            )
+            for K, ce_greeks, pe_greeks, call_tv, put_tv in rows
+        ]
+
+    def retained_kb(include_debug: bool) -> float:
+        tracemalloc.start()
+        results = run_chain(include_debug)
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del results
+        return held / 1024
+
+    lean_ms = time_it(lambda: run_chain(False), args.repeat)
+    debug_ms = time_it(lambda: run_chain(True), args.repeat)
+    lean_kb = retained_kb(False)
+    debug_kb = retained_kb(True)
+
+    print(f"Chain: {n} strikes, advanced_reversal_point per strike")
+    print(f"  include_debug=False : {lean_ms:8.3f} ms  {lean_kb:8.1f} KiB held")
+    print(f"  include_debug=True  : {debug_ms:8.3f} ms  {debug_kb:8.1f} KiB held")
+    print(f"  speed-up            : {debug_ms / lean_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark: scenario grid repricing of a 200-strike NIFTY chain.
+
+Times ScenarioService.reprice_grid over spot x IV x time shocks
+(default 21 x 11 x 5) for the cheapest and the full metric sets.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_scenario_grid [--strikes 200] [--repeat 20]
+"""
+import argparse
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.services.scenario import ScenarioService, SCENARIO_METRICS
+from scripts.benchmark_chain_greeks import build_chain, time_it
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--spot-steps", type=int, default=21)
+    parser.add_argument("--iv-steps", type=int, default=11)
+    parser.add_argument("--time-steps", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    scenario = ScenarioService(risk_free_rate=0.10)
+    spot, strikes, ce_iv, pe_iv = build_chain(args.strikes)
+    spot_shocks = np.linspace(-2, 2, args.spot_steps)
+    iv_shifts = np.linspace(-3, 3, args.iv_steps)
+    days = np.linspace(0, 4, args.time_steps)
+
+    def run(metrics):
+        return lambda: scenario.reprice_grid(
+            spot, strikes, ce_iv * 100, pe_iv * 100, 7.0,
+            spot_shocks, iv_shifts, days, metrics
+        )
+
+    cells = args.spot_steps * args.iv_steps * args.time_steps * len(strikes)
+    print(f"Grid: {args.spot_steps} spot x {args.iv_steps} IV x {args.time_steps} time "
+          f"x {len(strikes)} strikes = {cells:,} cells per leg")
+    print(f"  price, delta        : {time_it(run(('price', 'delta')), args.repeat):9.3f} ms")
+    print(f"  all {len(SCENARIO_METRICS)} metrics       : {time_it(run(SCENARIO_METRICS), args.repeat):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: iron condor search over a 200-strike NIFTY chain.
+
+Times StrategyOptimizer.optimize scoring inline against the same search
+chunked over a process pool, with and without a wing-width limit.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_strategy_optimizer [--strikes 200] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.services.bsm import BSMService
+from app.services.optimizer import ChainQuotes, StrategyOptimizer
+from scripts.benchmark_chain_greeks import build_chain
+
+
+def build_quotes(n_strikes: int, days: float = 7.0) -> ChainQuotes:
+    bsm = BSMService(risk_free_rate=0.10)
+    spot, strikes, ce_iv, pe_iv = build_chain(n_strikes)
+    T = days / 365
+    calls, _ = bsm.price_array(spot, strikes, T, ce_iv, np.ones(len(strikes), dtype=bool))
+    puts, _ = bsm.price_array(spot, strikes, T, pe_iv, np.zeros(len(strikes), dtype=bool))
+    return ChainQuotes(
+        strikes=strikes, call_prices=calls, put_prices=puts,
+        ivs=np.where(strikes < spot, pe_iv, ce_iv) * 100,
+        forward=spot * float(np.exp(0.10 * T)), T=T
+    )
+
+
+async def run(optimizer: StrategyOptimizer, quotes: ChainQuotes, max_width, budget: float):
+    start = time.perf_counter()
+    result = await optimizer.optimize(quotes, "iron_condor", top_k=10, max_width=max_width, time_budget=budget)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--budget", type=float, default=60.0)
+    args = parser.parse_args()
+
+    quotes = build_quotes(args.strikes)
+    inline = StrategyOptimizer(chunk_size=args.chunk_size)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pooled = StrategyOptimizer(executor=pool, workers=args.workers, chunk_size=args.chunk_size)
+        await run(pooled, quotes, 5, args.budget)  # Start the workers
+
+        for max_width in (10, None):
+            label = f"max_width={max_width}" if max_width else "any width"
+            inline_ms, inline_result = await run(inline, quotes, max_width, args.budget)
+            pool_ms, pool_result = await run(pooled, quotes, max_width, args.budget)
+            same = inline_result["results"] == pool_result["results"]
+            print(f"{label}: {inline_result['candidates']:,} condors in {pool_result['chunks']} chunks")
+            print(f"  inline                 : {inline_ms:9.1f} ms")
+            print(f"  pool ({args.workers} workers)       : {pool_ms:9.1f} ms  (same top 10: {same})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""
+Benchmark: Taylor fast-update vs exact Greeks for small spot moves.
+
+Computes exact chain Greeks at spot S0, then for each spot move compares
+GreeksService.approximate_spot_move (the approximate streaming mode) with an
+exact calculate_chain_greeks at the new spot: worst absolute error in price,
+delta, gamma and vega, and time per chain.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_taylor_update [--strikes 200] [--repeat 200]
+"""
+import argparse
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.services.greeks import GreeksService
+from scripts.benchmark_chain_greeks import build_chain, time_it
+
+MOVES_PCT = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    greeks = GreeksService(risk_free_rate=0.10)
+    spot, strikes, ce_iv, pe_iv = build_chain(args.strikes)
+    n = len(strikes)
+    K = np.concatenate([strikes, strikes])
+    sigma = np.concatenate([ce_iv, pe_iv])
+    is_call = np.arange(2 * n) < n
+    T = 4 / 365
+
+    anchor = greeks.calculate_chain_greeks(spot, K, T, sigma, is_call, with_price=True, decimals=None)
+
+    exact_ms = time_it(
+        lambda: greeks.calculate_chain_greeks(spot + 10, K, T, sigma, is_call, with_price=True),
+        args.repeat
+    )
+    approx_ms = time_it(lambda: GreeksService.approximate_spot_move(anchor, 10.0), args.repeat)
+
+    print(f"Chain: {n} strikes ({2 * n} legs), spot {spot:.0f}, 4 days to expiry")
+    print(f"  exact calculate_chain_greeks : {exact_ms:8.3f} ms")
+    print(f"  approximate_spot_move        : {approx_ms:8.3f} ms  ({exact_ms / approx_ms:.1f}x)")
+    print()
+    print(f"  {'move %':>7} {'move pts':>9} {'price err':>11} {'delta err':>11} {'gamma err':>11} {'vega err':>11}")
+    for move_pct in MOVES_PCT:
+        dS = spot * move_pct / 100
+        exact = greeks.calculate_chain_greeks(spot + dS, K, T, sigma, is_call, with_price=True, decimals=None)
+        approx = GreeksService.approximate_spot_move(anchor, dS)
+        errors = [np.max(np.abs(approx[name] - exact[name])) for name in ("price", "delta", "gamma", "vega")]
+        print(f"  {move_pct:7.2f} {dS:9.2f} " + " ".join(f"{err:11.2e}" for err in errors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: memory and allocations of one streaming tick.
+
+Runs OptionsService.get_live_data (Greeks and reversal on, as the WebSocket
+stream requests it) over a synthetic 200-strike raw chain under tracemalloc,
+reporting the peak, the size of the payload it returns and the number of
+allocations. Also compares the per-leg record types with dict-backed twins
+and the optgeeks assembly against the old per-field dict lookups.
+
+Run from the Backend directory:
+    python -m scripts.benchmark_tick_memory [--strikes 200] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.config.settings import settings
+from app.services.greeks import GreeksService, AdvancedGreeks
+from app.services.options import OptionsService
+from app.services.reversal import TradingSignals
+from scripts.benchmark_chain_greeks import build_chain, time_it
+
+
+class SnapshotClient:
+    """Stands in for DhanClient, serving one fixed raw chain"""
+
+    def __init__(self, chain: dict):
+        self.chain = chain
+
+    async def get_option_chain(self, symbol: str, expiry: str) -> dict:
+        return self.chain
+
+
+def build_raw_chain(n_strikes: int) -> dict:
+    """Dhan-shaped option chain payload around the synthetic smile"""
+    spot, strikes, ce_iv, pe_iv = build_chain(n_strikes)
+    rng = np.random.default_rng(7)
+    oc = {}
+    for K, c_iv, p_iv in zip(strikes.tolist(), ce_iv.tolist(), pe_iv.tolist()):
+        legs = {}
+        for side, iv, intrinsic in (("ce", c_iv, spot - K), ("pe", p_iv, K - spot)):
+            ltp = round(max(intrinsic, 0.0) + float(rng.uniform(5, 120)), 2)
+            legs[side] = {
+                "ltp": ltp, "iv": round(iv * 100, 2),
+                "OI": int(rng.integers(1e4, 5e6)), "oichng": int(rng.integers(-1e5, 1e5)),
+                "vol": int(rng.integers(0, 1e7)), "bid": ltp - 0.5, "ask": ltp + 0.5,
+            }
+        oc[f"{K:.6f}"] = legs
+    return {
+        "spot": {"ltp": spot, "change": 23.5}, "oc": oc,
+        "atmiv": 14.2, "atmiv_change": -0.4, "u_id": 1,
+    }
+
+
+def traced(fn):
+    """(result, peak KiB, KiB still held by the result, allocations) of fn()"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn()
+    after = tracemalloc.take_snapshot()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocations = sum(max(stat.count_diff, 0) for stat in after.compare_to(before, "lineno"))
+    return result, peak / 1024, held / 1024, allocations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Every tick serves the same chain; time processing it, not reusing it
+    settings.LIVE_COALESCE_ENABLED = False
+    settings.PROCESSED_CHAIN_CACHE_ENABLED = False
+    service = OptionsService(dhan_client=SnapshotClient(build_raw_chain(args.strikes)))
+    expiry = str(int(time.time()) + 4 * 86400)
+    loop = asyncio.new_event_loop()
+
+    def tick():
+        return loop.run_until_complete(service.get_live_data("NIFTY", expiry))
+
+    tick()  # Warm imports and per-expiry state
+    tick_ms = time_it(tick, args.repeat)
+    _, peak_kb, held_kb, allocations = traced(tick)
+    loop.close()
+
+    print(f"One streaming tick: {args.strikes} strikes, Greeks + reversal")
+    print(f"  wall time    : {tick_ms:8.2f} ms")
+    print(f"  peak traced  : {peak_kb:8.1f} KiB")
+    print(f"  payload held : {held_kb:8.1f} KiB")
+    print(f"  allocations  : {allocations:8d} blocks")
+
+    # Per-leg records: slotted vs the same fields on a __dict__-backed class
+    legs = 2 * args.strikes
+    print(f"Records for {legs} legs (KiB held)     slotted   __dict__")
+    for cls, make in (
+        (AdvancedGreeks, lambda c: c(*([0.1] * 13))),
+        (TradingSignals, lambda c: c(1.0, 2.0, 3.0, 4.0)),
+    ):
+        dict_cls = make_dataclass(f"Dict{cls.__name__}", [(f.name, f.type) for f in fields(cls)])
+        _, _, slotted_kb, _ = traced(lambda: [make(cls) for _ in range(legs)])
+        _, _, dict_kb, _ = traced(lambda: [make(dict_cls) for _ in range(legs)])
+        print(f"  {cls.__name__:<32}{slotted_kb:9.1f} {dict_kb:10.1f}")
+
+    # optgeeks payloads: per-field lookups on column lists vs zipped rows
+    spot, strikes, ce_iv, pe_iv = build_chain(args.strikes)
+    n = len(strikes)
+    chain = GreeksService(risk_free_rate=0.10).calculate_chain_greeks(
+        spot, np.concatenate([strikes, strikes]), 4 / 365,
+        np.concatenate([ce_iv, pe_iv]), np.arange(2 * n) < n
+    )
+    names = list(OptionsService.GREEKS_OUTPUT_FIELDS)
+
+    def per_field():
+        columns = {name: arr.tolist() for name, arr in chain.items()}
+        return [{name: columns[name][i] for name in names} for i in range(2 * n)]
+
+    def zipped_rows():
+        rows = zip(*(chain[name].tolist() for name in names))
+        return [dict(zip(names, row)) for row in rows]
+
+    print(f"optgeeks for {2 * n} legs          ms   peak KiB")
+    for label, fn in (("per-field lookups", per_field), ("zipped rows", zipped_rows)):
+        _, peak_kb, _, _ = traced(fn)
+        print(f"  {label:<26}{time_it(fn, args.repeat * 5):7.3f} {peak_kb:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: SVI smile fit latency for one expiry of a 200-strike NIFTY chain.
+
+Times VolSurfaceService.update for a cold fit, a warm-started refit after
+the quotes move, and a tick whose quotes are within tolerance (cache hit).
+
+Run from the Backend directory:
+    python -m scripts.benchmark_vol_surface [--strikes 200] [--repeat 20]
+"""
+import argparse
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.services.vol_surface import VolSurfaceService
+from scripts.benchmark_chain_greeks import build_chain, time_it
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    spot, strikes, ce_iv, pe_iv = build_chain(args.strikes)
+    T = 7 / 365
+    forward = spot * np.exp(0.10 * T)
+    ce_iv = ce_iv * 100 + rng.normal(0, 0.2, strikes.size)
+    pe_iv = pe_iv * 100 + rng.normal(0, 0.2, strikes.size)
+    moved = [ce_iv + rng.normal(0, 0.3, strikes.size) for _ in range(2)]
+
+    def cold():
+        VolSurfaceService().update("NIFTY", "1", strikes, ce_iv, pe_iv, forward, T)
+
+    surface = VolSurfaceService()
+    surface.update("NIFTY", "1", strikes, ce_iv, pe_iv, forward, T)
+    ticks = iter(range(10 ** 9))
+
+    def warm():
+        # Alternate between two moved quote sets so every call refits
+        surface.update("NIFTY", "1", strikes, moved[next(ticks) % 2], pe_iv, forward, T)
+
+    def cached():
+        surface.update("NIFTY", "1", strikes, moved[1], pe_iv, forward, T)
+
+    fitted = surface.get_slice("NIFTY", "1")
+    print(f"Expiry: {strikes.size} strikes, fit RMSE {fitted.rmse:.3f} vol pts")
+    print(f"  cold fit          : {time_it(cold, args.repeat):9.3f} ms")
+    print(f"  warm-started refit: {time_it(warm, args.repeat):9.3f} ms")
+    print(f"  unchanged quotes  : {time_it(cached, args.repeat):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
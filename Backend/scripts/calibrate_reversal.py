@@ -0,0 +1,67 @@
+"""
+Calibrate the reversal weights on recorded chain snapshots.
+
+Reads HistoricalService snapshot dicts from a JSON-lines file, runs the
+walk-forward random search of app.services.reversal_calibration across
+worker processes and writes the winning parameter set as
+<output-dir>/reversal_params_<version>.json. Point REVERSAL_PARAMS_PATH at
+that file to load it at startup.
+
+Run from the Backend directory:
+    python -m scripts.calibrate_reversal snapshots.jsonl [--output-dir calibration]
+        [--horizon-minutes 60] [--candidates 2000] [--workers 4] [--folds 4]
+"""
+import argparse
+import json
+import os
+
+os.environ.setdefault("SECRET_KEY", "calibration")
+
+from app.services.reversal import DEFAULT_REVERSAL_PARAMS, ReversalParams
+from app.services.reversal_calibration import build_samples, calibrate, load_snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("snapshots", help="JSON-lines file of recorded snapshots")
+    parser.add_argument("--output-dir", default="calibration")
+    parser.add_argument("--horizon-minutes", type=float, default=60)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--spread", type=float, default=0.25, help="Lognormal spread of the random search")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--base", help="Parameter set to search around (default: built-in weights)")
+    args = parser.parse_args()
+
+    base = ReversalParams.load(args.base) if args.base else DEFAULT_REVERSAL_PARAMS
+    samples = build_samples(load_snapshots(args.snapshots), horizon_minutes=args.horizon_minutes)
+    print(f"{len(samples)} samples from {args.snapshots}")
+
+    params = calibrate(
+        samples,
+        n_candidates=args.candidates,
+        spread=args.spread,
+        seed=args.seed,
+        n_folds=args.folds,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        base=base,
+    )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"reversal_params_{params.version}.json")
+    params.save(path)
+    report = {k: v for k, v in params.metadata.items() if k != "walk_forward"}
+    print(json.dumps(report, indent=2))
+    for fold in params.metadata["walk_forward"]:
+        print(
+            f"  train {fold['train_samples']:5d}  test {fold['test_samples']:5d}  "
+            f"loss {fold['test_loss_bps']:8.2f} bps  (default {fold['default_test_loss_bps']:8.2f})"
+        )
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,18 @@ class TestDhanClientIntegration:
 class TestOptionsServiceIntegration:
     """Integration tests for options service"""
     
+    @pytest.fixture(autouse=True)
+    def fresh_container(self, monkeypatch):
+        """Services default to the container's shared single-flight and processed-chain cache;
+        turn both off so each call recomputes unless a test passes its own"""
+        from app.config.settings import settings
+        from app.core.container import container
+        monkeypatch.setattr(settings, "LIVE_COALESCE_ENABLED", False)
+        monkeypatch.setattr(settings, "PROCESSED_CHAIN_CACHE_ENABLED", False)
+        container.reset()
+        yield
+        container.reset()
+    
     @pytest.fixture
     def mock_dhan_client(self):
         """Mock Dhan client"""
@@ -86,6 +98,416 @@ class TestOptionsServiceIntegration:
         assert "symbol" in data or "oc" in data
 
 
+    @pytest.mark.asyncio
+    async def test_options_service_greeks_level(self, mock_dhan_client, mock_cache):
+        """greeks_level='first' should only return first-order Greeks per leg"""
+        from app.services.options import OptionsService
+        
+        service = OptionsService(dhan_client=mock_dhan_client, cache=mock_cache)
+        data = await service.get_live_data(
+            symbol="NIFTY",
+            expiry="1703635200",
+            include_reversal=False,
+            greeks_level="first"
+        )
+        
+        greeks = data["oc"]["24500.000000"]["ce"]["optgeeks"]
+        assert set(greeks) == {"delta", "gamma", "theta", "vega", "rho"}
+    
+    @pytest.mark.asyncio
+    async def test_options_service_reuses_unchanged_strikes(self, mock_cache):
+        """Second tick should only recompute strikes whose inputs moved"""
+        import copy
+        from app.services.options import OptionsService
+        
+        chain = {
+            "symbol": "NIFTY",
+            "spot": {"ltp": 24500, "change": 12},
+            "atmiv": 14,
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24500 - strike, 0) + 90, "iv": 14, "OI": 10000},
+                    "pe": {"ltp": max(strike - 24500, 0) + 95, "iv": 15, "OI": 12000}
+                }
+                for strike in range(24300, 24750, 50)
+            }
+        }
+        next_tick = copy.deepcopy(chain)
+        next_tick["oc"]["24400.000000"]["ce"]["ltp"] += 1.5
+        
+        def make_service(*ticks):
+            client = MagicMock()
+            client.get_option_chain = AsyncMock(side_effect=list(ticks))
+            service = OptionsService(dhan_client=client, cache=mock_cache)
+            service._calculate_days_to_expiry_ist = lambda ts: 5.0
+            return service
+        
+        streaming = make_service(chain, next_tick)
+        await streaming.get_live_data(symbol="NIFTY", expiry="1703635200")
+        incremental = await streaming.get_live_data(symbol="NIFTY", expiry="1703635200")
+        full = await make_service(next_tick).get_live_data(symbol="NIFTY", expiry="1703635200")
+        
+        assert streaming.recompute_stats == {"reused": 8, "recomputed": 10, "approximated": 0}
+        assert incremental["oc"] == full["oc"]
+    
+    @pytest.mark.asyncio
+    async def test_options_service_evicts_least_recent_chain_state(self, mock_cache, monkeypatch):
+        """Only the most recently served chains keep last-tick state"""
+        from app.config.settings import settings
+        from app.services.options import OptionsService
+        
+        monkeypatch.setattr(settings, "INCREMENTAL_MAX_CHAINS", 2)
+        client = MagicMock()
+        client.get_option_chain = AsyncMock(return_value={
+            "spot": {"ltp": 24500},
+            "oc": {
+                f"{strike}.000000": {"ce": {"ltp": 100, "iv": 14}, "pe": {"ltp": 100, "iv": 15}}
+                for strike in range(24400, 24650, 50)
+            }
+        })
+        service = OptionsService(dhan_client=client, cache=mock_cache)
+        service._calculate_days_to_expiry_ist = lambda ts: 5.0
+        
+        for expiry in ("1703635200", "1704240000", "1703635200", "1704844800"):
+            await service.get_live_data(symbol="NIFTY", expiry=expiry)
+        
+        assert list(service._chain_state) == [
+            ("NIFTY", "1703635200", None), ("NIFTY", "1704844800", None)
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_options_service_approximate_spot_tick(self, mock_cache, monkeypatch):
+        """Approximate mode should Taylor-expand a small spot move"""
+        import copy
+        from app.config.settings import settings
+        from app.services.options import OptionsService
+        
+        # Price off the cash spot; these fixed quotes would pin the parity forward
+        monkeypatch.setattr(settings, "IMPLIED_FORWARD_ENABLED", False)
+        chain = {
+            "symbol": "NIFTY",
+            "spot": {"ltp": 24500, "change": 12},
+            "atmiv": 14,
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24500 - strike, 0) + 90, "iv": 14, "OI": 10000},
+                    "pe": {"ltp": max(strike - 24500, 0) + 95, "iv": 15, "OI": 12000}
+                }
+                for strike in range(24300, 24750, 50)
+            }
+        }
+        next_tick = copy.deepcopy(chain)
+        next_tick["spot"]["ltp"] = 24505
+        
+        def make_service(*ticks):
+            client = MagicMock()
+            client.get_option_chain = AsyncMock(side_effect=list(ticks))
+            service = OptionsService(dhan_client=client, cache=mock_cache)
+            service._calculate_days_to_expiry_ist = lambda ts: 5.0
+            return service
+        
+        service = make_service(chain, next_tick, next_tick)
+        await service.get_live_data(symbol="NIFTY", expiry="1703635200", approximate=True)
+        approx = await service.get_live_data(symbol="NIFTY", expiry="1703635200", approximate=True)
+        # No prior state, so every strike is priced exactly at the new spot
+        exact = await make_service(next_tick).get_live_data(symbol="NIFTY", expiry="1703635200")
+        
+        assert service.recompute_stats["approximated"] == 9
+        assert approx["oc"] != exact["oc"]
+        for key, strike in exact["oc"].items():
+            assert approx["oc"][key]["ce"]["optgeeks"]["delta"] == pytest.approx(
+                strike["ce"]["optgeeks"]["delta"], abs=1e-5
+            )
+            assert approx["oc"][key]["ce_tv"] == pytest.approx(strike["ce_tv"], abs=1e-3)
+        
+        # An exact request on the same spot recomputes the approximated strikes
+        recomputed = await service.get_live_data(symbol="NIFTY", expiry="1703635200")
+        assert service.recompute_stats["recomputed"] == 18
+        assert recomputed["oc"] == exact["oc"]
+
+    
+    @pytest.mark.asyncio
+    async def test_options_service_strike_window(self, mock_cache):
+        """strike_window should return ATM +/- N strikes, unchanged, and follow spot"""
+        import copy
+        from app.services.options import OptionsService
+        
+        chain = {
+            "symbol": "NIFTY",
+            "spot": {"ltp": 24510, "change": 12},
+            "atmiv": 14,
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24500 - strike, 0) + 90, "iv": 14, "OI": 10000},
+                    "pe": {"ltp": max(strike - 24500, 0) + 95, "iv": 15, "OI": 12000}
+                }
+                for strike in range(24000, 25050, 50)
+            }
+        }
+        moved = copy.deepcopy(chain)
+        moved["spot"]["ltp"] = 24690
+        
+        client = MagicMock()
+        client.get_option_chain = AsyncMock(side_effect=[chain, chain, moved])
+        service = OptionsService(dhan_client=client, cache=mock_cache)
+        service._calculate_days_to_expiry_ist = lambda ts: 5.0
+        
+        full = await service.get_live_data(symbol="NIFTY", expiry="1703635200")
+        window = await service.get_live_data(symbol="NIFTY", expiry="1703635200", strike_window=2)
+        assert window["strikes"] == ["24400.0", "24450.0", "24500.0", "24550.0", "24600.0"]
+        assert window["strike_window"] == 2
+        assert window["total_ce_oi"] == full["total_ce_oi"]
+        for key, strike in window["oc"].items():
+            assert strike == full["oc"][key]
+        
+        recentred = await service.get_live_data(symbol="NIFTY", expiry="1703635200", strike_window=2)
+        assert recentred["atm_strike"] == 24700
+        assert recentred["strikes"][0] == "24600.0" and recentred["strikes"][-1] == "24800.0"
+    
+    @pytest.mark.asyncio
+    async def test_options_service_coalesces_identical_requests(self, mock_cache):
+        """Concurrent identical requests should share one fetch; fresh results are reused"""
+        import asyncio
+        from app.cache.single_flight import SingleFlight
+        from app.services.options import OptionsService
+        
+        chain = {
+            "symbol": "NIFTY",
+            "spot": {"ltp": 24500, "change": 12},
+            "atmiv": 14,
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24500 - strike, 0) + 90, "iv": 14, "OI": 10000},
+                    "pe": {"ltp": max(strike - 24500, 0) + 95, "iv": 15, "OI": 12000}
+                }
+                for strike in range(24300, 24750, 50)
+            }
+        }
+        
+        async def slow_chain(symbol, expiry):
+            await asyncio.sleep(0.01)
+            return chain
+        
+        client = MagicMock()
+        client.get_option_chain = AsyncMock(side_effect=slow_chain)
+        flight = SingleFlight(freshness_seconds=0.05)
+        services = [OptionsService(dhan_client=client, cache=mock_cache, single_flight=flight) for _ in range(4)]
+        for service in services:
+            service._calculate_days_to_expiry_ist = lambda ts: 5.0
+        
+        results = await asyncio.gather(*(
+            service.get_live_data(symbol="NIFTY", expiry="1703635200") for service in services
+        ))
+        assert client.get_option_chain.await_count == 1
+        assert all(result is results[0] for result in results)
+        
+        # Within the freshness window; different flags are a different key
+        assert await services[0].get_live_data(symbol="nifty", expiry="1703635200") is results[0]
+        await services[0].get_live_data(symbol="NIFTY", expiry="1703635200", strike_window=2)
+        assert client.get_option_chain.await_count == 2
+        
+        await asyncio.sleep(0.06)
+        assert await services[0].get_live_data(symbol="NIFTY", expiry="1703635200") is not results[0]
+        stats = flight.snapshot()
+        assert (stats["executed"], stats["coalesced"], stats["fresh"]) == (3, 3, 1)
+        assert stats["coalescing_ratio"] == pytest.approx(4 / 7, abs=1e-4)
+        
+        # A failed fetch is never reused
+        client.get_option_chain = AsyncMock(side_effect=RuntimeError("upstream down"))
+        flight.clear()
+        with pytest.raises(RuntimeError):
+            await services[1].get_live_data(symbol="NIFTY", expiry="1703635200")
+        with pytest.raises(RuntimeError):
+            await services[1].get_live_data(symbol="NIFTY", expiry="1703635200")
+        assert client.get_option_chain.await_count == 2
+    
+    def test_options_service_defaults_to_shared_coalescing(self, monkeypatch, mock_cache):
+        """Services built per request should share the container's single-flight and cache"""
+        from app.config.settings import settings
+        from app.core.container import container
+        from app.services.options import OptionsService
+        
+        monkeypatch.setattr(settings, "LIVE_COALESCE_ENABLED", True)
+        monkeypatch.setattr(settings, "PROCESSED_CHAIN_CACHE_ENABLED", True)
+        container.reset()
+        first = OptionsService(dhan_client=MagicMock(), cache=mock_cache)
+        second = OptionsService(dhan_client=MagicMock(), cache=mock_cache)
+        
+        assert first.single_flight is not None
+        assert first.single_flight is second.single_flight is container.live_data_flight
+        assert first.processed_cache is not None
+        assert first.processed_cache is second.processed_cache is container.processed_chain_cache
+    
+    @pytest.mark.asyncio
+    async def test_options_service_skips_unchanged_upstream(self, mock_cache):
+        """An unchanged upstream chain should be served from the versioned cache"""
+        import copy
+        from app.cache.versioned import VersionedCache
+        from app.services.options import OptionsService
+        
+        chain = {
+            "symbol": "NIFTY",
+            "timestamp": "2024-12-20T09:15:00",
+            "spot": {"ltp": 24500, "change": 12},
+            "atmiv": 14,
+            "u_id": 7,
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24500 - strike, 0) + 90, "iv": 14, "OI": 10000},
+                    "pe": {"ltp": max(strike - 24500, 0) + 95, "iv": 15, "OI": 12000}
+                }
+                for strike in range(24300, 24750, 50)
+            }
+        }
+        # Same content fetched again (only the fetch timestamp differs), then a new tick
+        repeat = copy.deepcopy(chain)
+        repeat["timestamp"] = "2024-12-20T09:15:01"
+        next_tick = copy.deepcopy(chain)
+        next_tick["oc"]["24400.000000"]["ce"]["ltp"] += 1.5
+        
+        client = MagicMock()
+        client.get_option_chain = AsyncMock(side_effect=[chain, repeat, next_tick])
+        processed = VersionedCache()
+        service = OptionsService(dhan_client=client, cache=mock_cache, processed_cache=processed)
+        service._calculate_days_to_expiry_ist = lambda ts: 5.0
+        
+        first = await service.get_live_data(symbol="NIFTY", expiry="1703635200")
+        again = await service.get_live_data(symbol="NIFTY", expiry="1703635200")
+        assert first["version"] and again["version"] == first["version"]
+        assert again["oc"] is first["oc"]
+        assert processed.stats["hits"] == 1
+        
+        updated = await service.get_live_data(symbol="NIFTY", expiry="1703635200")
+        assert updated["version"] != first["version"]
+        assert updated["oc"]["24400.000000"]["ce"]["ltp"] == first["oc"]["24400.000000"]["ce"]["ltp"] + 1.5
+        assert processed.stats["misses"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_options_service_process_kernels_match(self, mock_cache):
+        """Greeks and reversal computed in worker processes should match the in-process chain"""
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        from app.core.container import process_pool_context
+        from app.services.options import OptionsService
+        
+        chain = {
+            "symbol": "NIFTY",
+            "spot": {"ltp": 24510, "change": 12},
+            "atmiv": 14,
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24500 - strike, 0) + 90, "iv": 14, "OI": 10000},
+                    "pe": {"ltp": max(strike - 24500, 0) + 95, "iv": 15, "OI": 12000}
+                }
+                for strike in range(24000, 25050, 50)
+            }
+        }
+        
+        def make_service(**executors):
+            client = MagicMock()
+            client.get_option_chain = AsyncMock(return_value=chain)
+            service = OptionsService(dhan_client=client, cache=mock_cache, **executors)
+            service._calculate_days_to_expiry_ist = lambda ts: 5.0
+            return service
+        
+        expected = await make_service().get_live_data(symbol="NIFTY", expiry="1703635200")
+        with ThreadPoolExecutor(1) as threads, ProcessPoolExecutor(1, mp_context=process_pool_context()) as processes:
+            offloaded = await make_service(executor=threads, kernel_executor=processes).get_live_data(
+                symbol="NIFTY", expiry="1703635200"
+            )
+        
+        assert offloaded["oc"] == expected["oc"]
+
+    @pytest.mark.asyncio
+    async def test_options_service_fills_missing_iv_from_surface(self, mock_cache):
+        """A leg with no IV and no LTP should take the fitted smile's IV"""
+        from app.services.options import OptionsService
+        from app.services.vol_surface import VolSurfaceService
+        
+        chain = {
+            "symbol": "NIFTY",
+            "spot": {"ltp": 24500, "change": 12},
+            "atmiv": 14,
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24500 - strike, 0) + 90, "iv": 14 + abs(strike - 24500) / 100, "OI": 10000},
+                    "pe": {"ltp": max(strike - 24500, 0) + 95, "iv": 14.5 + abs(strike - 24500) / 100, "OI": 12000}
+                }
+                for strike in range(24300, 24750, 50)
+            }
+        }
+        chain["oc"]["24600.000000"]["ce"].update({"ltp": 0, "iv": 0})
+        
+        client = MagicMock()
+        client.get_option_chain = AsyncMock(return_value=chain)
+        surface = VolSurfaceService()
+        service = OptionsService(dhan_client=client, cache=mock_cache, vol_surface=surface)
+        service._calculate_days_to_expiry_ist = lambda ts: 5.0
+        data = await service.get_live_data(symbol="NIFTY", expiry="1703635200")
+        
+        fitted = surface.get_slice("NIFTY", "1703635200")
+        assert fitted is not None
+        assert data["oc"]["24600.000000"]["ce"]["iv"] == pytest.approx(
+            float(fitted.implied_vol([24600])[0]), abs=0.01
+        )
+        assert 14.5 < data["oc"]["24600.000000"]["ce"]["iv"] < 16.5
+
+    
+    @pytest.mark.asyncio
+    async def test_future_price_from_parity_skips_futures_call(self, mock_cache):
+        """A chain with consistent CE/PE prices should not need the futures feed"""
+        from app.services.options import OptionsService
+        
+        client = MagicMock()
+        client.get_option_chain = AsyncMock(return_value={
+            "spot": {"ltp": 24500},
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24530 - strike, 0) + 80},
+                    "pe": {"ltp": max(strike - 24530, 0) + 80}
+                }
+                for strike in range(24300, 24750, 50)
+            }
+        })
+        client.get_futures_data = AsyncMock(return_value=[])
+        service = OptionsService(dhan_client=client, cache=mock_cache)
+        
+        data = await service.get_future_price_data("NIFTY", "1703635200")
+        
+        client.get_futures_data.assert_not_called()
+        assert data["source"] == "put_call_parity"
+        assert data["future_price"] == pytest.approx(24530)
+    
+    @pytest.mark.asyncio
+    async def test_reversal_prices_off_parity_spot(self, mock_cache):
+        """Reversal should use the same parity-implied spot as the Greeks, not the cash LTP"""
+        import math
+        import time
+        from app.services.options import OptionsService
+        
+        client = MagicMock()
+        client.get_option_chain = AsyncMock(return_value={
+            "spot": {"ltp": 24500},
+            "oc": {
+                f"{strike}.000000": {
+                    "ce": {"ltp": max(24530 - strike, 0) + 80, "iv": 15, "OI": 1000},
+                    "pe": {"ltp": max(strike - 24530, 0) + 80, "iv": 15, "OI": 1000}
+                }
+                for strike in range(24300, 24750, 50)
+            }
+        })
+        service = OptionsService(dhan_client=client, cache=mock_cache)
+        
+        data = await service.get_live_data(symbol="NIFTY", expiry=str(int(time.time()) + 7 * 86400))
+        
+        pricing_spot = data["implied_forward"]["forward"] * math.exp(
+            -service.greeks.r * data["days_to_expiry"] / 365
+        )
+        price_range = data["oc"]["24500.000000"]["price_range"]
+        assert (price_range["low"] + price_range["high"]) / 2 == pytest.approx(pricing_spot, abs=1e-3)
+        assert abs(pricing_spot - 24500) > 1  # Parity spot is not the cash LTP
+
+
 class TestCacheIntegration:
     """Integration tests for Redis cache"""
     
@@ -4,9 +4,24 @@ BSM, Greeks, and Reversal calculations
 """
 import pytest
 import math
+import dataclasses
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from app.cache.memo import PricingMemo
 from app.services.bsm import BSMService
-from app.services.greeks import GreeksService
-from app.services.reversal import ReversalService
+from app.services.calculators import CalculatorService
+from app.services.chain_frame import ChainFrame, LEG_PAYLOAD_FIELDS
+from app.services.greeks import GreeksService, GREEK_FIELDS, GREEK_LEVELS
+from app.services.kernels import norm_cdf, norm_pdf, norm_ppf
+from app.services.optimizer import StrategyOptimizer, ChainQuotes
+from app.services.reversal import ReversalService, ReversalParams, DEFAULT_REVERSAL_PARAMS
+from app.services.reversal_calibration import (
+    build_samples, calibrate, candidate_reversals, params_to_arrays
+)
+from app.services.scenario import ScenarioService
+from app.services.simulation import SimulationService, JumpParams
+from app.services.strategy import StrategyService, StrategyLeg
+from app.services.vol_surface import VolSurfaceService
 
 
 class TestBSMService:
@@ -52,8 +67,150 @@ class TestBSMService:
         price = bsm.price(S=24500, K=24500, T=0.1, sigma=original_sigma, option_type="call")
         calculated_iv = bsm.implied_volatility(price, S=24500, K=24500, T=0.1, option_type="call")
         assert abs(calculated_iv - original_sigma) < 0.01  # Within 1%
+    
+    def test_implied_volatility_batch_round_trip(self, bsm):
+        """Batch IV solver should recover the IVs used to price a chain"""
+        strikes = np.arange(23000, 26050, 100, dtype=float)
+        K = np.concatenate([strikes, strikes])
+        is_call = np.arange(len(K)) < len(strikes)
+        sigma = np.linspace(0.10, 0.60, len(K))
+        prices, _ = bsm.price_array(24500, K, 0.1, sigma, is_call)
+        
+        solved = bsm.implied_volatility_batch(prices, 24500, K, 0.1, is_call)
+        repriced, _ = bsm.price_array(24500, K, 0.1, solved, is_call)
+        
+        assert not np.isnan(solved).any()
+        assert np.max(np.abs(repriced - prices)) < 1e-3
+    
+    def test_implied_volatility_batch_rejects_arbitrage(self, bsm):
+        """Prices outside no-arbitrage bounds should return NaN"""
+        solved = bsm.implied_volatility_batch(
+            np.array([0.0, 30000.0, 600.0]), 24500,
+            np.array([24500.0, 24500.0, 24500.0]), 0.1,
+            np.array([True, True, True])
+        )
+        assert np.isnan(solved[0]) and np.isnan(solved[1])
+        assert solved[2] > 0
+
+    
+    def test_implied_forward_recovers_parity(self, bsm):
+        """Forward and discount factor should be recovered from BSM prices"""
+        T, r, q = 30 / 365, 0.07, 0.012
+        strikes = np.arange(23500, 25550, 100.0)
+        sigma = np.full(strikes.size, 0.15)
+        calls, _ = bsm.price_array(24500, strikes, T, sigma, np.ones(strikes.size, bool), r=r, q=q)
+        puts, _ = bsm.price_array(24500, strikes, T, sigma, np.zeros(strikes.size, bool), r=r, q=q)
+        # One stale quote should not move the robust estimate
+        calls[5] += 40
+        
+        fit = bsm.implied_forward(strikes, calls, puts, 24500, T)
+        assert fit.forward == pytest.approx(24500 * math.exp((r - q) * T), abs=1e-6)
+        assert fit.discount_factor == pytest.approx(math.exp(-r * T), abs=1e-9)
+        assert fit.rate == pytest.approx(r, abs=1e-6)
+    
+    def test_greeks_array_matches_scalar_greeks(self, bsm):
+        """Vectorized Greeks at q=0 should match the scalar methods"""
+        strikes = np.arange(23500, 25550, 250.0)
+        sigma = np.full(strikes.size, 0.18)
+        for option_type in ("call", "put"):
+            greeks = bsm.greeks_array(24500, strikes, 0.05, sigma, option_type == "call")
+            for name in ("delta", "theta", "rho"):
+                scalar = [getattr(bsm, name)(24500, K, 0.05, 0.18, option_type) for K in strikes.tolist()]
+                np.testing.assert_allclose(greeks[name], scalar, rtol=0, atol=1e-9)
+            for name in ("gamma", "vega"):
+                scalar = [getattr(bsm, name)(24500, K, 0.05, 0.18) for K in strikes.tolist()]
+                np.testing.assert_allclose(greeks[name], scalar, rtol=0, atol=1e-9)
+    
+    def test_implied_forward_needs_quotes(self, bsm):
+        assert bsm.implied_forward([24400, 24500], [150, 90], [60, 100], 24500, 0.05) is None
+
 
 
+
+class TestNormalKernels:
+    """Scalar normal kernels should agree with scipy to 1e-12"""
+    
+    def test_cdf_and_pdf_match_scipy(self):
+        from scipy.stats import norm
+        xs = np.linspace(-38, 38, 20001)
+        np.testing.assert_allclose([norm_cdf(x) for x in xs.tolist()], norm.cdf(xs), rtol=0, atol=1e-12)
+        np.testing.assert_allclose([norm_pdf(x) for x in xs.tolist()], norm.pdf(xs), rtol=0, atol=1e-12)
+        # Relative accuracy holds in the far tail too
+        assert norm_cdf(-30) == pytest.approx(norm.cdf(-30), rel=1e-12)
+    
+    def test_ppf_matches_scipy(self):
+        from scipy.stats import norm
+        ps = np.concatenate([np.logspace(-300, -1, 600), np.linspace(1e-4, 1 - 1e-4, 5001), 1 - np.logspace(-15, -1, 300)])
+        np.testing.assert_allclose([norm_ppf(p) for p in ps.tolist()], norm.ppf(ps), rtol=0, atol=1e-12)
+        assert norm_ppf(0.0) == -math.inf and norm_ppf(1.0) == math.inf
+        assert math.isnan(norm_ppf(1.5))
+    
+    def test_scalar_price_matches_array_path(self):
+        bsm = BSMService(risk_free_rate=0.10)
+        strikes = np.arange(23000, 26001, 100.0)
+        calls, _ = bsm.price_array(24500, strikes, 7 / 365, np.full(len(strikes), 0.15), np.ones(len(strikes), dtype=bool))
+        scalar = [bsm.price(24500, K, 7 / 365, 0.15, "call") for K in strikes.tolist()]
+        np.testing.assert_allclose(scalar, calls, rtol=0, atol=1e-9)
+
+class TestPricingMemo:
+    """Tests for the quantized pricing memo"""
+    
+    def test_hits_return_grid_point_values(self):
+        memo = PricingMemo(price_step=2e-6, iv_step=0.0001, time_step_minutes=1)
+        bsm = BSMService(risk_free_rate=0.10, memo=memo)
+        plain = BSMService(risk_free_rate=0.10)
+        T = 7 / 365
+        first = bsm.price(24513.37, 24500, T, 0.15341, "call")
+        # Same grid point (2e-6 relative price step, IV 1 bp) -> cached value
+        assert bsm.price(24513.36, 24500, T, 0.15339, "call") == first
+        grid_S = math.exp(round(math.log(24513.37) / 2e-6) * 2e-6)
+        grid_K = math.exp(round(math.log(24500) / 2e-6) * 2e-6)
+        assert first == pytest.approx(plain.price(grid_S, grid_K, T, 0.1534, "call"), rel=1e-12)
+        assert first == pytest.approx(plain.price(24513.37, 24500, T, 0.15341, "call"), abs=0.05)
+        assert memo.stats["hits"] == 1 and memo.stats["misses"] == 1
+    
+    def test_low_priced_underlying_keeps_precision(self):
+        """The price step is relative, so a spot near 1 is not rounded to 0.05"""
+        memo = CalculatorService(memo=PricingMemo()).calculate_option_price(1.02, 1.0, 0.25, 0.07, 0.2)
+        exact = CalculatorService().calculate_option_price(1.02, 1.0, 0.25, 0.07, 0.2)
+        assert (memo.call_price, memo.put_price) == (exact.call_price, exact.put_price) == (0.06, 0.02)
+        assert memo.gamma == pytest.approx(exact.gamma, rel=1e-5)
+    
+    def test_key_includes_type_rate_and_method(self):
+        memo = PricingMemo()
+        fast = BSMService(risk_free_rate=0.10, memo=memo)
+        slow = BSMService(risk_free_rate=0.05, memo=memo)
+        T = 30 / 365
+        assert fast.price(24500, 24500, T, 0.15, "call") != fast.price(24500, 24500, T, 0.15, "put")
+        assert fast.price(24500, 24500, T, 0.15, "call") != slow.price(24500, 24500, T, 0.15, "call")
+        assert fast.delta(24500, 24500, T, 0.15, "call") == pytest.approx(
+            BSMService(risk_free_rate=0.10).delta(24500, 24500, T, 0.15, "call")
+        )
+        greeks = GreeksService(risk_free_rate=0.10, memo=memo)
+        assert greeks.calculate_all_greeks(24500, 24500, T, 0.15, "call", level="first").vanna == 0
+        assert greeks.calculate_all_greeks(24500, 24500, T, 0.15, "call").vanna != 0
+    
+    def test_lru_eviction_and_degenerate_inputs(self):
+        memo = PricingMemo(max_size=2)
+        bsm = BSMService(risk_free_rate=0.10, memo=memo)
+        for K in (24400, 24500, 24600):
+            bsm.price(24500, K, 0.1, 0.15)
+        assert memo.snapshot()["size"] == 2 and memo.stats["evictions"] == 1
+        # Expired options bypass the memo and settle at intrinsic
+        assert bsm.price(24500, 24400, 0, 0.15) == 100
+        assert memo.stats["misses"] == 3
+    
+    def test_calculator_shares_container_memo(self):
+        from app.core.container import container
+        from app.services.calculators import get_calculator_service
+        first, second = get_calculator_service(), get_calculator_service()
+        assert first.memo is second.memo is container.pricing_memo
+        result = first.calculate_option_price(24500, 24500, 7 / 365, 0.07, 0.15)
+        assert second.calculate_option_price(24500.01, 24500, 7 / 365, 0.07, 0.15) is result
+        # Shared between callers, so read-only
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.call_price = 0
+
 class TestGreeksService:
     """Test Greeks calculations"""
     
@@ -106,7 +263,85 @@ class TestGreeksService:
         assert hasattr(result, 'zomma')
         assert hasattr(result, 'color')
         assert hasattr(result, 'ultima')
+    
+    def test_greeks_are_slotted_and_serialize(self, greeks):
+        """Per-leg Greeks should carry no __dict__ and serialize field by field"""
+        result = greeks.calculate_all_greeks(S=24500, K=24500, T=0.1, sigma=0.15, option_type="call")
+        assert not hasattr(result, "__dict__")
+        assert list(result.to_dict()) == list(GREEK_FIELDS)
+        assert result.to_dict(("delta", "gamma")) == {"delta": result.delta, "gamma": result.gamma}
+    
+    def test_chain_greeks_match_scalar(self, greeks):
+        """Vectorized chain Greeks should match the scalar path"""
+        strikes = np.arange(23500, 25550, 50, dtype=float)
+        n = len(strikes)
+        K = np.concatenate([strikes, strikes])
+        sigma = np.linspace(0.10, 0.35, 2 * n)
+        is_call = np.arange(2 * n) < n
+        
+        chain = greeks.calculate_chain_greeks(24500, K, 7 / 365, sigma, is_call)
+        
+        for i in range(2 * n):
+            scalar = greeks.calculate_all_greeks(
+                24500, K[i], 7 / 365, sigma[i], "call" if is_call[i] else "put"
+            )
+            for name in GREEK_FIELDS:
+                assert chain[name][i] == pytest.approx(getattr(scalar, name), abs=1e-6)
+    
+    def test_chain_greeks_invalid_rows_are_zero(self, greeks):
+        """Rows with zero IV or expired time should return zero Greeks"""
+        chain = greeks.calculate_chain_greeks(
+            24500, np.array([24500.0, 24500.0]), 0.1,
+            np.array([0.0, 0.15]), np.array([True, True])
+        )
+        assert all(chain[name][0] == 0 for name in GREEK_FIELDS)
+        assert chain["delta"][1] > 0
+    
+    def test_calculate_for_chain(self, greeks):
+        """calculate_for_chain should return CE/PE Greeks per strike"""
+        result = greeks.calculate_for_chain(
+            24500, [24400.0, 24500.0], 0.1,
+            {24400.0: 0.15, 24500.0: 0.15}, {24400.0: 0.16, 24500.0: 0.16}
+        )
+        assert set(result) == {24400.0, 24500.0}
+        assert result[24500.0]["ce"].delta > 0
+        assert result[24500.0]["pe"].delta < 0
 
+    
+    def test_approximate_spot_move(self, greeks):
+        """Taylor update should track exact Greeks for a small spot move"""
+        strikes = np.arange(24000.0, 25050.0, 50.0)
+        K = np.concatenate([strikes, strikes])
+        sigma = np.full(K.shape, 0.15)
+        is_call = np.arange(len(K)) < len(strikes)
+        
+        anchor = greeks.calculate_chain_greeks(24500, K, 5 / 365, sigma, is_call, with_price=True, decimals=None)
+        exact = greeks.calculate_chain_greeks(24520, K, 5 / 365, sigma, is_call, with_price=True, decimals=None)
+        approx = GreeksService.approximate_spot_move(anchor, 20.0)
+        
+        assert np.allclose(approx["price"], exact["price"], atol=1e-3)
+        assert np.allclose(approx["delta"], exact["delta"], atol=1e-4)
+        assert np.allclose(approx["gamma"], exact["gamma"], atol=1e-5)
+        assert np.array_equal(approx["theta"], anchor["theta"])
+    
+    def test_greeks_level_tiers(self, greeks):
+        """Lower greeks_level should match full on its Greeks and skip the rest"""
+        full = greeks.calculate_all_greeks(24500, 24600, 7 / 365, 0.15, "call")
+        first = greeks.calculate_all_greeks(24500, 24600, 7 / 365, 0.15, "call", level="first")
+        second = greeks.calculate_all_greeks(24500, 24600, 7 / 365, 0.15, "call", level="second")
+        
+        for name in GREEK_FIELDS:
+            assert getattr(first, name) == (getattr(full, name) if name in GREEK_LEVELS["first"] else 0)
+            assert getattr(second, name) == (getattr(full, name) if name in GREEK_LEVELS["second"] else 0)
+        
+        chain = greeks.calculate_chain_greeks(
+            24500, np.array([24600.0]), 7 / 365, np.array([0.15]), np.array([True]), level="first"
+        )
+        assert set(chain) == set(GREEK_LEVELS["first"])
+        assert chain["delta"][0] == full.delta
+        
+        with pytest.raises(ValueError):
+            greeks.calculate_all_greeks(24500, 24600, 7 / 365, 0.15, "call", level="third")
 
 class TestReversalService:
     """Test Reversal point calculations"""
@@ -132,6 +367,100 @@ class TestReversalService:
         assert result.reversal > 0
         assert result.strike_price == 24500
     
+    def test_reversal_reuses_precomputed_greeks(self, reversal):
+        """Passing fused chain Greeks/prices should not change the result"""
+        greeks = GreeksService(risk_free_rate=0.10)
+        chain = greeks.calculate_chain_greeks(
+            24500, np.array([24500.0, 24500.0]), 7 / 365,
+            np.array([0.15, 0.16]), np.array([True, False]), with_price=True
+        )
+        kwargs = dict(
+            spot=24500, spot_change=10, iv_change=0.01, strike=24500, T_days=7,
+            sigma_call=15, sigma_put=16, curr_call_price=200, curr_put_price=220
+        )
+        
+        expected = reversal.calculate_reversal(**kwargs)
+        fused = reversal.calculate_reversal(
+            **kwargs,
+            ce_greeks=GreeksService.greeks_at(chain, 0),
+            pe_greeks=GreeksService.greeks_at(chain, 1),
+            call_theoretical=float(chain["price"][0]),
+            put_theoretical=float(chain["price"][1]),
+        )
+        
+        assert fused.ce_tv == pytest.approx(expected.ce_tv)
+        assert fused.pe_tv == pytest.approx(expected.pe_tv)
+        assert fused.reversal == expected.reversal
+        assert fused.wkly_reversal == expected.wkly_reversal
+        assert fused.confidence == expected.confidence
+    
+    @pytest.mark.parametrize("T_days,atmiv", [(0.3, 0), (3, 14), (10, 35), (45, 14)])
+    def test_reversal_chain_matches_scalar(self, reversal, T_days, atmiv):
+        """Vectorized chain reversal should agree with the per-strike path"""
+        strikes = np.arange(24000.0, 25050.0, 50.0)
+        sigma_call = 13 + 40 * np.log(strikes / 24500) ** 2 * 100
+        sigma_put = sigma_call + 1
+        call_ltp = np.maximum(24500 - strikes, 0) + 40
+        put_ltp = np.maximum(strikes - 24500, 0) + 45
+        ce_oi = np.linspace(1e5, 4e5, len(strikes))
+        pe_oi = ce_oi[::-1].copy()
+        
+        chain = reversal.calculate_reversal_chain(
+            spot=24500, spot_change=-35, iv_change=0.5, strikes=strikes,
+            T_days=T_days, sigma_call=sigma_call, sigma_put=sigma_put,
+            curr_call_price=call_ltp, curr_put_price=put_ltp,
+            fut_price=24560, atmiv=atmiv, ce_oi=ce_oi, pe_oi=pe_oi,
+            avg_ce_oi=2.5e5, avg_pe_oi=2.5e5
+        )
+        
+        for i, strike in enumerate(strikes):
+            expected = reversal.calculate_reversal(
+                spot=24500, spot_change=-35, iv_change=0.5, strike=strike,
+                T_days=T_days, sigma_call=sigma_call[i], sigma_put=sigma_put[i],
+                curr_call_price=call_ltp[i], curr_put_price=put_ltp[i],
+                fut_price=24560, atmiv=atmiv, ce_oi=ce_oi[i], pe_oi=pe_oi[i],
+                avg_ce_oi=2.5e5, avg_pe_oi=2.5e5
+            )
+            assert chain["reversal"][i] == pytest.approx(expected.reversal)
+            assert chain["wkly_reversal"][i] == pytest.approx(expected.wkly_reversal)
+            assert chain["ce_tv"][i] == pytest.approx(expected.ce_tv)
+            assert chain["pe_tv"][i] == pytest.approx(expected.pe_tv)
+            assert chain["confidence"][i] == expected.confidence
+            assert chain["direction"][i] == expected.direction
+            assert chain["volatility_regime"][i] == expected.market_regimes["volatility"]
+            assert chain["recommended_strategy"][i] == expected.recommended_strategy
+            assert chain["alert_level"][i] == expected.alert["level"]
+    
+    def test_reversal_debug_is_opt_in(self, reversal):
+        """Debug breakdown should only be built when asked for"""
+        kwargs = dict(
+            spot=24500, spot_change=10, iv_change=0.01, strike=24500, T_days=7,
+            sigma_call=15, sigma_put=16, curr_call_price=200, curr_put_price=220
+        )
+        
+        lean = reversal.calculate_reversal(**kwargs)
+        debug = reversal.calculate_reversal(**kwargs, include_debug=True)
+        
+        assert lean.debug_data == {}
+        assert "greek_breakdown" in debug.debug_data
+        assert debug.debug_data["reversal_features"]["strike"] == 24500
+        assert lean.reversal == debug.reversal
+        assert lean.confidence == debug.confidence
+    
+    def test_reversal_result_to_dict(self, reversal):
+        """to_dict should match the fields, omitting an empty debug payload"""
+        result = reversal.calculate_reversal(
+            spot=24500, spot_change=10, iv_change=0.01, strike=24500, T_days=7,
+            sigma_call=15, sigma_put=16, curr_call_price=200, curr_put_price=220
+        )
+        payload = result.to_dict()
+        
+        assert not hasattr(result, "__dict__")
+        assert "debug_data" not in payload
+        assert payload["reversal"] == result.reversal
+        assert payload["trading_signals"]["entry"] == result.trading_signals.entry
+        assert list(payload["call_greeks"]) == ["delta", "gamma", "theta", "vega", "rho"]
+    
     def test_reversal_confidence_range(self, reversal):
         """Confidence should be 0-100"""
         result = reversal.calculate_reversal(
@@ -195,5 +524,590 @@ class TestReversalService:
         assert decay_near > decay_far  # Higher decay near expiry
 
 
+class TestReversalCalibration:
+    """Tests for reversal weight parameter sets and their calibration"""
+    
+    @pytest.fixture
+    def snapshots(self):
+        """Two hours of 5-minute NIFTY snapshots, four days before expiry"""
+        rng = np.random.default_rng(3)
+        start = datetime(2026, 1, 5, 9, 30)
+        expiry = str(int(datetime(2026, 1, 9, 10, 0, tzinfo=timezone.utc).timestamp()))
+        spot = 24500.0
+        strikes = np.arange(24000.0, 25050.0, 50.0)
+        result = []
+        for i in range(24):
+            spot += float(rng.normal(0, 15))
+            iv = 13 + 40 * np.log(strikes / spot) ** 2 * 100
+            result.append({
+                "symbol": "NIFTY",
+                "expiry": expiry,
+                "timestamp": (start + timedelta(minutes=5 * i)).isoformat(),
+                "spot": round(spot, 2),
+                "option_chain": {
+                    f"{K:.6f}": {
+                        "ce": {"iv": round(float(v), 2), "OI": int(rng.integers(1e4, 5e5))},
+                        "pe": {"iv": round(float(v) + 1, 2), "OI": int(rng.integers(1e4, 5e5))},
+                    }
+                    for K, v in zip(strikes, iv)
+                },
+            })
+        return result
+    
+    def test_params_round_trip(self, tmp_path):
+        """Saved parameter sets should load back equal, defaults included"""
+        params = ReversalParams(version="v1", gravity_cap=0.3, metadata={"samples": 10})
+        path = tmp_path / "params.json"
+        params.save(str(path))
+        loaded = ReversalParams.load(str(path))
+        
+        assert loaded == params
+        assert loaded.metadata == {"samples": 10}
+        assert ReversalParams() == DEFAULT_REVERSAL_PARAMS
+        with pytest.raises(ValueError):
+            ReversalParams.from_dict({**params.to_dict(), "volatility_multipliers": [1.0]})
+    
+    def test_default_candidate_matches_chain_reversal(self, snapshots):
+        """Candidate arrays should reproduce calculate_reversal_chain's reversal points"""
+        service = ReversalService(risk_free_rate=0.10)
+        samples = build_samples(snapshots, horizon_minutes=30, service=service)
+        sample, snap = samples[5], snapshots[5]
+        # Expiry closes 15:30 IST on 9 Jan; timestamps are IST
+        T_days = (datetime(2026, 1, 9, 15, 30) - datetime.fromisoformat(snap["timestamp"])).total_seconds() / 86400
+        legs = list(snap["option_chain"].values())
+        
+        chain = service.calculate_reversal_chain(
+            spot=sample.spot, spot_change=snap["spot"] - snapshots[4]["spot"], iv_change=0,
+            strikes=sample.strikes, T_days=T_days,
+            sigma_call=np.array([leg["ce"]["iv"] for leg in legs]),
+            sigma_put=np.array([leg["pe"]["iv"] for leg in legs]),
+            curr_call_price=np.zeros(len(legs)), curr_put_price=np.zeros(len(legs)),
+            ce_oi=np.array([leg["ce"]["OI"] for leg in legs], dtype=float),
+            pe_oi=np.array([leg["pe"]["OI"] for leg in legs], dtype=float),
+            avg_ce_oi=np.mean([leg["ce"]["OI"] for leg in legs]),
+            avg_pe_oi=np.mean([leg["pe"]["OI"] for leg in legs]),
+        )
+        reversals = candidate_reversals(params_to_arrays([DEFAULT_REVERSAL_PARAMS]), sample)
+        np.testing.assert_allclose(reversals[0], chain["reversal"], atol=1e-9)
+    
+    def test_calibrate_walk_forward(self, snapshots):
+        """Calibration should never do worse than the defaults in-sample"""
+        samples = build_samples(snapshots, horizon_minutes=30)
+        params = calibrate(samples, n_candidates=64, seed=1, n_folds=3)
+        
+        assert len(samples) == len(snapshots) - 1
+        assert params.metadata["loss_bps"] <= params.metadata["default_loss_bps"]
+        assert len(params.metadata["walk_forward"]) == 3
+        assert params.version != DEFAULT_REVERSAL_PARAMS.version
+        for weights in params.order_weights:
+            assert sum(weights) == pytest.approx(1.0)
+        
+        chain = ReversalService(params=params).calculate_reversal_chain(
+            spot=24500, spot_change=10, iv_change=0.01, strikes=np.array([24400.0, 24500.0]),
+            T_days=4, sigma_call=np.array([14.0, 13.0]), sigma_put=np.array([15.0, 14.0]),
+            curr_call_price=np.array([150.0, 90.0]), curr_put_price=np.array([60.0, 95.0])
+        )
+        assert np.all(np.isfinite(chain["reversal"]))
+
+
+class TestChainFrame:
+    """Columnar option chain parsed from Dhan's nested "oc" payload"""
+    
+    @pytest.fixture
+    def oc(self):
+        return {
+            "24600.000000": {
+                "ce": {"ltp": 80.5, "iv": 14.1, "OI": 1500, "oichng": -200, "bid": 80, "ask": 81},
+                "pe": {"ltp": 150.0, "iv": 15.2, "oi": 3000, "oichng": 400, "btyp": "LB"},
+            },
+            "24500.000000": {
+                "ce": {"ltp": 130.0, "iv": None, "OI": 0, "oichng": 0},
+                "pe": {"ltp": 95.0, "iv": 15.0, "OI": 2500, "oichng": 100},
+            },
+            "24700.000000": {"ce": {"ltp": 45.0, "iv": 13.5, "OI": 1000, "oichng": 50}},
+            "bad": {"ce": {}},
+        }
+    
+    def test_columns_are_strike_sorted(self, oc):
+        frame = ChainFrame.from_oc(oc)
+        frame.spot = 24560
+        
+        assert frame.keys == ["24500.000000", "24600.000000", "24700.000000"]
+        np.testing.assert_array_equal(frame.strikes, [24500, 24600, 24700])
+        # Calls then puts; lowercase "oi" and nulls are normalised
+        assert frame.legs["OI"].tolist() == [0, 1500, 1000, 2500, 3000, 0]
+        assert frame.legs["iv"].tolist() == [0, 14.1, 13.5, 15.0, 15.2, 0]
+        assert frame.present.tolist() == [True, True, True, True, True, False]
+        assert frame.pe("btyp").tolist() == ["NT", "LB", "NT"]
+        
+        assert frame.atm_strike() == 24600
+        assert frame.strike_pcr().tolist() == [0, 2.0, 0]
+        # Quoted mid where bid/ask are valid, LTP otherwise
+        assert frame.mid_prices()[:3].tolist() == [130.0, 80.5, 45.0]
+        
+        assert len(ChainFrame.from_oc({})) == 0
+        assert ChainFrame.from_oc({}).atm_strike() == 0
+    
+    def test_window_centres_on_atm(self):
+        oc = {f"{k}": {"ce": {"ltp": 1}, "pe": {"ltp": 2}} for k in range(24000, 25050, 50)}
+        frame = ChainFrame.from_oc(oc)
+        
+        frame.spot = 24524  # Nearer 24500
+        window = frame.window(2)
+        np.testing.assert_array_equal(window.strikes, [24400, 24450, 24500, 24550, 24600])
+        assert len(window.legs["ltp"]) == 10 and window.pe("ltp").tolist() == [2] * 5
+        assert window.parent is frame and window.atm_strike() == 24500
+        
+        frame.spot = 24525  # Midway ties to the lower strike
+        assert frame.atm_strike() == 24500
+        frame.spot = 23000
+        assert frame.window(1).keys == ["24000", "24050"]
+        assert frame.window(100) is frame
+    
+    def test_leg_payloads_keep_upstream_shape(self, oc):
+        frame = ChainFrame.from_oc(oc)
+        payloads = frame.leg_payloads(iv=[1.0] * 6)
+        
+        assert len(payloads) == 6
+        call = payloads[1]
+        assert list(call) == [key for key, _ in LEG_PAYLOAD_FIELDS]
+        assert call["oi"] == call["OI"] == 1500
+        assert call["oichng"] == call["oi_change"] == -200
+        assert call["iv"] == 1.0
+        assert call["btyp"] == "NT" and call["optgeeks"] == {}
+        # Plain Python values, ready for JSON
+        assert type(call["OI"]) is int and type(call["ltp"]) is float
+        # A missing leg serializes with defaults
+        assert payloads[5]["ltp"] == 0 and payloads[5]["BuiltupName"] == "NEUTRAL"
+
+
+class TestCalculatorService:
+    """Tests for the calculator option pricing paths"""
+    
+    @pytest.fixture
+    def calculator(self):
+        return CalculatorService()
+    
+    def test_batch_matches_scalar(self, calculator):
+        """Batch pricing should reproduce calculate_option_price row by row"""
+        rows = [
+            (24500, 24500, 7 / 365, 0.07, 0.15, 0.0),
+            (24500, 23000, 0.5, 0.10, 0.30, 0.01),
+            (1500, 1650, 0.08, 0.065, 0.45, 0.02),
+            (24500, 26000, 0.0, 0.07, 0.0, 0.0),  # Floored T and sigma
+        ]
+        batch = calculator.calculate_option_price_batch(*zip(*rows))
+        for i, row in enumerate(rows):
+            expected = calculator.calculate_option_price(*row)
+            for field, value in expected.__dict__.items():
+                assert batch[field][i] == pytest.approx(value, abs=1e-9)
+    
+    def test_batch_rejects_non_positive_spot(self, calculator):
+        with pytest.raises(ValueError):
+            calculator.calculate_option_price_batch([0], [24500], [0.1], [0.07], [0.2], [0.0])
+
+
+class TestStrategyService:
+    """Tests for multi-leg strategy payoff and Greeks"""
+    
+    @pytest.fixture
+    def strategy(self):
+        return StrategyService()
+    
+    def test_bull_call_spread_payoff(self, strategy):
+        """Payoff at expiry should match the piecewise spread formula"""
+        legs = [
+            StrategyLeg(24400, "CE", "buy", 50, 7 / 365, 0.15, premium=180),
+            StrategyLeg(24600, "CE", "sell", 50, 7 / 365, 0.14, premium=90),
+        ]
+        result = strategy.analyze(legs, spot=24500, risk_free_rate=0.07, points=401)
+        prices = np.array(result["prices"])
+        expected = (np.clip(prices - 24400, 0, 200) - 90) * 50
+        np.testing.assert_allclose(result["payoff_at_expiry"], expected, atol=0.01)
+        assert result["max_profit"] == pytest.approx(110 * 50)
+        assert result["max_loss"] == pytest.approx(-90 * 50)
+        assert result["breakevens"] == pytest.approx([24490.0])
+        assert result["net_premium"] == pytest.approx(-90 * 50)
+    
+    def test_long_straddle_unlimited_profit(self, strategy):
+        legs = [
+            StrategyLeg(24500, "CE", "buy", 1, 7 / 365, 0.15, premium=200),
+            StrategyLeg(24500, "PE", "buy", 1, 7 / 365, 0.15, premium=180),
+        ]
+        result = strategy.analyze(legs, spot=24500, risk_free_rate=0.07)
+        assert result["max_profit"] == "Unlimited"
+        assert result["breakevens"] == pytest.approx([24120.0, 24880.0])
+    
+    def test_put_extremes_beyond_grid(self, strategy):
+        """The worst case of a naked short put is at S=0, far below the grid"""
+        short_put = [StrategyLeg(24000, "PE", "sell", 75, 7 / 365, 0.15, premium=183.4)]
+        result = strategy.analyze(short_put, spot=24500, risk_free_rate=0.07)
+        assert result["max_loss"] == pytest.approx((183.4 - 24000) * 75)
+        assert result["max_profit"] == pytest.approx(183.4 * 75)
+        long_put = [StrategyLeg(24000, "PE", "buy", 75, 7 / 365, 0.15, premium=183.4)]
+        result = strategy.analyze(long_put, spot=24500, risk_free_rate=0.07)
+        assert result["max_profit"] == pytest.approx((24000 - 183.4) * 75)
+        assert result["max_loss"] == pytest.approx(-183.4 * 75)
+    
+    def test_aggregate_greeks_and_theoretical_pnl(self, strategy):
+        """Position Greeks are signed sums; P&L now at spot is zero without premiums"""
+        calculator = strategy.calculator
+        legs = [
+            StrategyLeg(24500, "CE", "sell", 2, 7 / 365, 0.15),
+            StrategyLeg(24500, "CE", "buy", 1, 35 / 365, 0.16),
+        ]
+        result = strategy.analyze(legs, spot=24500, risk_free_rate=0.07, points=201)
+        near = calculator.calculate_option_price(24500, 24500, 7 / 365, 0.07, 0.15)
+        far = calculator.calculate_option_price(24500, 24500, 35 / 365, 0.07, 0.16)
+        assert result["greeks"]["delta"] == pytest.approx(far.call_delta - 2 * near.call_delta, abs=1e-4)
+        assert result["greeks"]["vega"] == pytest.approx(far.vega - 2 * near.vega, abs=1e-4)
+        assert result["pnl_theoretical"][100] == pytest.approx(0, abs=0.02)
+
+    
+    def test_portfolio_margin_credits_hedges(self, strategy):
+        """Buying wings should cut the scan risk of a short straddle"""
+        straddle = [
+            StrategyLeg(24500, "CE", "sell", 75, 7 / 365, 0.15),
+            StrategyLeg(24500, "PE", "sell", 75, 7 / 365, 0.15),
+        ]
+        condor = straddle + [
+            StrategyLeg(24000, "PE", "buy", 75, 7 / 365, 0.17),
+            StrategyLeg(25000, "CE", "buy", 75, 7 / 365, 0.13),
+        ]
+        naked = strategy.portfolio_margin(straddle, spot=24500, risk_free_rate=0.07)
+        hedged = strategy.portfolio_margin(condor, spot=24500, risk_free_rate=0.07)
+        
+        assert len(naked["scenarios"]) == 16
+        assert hedged["scan_risk"] < naked["scan_risk"]
+        assert hedged["short_option_minimum"] == 0
+        assert hedged["offset_credit"] == pytest.approx(
+            hedged["standalone_scan_risk"] - hedged["scan_risk"], abs=0.01
+        )
+        # The condor cannot lose more than the wing width
+        assert hedged["scan_risk"] <= 500 * 75
+        assert hedged["total_margin"] < naked["total_margin"]
+    
+    def test_portfolio_margin_scan_matches_repricing(self, strategy):
+        """Scan risk of a single short call is its worst covered repricing loss"""
+        leg = StrategyLeg(24500, "CE", "sell", 1, 30 / 365, 0.15)
+        result = strategy.portfolio_margin(
+            [leg], spot=24500, risk_free_rate=0.07, scenarios=[(1, 1, 1.0), (2, 0, 0.35)]
+        )
+        bsm = BSMService(risk_free_rate=0.07)
+        now = bsm.price(24500, 24500, 30 / 365, 0.15, "call")
+        up = bsm.price(24500 * 1.06, 24500, 30 / 365, 0.19, "call")
+        extreme = bsm.price(24500 * 1.12, 24500, 30 / 365, 0.15, "call")
+        assert result["scan_risk"] == pytest.approx(max(up - now, 0.35 * (extreme - now)), abs=0.01)
+
+
+
+class TestStrategyOptimizer:
+    """Tests for the strike-combination search"""
+    
+    @pytest.fixture
+    def quotes(self):
+        """60-strike chain priced off a mild smile"""
+        bsm = BSMService(risk_free_rate=0.07)
+        spot, T = 24500.0, 7 / 365
+        strikes = spot + (np.arange(60) - 30) * 50
+        ivs = 0.13 + 0.6 * np.log(strikes / spot) ** 2
+        calls, _ = bsm.price_array(spot, strikes, T, ivs, np.ones(60, dtype=bool))
+        puts, _ = bsm.price_array(spot, strikes, T, ivs, np.zeros(60, dtype=bool))
+        return ChainQuotes(
+            strikes=strikes, call_prices=calls, put_prices=puts,
+            ivs=ivs * 100, forward=spot * math.exp(0.07 * T), T=T
+        )
+    
+    @pytest.mark.asyncio
+    async def test_iron_condor_matches_payoff(self, quotes):
+        """Reported max profit/loss and breakevens should match the expiry payoff"""
+        result = await StrategyOptimizer().optimize(quotes, "iron_condor", top_k=5, max_width=6)
+        assert result["complete"] and len(result["results"]) == 5
+        scores = [r["score"] for r in result["results"]]
+        assert scores == sorted(scores, reverse=True)
+        
+        best = result["results"][0]
+        legs = [
+            StrategyLeg(l["strike"], l["option_type"], l["side"], l["quantity"], quotes.T, 0.15, premium=l["price"])
+            for l in best["legs"]
+        ]
+        assert [l.strike for l in legs] == sorted(l.strike for l in legs)
+        payoff = StrategyService().analyze(legs, spot=24500, risk_free_rate=0.07, range_pct=15, points=3001)
+        # Leg prices are reported to 2 decimals
+        assert payoff["max_profit"] == pytest.approx(best["max_profit"], abs=0.03)
+        assert payoff["max_loss"] == pytest.approx(-best["max_loss"], abs=0.03)
+        assert payoff["breakevens"] == pytest.approx(best["breakevens"], abs=0.03)
+        assert 0 < best["pop"] < 100
+    
+    @pytest.mark.asyncio
+    async def test_process_pool_matches_inline(self, quotes):
+        """Chunked pool search with floor pruning should find the same top K"""
+        from concurrent.futures import ProcessPoolExecutor
+        from app.core.container import process_pool_context
+        
+        inline = await StrategyOptimizer(chunk_size=10**9).optimize(quotes, "iron_condor", top_k=8)
+        with ProcessPoolExecutor(max_workers=2, mp_context=process_pool_context()) as pool:
+            pooled = await StrategyOptimizer(executor=pool, workers=2, chunk_size=2000).optimize(
+                quotes, "iron_condor", top_k=8, time_budget=60
+            )
+        assert pooled["chunks"] > 1 and pooled["complete"]
+        assert pooled["results"] == inline["results"]
+    
+    @pytest.mark.asyncio
+    async def test_time_budget_returns_partial(self, quotes):
+        optimizer = StrategyOptimizer(chunk_size=500)
+        result = await optimizer.optimize(quotes, "iron_condor", top_k=3, time_budget=0)
+        assert result["chunks_done"] == 1 and not result["complete"]
+        assert len(result["results"]) == 3
+    
+    @pytest.mark.asyncio
+    async def test_filters_and_debit_structures(self, quotes):
+        result = await StrategyOptimizer().optimize(
+            quotes, "call_butterfly", top_k=10, max_loss=40, min_pop=0.2
+        )
+        assert result["results"]
+        for combo in result["results"]:
+            assert combo["net_premium"] < 0 and combo["max_loss"] <= 40 and combo["pop"] >= 20
+            low, mid, high = (l["strike"] for l in combo["legs"])
+            assert mid - low == high - mid
+
+class TestScenarioService:
+    """Tests for scenario grid repricing"""
+    
+    @pytest.fixture
+    def scenario(self):
+        return ScenarioService(risk_free_rate=0.10)
+    
+    @pytest.fixture
+    def greeks(self):
+        return GreeksService(risk_free_rate=0.10)
+    
+    def test_grid_shape(self, scenario):
+        """Each metric is a (spot, iv, time, strike) tensor"""
+        grid = scenario.reprice_grid(
+            24500, [24400, 24500, 24600], [15, 14, 13], [16, 15, 14], 7,
+            [-1, 0, 1], [-2, 0, 2], [0, 1, 2, 3], metrics=("price", "gamma")
+        )
+        assert set(grid) == {"ce", "pe"}
+        assert set(grid["ce"]) == {"price", "gamma"}
+        assert grid["pe"]["price"].shape == (3, 3, 4, 3)
+    
+    def test_grid_matches_scalar_greeks(self, scenario, greeks):
+        """Every cell should match GreeksService at the shocked inputs"""
+        strikes = [24300, 24500, 24700]
+        call_ivs, put_ivs = [16, 15, 14], [17, 16, 15]
+        shocks, shifts, days = [-2, 0, 1.5], [-3, 0, 2], [0, 2.5]
+        grid = scenario.reprice_grid(
+            24500, strikes, call_ivs, put_ivs, 7, shocks, shifts, days,
+            metrics=("price", "delta", "gamma", "theta", "vega", "rho")
+        )
+        for i, shock in enumerate(shocks):
+            for j, shift in enumerate(shifts):
+                for t, day in enumerate(days):
+                    for k, K in enumerate(strikes):
+                        S = 24500 * (1 + shock / 100)
+                        T = (7 - day) / 365
+                        for leg, ivs, option_type in (("ce", call_ivs, "call"), ("pe", put_ivs, "put")):
+                            expected = greeks.calculate_all_greeks(S, K, T, (ivs[k] + shift) / 100, option_type)
+                            for metric in ("delta", "gamma", "theta", "vega", "rho"):
+                                assert grid[leg][metric][i, j, t, k] == pytest.approx(
+                                    getattr(expected, metric), abs=1e-5
+                                )
+                            assert grid[leg]["price"][i, j, t, k] == pytest.approx(
+                                greeks.bsm.price(S, K, T, (ivs[k] + shift) / 100, option_type), abs=1e-6
+                            )
+    
+    def test_expired_steps_use_intrinsic(self, scenario):
+        """Time steps past expiry should be intrinsic value with zero Greeks"""
+        grid = scenario.reprice_grid(
+            24500, [24400, 24600], [15, 15], [15, 15], 2,
+            [0], [0], [0, 2, 5], metrics=("price", "delta")
+        )
+        assert grid["ce"]["price"][0, 0, 1].tolist() == [100.0, 0.0]
+        assert grid["pe"]["price"][0, 0, 2].tolist() == [0.0, 100.0]
+        assert np.all(grid["ce"]["delta"][0, 0, 1:] == 0)
+        assert grid["ce"]["price"][0, 0, 0, 0] > 100
+    
+    def test_unknown_metric_rejected(self, scenario):
+        with pytest.raises(ValueError):
+            scenario.reprice_grid(24500, [24500], [15], [15], 7, [0], [0], [0], metrics=("charm",))
+
+
+
+class TestSimulationService:
+    """Tests for Monte Carlo paths and the statistics built on them"""
+    
+    @pytest.fixture
+    def simulation(self):
+        return SimulationService(n_paths=20000, steps_per_day=24)
+    
+    def test_terminal_distribution(self, simulation):
+        """Terminal prices should be lognormal around the forward"""
+        paths = simulation.simulate(24500, 0.15, 30, 0.07)
+        T = 30 / 365
+        assert paths.terminal.mean() == pytest.approx(24500 * math.exp(0.07 * T), rel=1e-3)
+        assert np.log(paths.terminal).std() == pytest.approx(0.15 * math.sqrt(T), rel=0.02)
+        cones = simulation.percentile_cones(paths, (5, 50, 95))
+        assert len(cones["p50"]) == len(paths.days) == 31
+        assert cones["p50"][0] == 24500 and np.all(np.diff(cones["p95"]) > 0)
+        assert cones["p50"][-1] == pytest.approx(24500 * math.exp((0.07 - 0.5 * 0.15 ** 2) * T), rel=2e-3)
+    
+    def test_touch_probabilities(self, simulation):
+        """Touch odds exceed finishing odds, about twice for OTM strikes"""
+        paths = simulation.simulate(24500, 0.15, 30, 0.0)
+        probs = simulation.touch_probabilities(paths, [23500, 24500, 25500])
+        assert np.all(probs["touch"] >= probs["expire_beyond"])
+        assert probs["touch"][1] == 1.0
+        # Reflection principle, less the touches missed between steps
+        for i in (0, 2):
+            assert probs["touch"][i] == pytest.approx(2 * probs["expire_beyond"][i], rel=0.12)
+    
+    def test_paths_reused_per_snapshot(self, simulation):
+        first = simulation.simulate(24500, 0.15, 7, 0.07)
+        assert simulation.simulate(24500, 0.15, 7, 0.07) is first
+        other = simulation.simulate(24500, 0.15, 7, 0.07, seed=7)
+        assert other is not first
+        assert simulation.stats == {"generated": 2, "reused": 1}
+    
+    def test_path_cache_bounded_by_bytes(self):
+        """Sets are evicted least recently used first once their arrays exceed the byte budget"""
+        simulation = SimulationService(n_paths=1000)
+        weekly = simulation.simulate(24500, 0.15, 7, 0.07)
+        monthly = simulation.simulate(24500, 0.15, 30, 0.07)
+        assert monthly.nbytes > 3 * weekly.nbytes
+        simulation.cache_max_bytes = weekly.nbytes + monthly.nbytes
+        
+        assert simulation.simulate(24500, 0.15, 7, 0.07) is weekly
+        simulation.simulate(24500, 0.15, 7, 0.07, seed=1)  # Evicts the monthly set
+        assert simulation.simulate(24500, 0.15, 7, 0.07) is weekly
+        assert simulation.simulate(24500, 0.15, 30, 0.07) is not monthly
+        assert simulation.stats == {"generated": 4, "reused": 2}
+    
+    def test_short_straddle_pop(self, simulation):
+        """POP should match the lognormal chance of expiring between breakevens"""
+        from scipy.stats import norm
+        paths = simulation.simulate(24500, 0.15, 7, 0.07)
+        T = 7 / 365
+        legs = [
+            StrategyLeg(24500, "CE", "sell", 1, T, 0.15, premium=200),
+            StrategyLeg(24500, "PE", "sell", 1, T, 0.15, premium=180),
+        ]
+        result = simulation.probability_of_profit(paths, legs)
+        sd = 0.15 * math.sqrt(T)
+        mu = math.log(24500) + (0.07 - 0.5 * 0.15 ** 2) * T
+        expected = norm.cdf((math.log(24880) - mu) / sd) - norm.cdf((math.log(24120) - mu) / sd)
+        assert result["pop"] == pytest.approx(expected, abs=0.01)
+        assert result["net_premium"] == pytest.approx(380)
+    
+    def test_jumps_keep_forward_and_fatten_tails(self, simulation):
+        jumps = JumpParams(intensity=10, mean=-0.02, vol=0.03)
+        plain = simulation.simulate(24500, 0.15, 30, 0.07)
+        jumpy = simulation.simulate(24500, 0.15, 30, 0.07, jumps=jumps)
+        assert jumpy.terminal.mean() == pytest.approx(plain.terminal.mean(), rel=2e-3)
+        returns = np.log(jumpy.terminal / 24500)
+        kurtosis = np.mean((returns - returns.mean()) ** 4) / returns.var() ** 2
+        assert kurtosis > 3.2
+
+class TestVolSurfaceService:
+    """Tests for SVI surface fitting and interpolation"""
+    
+    TRUE_PARAMS = (0.0002, 0.004, -0.6, 0.01, 0.05)
+    
+    @pytest.fixture
+    def surface(self):
+        return VolSurfaceService()
+    
+    def svi_ivs(self, strikes, forward, T, params=TRUE_PARAMS):
+        a, b, rho, m, sigma = params
+        km = np.log(np.asarray(strikes) / forward) - m
+        return np.sqrt((a + b * (rho * km + np.sqrt(km ** 2 + sigma ** 2))) / T) * 100
+    
+    def test_fit_recovers_svi_smile(self, surface):
+        """An exact SVI smile should be recovered with negligible error"""
+        strikes = np.arange(22000, 27050, 50.0)
+        ivs = self.svi_ivs(strikes, 24550, 7 / 365)
+        fitted = surface.update("NIFTY", "1", strikes, ivs, ivs, 24550, 7 / 365)
+        assert fitted.rmse < 0.01
+        np.testing.assert_allclose(fitted.params, self.TRUE_PARAMS, rtol=1e-3, atol=1e-6)
+    
+    def test_refit_only_when_quotes_move(self, surface):
+        """Unchanged quotes reuse the fit; a move beyond tolerance refits"""
+        strikes = np.arange(24000, 25050, 50.0)
+        ivs = self.svi_ivs(strikes, 24550, 7 / 365)
+        first = surface.update("NIFTY", "1", strikes, ivs, ivs, 24550, 7 / 365)
+        again = surface.update("NIFTY", "1", strikes, ivs + 0.01, ivs, 24550, 7 / 365)
+        moved = surface.update("NIFTY", "1", strikes, ivs + 0.5, ivs + 0.5, 24550, 7 / 365)
+        assert again is first
+        assert moved is not first
+        assert surface.stats == {"fitted": 2, "reused": 1, "failed": 0}
+    
+    def test_too_few_quotes_not_fitted(self, surface):
+        assert surface.update("NIFTY", "1", [24500, 24550], [14, 14], [15, 15], 24550, 7 / 365) is None
+    
+    def test_two_level_chain_fits(self, surface):
+        """A step between put and call IVs is a degenerate design but still fits"""
+        strikes = np.arange(24300, 24750, 50.0)
+        fitted = surface.update("NIFTY", "1", strikes, np.full(9, 14.0), np.full(9, 15.0), 24533.58, 5 / 365)
+        assert fitted is not None
+        assert surface.stats["failed"] == 0
+        assert np.all((fitted.implied_vol(strikes) > 14) & (fitted.implied_vol(strikes) < 15))
+    
+    def test_bsm_and_reversal_read_surface(self, surface):
+        """Legs without an IV should price off the fitted smile"""
+        strikes = np.arange(24000, 25050, 50.0)
+        ivs = self.svi_ivs(strikes, 24550, 7 / 365)
+        surface.update("NIFTY", "1", strikes, ivs, ivs, 24550, 7 / 365)
+        bsm = BSMService(0.10, vol_surface=surface)
+        np.testing.assert_allclose(bsm.surface_iv("NIFTY", strikes, 7 / 365, forward=24550), ivs / 100, rtol=1e-4)
+        assert BSMService(0.10).surface_iv("NIFTY", strikes, 7 / 365) is None
+        
+        reversal = ReversalService(0.10, vol_surface=surface)
+        args = dict(
+            spot=24550, spot_change=50, iv_change=0, strikes=strikes, T_days=7,
+            curr_call_price=np.full(21, 100.0), curr_put_price=np.full(21, 100.0)
+        )
+        missing = reversal.calculate_reversal_chain(
+            **args, sigma_call=np.zeros(21), sigma_put=np.zeros(21), symbol="NIFTY"
+        )
+        quoted = reversal.calculate_reversal_chain(
+            **args, sigma_call=bsm.surface_iv("NIFTY", strikes, 7 / 365) * 100,
+            sigma_put=bsm.surface_iv("NIFTY", strikes, 7 / 365) * 100
+        )
+        np.testing.assert_allclose(missing["reversal"], quoted["reversal"])
+        # Without a symbol the flat fallback still applies
+        flat = reversal.calculate_reversal_chain(**args, sigma_call=np.zeros(21), sigma_put=np.zeros(21))
+        assert not np.allclose(flat["ce_tv"], missing["ce_tv"])
+    
+    def test_concurrent_updates_from_threads(self, surface):
+        """Compute threads fitting different expiries should not lose fits or break reads"""
+        from concurrent.futures import ThreadPoolExecutor
+        strikes = np.arange(24000, 25050, 50.0)
+        
+        def fit(day):
+            ivs = self.svi_ivs(strikes, 24550, day / 365)
+            surface.update("NIFTY", str(day), strikes, ivs, ivs, 24550, day / 365)
+            return len(surface.get_surface("NIFTY"))
+        
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(fit, range(1, 33)))
+        assert surface.stats["fitted"] == 32
+        assert [s.expiry for s in surface.get_surface("NIFTY")] == [str(day) for day in range(1, 33)]
+    
+    def test_interpolates_total_variance_across_expiries(self, surface):
+        """Between expiries, total variance should be linear in time"""
+        strikes = np.arange(24000, 25050, 50.0)
+        near = surface.update("NIFTY", "1", strikes, np.full(21, 12.0), np.full(21, 12.0), 24550, 7 / 365)
+        far = surface.update("NIFTY", "2", strikes, np.full(21, 16.0), np.full(21, 16.0), 24550, 21 / 365)
+        T = 14 / 365
+        iv = surface.implied_vol("NIFTY", [24550], T, forward=24550)[0]
+        w_near = (near.implied_vol([24550])[0] / 100) ** 2 * near.T
+        w_far = (far.implied_vol([24550])[0] / 100) ** 2 * far.T
+        assert (iv / 100) ** 2 * T == pytest.approx((w_near + w_far) / 2, rel=1e-9)
+        # Flat beyond the last expiry
+        assert surface.implied_vol("NIFTY", [24550], 60 / 365, forward=24550)[0] == pytest.approx(
+            far.implied_vol([24550])[0]
+        )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])